@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Two-Step Floating Catchment Accessibility for Digital Equity Services
+Scores how reachable each Service type is from every tract or block group
+population centroid, weighing provider capacity against the population
+competing for it within a distance-decayed catchment, and feeds the result
+to the Bayesian Services factor as service_quality_score
+"""
+
+from typing import Dict, List, Tuple
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+from spatial_index import EARTH_RADIUS_M
+
+# Catchment radius (about a 30 minute drive in rural Michigan) and the decay within it
+DEFAULT_CATCHMENT_M = 30000.0
+DECAY_FUNCTIONS = ('gaussian', 'step')
+
+# Accessibility is reported per 1,000 residents
+PER_POPULATION = 1000.0
+
+# Census centers of population files (CenPop2020_Mean_TR26.txt / _BG26.txt) build the GEOID from these
+GEOID_PARTS = ['STATEFP', 'COUNTYFP', 'TRACTCE', 'BLKGRPCE']
+
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """Points on the unit sphere, so chord lengths convert exactly to great-circle distance"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def decay_weights(distance_m: np.ndarray, catchment_m: float, decay: str = 'gaussian') -> np.ndarray:
+    """
+    Distance decay inside the catchment: 1 at the centroid, 0 at the edge
+
+    'gaussian' is the Gaussian 2SFCA kernel, rescaled so the catchment edge
+    has zero weight; 'step' is the original 2SFCA (everything inside counts).
+    """
+    if decay == 'step':
+        return np.ones_like(distance_m)
+    edge = math.exp(-0.5)
+    return (np.exp(-0.5 * (distance_m / catchment_m) ** 2) - edge) / (1.0 - edge)
+
+
+class AccessibilityModel:
+    """
+    Demand areas, providers and the sparse distance-decay matrix between them
+
+    W (areas x providers) holds the decay weight of every pair within the
+    catchment; S (providers x services) holds each provider's capacity per
+    service. Both passes of 2SFCA are then two sparse products over all
+    services at once:
+
+        R = diag(1 / (W^T P)) S        supply-to-demand ratio per provider
+        A = W R                        accessibility per area and service
+    """
+
+    def __init__(self, areas: pd.DataFrame, providers: pd.DataFrame,
+                 catchment_m: float = DEFAULT_CATCHMENT_M, decay: str = 'gaussian'):
+        """
+        Args:
+            areas: geoid, latitude, longitude, population and optional county / county_fips
+            providers: id, latitude, longitude, service and optional capacity (one row per service)
+            catchment_m: Catchment radius in meters
+            decay: One of DECAY_FUNCTIONS
+        """
+        if decay not in DECAY_FUNCTIONS:
+            raise ValueError(f"Unknown decay '{decay}', expected one of {DECAY_FUNCTIONS}")
+        self.catchment_m = catchment_m
+        self.decay = decay
+        self.areas = areas.reset_index(drop=True)
+        self.population = self.areas['population'].to_numpy(dtype=np.float64)
+
+        providers = providers.dropna(subset=['latitude', 'longitude', 'service'])
+        provider_codes, provider_ids = pd.factorize(providers['id'])
+        service_codes, self.services = pd.factorize(providers['service'], sort=True)
+        located = providers.groupby(provider_codes)[['latitude', 'longitude']].first()
+        self.provider_ids = list(provider_ids)
+        self.provider_lat = located['latitude'].to_numpy(dtype=np.float64)
+        self.provider_lon = located['longitude'].to_numpy(dtype=np.float64)
+        capacity = (providers['capacity'].fillna(1.0) if 'capacity' in providers
+                    else pd.Series(1.0, index=providers.index)).to_numpy(dtype=np.float64)
+        self.supply = sparse.csr_matrix((capacity, (provider_codes, service_codes)),
+                                        shape=(len(self.provider_ids), len(self.services)))
+        self.weights = self._weight_matrix()
+
+    def _weight_matrix(self) -> sparse.csr_matrix:
+        """Sparse decay weights for every area-provider pair within the catchment"""
+        shape = (len(self.areas), len(self.provider_ids))
+        if not shape[0] or not shape[1]:
+            return sparse.csr_matrix(shape)
+        area_tree = cKDTree(unit_vectors(self.areas['latitude'], self.areas['longitude']))
+        provider_tree = cKDTree(unit_vectors(self.provider_lat, self.provider_lon))
+        chord = 2.0 * math.sin(min(self.catchment_m / EARTH_RADIUS_M, math.pi) / 2.0)
+        pairs = area_tree.sparse_distance_matrix(provider_tree, chord, output_type='ndarray')
+        distance = 2.0 * EARTH_RADIUS_M * np.arcsin(np.minimum(pairs['v'] / 2.0, 1.0))
+        weight = decay_weights(distance, self.catchment_m, self.decay)
+        keep = weight > 0
+        return sparse.csr_matrix((weight[keep], (pairs['i'][keep], pairs['j'][keep])), shape=shape)
+
+    def accessibility(self) -> np.ndarray:
+        """Dense (areas x services) 2SFCA accessibility per PER_POPULATION residents"""
+        demand = self.weights.T @ self.population
+        inverse = np.divide(1.0, demand, out=np.zeros_like(demand), where=demand > 0)
+        ratios = sparse.diags(inverse) @ self.supply
+        return np.asarray((self.weights @ ratios).todense()) * PER_POPULATION
+
+    def score(self) -> Dict:
+        """
+        Accessibility per area and service, and service_quality_score per area and county
+
+        A service's score is the area's accessibility relative to the statewide
+        population-weighted mean, capped at 1; service_quality_score averages
+        the service scores, so 0.5 (the Bayesian high threshold) means at least
+        half of average access across services.
+
+        Returns:
+            {'services': [...], 'accessibility': (areas x services), 'statewide': per service,
+             'area_scores': per area, 'counties': DataFrame, 'pairs': n, 'seconds': s}
+        """
+        start = time.perf_counter()
+        access = self.accessibility()
+        total_population = self.population.sum()
+        statewide = (self.population @ access) / total_population if total_population else np.zeros(len(self.services))
+        relative = np.divide(access, statewide, out=np.zeros_like(access), where=statewide > 0)
+        service_scores = np.minimum(relative, 1.0)
+        offered = statewide > 0
+        area_scores = (service_scores[:, offered].mean(axis=1) if offered.any()
+                       else np.zeros(len(self.areas)))
+        return {
+            'services': list(self.services),
+            'accessibility': access,
+            'service_scores': service_scores,
+            'statewide': statewide,
+            'area_scores': area_scores,
+            'counties': self.county_rollup(access, service_scores, area_scores),
+            'pairs': int(self.weights.nnz),
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+
+    def county_rollup(self, access: np.ndarray, service_scores: np.ndarray,
+                      area_scores: np.ndarray) -> pd.DataFrame:
+        """Population-weighted county means through a sparse county-by-area incidence matrix"""
+        keys = self._county_keys()
+        codes, counties = pd.factorize(keys)
+        has_county = codes >= 0
+        incidence = sparse.csr_matrix((self.population[has_county], (codes[has_county], np.flatnonzero(has_county))),
+                                      shape=(len(counties), len(self.areas)))
+        county_population = np.asarray(incidence.sum(axis=1)).ravel()
+        scale = np.divide(1.0, county_population, out=np.zeros_like(county_population),
+                          where=county_population > 0)[:, None]
+        rollup = pd.DataFrame({'key': counties, 'population': county_population,
+                               'service_quality_score': (incidence @ area_scores[:, None]).ravel() * scale.ravel()})
+        rollup['accessibility'] = list(incidence @ access * scale)
+        rollup['service_scores'] = list(incidence @ service_scores * scale)
+        return rollup
+
+    def _county_keys(self) -> np.ndarray:
+        """County FIPS when known (GEOIDs start with it), else the county name column"""
+        if 'county_fips' in self.areas:
+            return self.areas['county_fips'].to_numpy(dtype=object)
+        if 'county' in self.areas:
+            return self.areas['county'].to_numpy(dtype=object)
+        return np.full(len(self.areas), None, dtype=object)
+
+
+# ===== Inputs =====
+
+def read_areas(path: str) -> pd.DataFrame:
+    """
+    Demand centroids from a CSV
+
+    Accepts either geoid, latitude, longitude, population[, county] columns or
+    a Census centers of population file (STATEFP, COUNTYFP, TRACTCE[, BLKGRPCE],
+    POPULATION, LATITUDE, LONGITUDE), whose GEOID is rebuilt from its parts.
+    """
+    frame = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    upper = {column.upper(): column for column in frame.columns}
+    if 'GEOID' not in upper and 'STATEFP' in upper:
+        parts = [upper[part] for part in GEOID_PARTS if part in upper]
+        frame['geoid'] = frame[parts].agg(''.join, axis=1)
+        upper['GEOID'] = 'geoid'
+    areas = pd.DataFrame({
+        'geoid': frame[upper['GEOID']].str.strip(),
+        'latitude': pd.to_numeric(frame[upper['LATITUDE']]),
+        'longitude': pd.to_numeric(frame[upper['LONGITUDE']]),
+        'population': pd.to_numeric(frame[upper['POPULATION']]).fillna(0.0)
+    })
+    if 'COUNTY' in upper:
+        areas['county'] = frame[upper['COUNTY']].str.strip()
+    if areas['geoid'].str.len().ge(11).all():
+        areas['county_fips'] = areas['geoid'].str[:5]
+    return areas
+
+
+def read_providers(path: str) -> pd.DataFrame:
+    """Providers CSV with id, latitude, longitude, services (';'-separated) and optional capacity"""
+    frame = pd.read_csv(path, dtype={'id': str})
+    column = 'services' if 'services' in frame else 'service'
+    frame['service'] = frame[column].astype(str).str.split(';')
+    frame = frame.explode('service')
+    frame['service'] = frame['service'].str.strip()
+    return frame[[c for c in ['id', 'latitude', 'longitude', 'service', 'capacity'] if c in frame]]
+
+
+def fetch_areas(driver, level: str = 'county') -> pd.DataFrame:
+    """GeographicRegion centroids at one level, with their population, as demand areas"""
+    with driver.session() as session:
+        rows = session.run("""
+            MATCH (r:GeographicRegion)
+            WHERE r.type = $level AND r.centroid IS NOT NULL AND r.population IS NOT NULL
+            RETURN coalesce(r.fips, r.name) as geoid, r.name as county,
+                   r.centroid.latitude as latitude, r.centroid.longitude as longitude,
+                   toFloat(r.population) as population
+        """, {'level': level}).data()
+    return pd.DataFrame(rows, columns=['geoid', 'county', 'latitude', 'longitude', 'population'])
+
+
+def fetch_providers(driver) -> Tuple[pd.DataFrame, int]:
+    """Located organizations with one row per Service they provide, and how many lack a location"""
+    with driver.session() as session:
+        rows = session.run("""
+            MATCH (o:Organization)-[:PROVIDES_SERVICE]->(s:Service)
+            WHERE o.location IS NOT NULL
+            RETURN elementId(o) as id, o.location.latitude as latitude, o.location.longitude as longitude,
+                   s.name as service, toFloat(coalesce(o.capacity, 1.0)) as capacity
+        """).data()
+        unlocated = session.run("""
+            MATCH (o:Organization) WHERE o.location IS NULL AND (o)-[:PROVIDES_SERVICE]->()
+            RETURN count(o) as n
+        """).single()['n']
+    return pd.DataFrame(rows, columns=['id', 'latitude', 'longitude', 'service', 'capacity']), unlocated
+
+
+def synthetic_inputs(areas: int, providers: int, services: int = 12, seed: int = 3) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Clustered statewide centroids and providers for benchmarking"""
+    rng = np.random.default_rng(seed)
+    towns = np.column_stack([rng.uniform(41.7, 46.5, 80), rng.uniform(-90.0, -82.5, 80)])
+
+    def scatter(n, spread):
+        centers = towns[rng.integers(0, len(towns), n)]
+        return centers + rng.normal(0.0, spread, (n, 2))
+
+    area_points = scatter(areas, 0.25)
+    demand = pd.DataFrame({'geoid': [f"26{i:09d}" for i in range(areas)],
+                           'latitude': area_points[:, 0], 'longitude': area_points[:, 1],
+                           'population': rng.integers(600, 3000, areas).astype(np.float64)})
+    demand['county_fips'] = [f"26{i % 83 * 2 + 1:03d}" for i in range(areas)]
+    provider_points = scatter(providers, 0.3)
+    offered = [rng.choice(services, size=rng.integers(1, 5), replace=False) for _ in range(providers)]
+    supply = pd.DataFrame({'id': np.repeat(np.arange(providers), [len(s) for s in offered]).astype(str),
+                           'service': [f"Service {s:02d}" for s in np.concatenate(offered)]})
+    supply['latitude'] = provider_points[supply['id'].astype(int), 0]
+    supply['longitude'] = provider_points[supply['id'].astype(int), 1]
+    supply['capacity'] = rng.uniform(1.0, 20.0, len(supply))
+    return demand, supply
+
+
+# ===== Write-back =====
+
+def write_accessibility(driver, model: AccessibilityModel, result: Dict, batch_size: int = 2000) -> Dict[str, int]:
+    """
+    Write service_quality_score to area and county regions, plus per-service SERVICE_ACCESS
+
+    Areas match GeographicRegion on fips (tracts, block groups); county
+    rollups match on fips or name. Regions marked
+    service_quality_source = 'accessibility' keep their score when
+    ingest_michigan_data.py reruns.
+    """
+    from graph_metadata import bump_graph_version
+
+    services = result['services']
+
+    def region_rows(keys, scores, access, service_scores):
+        return [{'key': key, 'score': round(float(score), 4),
+                 'services': [{'service': services[s], 'accessibility': round(float(access[i, s]), 4),
+                               'score': round(float(service_scores[i, s]), 4)}
+                              for s in np.flatnonzero(result['statewide'] > 0)]}
+                for i, (key, score) in enumerate(zip(keys, scores)) if key]
+
+    counties = result['counties']
+    batches = [
+        ("MATCH (r:GeographicRegion {fips: row.key})",
+         region_rows(model.areas['geoid'].tolist(), result['area_scores'],
+                     result['accessibility'], result['service_scores'])),
+        ("MATCH (r:GeographicRegion) WHERE r.type = 'county' AND (r.fips = row.key OR r.name = row.key)",
+         region_rows(counties['key'].tolist(), counties['service_quality_score'],
+                     np.vstack(counties['accessibility']) if len(counties) else np.zeros((0, len(services))),
+                     np.vstack(counties['service_scores']) if len(counties) else np.zeros((0, len(services)))))
+    ]
+    written = {'areas': 0, 'counties': 0}
+    with driver.session() as session:
+        for (match, rows), label in zip(batches, written):
+            for i in range(0, len(rows), batch_size):
+                written[label] += session.run(f"""
+                    UNWIND $rows as row
+                    {match}
+                    SET r.service_quality_score = row.score,
+                        r.service_quality_source = 'accessibility',
+                        r.service_accessibility_updated_at = datetime()
+                    WITH r, row
+                    CALL {{
+                        WITH r, row
+                        UNWIND row.services as entry
+                        MATCH (s:Service {{name: entry.service}})
+                        MERGE (r)-[a:SERVICE_ACCESS]->(s)
+                        SET a.accessibility = entry.accessibility,
+                            a.score = entry.score,
+                            a.catchment_m = $catchment_m
+                        RETURN count(a) as linked
+                    }}
+                    RETURN count(DISTINCT r) as updated
+                """, {'rows': rows[i:i + batch_size], 'catchment_m': model.catchment_m}).single()['updated']
+        bump_graph_version(session, source='accessibility_engine')
+    return written
+
+
+# Score service accessibility from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Two-step floating catchment accessibility per Service type")
+    parser.add_argument("--areas", help="Population centroid CSV for tracts or block groups "
+                                        "(default: GeographicRegion centroids at --level)")
+    parser.add_argument("--level", default="county", help="GeographicRegion type used when --areas is not given")
+    parser.add_argument("--providers", help="Providers CSV (default: located Organization nodes)")
+    parser.add_argument("--catchment-m", type=float, default=DEFAULT_CATCHMENT_M)
+    parser.add_argument("--decay", choices=DECAY_FUNCTIONS, default='gaussian')
+    parser.add_argument("--output", help="Write per-area accessibility CSV")
+    parser.add_argument("--write", action="store_true", help="Write scores to GeographicRegion nodes")
+    parser.add_argument("--benchmark", type=int, nargs=2, metavar=("AREAS", "PROVIDERS"),
+                        help="Score synthetic statewide inputs instead (e.g. 8400 5000)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Service Accessibility (2SFCA)")
+    print("=" * 60)
+    print()
+
+    try:
+        driver = None
+        if args.benchmark:
+            areas, providers = synthetic_inputs(*args.benchmark)
+        else:
+            if not (args.areas and args.providers):
+                from neo4j_connection import get_driver
+                driver = get_driver()
+            areas = read_areas(args.areas) if args.areas else fetch_areas(driver, args.level)
+            if args.providers:
+                providers = read_providers(args.providers)
+            else:
+                providers, unlocated = fetch_providers(driver)
+                if unlocated:
+                    print(f"  {unlocated} organizations have no location and are not scored")
+
+        start = time.perf_counter()
+        model = AccessibilityModel(areas, providers, args.catchment_m, args.decay)
+        build_seconds = time.perf_counter() - start
+        result = model.score()
+        print(f"✓ {len(model.areas):,} areas, {len(model.provider_ids):,} providers, "
+              f"{len(result['services'])} services, {result['pairs']:,} pairs within "
+              f"{args.catchment_m / 1000:.0f} km")
+        print(f"✓ Catchment matrix {build_seconds:.2f}s, both 2SFCA passes {result['seconds']:.3f}s")
+        for service, mean in zip(result['services'], result['statewide']):
+            print(f"  {service:32s} {mean:8.3f} per {PER_POPULATION:,.0f} residents")
+        covered = model.population[result['area_scores'] >= 0.5].sum() / max(model.population.sum(), 1.0)
+        print(f"  Population with service_quality_score >= 0.5: {covered:.1%}")
+
+        if args.output:
+            out = pd.DataFrame(result['accessibility'], columns=result['services']).round(4)
+            out.insert(0, 'service_quality_score', np.round(result['area_scores'], 4))
+            out.insert(0, 'population', model.population)
+            out.insert(0, 'geoid', model.areas['geoid'])
+            out.to_csv(args.output, index=False)
+            print(f"✓ Wrote {args.output}")
+
+        if args.write and not args.benchmark:
+            if driver is None:
+                from neo4j_connection import get_driver
+                driver = get_driver()
+            written = write_accessibility(driver, model, result)
+            print(f"✓ Updated service_quality_score on {written['areas']} areas and {written['counties']} counties")
+
+    except Exception as e:
+        print(f"❌ Accessibility scoring failed: {e}")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Materialized Analytics Views for the Digital Equity Dashboard
+Precomputes the dashboard aggregates (overview counts, services by provider
+count, populations by organization count, regional coverage) into small
+summary nodes after ingestion, so charts read rows instead of the graph
+"""
+
+from typing import Dict
+
+# Names listed per service/population row; the counts stay exact
+MAX_LISTED_NAMES = 25
+
+SUMMARY_LABELS = ['ServiceSummary', 'PopulationSummary', 'RegionSummary']
+
+OVERVIEW_VIEW = """
+CALL { MATCH (o:Organization) RETURN count(o) as organizations }
+CALL { MATCH (s:Service) RETURN count(s) as services }
+CALL { MATCH (p:Population) RETURN count(p) as populations }
+CALL { MATCH (r:GeographicRegion) RETURN count(r) as regions }
+MERGE (v:AnalyticsView {name: 'overview'})
+SET v.organizations = organizations,
+    v.services = services,
+    v.populations = populations,
+    v.regions = regions,
+    v.refreshed_at = datetime()
+"""
+
+SERVICE_VIEW = """
+MATCH (s:Service)<-[:PROVIDES_SERVICE]-(o:Organization)
+WITH s, o ORDER BY o.name
+WITH s, count(DISTINCT o) as provider_count, collect(DISTINCT o.name)[..$max_names] as providers
+ORDER BY provider_count DESC, s.name
+WITH collect({service: s.name, provider_count: provider_count, providers: providers}) as rows
+UNWIND range(0, size(rows) - 1) as rank
+WITH rank, rows[rank] as row
+CREATE (:ServiceSummary {rank: rank, service: row.service,
+                         provider_count: row.provider_count, providers: row.providers})
+"""
+
+POPULATION_VIEW = """
+MATCH (p:Population)<-[:SERVES_POPULATION]-(o:Organization)
+WITH p, o ORDER BY o.name
+WITH p, count(DISTINCT o) as org_count, collect(DISTINCT o.name)[..$max_names] as organizations
+ORDER BY org_count DESC, p.name
+WITH collect({population: p.name, org_count: org_count, organizations: organizations}) as rows
+UNWIND range(0, size(rows) - 1) as rank
+WITH rank, rows[rank] as row
+CREATE (:PopulationSummary {rank: rank, population: row.population,
+                            org_count: row.org_count, organizations: row.organizations})
+"""
+
+REGION_VIEW = """
+MATCH (r:GeographicRegion)
+WITH r ORDER BY r.fiber_coverage DESC, r.name
+WITH collect(r) as regions
+UNWIND range(0, size(regions) - 1) as rank
+WITH rank, regions[rank] as r
+CREATE (:RegionSummary {rank: rank, county: r.name, fiber: r.fiber_coverage,
+                        cable: r.cable_coverage, speed: r.median_speed_mbps})
+"""
+
+
+def create_view_indexes(session):
+    """Range indexes on rank so dashboard reads walk the index in display order"""
+    from service_gaps import create_gap_index
+
+    create_gap_index(session)
+    for label in SUMMARY_LABELS:
+        session.run(f"CREATE INDEX {label.lower()}_rank IF NOT EXISTS FOR (n:{label}) ON (n.rank)")
+    session.run("CREATE CONSTRAINT analytics_view_name IF NOT EXISTS "
+                "FOR (v:AnalyticsView) REQUIRE v.name IS UNIQUE")
+
+
+def _rebuild_views(tx, max_names: int) -> Dict:
+    for label in SUMMARY_LABELS:
+        tx.run(f"MATCH (n:{label}) DELETE n")
+    tx.run(OVERVIEW_VIEW)
+    counts = {}
+    for label, query in [('ServiceSummary', SERVICE_VIEW), ('PopulationSummary', POPULATION_VIEW),
+                         ('RegionSummary', REGION_VIEW)]:
+        counts[label] = tx.run(query, {'max_names': max_names}).consume().counters.nodes_created
+    return counts
+
+
+def refresh_analytics_views(session, max_names: int = MAX_LISTED_NAMES) -> Dict:
+    """
+    Recompute every summary view and the service gap ranking in one write transaction
+
+    The gap cube is read and ranked first, outside the transaction; the
+    views and the ranked rows are then replaced together. Call at the end
+    of an ingestion run, before bumping the graph version, so the dashboard
+    never caches a half-built view under a new version.
+
+    Returns:
+        Number of summary rows written per view label
+    """
+    from service_gaps import prepare_service_gaps, write_service_gaps
+
+    create_view_indexes(session)
+    gaps = prepare_service_gaps(session)
+
+    def rebuild(tx):
+        counts = _rebuild_views(tx, max_names)
+        counts['ServiceGap'] = write_service_gaps(tx, gaps)
+        return counts
+
+    return session.execute_write(rebuild)
+
+
+# Refresh the views from the command line
+if __name__ == "__main__":
+    from graph_metadata import bump_graph_version
+    from neo4j_connection import get_driver
+
+    print("=" * 60)
+    print("Refreshing Analytics Views")
+    print("=" * 60)
+    print()
+
+    driver = get_driver()
+    try:
+        with driver.session() as session:
+            counts = refresh_analytics_views(session)
+            bump_graph_version(session, source='analytics_views')
+        for label, count in counts.items():
+            print(f"✓ {label}: {count} rows")
+    except Exception as e:
+        print(f"❌ Refresh failed: {e}")
+    finally:
+        driver.close()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP/JSON API for the Digital Equity Intelligence System
+Serves the dashboard's analytics (coverage, organizations, Bayesian queries,
+interventions, GraphRAG) to partner systems and reporting jobs without the
+Streamlit UI, with response caching and graph-version ETags on the shared
+connection pool
+"""
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+import hashlib
+import json
+import threading
+import time
+
+from dashboard_queries import (fetch_explorer_filters, fetch_organization_page, fetch_overview,
+                               fetch_population_summary, fetch_region_metrics, fetch_service_gaps,
+                               fetch_service_summary)
+from graph_metadata import get_graph_version
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+from query_metrics import PROMETHEUS_CONTENT_TYPE, QUERY_METRICS, metrics_text
+
+
+class ApiError(Exception):
+    """Raised by handlers to return a JSON error with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ResponseCache:
+    """
+    LRU of serialized responses keyed by request and graph version
+
+    Entries from older graph versions are never hit again and age out.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def put(self, key, etag: str, body: bytes):
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class QueryAPI:
+    """
+    Routes API requests to the dashboard query layer, Bayesian model and GraphRAG engine
+
+    Independent of the HTTP server so it can be driven directly by load
+    tests and reporting scripts.
+    """
+
+    def __init__(self, driver, bayesian_model=None, graphrag_engine=None,
+                 cache_size: int = 1024, version_ttl: float = 5.0):
+        """
+        Args:
+            driver: Shared driver from neo4j_connection.get_driver
+            bayesian_model: DigitalDivideBayesianModel (Bayesian routes return 503 without it)
+            graphrag_engine: GraphRAGEngine (the GraphRAG route returns 503 without it)
+            cache_size: Responses kept in the LRU cache
+            version_ttl: Seconds the graph version stamp is reused before rechecking
+        """
+        self.driver = driver
+        self.bayesian_model = bayesian_model
+        self.graphrag_engine = graphrag_engine
+        self.cache = ResponseCache(cache_size)
+        self.version_ttl = version_ttl
+        self._version = None
+        self._version_checked = 0.0
+        self._version_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self.request_count = 0
+
+        # path -> (method, handler(params, body), cacheable)
+        self.routes: Dict[str, Tuple[str, Callable, bool]] = {
+            '/health': ('GET', self.health, False),
+            '/metrics': ('GET', self.metrics, False),
+            '/metrics/prometheus': ('GET', self.prometheus_metrics, False),
+            '/v1/overview': ('GET', self.overview, True),
+            '/v1/regions': ('GET', self.regions, True),
+            '/v1/services': ('GET', self.services, True),
+            '/v1/populations': ('GET', self.populations, True),
+            '/v1/service-gaps': ('GET', self.service_gaps, True),
+            '/v1/filters': ('GET', self.filters, True),
+            '/v1/organizations': ('GET', self.organizations, True),
+            '/v1/bayesian/query': ('GET', self.bayesian_query, True),
+            '/v1/bayesian/regions': ('GET', self.bayesian_regions, True),
+            '/v1/interventions': ('GET', self.interventions, True),
+            '/v1/graphrag': ('POST', self.graphrag, True),
+        }
+
+    # ===== Request handling =====
+
+    def graph_version(self) -> str:
+        """Graph version stamp, rechecked at most every version_ttl seconds"""
+        with self._version_lock:
+            if time.monotonic() - self._version_checked > self.version_ttl:
+                with self.driver.session() as session:
+                    self._version = get_graph_version(session) or 'empty'
+                self._version_checked = time.monotonic()
+            return self._version
+
+    def handle(self, method: str, target: str, body: bytes = b'',
+               if_none_match: str = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Serve one request
+
+        Returns:
+            (status, headers, body)
+        """
+        with self._count_lock:
+            self.request_count += 1
+        parts = urlsplit(target)
+        params = dict(parse_qsl(parts.query))
+        try:
+            route = self.routes.get(parts.path.rstrip('/') or '/')
+            if route is None:
+                raise ApiError(404, f"Unknown endpoint: {parts.path}")
+            route_method, handler, cacheable = route
+            if method != route_method:
+                raise ApiError(405, f"{parts.path} expects {route_method}")
+            payload = self._parse_body(body) if method == 'POST' else {}
+
+            if not cacheable:
+                result = handler(params, payload)
+                if isinstance(result, str):
+                    return 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE, 'Cache-Control': 'no-store'}, \
+                        result.encode('utf-8')
+                return self._respond(200, result)
+
+            version = self.graph_version()
+            key = (parts.path, tuple(sorted(params.items())), json.dumps(payload, sort_keys=True), version)
+            cached = self.cache.get(key)
+            if cached is None:
+                result = handler(params, payload)
+                if isinstance(result, dict) and result.get('error'):
+                    # Failed GraphRAG runs are returned but not cached
+                    return self._respond(200, result)
+                data = json.dumps(result, default=str, separators=(',', ':')).encode('utf-8')
+                etag = f'"{version[:8]}-{hashlib.sha1(data).hexdigest()[:16]}"'
+                self.cache.put(key, etag, data)
+                cached = (etag, data)
+
+            etag, data = cached
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'X-Graph-Version': version}
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+                return 304, headers, b''
+            return 200, {**headers, 'Content-Type': 'application/json'}, data
+
+        except ApiError as e:
+            return self._respond(e.status, {'error': e.message})
+        except ValueError as e:
+            return self._respond(400, {'error': str(e)})
+        except (ServiceUnavailable, SessionExpired) as e:
+            return self._respond(503, {'error': f"Neo4j unavailable: {e}"})
+        except Exception as e:
+            return self._respond(500, {'error': f"{type(e).__name__}: {e}"})
+
+    @staticmethod
+    def _parse_body(body: bytes) -> Dict:
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ApiError(400, f"Invalid JSON body: {e}")
+
+    @staticmethod
+    def _respond(status: int, payload) -> Tuple[int, Dict[str, str], bytes]:
+        data = json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+        return status, {'Content-Type': 'application/json', 'Cache-Control': 'no-store'}, data
+
+    @staticmethod
+    def _int_param(params: Dict, name: str, default: int, maximum: int) -> int:
+        try:
+            value = int(params.get(name, default))
+        except ValueError:
+            raise ApiError(400, f"{name} must be an integer")
+        return max(1, min(value, maximum))
+
+    # ===== Endpoints =====
+
+    def health(self, params, payload) -> Dict:
+        with self.driver.session() as session:
+            session.run("RETURN 1").consume()
+        return {'status': 'ok'}
+
+    def metrics(self, params, payload) -> Dict:
+        metrics = {'requests': self.request_count, 'response_cache': dict(self.cache.stats),
+                   'pool': self.driver.pool_metrics()}
+        if self.graphrag_engine is not None:
+            metrics['cypher_cache'] = dict(self.graphrag_engine.cache_stats)
+        metrics['slowest_queries'] = QUERY_METRICS.top(self._int_param(params, 'top', 10, 100))
+        return metrics
+
+    def prometheus_metrics(self, params, payload) -> str:
+        """Per-call-site query histograms and pool gauges as Prometheus text"""
+        return metrics_text()
+
+    def overview(self, params, payload) -> Dict:
+        with self.driver.session() as session:
+            return fetch_overview(session)
+
+    def regions(self, params, payload):
+        with self.driver.session() as session:
+            return fetch_region_metrics(session, params.get('level', 'county'))
+
+    def services(self, params, payload):
+        with self.driver.session() as session:
+            return fetch_service_summary(session, self._int_param(params, 'limit', 50, 500))
+
+    def populations(self, params, payload):
+        with self.driver.session() as session:
+            return fetch_population_summary(session, self._int_param(params, 'limit', 50, 500))
+
+    def service_gaps(self, params, payload):
+        with self.driver.session() as session:
+            return fetch_service_gaps(session, self._int_param(params, 'limit', 50, 1000),
+                                      region=params.get('region'), population=params.get('population'),
+                                      service=params.get('service'))
+
+    def filters(self, params, payload) -> Dict:
+        with self.driver.session() as session:
+            return fetch_explorer_filters(session)
+
+    def organizations(self, params, payload) -> Dict:
+        with self.driver.session() as session:
+            return fetch_organization_page(
+                session,
+                page_size=self._int_param(params, 'page_size', 25, 200),
+                after=params.get('after'),
+                region=params.get('region'),
+                service=params.get('service'),
+                population=params.get('population'),
+                label=params.get('label'),
+                search=params.get('search')
+            )
+
+    def _require_model(self):
+        if self.bayesian_model is None:
+            raise ApiError(503, "Bayesian model not loaded")
+        return self.bayesian_model
+
+    def bayesian_query(self, params, payload) -> Dict:
+        """GET /v1/bayesian/query?target=DigitalInclusion&Infrastructure=High"""
+        model = self._require_model()
+        target = params.pop('target', 'DigitalInclusion')
+        # Query strings carry 0/1 as text; DigitalDivideBayesianModel.query validates the rest
+        evidence = {variable: int(value) if value in ('0', '1') else value for variable, value in params.items()}
+        try:
+            result = model.query([target], evidence)
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return {'target': target, 'evidence': result['evidence'], 'distribution': result['marginals'][target]}
+
+    def bayesian_regions(self, params, payload) -> Dict:
+        model = self._require_model()
+        with self.driver.session() as session:
+            regions = fetch_region_metrics(session, 'county')
+        return model.posterior_by_region(regions)
+
+    def interventions(self, params, payload) -> Dict:
+        model = self._require_model()
+        intervention = params.get('intervention', 'all')
+        if intervention != 'all' and intervention not in model.SCENARIOS:
+            raise ApiError(400, f"intervention must be 'all' or one of {sorted(model.SCENARIOS)}")
+        return model.predict_intervention_impact(intervention)
+
+    def graphrag(self, params, payload) -> Dict:
+        """POST /v1/graphrag {"question": "..."}"""
+        if self.graphrag_engine is None:
+            raise ApiError(503, "GraphRAG engine not configured")
+        question = str(payload.get('question', '')).strip()
+        if not question:
+            raise ApiError(400, "question is required")
+        return self.graphrag_engine.query(question)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Adapts http.server requests onto QueryAPI.handle"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive for clients making many requests
+    api: QueryAPI = None
+    quiet = True
+
+    def _dispatch(self, method: str):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, data = self.api.handle(method, self.path, body, self.headers.get('If-None-Match'))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(api: QueryAPI, host: str = "127.0.0.1", port: int = 8600, quiet: bool = True) -> ThreadingHTTPServer:
+    """Threaded HTTP server bound to an API instance (one thread per connection)"""
+    handler = type('RequestHandler', (_RequestHandler,), {'api': api, 'quiet': quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# Run the API from the command line
+if __name__ == "__main__":
+    import argparse
+    from bayesian_model import DigitalDivideBayesianModel
+    from graphrag_engine import GraphRAGEngine
+    from llm_providers import get_provider
+    from neo4j_connection import ConnectionConfig, get_driver
+
+    parser = argparse.ArgumentParser(description="Digital equity HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--provider", help="GraphRAG LLM provider (rule-based, recorded, openai)")
+    parser.add_argument("--no-graphrag", action="store_true", help="Disable the GraphRAG endpoint")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Digital Equity Query API")
+    print("=" * 60)
+    print()
+
+    config = ConnectionConfig()
+    driver = get_driver(config)
+    engine = None
+    if not args.no_graphrag:
+        engine = GraphRAGEngine(config.uri, config.user, config.password, connection_config=config,
+                                llm_provider=get_provider(args.provider), vector_index_dir="data/vector_index")
+
+    api = QueryAPI(driver, DigitalDivideBayesianModel(), engine)
+    server = make_server(api, args.host, args.port, quiet=not args.verbose)
+    print(f"✓ Listening on http://{args.host}:{args.port}")
+    print("  Try: curl -i http://{0}:{1}/v1/overview".format(args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        driver.close()
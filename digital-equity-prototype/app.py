@@ -6,12 +6,16 @@ Streamlit application for exploring Michigan's digital divide
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from neo4j import GraphDatabase
-from bayesian_model import DigitalDivideBayesianModel
-from graphrag_engine import GraphRAGEngine
+from dashboard_queries import (REGION_METRICS, fetch_explorer_filters, fetch_organization_page,
+                               fetch_overview, fetch_population_summary, fetch_region_metrics,
+                               fetch_service_gaps, fetch_service_summary)
+from geometry_cache import ZOOM_TOLERANCES, available_levels, load_geometries
+from graph_metadata import get_graph_version
+from job_runner import FAILED, SUCCEEDED, JobRunner
+from neo4j_connection import ConnectionConfig, get_driver
+from query_metrics import QUERY_METRICS, start_metrics_server
 import os
+import time
 
 # Page configuration
 st.set_page_config(
@@ -47,41 +51,132 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize connections
+# Plotly, pgmpy and the GraphRAG stack are imported inside the pages and
+# resources that use them, so first paint only pays for what it shows
 @st.cache_resource
 def init_neo4j():
-    """Initialize Neo4j connection"""
-    uri = st.secrets.get("neo4j", {}).get("uri", "bolt://localhost:7687")
-    user = st.secrets.get("neo4j", {}).get("username", "neo4j")
-    password = st.secrets.get("neo4j", {}).get("password", "password")
-    return GraphDatabase.driver(uri, auth=(user, password))
+    """Shared pooled Neo4j driver for every page and the GraphRAG engine"""
+    metrics_port = st.secrets.get("neo4j", {}).get("metrics_port", os.getenv("NEO4J_METRICS_PORT"))
+    if metrics_port:
+        # Prometheus scrape target for this dashboard process
+        start_metrics_server(int(metrics_port))
+    return get_driver(ConnectionConfig.from_secrets(st.secrets))
 
 @st.cache_resource
 def init_bayesian_model():
-    """Initialize Bayesian network model"""
+    """Initialize Bayesian network model (loads pgmpy on first use)"""
+    from bayesian_model import DigitalDivideBayesianModel
     return DigitalDivideBayesianModel()
 
 @st.cache_resource
 def init_graphrag():
-    """Initialize GraphRAG engine"""
-    uri = st.secrets.get("neo4j", {}).get("uri", "bolt://localhost:7687")
-    user = st.secrets.get("neo4j", {}).get("username", "neo4j")
-    password = st.secrets.get("neo4j", {}).get("password", "password")
+    """Initialize GraphRAG engine on the shared connection pool"""
+    from graphrag_engine import GraphRAGEngine
+    from llm_providers import get_provider
+    
+    config = ConnectionConfig.from_secrets(st.secrets)
     api_key = st.secrets.get("openai", {}).get("api_key", os.getenv("OPENAI_API_KEY"))
+    provider = st.secrets.get("graphrag", {}).get("provider", os.getenv("GRAPHRAG_LLM_PROVIDER"))
     
-    if api_key:
-        return GraphRAGEngine(uri, user, password, api_key)
+    if api_key or provider:
+        return GraphRAGEngine(config.uri, config.user, config.password, api_key,
+                              vector_index_dir="data/vector_index",
+                              llm_provider=get_provider(provider, api_key),
+                              connection_config=config)
     return None
 
 # Initialize resources
 driver = init_neo4j()
-bayesian_model = init_bayesian_model()
-graphrag_engine = init_graphrag()
+
+@st.cache_data(ttl=15, show_spinner=False)
+def current_graph_version():
+    """Graph version stamp; rechecked at most every 15 seconds"""
+    with driver.session() as session:
+        return get_graph_version(session)
+
+@st.cache_data(show_spinner=False)
+def load_overview(graph_version):
+    """Overview metrics for a graph version (one round trip on a miss)"""
+    with driver.session() as session:
+        return fetch_overview(session)
+
+@st.cache_data(show_spinner=False)
+def load_service_summary(graph_version):
+    """Services by provider count from the materialized view"""
+    with driver.session() as session:
+        return fetch_service_summary(session)
+
+@st.cache_data(show_spinner=False)
+def load_population_summary(graph_version):
+    """Populations by organization count from the materialized view"""
+    with driver.session() as session:
+        return fetch_population_summary(session)
+
+@st.cache_data(show_spinner=False)
+def load_service_gaps(graph_version, region, population):
+    """Top ranked service gaps from the materialized gap cube"""
+    with driver.session() as session:
+        return fetch_service_gaps(session, limit=100, region=region, population=population)
+
+@st.cache_data(show_spinner=False)
+def load_explorer_filters(graph_version):
+    """Filter choices for the Explorer"""
+    with driver.session() as session:
+        return fetch_explorer_filters(session)
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def load_organization_page(graph_version, query_filters, after):
+    """One Explorer page; only the visible rows are fetched"""
+    region, service, population, label, search, page_size = query_filters
+    with driver.session() as session:
+        return fetch_organization_page(session, page_size=page_size, after=after, region=region,
+                                       service=service, population=population, label=label,
+                                       search=search)
+
+@st.cache_resource(show_spinner=False)
+def load_map_geometries(level, zoom):
+    """Pre-simplified boundaries; loaded once per process and shared across metrics"""
+    return load_geometries(level, zoom)
+
+@st.cache_data(show_spinner=False)
+def load_region_metrics(graph_version, level):
+    """Map metrics for every region at a level"""
+    with driver.session() as session:
+        return fetch_region_metrics(session, level)
+
+@st.cache_data(show_spinner=False)
+def load_region_posteriors(graph_version):
+    """P(Digital Inclusion = High) per county from its factor scores"""
+    return init_bayesian_model().posterior_by_region(load_region_metrics(graph_version, 'county'))
+
+@st.cache_resource
+def init_job_runner():
+    """One worker pool and job table shared by every dashboard session"""
+    return JobRunner()
+
+job_runner = init_job_runner()
+polling_jobs = False
+
+def show_job(job_id):
+    """Progress for a background job; returns the job once it has finished"""
+    global polling_jobs
+    job = job_runner.status(job_id)
+    if job is None:
+        return None
+    if job['status'] == SUCCEEDED:
+        return job
+    if job['status'] == FAILED:
+        st.error(f"Job failed: {job['error']}")
+        return job
+    st.progress(job['progress'], text=f"{job['status'].title()}… {job['message'] or ''}")
+    polling_jobs = True
+    return None
 
 # Sidebar navigation
 st.sidebar.title("🌐 Digital Equity Navigator")
 page = st.sidebar.radio(
     "Navigation",
-    ["📊 Overview", "🕸️ Knowledge Graph Explorer", "🎲 Bayesian Analysis", 
+    ["📊 Overview", "🕸️ Knowledge Graph Explorer", "🗺️ Geographic Map", "🎲 Bayesian Analysis", 
      "🎯 Intervention Planner", "💬 GraphRAG Query"]
 )
 
@@ -107,23 +202,16 @@ if page == "📊 Overview":
     3. **Bayesian Causal Model** - Analyzing intervention effectiveness
     """)
     
-    # Fetch summary statistics from Neo4j
-    with driver.session() as session:
-        # Count organizations
-        org_result = session.run("MATCH (o:Organization) RETURN count(o) as count")
-        org_count = org_result.single()["count"]
-        
-        # Count services
-        service_result = session.run("MATCH (s:Service) RETURN count(s) as count")
-        service_count = service_result.single()["count"]
-        
-        # Count populations
-        pop_result = session.run("MATCH (p:Population) RETURN count(p) as count")
-        pop_count = pop_result.single()["count"]
-        
-        # Count regions
-        region_result = session.run("MATCH (r:GeographicRegion) RETURN count(r) as count")
-        region_count = region_result.single()["count"]
+    # Fetch summary statistics from Neo4j (cached until ingestion bumps the graph version)
+    overview = load_overview(current_graph_version())
+    org_count = overview["organizations"]
+    service_count = overview["services"]
+    pop_count = overview["populations"]
+    region_count = overview["regions"]
+    
+    if not overview["materialized"]:
+        st.info("Analytics views have not been built yet. Run `python ingest_michigan_data.py` "
+                "(or `python analytics_views.py`) to populate the dashboard.")
     
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -152,17 +240,9 @@ if page == "📊 Overview":
     
     # Regional comparison
     st.subheader("📍 Regional Broadband Coverage")
+    import plotly.graph_objects as go
     
-    with driver.session() as session:
-        region_data = session.run("""
-            MATCH (r:GeographicRegion)
-            RETURN r.name as county, 
-                   r.fiber_coverage as fiber,
-                   r.cable_coverage as cable,
-                   r.median_speed_mbps as speed
-            ORDER BY r.fiber_coverage DESC
-        """)
-        df_regions = pd.DataFrame([dict(record) for record in region_data])
+    df_regions = pd.DataFrame(overview["region_coverage"])
     
     if not df_regions.empty:
         fig = go.Figure()
@@ -179,50 +259,69 @@ if page == "📊 Overview":
 
 # ===== PAGE 2: KNOWLEDGE GRAPH EXPLORER =====
 elif page == "🕸️ Knowledge Graph Explorer":
+    import plotly.express as px
     st.markdown('<p class="main-header">🕸️ Knowledge Graph Explorer</p>', unsafe_allow_html=True)
     
-    tab1, tab2, tab3 = st.tabs(["Organizations", "Services", "Populations"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Organizations", "Services", "Populations", "Service Gaps"])
     
     with tab1:
         st.subheader("Organizations in the Digital Equity Ecosystem")
         
-        with driver.session() as session:
-            org_data = session.run("""
-                MATCH (o:Organization)
-                OPTIONAL MATCH (o)-[:PROVIDES_SERVICE]->(s:Service)
-                OPTIONAL MATCH (o)-[:SERVES_POPULATION]->(p:Population)
-                OPTIONAL MATCH (o)-[:LOCATED_IN]->(r:GeographicRegion)
-                RETURN o.name as name, 
-                       labels(o) as types,
-                       collect(DISTINCT s.name) as services,
-                       collect(DISTINCT p.name) as populations,
-                       r.name as region
-            """)
-            df_orgs = pd.DataFrame([dict(record) for record in org_data])
-        
-        if not df_orgs.empty:
-            for _, row in df_orgs.iterrows():
-                with st.expander(f"**{row['name']}**"):
-                    st.write(f"**Type:** {', '.join(row['types'])}")
-                    if row['region']:
-                        st.write(f"**Location:** {row['region']}")
-                    if row['services']:
-                        st.write(f"**Services:** {', '.join(row['services'])}")
-                    if row['populations']:
-                        st.write(f"**Populations Served:** {', '.join(row['populations'])}")
+        filters = load_explorer_filters(current_graph_version())
+        
+        search = st.text_input("Search organizations", placeholder="e.g. library, Detroit")
+        col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
+        with col1:
+            region = st.selectbox("Region", ["All"] + filters['regions'])
+        with col2:
+            service = st.selectbox("Service", ["All"] + filters['services'])
+        with col3:
+            population = st.selectbox("Population", ["All"] + filters['populations'])
+        with col4:
+            label = st.selectbox("Type", ["All"] + filters['labels'])
+        with col5:
+            page_size = st.selectbox("Per page", [10, 25, 50], index=1)
+        
+        query_filters = tuple(None if v == "All" else v for v in (region, service, population, label))
+        query_filters += (search.strip() or None, page_size)
+        
+        # Keyset cursors for the pages visited so far; reset when filters change
+        if st.session_state.get('org_filters') != query_filters:
+            st.session_state['org_filters'] = query_filters
+            st.session_state['org_cursors'] = [None]
+        cursors = st.session_state['org_cursors']
+        
+        org_page = load_organization_page(current_graph_version(), query_filters, cursors[-1])
+        
+        for row in org_page['rows']:
+            with st.expander(f"**{row['name']}**"):
+                st.write(f"**Type:** {', '.join(row['types'])}")
+                if row['regions']:
+                    st.write(f"**Location:** {', '.join(row['regions'])}")
+                if row['services']:
+                    st.write(f"**Services:** {', '.join(row['services'])}")
+                if row['populations']:
+                    st.write(f"**Populations Served:** {', '.join(row['populations'])}")
+        
+        if not org_page['rows']:
+            st.info("No organizations match these filters.")
+        
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("← Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with page_col:
+            st.caption(f"Page {len(cursors)}")
+        with next_col:
+            if st.button("Next →", disabled=org_page['next_cursor'] is None):
+                cursors.append(org_page['next_cursor'])
+                st.rerun()
     
     with tab2:
         st.subheader("Digital Services Catalog")
         
-        with driver.session() as session:
-            service_data = session.run("""
-                MATCH (s:Service)<-[:PROVIDES_SERVICE]-(o:Organization)
-                RETURN s.name as service, 
-                       count(o) as provider_count,
-                       collect(o.name) as providers
-                ORDER BY provider_count DESC
-            """)
-            df_services = pd.DataFrame([dict(record) for record in service_data])
+        df_services = pd.DataFrame(load_service_summary(current_graph_version()))
         
         if not df_services.empty:
             fig = px.bar(
@@ -239,15 +338,7 @@ elif page == "🕸️ Knowledge Graph Explorer":
     with tab3:
         st.subheader("Populations Served")
         
-        with driver.session() as session:
-            pop_data = session.run("""
-                MATCH (p:Population)<-[:SERVES_POPULATION]-(o:Organization)
-                RETURN p.name as population,
-                       count(o) as org_count,
-                       collect(o.name) as organizations
-                ORDER BY org_count DESC
-            """)
-            df_pops = pd.DataFrame([dict(record) for record in pop_data])
+        df_pops = pd.DataFrame(load_population_summary(current_graph_version()))
         
         if not df_pops.empty:
             fig = px.pie(
@@ -257,9 +348,94 @@ elif page == "🕸️ Knowledge Graph Explorer":
                 title="Population Coverage by Organizations"
             )
             st.plotly_chart(fig, use_container_width=True)
+    
+    with tab4:
+        st.subheader("Which populations in which counties lack which services")
+        st.caption("Services some organization offers a population elsewhere in Michigan but no local "
+                   "organization does, ranked by residents affected (statewide providers lower the rank)")
+        
+        filters = load_explorer_filters(current_graph_version())
+        col1, col2 = st.columns(2)
+        with col1:
+            gap_region = st.selectbox("Region", ["All"] + filters['regions'], key="gap_region")
+        with col2:
+            gap_population = st.selectbox("Population", ["All"] + filters['populations'], key="gap_population")
+        
+        df_gaps = pd.DataFrame(load_service_gaps(current_graph_version(),
+                                                 None if gap_region == "All" else gap_region,
+                                                 None if gap_population == "All" else gap_population))
+        if df_gaps.empty:
+            st.info("No service gaps materialized yet (run `python service_gaps.py`)")
+        else:
+            df_top = df_gaps.head(20).iloc[::-1]
+            df_top = df_top.assign(gap=df_top['region'] + " · " + df_top['population'] + " · " + df_top['service'])
+            fig = px.bar(
+                df_top,
+                x='affected_population',
+                y='gap',
+                orientation='h',
+                title="Largest Service Gaps (Residents Affected)",
+                labels={'affected_population': 'Residents affected', 'gap': ''}
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(df_gaps, use_container_width=True)
+
+# ===== GEOGRAPHIC MAP =====
+elif page == "🗺️ Geographic Map":
+    import plotly.express as px
+    st.markdown('<p class="main-header">🗺️ Geographic Map</p>', unsafe_allow_html=True)
+    
+    levels = available_levels()
+    if not levels:
+        st.warning("No boundary files cached yet. Run `python geometry_cache.py` to build them.")
+    else:
+        level_names = {'county': 'Counties', 'tract': 'Census tracts'}
+        zoom_names = {'state': 'Statewide', 'region': 'Regional', 'detail': 'Detailed'}
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            level = st.selectbox("Boundaries", levels, format_func=level_names.get)
+        with col2:
+            metric_labels = dict(REGION_METRICS)
+            if level == 'county':
+                metric_labels['posterior'] = 'P(Digital Inclusion = High)'
+            metric = st.selectbox("Metric", list(metric_labels), format_func=metric_labels.get)
+        with col3:
+            zoom = st.selectbox("Detail", list(ZOOM_TOLERANCES), format_func=zoom_names.get)
+        
+        graph_version = current_graph_version()
+        geojson = load_map_geometries(level, zoom)
+        
+        # Counties join on name (as stored on GeographicRegion), tracts on FIPS
+        key = 'name' if level == 'county' else 'fips'
+        if metric == 'posterior':
+            values = load_region_posteriors(graph_version)
+        else:
+            values = {row[key]: row[metric] for row in load_region_metrics(graph_version, level)}
+        
+        df_map = pd.DataFrame([feature['properties'] for feature in geojson['features']])
+        df_map['value'] = df_map[key].map(values)
+        
+        fig = px.choropleth(
+            df_map,
+            geojson=geojson,
+            locations=key,
+            featureidkey=f"properties.{key}",
+            color='value',
+            hover_name='name',
+            color_continuous_scale="Blues",
+            labels={'value': metric_labels[metric]}
+        )
+        fig.update_geos(fitbounds="locations", visible=False)
+        fig.update_layout(height=600, margin=dict(l=0, r=0, t=0, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+        
+        st.caption(f"{df_map['value'].notna().sum()} of {len(df_map)} {level_names[level].lower()} have data")
 
 # ===== PAGE 3: BAYESIAN ANALYSIS =====
 elif page == "🎲 Bayesian Analysis":
+    import plotly.express as px
+    bayesian_model = init_bayesian_model()
     st.markdown('<p class="main-header">🎲 Bayesian Causal Analysis</p>', unsafe_allow_html=True)
     
     st.markdown("""
@@ -269,65 +445,79 @@ elif page == "🎲 Bayesian Analysis":
     
     st.subheader("Query Probability")
     
+    network_variables = ["Infrastructure", "Income", "Education", "Availability", "Affordability",
+                         "Aspiration", "InternetAccess", "Services", "DigitalInclusion"]
+    
     col1, col2 = st.columns(2)
     
     with col1:
         variables = st.multiselect(
             "Select variables to query",
-            ["Infrastructure", "Availability", "Affordability", "Aspiration", 
-             "InternetAccess", "ServiceQuality", "DigitalInclusion"],
+            network_variables,
             default=["DigitalInclusion"]
         )
+        show_joint = st.checkbox("Show joint distribution", value=False,
+                                 help="Probability of every combination of the selected variables")
     
     with col2:
-        evidence_var = st.selectbox(
-            "Evidence variable (optional)",
-            ["None", "Infrastructure", "Availability", "Affordability", "Aspiration"]
-        )
-        
-        if evidence_var != "None":
-            evidence_value = st.selectbox(f"{evidence_var} value", ["Low", "Medium", "High"])
-    
-    if st.button("Run Query"):
+        evidence_vars = st.multiselect("Evidence variables (optional)", network_variables)
         evidence = {}
-        if evidence_var != "None":
-            evidence[evidence_var] = evidence_value
-        
-        result = bayesian_model.query(variables, evidence)
+        for evidence_var in evidence_vars:
+            evidence[evidence_var] = st.radio(f"{evidence_var} value", bayesian_model.STATE_NAMES,
+                                              horizontal=True, key=f"evidence_{evidence_var}")
+    
+    if st.button("Run Query") and variables:
+        # One inference pass covers every selected variable
+        result = bayesian_model.query(variables, evidence, joint=show_joint)
         
         st.markdown('<div class="insight-box">', unsafe_allow_html=True)
         st.subheader("Results")
         
-        for var in variables:
-            st.write(f"**{var}:**")
-            df_result = pd.DataFrame(
-                result[var].values,
-                columns=[result[var].state_names[var][i] for i in range(len(result[var].values))]
-            )
-            st.dataframe(df_result.T, use_container_width=True)
-            
-            # Visualization
-            fig = px.bar(
-                x=df_result.columns,
-                y=df_result.values[0],
-                title=f"Probability Distribution: {var}",
-                labels={'x': 'State', 'y': 'Probability'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        df_result = pd.DataFrame(result['marginals']).T
+        df_result.index.name = 'Variable'
+        st.dataframe(df_result, use_container_width=True)
+        
+        # Visualization
+        df_long = df_result.reset_index().melt(id_vars='Variable', var_name='State', value_name='Probability')
+        fig = px.bar(
+            df_long,
+            x='Variable',
+            y='Probability',
+            color='State',
+            barmode='group',
+            title="Marginal Probability Distributions",
+            range_y=[0, 1]
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        if show_joint:
+            st.write("**Joint distribution**")
+            df_joint = pd.DataFrame(result['joint']).sort_values('probability', ascending=False)
+            st.dataframe(df_joint, use_container_width=True, hide_index=True)
         
         st.markdown('</div>', unsafe_allow_html=True)
 
 # ===== PAGE 4: INTERVENTION PLANNER =====
 elif page == "🎯 Intervention Planner":
+    import plotly.express as px
     st.markdown('<p class="main-header">🎯 Intervention Planning</p>', unsafe_allow_html=True)
     
     st.markdown("""
     Compare the predicted impact of different digital equity interventions using the Bayesian model.
     """)
     
-    if st.button("Run Intervention Analysis"):
-        with st.spinner("Calculating intervention impacts..."):
-            results = bayesian_model.predict_intervention_impact()
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Run Intervention Analysis"):
+            st.session_state['intervention_job'] = job_runner.submit('intervention_sweep', {'intervention_type': 'all'})
+    with col2:
+        if st.button("Run Sensitivity Analysis"):
+            st.session_state['sensitivity_job'] = job_runner.submit('sensitivity_analysis', {'target': 'DigitalInclusion'})
+    
+    # Jobs run in background workers; results survive reruns and are shared by identical requests
+    job = show_job(st.session_state['intervention_job']) if 'intervention_job' in st.session_state else None
+    if job and job['status'] == SUCCEEDED:
+        results = job['result']
         
         # Create comparison table
         comparison_data = []
@@ -335,7 +525,6 @@ elif page == "🎯 Intervention Planner":
             comparison_data.append({
                 'Intervention': intervention,
                 'P(Digital Inclusion = High)': probs['High'],
-                'P(Digital Inclusion = Medium)': probs['Medium'],
                 'P(Digital Inclusion = Low)': probs['Low']
             })
         
@@ -368,9 +557,30 @@ elif page == "🎯 Intervention Planner":
         - **Navigator programs:** Help translate access into actual digital inclusion
         """)
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    job = show_job(st.session_state['sensitivity_job']) if 'sensitivity_job' in st.session_state else None
+    if job and job['status'] == SUCCEEDED:
+        st.subheader("🔬 Sensitivity of Digital Inclusion")
+        df_sensitivity = pd.DataFrame(job['result'])
+        fig = px.bar(
+            df_sensitivity,
+            x='swing',
+            y='variable',
+            orientation='h',
+            title="Change in P(Digital Inclusion = High) from Low to High",
+            labels={'swing': 'Probability swing', 'variable': 'Variable'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
 # ===== PAGE 5: GRAPHRAG QUERY =====
 elif page == "💬 GraphRAG Query":
+    graphrag_engine = init_graphrag()
+    if graphrag_engine is not None:
+        def run_graphrag_query(params, progress):
+            # A new graph version means ingestion rebuilt the vector index
+            graphrag_engine.refresh_index(params.get('graph_version'))
+            return graphrag_engine.query(params['question'])
+        job_runner.register('graphrag_query', run_graphrag_query)
     st.markdown('<p class="main-header">💬 Natural Language Query</p>', unsafe_allow_html=True)
     
     if graphrag_engine is None:
@@ -379,6 +589,10 @@ elif page == "💬 GraphRAG Query":
 # .streamlit/secrets.toml
 [openai]
 api_key = "sk-..."
+
+# Or run offline with the local rule-based provider
+[graphrag]
+provider = "rule-based"
         """)
     else:
         st.markdown("Ask questions about Michigan's digital equity ecosystem in natural language.")
@@ -392,8 +606,12 @@ api_key = "sk-..."
         question = st.text_input("Enter your question:", placeholder="Which organizations serve low-income families?")
         
         if st.button("Search") and question:
-            with st.spinner("Querying knowledge graph..."):
-                result = graphrag_engine.query(question)
+            st.session_state['graphrag_job'] = job_runner.submit(
+                'graphrag_query', {'question': question, 'graph_version': current_graph_version()})
+        
+        job = show_job(st.session_state['graphrag_job']) if 'graphrag_job' in st.session_state else None
+        if job and job['status'] == SUCCEEDED:
+            result = job['result']
             
             st.markdown('<div class="insight-box">', unsafe_allow_html=True)
             st.subheader("Answer")
@@ -403,8 +621,46 @@ api_key = "sk-..."
                 with st.expander("🔍 View Generated Cypher Query"):
                     st.code(result['cypher_query'], language="cypher")
             
+            stats = result.get('context_stats')
+            if stats:
+                st.caption(
+                    f"Context: {stats['rows_included']} of {stats['rows_returned']} rows, "
+                    f"~{stats['tokens_used']}/{stats['token_budget']} tokens"
+                    + (f" ({stats['rows_dropped']} rows dropped)" if stats['rows_dropped'] else "")
+                )
+            
             st.markdown('</div>', unsafe_allow_html=True)
 
+# Background jobs
+with st.sidebar.expander("Background jobs"):
+    for recent_job in job_runner.recent(5):
+        st.caption(f"{recent_job['kind']} · {recent_job['status']} · {recent_job['progress']:.0%}")
+
+# Connection pool health
+with st.sidebar.expander("Connection pool"):
+    pool = driver.pool_metrics()
+    st.caption(
+        f"Sessions in use: {pool['sessions_in_use']} (peak {pool['peak_sessions_in_use']}) · "
+        f"Connections: {pool['connections_in_use']}/{pool['connections_open']} in use "
+        f"of {pool['max_connection_pool_size']} · Utilization: {pool['pool_utilization']:.0%}"
+    )
+
+# Slowest Cypher call sites in this dashboard process
+with st.sidebar.expander("Query performance"):
+    slowest = QUERY_METRICS.top(5)
+    if not slowest:
+        st.caption("No queries recorded yet")
+    for site in slowest:
+        st.caption(
+            f"`{site['site']}` · {site['count']} runs · p95 {site['p95_ms']:.0f} ms · "
+            f"max {site['max_ms']:.0f} ms · {site['slow']} slow"
+        )
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.markdown("Built with ❤️ for Michigan's Digital Equity")
+
+# Poll running jobs without blocking other sessions
+if polling_jobs:
+    time.sleep(1)
+    st.rerun()
@@ -7,9 +7,18 @@ Based on "Finding the Digital Divide" research
 from pgmpy.models import BayesianNetwork
 from pgmpy.factors.discrete import TabularCPD
 from pgmpy.inference import VariableElimination
+import numpy as np
 import pandas as pd
 
 class DigitalDivideBayesianModel:
+    # Region score properties used as evidence; scores >= 0.5 count as the high state
+    REGION_EVIDENCE = {
+        'Availability': 'availability_score',
+        'Affordability': 'affordability_score',
+        'Aspiration': 'aspiration_score',
+        'Services': 'service_quality_score'
+    }
+    
     def __init__(self):
         # Define the structure (DAG)
         self.model = BayesianNetwork([
@@ -22,6 +31,8 @@ class DigitalDivideBayesianModel:
             ('InternetAccess', 'DigitalInclusion'),
             ('Services', 'DigitalInclusion')
         ])
+        self.define_cpds()
+        self.inference = VariableElimination(self.model)
         
     def define_cpds(self):
         """Define Conditional Probability Distributions"""
@@ -74,32 +85,150 @@ class DigitalDivideBayesianModel:
                            cpd_edu, cpd_aspir, cpd_access, cpd_services, cpd_inclusion)
         
         assert self.model.check_model()
-        print("✓ Bayesian model validated")
     
-    def query(self, evidence):
-        """Perform inference given evidence"""
-        inference = VariableElimination(self.model)
-        result = inference.query(['DigitalInclusion'], evidence=evidence)
-        return result
+    # Every variable is binary; index 0 is the low/absent state
+    STATE_NAMES = ['Low', 'High']
+    
+    def _state_index(self, variable, value):
+        """Evidence value as a state index ('Low'/'High' or 0/1)"""
+        if value in self.STATE_NAMES:
+            return self.STATE_NAMES.index(value)
+        if value in (0, 1):
+            return int(value)
+        raise ValueError(f"{variable} must be one of {self.STATE_NAMES}, got {value!r}")
     
-    def predict_intervention_impact(self, intervention_type):
-        """Predict impact of different interventions"""
-        inference = VariableElimination(self.model)
-        
-        scenarios = {
-            'baseline': {},
-            'infrastructure': {'Infrastructure': 1},
-            'affordability_subsidy': {'Income': 1},
-            'digital_navigator': {'Services': 1},
-            'combined': {'Infrastructure': 1, 'Services': 1}
+    def query(self, variables=None, evidence=None, joint=False):
+        """
+        Marginals for several variables from a single inference pass
+        
+        Variable elimination runs once for the joint over all requested
+        variables; each marginal is then a sum over the joint's other axes,
+        so N variables cost one elimination rather than N.
+        
+        Args:
+            variables: Variables to query (default: DigitalInclusion)
+            evidence: Variable -> 'Low'/'High' (or 0/1); any number of variables
+            joint: Also return the joint distribution over the queried variables
+            
+        Returns:
+            Dict with 'marginals' (variable -> {state: p}), the normalized
+            'evidence' and, if joint, 'joint' rows of {variable: state, ..., 'probability': p}
+        """
+        variables = list(dict.fromkeys(variables or ['DigitalInclusion']))
+        nodes = set(self.model.nodes())
+        unknown = [v for v in variables + list(evidence or {}) if v not in nodes]
+        if unknown:
+            raise ValueError(f"Unknown variables: {', '.join(unknown)}")
+        evidence = {var: self._state_index(var, value) for var, value in (evidence or {}).items()}
+        
+        # Observed variables are certain; pgmpy refuses to query them
+        free = [v for v in variables if v not in evidence]
+        marginals = {}
+        factor = None
+        if free:
+            factor = self.inference.query(free, evidence=evidence or None, joint=True, show_progress=False)
+            values = factor.values
+            for axis, var in enumerate(factor.variables):
+                others = tuple(i for i in range(values.ndim) if i != axis)
+                marginals[var] = dict(zip(self.STATE_NAMES, map(float, values.sum(axis=others))))
+        for var in variables:
+            if var in evidence:
+                marginals[var] = {name: float(i == evidence[var]) for i, name in enumerate(self.STATE_NAMES)}
+        
+        result = {
+            'marginals': {var: marginals[var] for var in variables},
+            'evidence': {var: self.STATE_NAMES[state] for var, state in evidence.items()}
         }
+        if joint:
+            rows = []
+            if factor is not None:
+                for index in np.ndindex(*factor.values.shape):
+                    row = {var: self.STATE_NAMES[i] for var, i in zip(factor.variables, index)}
+                    row.update({var: self.STATE_NAMES[state] for var, state in evidence.items() if var in variables})
+                    row['probability'] = float(factor.values[index])
+                    rows.append(row)
+            else:
+                # Every queried variable is observed: the joint is that one assignment
+                rows.append({**{var: self.STATE_NAMES[evidence[var]] for var in variables}, 'probability': 1.0})
+            result['joint'] = rows
+        return result
+    
+    # Intervention scenarios as evidence on the root causes
+    SCENARIOS = {
+        'baseline': {},
+        'infrastructure': {'Infrastructure': 1},
+        'affordability_subsidy': {'Income': 1},
+        'digital_navigator': {'Services': 1},
+        'combined': {'Infrastructure': 1, 'Services': 1}
+    }
+    
+    # Root and factor variables whose influence sensitivity analysis measures
+    SENSITIVITY_VARIABLES = ['Infrastructure', 'Income', 'Education', 'Availability',
+                             'Affordability', 'Aspiration', 'InternetAccess', 'Services']
+    
+    def predict_intervention_impact(self, intervention_type='all', progress=None):
+        """
+        Predict impact of different interventions
+        
+        Returns:
+            Scenario -> {'Low': p, 'High': p} for DigitalInclusion
+        """
+        scenarios = self.SCENARIOS
+        if intervention_type != 'all':
+            scenarios = {intervention_type: self.SCENARIOS[intervention_type]}
         
         results = {}
-        for scenario_name, evidence in scenarios.items():
-            result = inference.query(['DigitalInclusion'], evidence=evidence)
-            results[scenario_name] = result.values[1]  # Probability of High inclusion
+        for i, (scenario_name, evidence) in enumerate(scenarios.items()):
+            result = self.inference.query(['DigitalInclusion'], evidence=evidence, show_progress=False)
+            results[scenario_name] = {'Low': float(result.values[0]), 'High': float(result.values[1])}
+            if progress:
+                progress((i + 1) / len(scenarios), scenario_name)
         
         return results
+    
+    def sensitivity_analysis(self, target='DigitalInclusion', progress=None):
+        """
+        How far P(target = High) moves when each variable is set Low vs High
+        
+        Returns:
+            Rows of {variable, low, high, swing} sorted by swing
+        """
+        rows = []
+        for i, variable in enumerate(self.SENSITIVITY_VARIABLES):
+            low, high = (float(self.inference.query([target], evidence={variable: state},
+                                                    show_progress=False).values[1])
+                         for state in (0, 1))
+            rows.append({'variable': variable, 'low': low, 'high': high, 'swing': high - low})
+            if progress:
+                progress((i + 1) / len(self.SENSITIVITY_VARIABLES), variable)
+        return sorted(rows, key=lambda row: -abs(row['swing']))
+    
+    def region_evidence(self, region, threshold=0.5):
+        """Binary evidence from a region's factor scores (missing scores are left unobserved)"""
+        evidence = {}
+        for variable, prop in self.REGION_EVIDENCE.items():
+            score = region.get(prop)
+            if score is not None:
+                evidence[variable] = int(score >= threshold)
+        return evidence
+    
+    def posterior_by_region(self, regions, target='DigitalInclusion', state=1):
+        """
+        P(target = state) for each region, keyed by region name
+        
+        Regions share one of a handful of evidence combinations, so each
+        distinct combination is inferred once.
+        """
+        cache = {}
+        posteriors = {}
+        for region in regions:
+            evidence = self.region_evidence(region)
+            key = tuple(sorted(evidence.items()))
+            if key not in cache:
+                result = self.inference.query([target], evidence=evidence, show_progress=False)
+                cache[key] = float(result.values[state])
+            posteriors[region['name']] = cache[key]
+        return posteriors
 
 # Usage
 if __name__ == "__main__":
@@ -109,19 +238,20 @@ if __name__ == "__main__":
     print()
     
     model = DigitalDivideBayesianModel()
-    model.define_cpds()
+    print("✓ Bayesian model validated")
     print()
     
     # Example query
     print("Example 1: No infrastructure, Low income")
-    evidence = {'Infrastructure': 0, 'Income': 0}
-    result = model.query(evidence)
-    print(result)
+    evidence = {'Infrastructure': 'Low', 'Income': 'Low'}
+    result = model.query(['InternetAccess', 'DigitalInclusion'], evidence)
+    for var, dist in result['marginals'].items():
+        print(f"  P({var} = High) = {dist['High']:.2%}")
     print()
     
     # Predict intervention impacts
     print("Intervention Impact Analysis:")
     print("-" * 60)
     impacts = model.predict_intervention_impact('all')
-    for scenario, prob in impacts.items():
-        print(f"{scenario:25s}: {prob:.2%} digital inclusion probability")
+    for scenario, probs in impacts.items():
+        print(f"{scenario:25s}: {probs['High']:.2%} digital inclusion probability")
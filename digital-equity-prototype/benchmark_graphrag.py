@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Offline GraphRAG Benchmark and Evaluation Harness
+Runs a question suite concurrently through the GraphRAG engine and reports
+per-stage latency percentiles, Cypher cache hit rate, Cypher validity and
+answer accuracy - with a local LLM provider, so no network is needed, and
+optionally a fixture graph, so no Neo4j is needed either
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import json
+import re
+import threading
+import time
+
+import numpy as np
+
+STAGES = ['cypher_generation', 'graph_query', 'context_assembly', 'answer_synthesis']
+
+# Questions with names the answer or context must contain (sample Michigan data)
+DEFAULT_SUITE = [
+    {'question': "Which organizations serve low-income families in Wayne County?",
+     'expect': ['Detroit Public Library']},
+    {'question': "What digital services are provided by libraries in Michigan?",
+     'expect': ['WiFi Access', 'Device Lending']},
+    {'question': "Which counties have the lowest broadband availability?",
+     'expect': ['Chippewa County']},
+    {'question': "What populations are underserved by digital navigator programs?",
+     'expect': ['Rural Residents']},
+    {'question': "Show me organizations that provide device lending services",
+     'expect': ['Upper Peninsula District Library', 'Grand Rapids Public Library']},
+    {'question': "Which regions need the most infrastructure investment?",
+     'expect': ['Chippewa County']},
+    {'question': "What services help seniors with digital access?",
+     'expect': ['Digital Literacy Training']},
+    {'question': "Compare digital equity resources between rural and urban counties",
+     'expect': ['rural', 'urban']},
+]
+
+
+# Sample Michigan graph (ingest_michigan_data.py) as the rule-based provider queries it for DEFAULT_SUITE
+_UP, _DETROIT, _GRAND_RAPIDS = ('Upper Peninsula District Library', 'Detroit Public Library',
+                                'Grand Rapids Public Library')
+SAMPLE_FIXTURE = {
+    'schema': "\n".join([
+        "Node properties are the following:",
+        str({'Organization': ['name', 'type'], 'Library': ['name', 'type', 'location'],
+             'Service': ['name'], 'Population': ['name'], 'Program': ['name'],
+             'GeographicRegion': ['name', 'fiber_coverage', 'median_speed_mbps', 'availability_score',
+                                  'rural_percentage']}),
+        "The relationships are the following:",
+        str(['(:Organization)-[:PROVIDES_SERVICE]->(:Service)', '(:Organization)-[:SERVES_POPULATION]->(:Population)',
+             '(:Organization)-[:LOCATED_IN]->(:GeographicRegion)', '(:Organization)-[:OPERATES]->(:Program)'])
+    ]),
+    'queries': [
+        {'cypher': "MATCH (o:Organization)\n"
+                   "MATCH (o)-[:SERVES_POPULATION]->(:Population {name: 'Low-Income Families'})\n"
+                   "MATCH (o)-[:LOCATED_IN]->(:GeographicRegion {name: 'Wayne County'})\n"
+                   "RETURN DISTINCT o.name as organization",
+         'rows': [{'organization': _DETROIT}]},
+        {'cypher': "MATCH (o:Library)\nMATCH (o)-[:PROVIDES_SERVICE]->(s:Service)\n"
+                   "RETURN s.name as service, collect(DISTINCT o.name) as providers",
+         'rows': [{'service': 'Digital Navigation', 'providers': [_UP]},
+                  {'service': 'WiFi Access', 'providers': [_UP, _DETROIT, _GRAND_RAPIDS]},
+                  {'service': 'Device Lending', 'providers': [_UP, _GRAND_RAPIDS]},
+                  {'service': 'Digital Literacy Training', 'providers': [_UP, _DETROIT, _GRAND_RAPIDS]},
+                  {'service': 'Computer Access', 'providers': [_DETROIT]},
+                  {'service': 'Job Search Assistance', 'providers': [_DETROIT]},
+                  {'service': 'Tech Help Desk', 'providers': [_GRAND_RAPIDS]}]},
+        {'cypher': "MATCH (r:GeographicRegion) RETURN r.name as county, r.fiber_coverage as fiber, "
+                   "r.median_speed_mbps as speed ORDER BY r.fiber_coverage ASC LIMIT 5",
+         'rows': [{'county': 'Chippewa County', 'fiber': 30.0, 'speed': 25.0},
+                  {'county': 'Marquette County', 'fiber': 45.0, 'speed': 50.0},
+                  {'county': 'Kent County', 'fiber': 75.0, 'speed': 100.0},
+                  {'county': 'Wayne County', 'fiber': 85.0, 'speed': 100.0}]},
+        {'cypher': "MATCH (p:Population) OPTIONAL MATCH (p)<-[:SERVES_POPULATION]-(o:Organization) "
+                   "RETURN p.name as population, count(o) as organizations ORDER BY organizations ASC",
+         'rows': [{'population': 'Rural Residents', 'organizations': 1},
+                  {'population': 'Job Seekers', 'organizations': 2},
+                  {'population': 'Students', 'organizations': 2},
+                  {'population': 'Seniors', 'organizations': 3},
+                  {'population': 'Low-Income Families', 'organizations': 4}]},
+        {'cypher': "MATCH (o:Organization)\nMATCH (o)-[:PROVIDES_SERVICE]->(:Service {name: 'Device Lending'})\n"
+                   "RETURN DISTINCT o.name as organization",
+         'rows': [{'organization': _UP}, {'organization': _GRAND_RAPIDS}]},
+        {'cypher': "MATCH (r:GeographicRegion) RETURN r.name as county, r.availability_score as availability "
+                   "ORDER BY r.availability_score ASC LIMIT 5",
+         'rows': [{'county': 'Chippewa County', 'availability': 0.3},
+                  {'county': 'Marquette County', 'availability': 0.7},
+                  {'county': 'Kent County', 'availability': 1.0},
+                  {'county': 'Wayne County', 'availability': 1.0}]},
+        {'cypher': "MATCH (o:Organization)\nMATCH (o)-[:SERVES_POPULATION]->(:Population {name: 'Seniors'})\n"
+                   "MATCH (o)-[:PROVIDES_SERVICE]->(s:Service)\n"
+                   "RETURN s.name as service, collect(DISTINCT o.name) as providers",
+         'rows': [{'service': 'Digital Navigation', 'providers': [_UP]},
+                  {'service': 'WiFi Access', 'providers': [_UP, _GRAND_RAPIDS]},
+                  {'service': 'Device Lending', 'providers': [_UP, _GRAND_RAPIDS]},
+                  {'service': 'Digital Literacy Training', 'providers': [_UP, _GRAND_RAPIDS, 'AARP Michigan']},
+                  {'service': 'Tech Help Desk', 'providers': [_GRAND_RAPIDS]},
+                  {'service': 'Online Safety', 'providers': ['AARP Michigan']},
+                  {'service': 'Tech Support', 'providers': ['AARP Michigan']}]},
+        {'cypher': "MATCH (r:GeographicRegion) OPTIONAL MATCH (r)<-[:LOCATED_IN]-(o:Organization) "
+                   "RETURN CASE WHEN r.rural_percentage >= 0.5 THEN 'rural' ELSE 'urban' END as setting, "
+                   "count(DISTINCT r) as counties, count(o) as organizations",
+         'rows': [{'setting': 'rural', 'counties': 2, 'organizations': 1},
+                  {'setting': 'urban', 'counties': 2, 'organizations': 2}]},
+    ]
+}
+
+_TRAILING_LIMIT = re.compile(r"\s+LIMIT\s+\d+\s*$", re.IGNORECASE)
+
+
+class FixtureGraph:
+    """
+    Graph stand-in that replays recorded query results, for runs without Neo4j
+
+    Queries match on their text with whitespace collapsed; a trailing LIMIT
+    (as the Cypher guard injects) is ignored when the exact text is not
+    recorded. Unknown queries return no rows and are counted as misses.
+    EXPLAIN succeeds only for recorded queries, so Cypher validity means
+    "answered by the fixture".
+    """
+
+    def __init__(self, fixture: Dict = None):
+        """
+        Args:
+            fixture: Dict with 'schema' and 'queries' ([{cypher, rows}]); defaults to SAMPLE_FIXTURE
+        """
+        fixture = fixture or SAMPLE_FIXTURE
+        self.schema = fixture.get('schema', '')
+        self.results = {self._key(entry['cypher']): entry['rows'] for entry in fixture['queries']}
+        self.misses: List[str] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(cypher: str) -> str:
+        return " ".join(cypher.split()).rstrip(';')
+
+    @classmethod
+    def load(cls, path: str) -> 'FixtureGraph':
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _lookup(self, cypher: str):
+        key = self._key(cypher)
+        if key in self.results:
+            return self.results[key]
+        return self.results.get(_TRAILING_LIMIT.sub('', key))
+
+    def query(self, query: str, params: Dict = None) -> List[Dict]:
+        if query.lstrip().upper().startswith('EXPLAIN '):
+            if self._lookup(query.lstrip()[len('EXPLAIN '):]) is None:
+                raise ValueError("Query is not in the fixture")
+            return []
+        rows = self._lookup(query)
+        if rows is None:
+            with self._lock:
+                self.misses.append(self._key(query))
+            return []
+        return [dict(row) for row in rows]
+
+    @property
+    def get_schema(self) -> str:
+        return self.schema
+
+
+class RecordingGraph:
+    """Wraps a live graph and keeps every query's rows, to be saved as a fixture"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.queries: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def query(self, query: str, params: Dict = None) -> List[Dict]:
+        rows = self.graph.query(query, params)
+        self.record(query, params, rows)
+        return rows
+
+    def record(self, query: str, params: Dict, rows: List[Dict]):
+        if not query.lstrip().upper().startswith('EXPLAIN ') and not params:
+            with self._lock:
+                self.queries[query] = rows
+
+    def watch(self, guard):
+        """Also record the queries the engine runs through its guard rather than query()"""
+        execute = guard.execute
+
+        def recorded(cypher: str, params: Dict = None, check_plan: bool = True) -> List[Dict]:
+            rows = execute(cypher, params, check_plan)
+            self.record(cypher, params, rows)
+            return rows
+        guard.execute = recorded
+
+    @property
+    def driver(self):
+        return getattr(self.graph, 'driver', None)
+
+    @property
+    def get_schema(self) -> str:
+        return self.graph.get_schema
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({'schema': self.get_schema,
+                       'queries': [{'cypher': cypher, 'rows': rows} for cypher, rows in self.queries.items()]},
+                      f, indent=2, default=str)
+
+
+def load_suite(path: str) -> List[Dict]:
+    """Load a question suite from JSON lines of {question, expect}"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentiles(values: List[float]) -> Dict:
+    """p50/p95/p99 and mean in milliseconds"""
+    if not values:
+        return {'count': 0, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'mean_ms': None}
+    ms = np.asarray(values) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {'count': len(values), 'p50_ms': round(float(p50), 2), 'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2), 'mean_ms': round(float(ms.mean()), 2)}
+
+
+def is_correct(result: Dict, expect: List[str]) -> bool:
+    """All expected strings appear in the answer or the context"""
+    haystack = (str(result.get('answer', '')) + json.dumps(result.get('context') or [], default=str)).lower()
+    return all(item.lower() in haystack for item in expect)
+
+
+def check_cypher(graph, cypher: str) -> bool:
+    """Compile the query with EXPLAIN without running it"""
+    try:
+        graph.query(f"EXPLAIN {cypher}")
+        return True
+    except Exception:
+        return False
+
+
+def run_benchmark(engine, suite: List[Dict] = None, concurrency: int = 4, repeat: int = 3) -> Dict:
+    """
+    Run every question `repeat` times across `concurrency` worker threads
+
+    Returns:
+        Report with latency percentiles per stage, cache hit rate,
+        Cypher validity, accuracy and throughput
+    """
+    suite = suite or DEFAULT_SUITE
+    jobs = [item for _ in range(repeat) for item in suite]
+    cache_before = dict(engine.cache_stats)
+
+    def run_one(item):
+        start = time.perf_counter()
+        result = engine.query(item['question'])
+        result['total'] = time.perf_counter() - start
+        return item, result
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(run_one, jobs))
+    wall = time.perf_counter() - wall_start
+
+    stage_times = {stage: [] for stage in STAGES}
+    totals, errors, correct = [], 0, 0
+    validity = {}
+    per_question = {}
+
+    for item, result in outcomes:
+        totals.append(result['total'])
+        for stage, seconds in result['timings'].items():
+            stage_times.setdefault(stage, []).append(seconds)
+        if result['error']:
+            errors += 1
+        ok = not result['error'] and is_correct(result, item.get('expect', []))
+        correct += ok
+        cypher = result['cypher_query']
+        if cypher and cypher not in validity:
+            validity[cypher] = check_cypher(engine.graph, cypher)
+        stats = per_question.setdefault(item['question'], {'runs': 0, 'correct': 0, 'cypher': cypher})
+        stats['runs'] += 1
+        stats['correct'] += ok
+
+    hits = engine.cache_stats['hits'] - cache_before['hits']
+    misses = engine.cache_stats['misses'] - cache_before['misses']
+
+    return {
+        'provider': getattr(engine.llm_provider, 'name', type(engine.llm_provider).__name__),
+        'questions': len(suite),
+        'runs': len(jobs),
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 3),
+        'throughput_qps': round(len(jobs) / wall, 2) if wall else None,
+        'latency': {'total': percentiles(totals),
+                    **{stage: percentiles(times) for stage, times in stage_times.items()}},
+        'cypher_cache_hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        'cypher_validity': round(sum(validity.values()) / len(validity), 3) if validity else None,
+        'invalid_cypher': [q for q, valid in validity.items() if not valid],
+        'accuracy': round(correct / len(jobs), 3) if jobs else None,
+        'errors': errors,
+        'per_question': per_question
+    }
+
+
+def print_report(report: Dict):
+    print(f"Provider: {report['provider']}  |  {report['runs']} runs of {report['questions']} questions  "
+          f"|  concurrency {report['concurrency']}")
+    print(f"Throughput: {report['throughput_qps']} q/s over {report['wall_seconds']}s")
+    print()
+    print(f"  {'stage':20s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s}")
+    for stage, stats in report['latency'].items():
+        if stats['count']:
+            print(f"  {stage:20s} {stats['p50_ms']:10.2f} {stats['p95_ms']:10.2f} {stats['p99_ms']:10.2f}")
+    print()
+    print(f"Cypher cache hit rate: {report['cypher_cache_hit_rate']}")
+    print(f"Cypher validity:       {report['cypher_validity']}")
+    print(f"Accuracy:              {report['accuracy']}")
+    print(f"Errors:                {report['errors']}")
+    for cypher in report['invalid_cypher']:
+        print(f"  ❌ invalid: {cypher}")
+
+
+# Run the benchmark from the command line
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from graphrag_engine import GraphRAGEngine
+    from llm_providers import get_provider
+    from neo4j_connection import ConnectionConfig, PooledGraph, get_driver
+
+    parser = argparse.ArgumentParser(description="Offline GraphRAG benchmark")
+    parser.add_argument("--provider", default="rule-based",
+                        help="rule-based (default), recorded, record or openai")
+    parser.add_argument("--suite", help="JSON lines file of {question, expect}")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--uri", help="Neo4j URI (default: NEO4J_URI, as for the dashboard)")
+    parser.add_argument("--offline", action="store_true",
+                        help="Replay the sample Michigan graph instead of connecting to Neo4j")
+    parser.add_argument("--fixture", help="Replay a recorded fixture graph (JSON) instead of Neo4j")
+    parser.add_argument("--record-fixture", metavar="PATH",
+                        help="Run against Neo4j and save every query's rows as a fixture")
+    parser.add_argument("--output", help="Write the full report as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if total p95 latency exceeds this")
+    parser.add_argument("--min-accuracy", type=float, help="Fail if accuracy falls below this")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("GraphRAG Benchmark")
+    print("=" * 60)
+    print()
+
+    if args.offline or args.fixture:
+        # The fixture graph has no vector index; hybrid retrieval is skipped
+        graph = FixtureGraph.load(args.fixture) if args.fixture else FixtureGraph()
+        print(f"Graph: fixture ({args.fixture or 'sample Michigan data'})")
+    else:
+        # Credentials and pool settings come from NEO4J_* like the dashboard's
+        config = ConnectionConfig(uri=args.uri)
+        graph = PooledGraph(get_driver(config))
+        if args.record_fixture:
+            graph = RecordingGraph(graph)
+        print(f"Graph: Neo4j at {config.uri}")
+    print()
+    engine = GraphRAGEngine(None, None, None, graph=graph, llm_provider=get_provider(args.provider),
+                            vector_index_dir=None if isinstance(graph, FixtureGraph) else "data/vector_index")
+    if isinstance(graph, RecordingGraph):
+        graph.watch(engine.guard)
+    report = run_benchmark(engine, load_suite(args.suite) if args.suite else None,
+                           concurrency=args.concurrency, repeat=args.repeat)
+    if isinstance(graph, FixtureGraph):
+        report['fixture_misses'] = sorted(set(graph.misses))
+    print_report(report)
+    for cypher in report.get('fixture_misses', []):
+        print(f"  ⚠️  not in fixture: {cypher}")
+    if args.record_fixture:
+        graph.save(args.record_fixture)
+        print(f"\n✓ Saved {len(graph.queries)} query results to {args.record_fixture}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if args.max_p95_ms is not None and report['latency']['total']['p95_ms'] > args.max_p95_ms:
+        print(f"\n❌ p95 latency {report['latency']['total']['p95_ms']}ms exceeds {args.max_p95_ms}ms")
+        failed = True
+    if args.min_accuracy is not None and (report['accuracy'] or 0) < args.min_accuracy:
+        print(f"\n❌ accuracy {report['accuracy']} below {args.min_accuracy}")
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Statewide Benchmark Suite
+Times ingestion, factor scoring, dashboard queries, Bayesian inference and
+GraphRAG retrieval on seeded synthetic statewide data (synthetic_statewide.py),
+appends every run to a history file and flags metrics that got slower than
+the last comparable run, so regressions show up between versions
+"""
+
+from typing import Callable, Dict, List
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmark_graphrag import DEFAULT_SUITE, percentiles
+from synthetic_statewide import SCALES, generate_statewide, table_sizes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = "data/benchmark_history.jsonl"
+
+# A metric regresses when it is this much slower than the previous comparable run...
+REGRESSION_THRESHOLD = 0.2
+# ...and slower by at least this many milliseconds (timer noise on fast metrics)
+MIN_REGRESSION_MS = 5.0
+
+
+class BenchmarkRun:
+    """
+    Shared state for one suite run: the synthetic data, and the graph if one is used
+
+    Every metric a case reports is milliseconds, lower is better; 'info'
+    holds sizes and rates that are printed and recorded but not compared.
+    """
+
+    def __init__(self, scale: str = 'small', seed: int = 42, sizes: Dict = None, driver=None,
+                 repeat: int = 20):
+        """
+        Args:
+            scale: SCALES preset
+            seed: Generator seed; runs compare only with runs of the same seed and sizes
+            sizes: Overrides of the preset's tracts, organizations, programs, households
+            driver: Shared Neo4j driver; None runs the offline variant of each case
+            repeat: Samples per latency measurement
+        """
+        self.scale = scale
+        self.seed = seed
+        self.sizes = {**SCALES[scale], **(sizes or {})}
+        self.driver = driver
+        self.repeat = repeat
+        self.data = None
+        self.workdir = tempfile.mkdtemp(prefix="benchmark_suite_")
+
+    def ensure_data(self):
+        if self.data is None:
+            self.data = generate_statewide(seed=self.seed, **self.sizes)
+        return self.data
+
+    def close(self):
+        """Remove the scratch directory (vector index files)"""
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 2)
+
+
+def _timed(fn: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _latency(metrics: Dict, name: str, samples: List[float]):
+    """p50 and p95 of repeated calls as two metrics"""
+    stats = percentiles(samples)
+    metrics[f"{name}_p50"] = stats['p50_ms']
+    metrics[f"{name}_p95"] = stats['p95_ms']
+
+
+# ===== Cases =====
+
+def bench_generation(run: BenchmarkRun) -> Dict:
+    """Generating the synthetic state (also provides the data for later cases)"""
+    run.data, seconds = _timed(generate_statewide, seed=run.seed, **run.sizes)
+    households = len(run.data['households'])
+    return {'metrics': {'generate': _ms(seconds)},
+            'info': {**table_sizes(run.data), 'households_per_s': round(households / seconds)}}
+
+
+def bench_ingestion(run: BenchmarkRun) -> Dict:
+    """Batched UNWIND load of every table into Neo4j, replacing the previous synthetic load"""
+    from graph_metadata import bump_graph_version
+    from synthetic_statewide import clear_synthetic, load_statewide
+
+    data = run.ensure_data()
+    removed, clear_seconds = _timed(clear_synthetic, run.driver)
+    timings, seconds = _timed(load_statewide, run.driver, data)
+    with run.driver.session() as session:
+        bump_graph_version(session, source='benchmark_suite')
+    metrics = {'clear': _ms(clear_seconds), 'total': _ms(seconds)}
+    metrics.update({table: _ms(stats['seconds']) for table, stats in timings.items()})
+    rows = sum(stats['rows'] for stats in timings.values())
+    return {'metrics': metrics, 'info': {'rows': rows, 'rows_per_s': round(rows / seconds),
+                                         'replaced_nodes': removed}}
+
+
+def bench_factor_scoring(run: BenchmarkRun) -> Dict:
+    """
+    Factor scores: the regional score Cypher on the graph, plus 2SFCA service
+    accessibility over every tract (the Services factor) from graph or data
+    """
+    from accessibility_engine import AccessibilityModel, fetch_areas, fetch_providers
+    from synthetic_statewide import accessibility_inputs
+
+    metrics = {}
+    if run.driver is not None:
+        from ingest_michigan_data import calculate_factor_scores
+        with run.driver.session() as session:
+            _, seconds = _timed(calculate_factor_scores, session)
+        metrics['factor_cypher'] = _ms(seconds)
+        start = time.perf_counter()
+        areas = fetch_areas(run.driver, 'tract')
+        providers, _ = fetch_providers(run.driver)
+        metrics['accessibility_fetch'] = _ms(time.perf_counter() - start)
+    else:
+        areas, providers = accessibility_inputs(run.ensure_data())
+
+    model, seconds = _timed(AccessibilityModel, areas, providers)
+    metrics['accessibility_matrix'] = _ms(seconds)
+    result, seconds = _timed(model.score)
+    metrics['accessibility_score'] = _ms(seconds)
+    return {'metrics': metrics, 'info': {'areas': len(areas), 'provider_services': len(providers),
+                                         'pairs': result['pairs']}}
+
+
+def bench_dashboard_queries(run: BenchmarkRun) -> Dict:
+    """
+    The dashboard's reads against the graph after materializing its views;
+    offline, the service gap cube (the heaviest view) from the synthetic data
+    """
+    metrics = {}
+    if run.driver is None:
+        from service_gaps import affected_population, build_gap_cube
+        from synthetic_statewide import gap_inputs
+        inputs = gap_inputs(run.ensure_data())
+        cube, build_seconds = _timed(build_gap_cube, inputs)
+        affected = affected_population(inputs['regions'], inputs['populations'])
+        (gaps, _), gap_seconds = _timed(cube.gaps, affected)
+        metrics.update({'gap_cube_build': _ms(build_seconds), 'gap_cube_rank': _ms(gap_seconds)})
+        return {'metrics': metrics, 'info': {'gaps': len(gaps)}}
+
+    from analytics_views import refresh_analytics_views
+    import dashboard_queries as queries
+
+    with run.driver.session() as session:
+        _, seconds = _timed(refresh_analytics_views, session)
+        metrics['refresh_views'] = _ms(seconds)
+        filters = queries.fetch_explorer_filters(session)
+        service = filters['services'][0] if filters['services'] else None
+        reads = {
+            'overview': lambda: queries.fetch_overview(session),
+            'service_summary': lambda: queries.fetch_service_summary(session),
+            'population_summary': lambda: queries.fetch_population_summary(session),
+            'service_gaps': lambda: queries.fetch_service_gaps(session),
+            'region_metrics_county': lambda: queries.fetch_region_metrics(session, 'county'),
+            'region_metrics_tract': lambda: queries.fetch_region_metrics(session, 'tract'),
+            'explorer_filters': lambda: queries.fetch_explorer_filters(session),
+            'organization_page': lambda: queries.fetch_organization_page(session),
+            'organization_page_service': lambda: queries.fetch_organization_page(session, service=service),
+            'organization_search': lambda: queries.fetch_organization_page(session, search="digital equity")
+        }
+        for name, read in reads.items():
+            _latency(metrics, name, [_timed(read)[1] for _ in range(run.repeat)])
+    return {'metrics': metrics, 'info': {'reads': len(reads), 'repeat': run.repeat}}
+
+
+def _tract_regions(run: BenchmarkRun) -> List[Dict]:
+    """Tract factor scores: from the graph, or percentile ranks of the raw attributes offline"""
+    if run.driver is not None:
+        from dashboard_queries import fetch_region_metrics
+        with run.driver.session() as session:
+            return fetch_region_metrics(session, 'tract')
+    tracts = run.ensure_data()['tracts']
+    scores = pd.DataFrame({
+        'name': tracts['name'],
+        'availability_score': tracts['fiber_coverage'].rank(pct=True),
+        'affordability_score': tracts['median_income'].rank(pct=True),
+        'aspiration_score': 1.0 - tracts['rural_percentage'].rank(pct=True),
+        'service_quality_score': tracts['population'].rank(pct=True)
+    })
+    return scores.to_dict('records')
+
+
+def bench_bayesian_inference(run: BenchmarkRun) -> Dict:
+    """Model build, evidence queries, per-tract posteriors, interventions and sensitivity"""
+    from bayesian_model import DigitalDivideBayesianModel
+
+    metrics = {}
+    model, seconds = _timed(DigitalDivideBayesianModel)
+    metrics['model_build'] = _ms(seconds)
+
+    rng = np.random.default_rng(run.seed)
+    variables = list(DigitalDivideBayesianModel.REGION_EVIDENCE) + ['Infrastructure', 'Income', 'Education']
+    samples = []
+    for _ in range(run.repeat):
+        chosen = rng.choice(variables, size=rng.integers(0, 4), replace=False)
+        evidence = {variable: ['Low', 'High'][rng.integers(0, 2)] for variable in chosen}
+        samples.append(_timed(model.query, ['InternetAccess', 'DigitalInclusion'], evidence)[1])
+    _latency(metrics, 'query', samples)
+
+    regions = _tract_regions(run)
+    posteriors, seconds = _timed(model.posterior_by_region, regions)
+    metrics['posterior_by_region'] = _ms(seconds)
+    metrics['interventions'] = _ms(_timed(model.predict_intervention_impact, 'all')[1])
+    metrics['sensitivity'] = _ms(_timed(model.sensitivity_analysis)[1])
+    return {'metrics': metrics, 'info': {'regions': len(posteriors),
+                                         'regions_per_s': round(len(posteriors) / max(seconds, 1e-9))}}
+
+
+def _retrieval_items(data: Dict[str, pd.DataFrame]) -> List[Dict]:
+    """Node texts as VectorIndex.sync_from_graph builds them"""
+    items = [{'id': f"org:{row.name}", 'labels': [row.label, 'Organization'],
+              'text': f"{row.label} Organization: {row.name}. {row.type}"}
+             for row in data['organizations'].itertuples(index=False)]
+    items += [{'id': f"program:{row.name}", 'labels': ['Program'],
+               'text': f"Program: {row.name}. {row.description}. {row.type}"}
+              for row in data['programs'].itertuples(index=False)]
+    return items
+
+
+def bench_graphrag_retrieval(run: BenchmarkRun) -> Dict:
+    """
+    Index build and hybrid retrieval for the benchmark questions; with a graph,
+    also the full GraphRAG pipeline with the offline rule-based provider
+    """
+    from context_assembly import ContextAssembler
+    from vector_index import HybridRetriever, VectorIndex
+
+    metrics = {}
+    index_dir = os.path.join(run.workdir, "vector_index")
+    index = VectorIndex(index_dir)
+    if run.driver is not None:
+        from neo4j_connection import PooledGraph
+        graph = PooledGraph(run.driver)
+        stats, seconds = _timed(index.sync_from_graph, graph)
+        nodes = stats['nodes']
+        search = HybridRetriever(graph, index).retrieve
+    else:
+        items = _retrieval_items(run.ensure_data())
+        _, seconds = _timed(index.upsert, items)
+        nodes = len(items)
+        search = index.search
+    metrics['index_build'] = _ms(seconds)
+
+    assembler = ContextAssembler()
+    questions = [item['question'] for item in DEFAULT_SUITE]
+    retrieval, assembly = [], []
+    for i in range(run.repeat):
+        question = questions[i % len(questions)]
+        rows, seconds = _timed(search, question)
+        retrieval.append(seconds)
+        assembly.append(_timed(assembler.assemble, question, rows)[1])
+    _latency(metrics, 'retrieve', retrieval)
+    _latency(metrics, 'context_assembly', assembly)
+
+    if run.driver is not None:
+        from benchmark_graphrag import run_benchmark
+        from graphrag_engine import GraphRAGEngine
+        from llm_providers import get_provider
+        engine = GraphRAGEngine(None, None, None, graph=graph, llm_provider=get_provider('rule-based'),
+                                vector_index_dir=index_dir)
+        report = run_benchmark(engine, concurrency=1, repeat=max(1, run.repeat // len(questions)))
+        metrics['graphrag_p50'] = report['latency']['total']['p50_ms']
+        metrics['graphrag_p95'] = report['latency']['total']['p95_ms']
+    return {'metrics': metrics, 'info': {'indexed_nodes': nodes,
+                                         'nodes_per_s': round(nodes / max(metrics['index_build'] / 1000.0, 1e-9))}}
+
+
+# Case name -> (function, needs a graph)
+CASES = {
+    'generation': (bench_generation, False),
+    'ingestion': (bench_ingestion, True),
+    'factor_scoring': (bench_factor_scoring, False),
+    'dashboard_queries': (bench_dashboard_queries, False),
+    'bayesian_inference': (bench_bayesian_inference, False),
+    'graphrag_retrieval': (bench_graphrag_retrieval, False)
+}
+
+
+def run_suite(run: BenchmarkRun, cases: List[str] = None) -> Dict:
+    """
+    Run the cases in order; a failing case is recorded and the rest still run
+
+    Returns:
+        Case name -> {'metrics', 'info'}, {'skipped': reason} or {'error': message}
+    """
+    results = {}
+    for name in cases or list(CASES):
+        fn, needs_graph = CASES[name]
+        if needs_graph and run.driver is None:
+            results[name] = {'skipped': 'needs --graph'}
+            continue
+        try:
+            results[name] = fn(run)
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+    return results
+
+
+# ===== History =====
+
+def code_version() -> str:
+    """git describe of this checkout ('-dirty' with local changes), or 'unknown'"""
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=HERE, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def history_entry(run: BenchmarkRun, results: Dict, label: str = None) -> Dict:
+    return {
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'version': code_version(),
+        'label': label,
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'scale': run.scale,
+        'sizes': run.sizes,
+        'seed': run.seed,
+        'graph': run.driver is not None,
+        'repeat': run.repeat,
+        'results': results
+    }
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path: str, entry: Dict):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry, default=str) + "\n")
+
+
+def _comparable(a: Dict, b: Dict) -> bool:
+    """Same data, same machine and same backend; anything else is not a like-for-like timing"""
+    return all(a.get(key) == b.get(key) for key in ('sizes', 'seed', 'host', 'graph'))
+
+
+def compare(entry: Dict, history: List[Dict], threshold: float = REGRESSION_THRESHOLD,
+            min_ms: float = MIN_REGRESSION_MS) -> Dict:
+    """
+    Each metric against the most recent comparable run that measured it
+
+    Returns:
+        {'baseline': version of the newest comparable run (None if there is none),
+         'rows': [{case, metric, previous, current, change, version, regression}]}
+    """
+    earlier = [past for past in history if _comparable(past, entry)]
+    rows = []
+    for case, result in entry['results'].items():
+        for metric, current in result.get('metrics', {}).items():
+            previous = next((past for past in reversed(earlier)
+                             if past['results'].get(case, {}).get('metrics', {}).get(metric) is not None), None)
+            if previous is None or current is None:
+                continue
+            before = previous['results'][case]['metrics'][metric]
+            change = (current - before) / before if before else 0.0
+            rows.append({'case': case, 'metric': metric, 'previous': before, 'current': current,
+                         'change': round(change, 3), 'version': previous['version'],
+                         'regression': change > threshold and current - before > min_ms})
+    return {'baseline': earlier[-1]['version'] if earlier else None, 'rows': rows}
+
+
+def print_results(results: Dict, comparison: Dict = None):
+    changes = {(row['case'], row['metric']): row for row in (comparison or {}).get('rows', [])}
+    for case, result in results.items():
+        if 'skipped' in result:
+            print(f"- {case}: skipped ({result['skipped']})")
+            continue
+        if 'error' in result:
+            print(f"❌ {case}: {result['error']}")
+            continue
+        print(f"✓ {case}  " + "  ".join(f"{k}={v:,}" for k, v in result['info'].items()))
+        for metric, value in result['metrics'].items():
+            row = changes.get((case, metric))
+            delta = ""
+            if row:
+                delta = f"  {row['change']:+7.1%} vs {row['previous']:,.2f}" + ("  ❌ regression" if row['regression'] else "")
+            print(f"    {metric:28s} {value:12,.2f} ms{delta}")
+
+
+# Run the suite from the command line
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Statewide benchmark suite with regression history")
+    parser.add_argument("--scale", default="small", choices=sorted(SCALES), help="Synthetic data size preset")
+    parser.add_argument("--seed", type=int, default=42)
+    for table in ['tracts', 'organizations', 'programs', 'households']:
+        parser.add_argument(f"--{table}", type=int, help=f"Override the preset's number of {table}")
+    parser.add_argument("--cases", help=f"Comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--graph", action="store_true",
+                        help="Run against Neo4j: loads the synthetic state (tagged synthetic) and "
+                             "benchmarks the graph paths")
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per latency metric")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON lines file of past runs")
+    parser.add_argument("--no-record", action="store_true", help="Compare without appending this run")
+    parser.add_argument("--label", help="Note stored with the run (e.g. a branch or change)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any metric regressed")
+    parser.add_argument("--output", help="Write this run's entry and comparison as JSON")
+    args = parser.parse_args()
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()] if args.cases else list(CASES)
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    print("=" * 60)
+    print("Statewide Benchmark Suite")
+    print("=" * 60)
+    print()
+
+    driver = None
+    if args.graph:
+        from neo4j_connection import get_driver
+        driver = get_driver()
+
+    sizes = {k: v for k, v in vars(args).items() if k in SCALES[args.scale] and v}
+    run = BenchmarkRun(args.scale, args.seed, sizes, driver, args.repeat)
+    print(f"Scale '{args.scale}' (seed {args.seed}): " + ", ".join(f"{v:,} {k}" for k, v in run.sizes.items()))
+    print(f"Backend: {'Neo4j' if driver else 'offline'}  |  version {code_version()}")
+    print()
+
+    try:
+        results = run_suite(run, cases)
+    finally:
+        run.close()
+    entry = history_entry(run, results, args.label)
+    comparison = compare(entry, load_history(args.history), args.threshold)
+    print_results(results, comparison)
+    print()
+
+    regressions = [row for row in comparison['rows'] if row['regression']]
+    if comparison['baseline'] is None:
+        print("No comparable earlier run in the history; this run is the baseline")
+    elif regressions:
+        print(f"❌ {len(regressions)} metrics regressed more than {args.threshold:.0%} since {comparison['baseline']}")
+    else:
+        print(f"✓ No regressions since {comparison['baseline']}")
+
+    if not args.no_record:
+        append_history(args.history, entry)
+        print(f"✓ Recorded run in {args.history}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'entry': entry, 'comparison': comparison}, f, indent=2, default=str)
+
+    failed = any('error' in result for result in results.values())
+    sys.exit(1 if failed or (args.fail_on_regression and regressions) else 0)
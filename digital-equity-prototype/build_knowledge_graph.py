@@ -8,12 +8,15 @@ Combines ontologies from:
 """
 
 from owlready2 import *
-from neo4j import GraphDatabase
+from analytics_views import refresh_analytics_views
+from dashboard_queries import create_explorer_indexes
+from graph_metadata import bump_graph_version
+from neo4j_connection import ConnectionConfig, get_driver
 import pandas as pd
 
 class DigitalEquityKG:
     def __init__(self, neo4j_uri, neo4j_user, neo4j_password):
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        self.driver = get_driver(ConnectionConfig(neo4j_uri, neo4j_user, neo4j_password))
         self.onto = get_ontology("http://example.org/digital_equity.owl")
         
     def create_ontology(self):
@@ -112,6 +115,8 @@ class DigitalEquityKG:
                 REQUIRE n.name IS UNIQUE
             """)
             
+            create_explorer_indexes(session)
+            
             print("✓ Neo4j constraints created")
     
     def import_michigan_data(self):
@@ -165,6 +170,8 @@ class DigitalEquityKG:
                 CREATE (lib)-[:SERVES_POPULATION]->(pop)
             """)
             
+            refresh_analytics_views(session)
+            bump_graph_version(session, source='build_knowledge_graph')
             print("✓ Sample Michigan data imported")
     
     def close(self):
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Context Assembly for the GraphRAG Engine
+Bounds the Cypher results handed to the LLM: pushes a LIMIT into the
+generated query, summarizes large result sets, ranks rows by relevance
+to the question and packs them into a fixed token budget
+"""
+
+from collections import Counter
+from typing import Dict, List
+import json
+import re
+
+# Words that carry no signal when ranking rows against a question
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'by', 'do', 'does', 'for', 'from', 'how', 'in',
+    'is', 'me', 'of', 'on', 'or', 'show', 'that', 'the', 'to', 'what',
+    'which', 'who', 'with'
+}
+
+# Result columns treated as node labels when summarizing
+LABEL_COLUMNS = {'labels', 'label', 'type', 'types'}
+
+_LIMIT_PATTERN = re.compile(r'\bLIMIT\s+(\d+)\s*$', re.IGNORECASE)
+# A trailing LIMIT whose value is a parameter or expression, e.g. LIMIT $n
+_EXPRESSION_LIMIT_PATTERN = re.compile(r'\bLIMIT\s+[^\s\d][^\n]*$', re.IGNORECASE)
+_RETURN_PATTERN = re.compile(r'\bRETURN\b', re.IGNORECASE)
+_UNION_PATTERN = re.compile(r'\bUNION\b', re.IGNORECASE)
+
+
+def estimate_tokens(text: str, chars_per_token: int = 4) -> int:
+    """Cheap token estimate (~4 characters per token for English/JSON)"""
+    return max(1, (len(text) + chars_per_token - 1) // chars_per_token)
+
+
+def inject_limit(cypher: str, row_limit: int) -> str:
+    """
+    Make sure a read query returns at most row_limit rows
+
+    Adds a LIMIT when the final RETURN has none and lowers an existing
+    literal LIMIT that is larger than row_limit. UNION queries and queries
+    ending in a parameterised LIMIT ($n cannot be compared here) are
+    wrapped in a subquery so the limit applies to the combined result.
+    """
+    query = cypher.strip().rstrip(';').strip()
+    if not _RETURN_PATTERN.search(query):
+        return query
+
+    if _UNION_PATTERN.search(query) or _EXPRESSION_LIMIT_PATTERN.search(query):
+        return f"CALL {{\n{query}\n}}\nRETURN * LIMIT {row_limit}"
+
+    match = _LIMIT_PATTERN.search(query)
+    if match:
+        if int(match.group(1)) <= row_limit:
+            return query
+        return query[:match.start()] + f"LIMIT {row_limit}"
+
+    return f"{query}\nLIMIT {row_limit}"
+
+
+def _terms(text: str) -> List[str]:
+    """Lowercased word terms without stopwords, with plural 's' stripped"""
+    terms = []
+    for t in re.findall(r"[a-z0-9]+", text.lower()):
+        if t in STOPWORDS:
+            continue
+        terms.append(t[:-1] if len(t) > 3 and t.endswith('s') else t)
+    return terms
+
+
+class ContextAssembler:
+    """
+    Token-budgeted context builder for Cypher query results
+    """
+
+    def __init__(self, token_budget: int = 1500, row_limit: int = 200,
+                 summarize_threshold: int = 50, chars_per_token: int = 4):
+        """
+        Args:
+            token_budget: Maximum estimated tokens of context sent to the LLM
+            row_limit: LIMIT pushed into generated Cypher
+            summarize_threshold: Result size above which an aggregate summary is added
+            chars_per_token: Characters per token used for estimation
+        """
+        self.token_budget = token_budget
+        self.row_limit = row_limit
+        self.summarize_threshold = summarize_threshold
+        self.chars_per_token = chars_per_token
+
+    def limit_query(self, cypher: str) -> str:
+        """Push the row limit into a generated Cypher query"""
+        return inject_limit(cypher, self.row_limit)
+
+    def rank_rows(self, question: str, rows: List[Dict]) -> List[Dict]:
+        """
+        Order rows by term overlap with the question
+
+        Ties keep their original order so an ORDER BY in the generated
+        query still counts.
+        """
+        question_terms = set(_terms(question))
+        if not question_terms:
+            return list(rows)
+
+        def score(indexed_row):
+            index, row = indexed_row
+            row_terms = _terms(json.dumps(row, default=str))
+            hits = sum(1 for t in row_terms if t in question_terms)
+            distinct = len(question_terms.intersection(row_terms))
+            return (-distinct, -hits, index)
+
+        return [row for _, row in sorted(enumerate(rows), key=score)]
+
+    def summarize(self, rows: List[Dict], truncated: bool = False) -> Dict:
+        """
+        Aggregate a large result set into counts
+
+        Returns counts by node label plus the most common values of
+        low-cardinality string columns. With truncated (the query hit the
+        row limit) the counts cover only the rows returned, and the summary
+        says so rather than passing them off as the full result size.
+        """
+        label_counts = Counter()
+        value_counts = {}
+
+        for row in rows:
+            for column, value in row.items():
+                if column.lower() in LABEL_COLUMNS:
+                    values = value if isinstance(value, list) else [value]
+                    label_counts.update(str(v) for v in values if v is not None)
+                elif isinstance(value, str):
+                    value_counts.setdefault(column, Counter())[value] += 1
+
+        top_values = {}
+        for column, counts in value_counts.items():
+            # Unique-per-row columns (names, ids) say nothing in aggregate
+            if len(counts) < len(rows):
+                top_values[column] = dict(counts.most_common(10))
+
+        return {
+            'scope': f"first {len(rows)} rows only (row limit reached)" if truncated else "all rows",
+            'rows_counted': len(rows),
+            'counts_by_label': dict(label_counts.most_common()),
+            'top_values': top_values
+        }
+
+    def assemble(self, question: str, rows: List[Dict]) -> Dict:
+        """
+        Build the LLM context for a question from raw query rows
+
+        Returns:
+            Dictionary with the context list and how much was kept/dropped
+        """
+        rows = rows or []
+        context = []
+        tokens_used = 0
+        summary = None
+
+        if len(rows) > self.summarize_threshold:
+            summary = self.summarize(rows, truncated=len(rows) >= self.row_limit)
+            summary_tokens = estimate_tokens(json.dumps(summary, default=str), self.chars_per_token)
+            if summary_tokens <= self.token_budget:
+                context.append({'summary': summary})
+                tokens_used += summary_tokens
+
+        included = 0
+        for row in self.rank_rows(question, rows):
+            row_tokens = estimate_tokens(json.dumps(row, default=str), self.chars_per_token)
+            if tokens_used + row_tokens > self.token_budget:
+                break
+            context.append(row)
+            tokens_used += row_tokens
+            included += 1
+
+        return {
+            'context': context,
+            'summary': summary,
+            'rows_returned': len(rows),
+            'rows_included': included,
+            'rows_dropped': len(rows) - included,
+            'hit_row_limit': len(rows) >= self.row_limit,
+            'tokens_used': tokens_used,
+            'token_budget': self.token_budget
+        }
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Household-to-Fiber Coverage Classification
+Classifies every household or location-fabric point as served, underserved
+or unserved by its distance to fiber and access points, streaming locations
+from local files in chunks across worker processes, and writes measured
+coverage percentages to GeographicRegion in place of the sample figures
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from spatial_index import GridIndex
+
+# Distance to fiber (or a fiber access point) that counts as served / within reach of an extension
+SERVICE_THRESHOLDS = {
+    'served_m': 200.0,
+    'underserved_m': 1500.0
+}
+
+SERVED, UNDERSERVED, UNSERVED = 0, 1, 2
+STATUS_NAMES = ['served', 'underserved', 'unserved']
+
+# Locations per chunk; bounds worker memory regardless of file size
+CHUNK_SIZE = 200000
+
+
+class CoverageModel:
+    """
+    Spatial indexes over fiber lines, fiber access points and other access points
+
+    The indexes prune candidates to nearby cells; the match is then measured
+    with haversine (points) or a tangent plane at the location (segments).
+    """
+
+    def __init__(self, fiber_lines: List = None, fiber_points: List = None, other_points: List = None,
+                 thresholds: Dict[str, float] = None):
+        """
+        Args:
+            fiber_lines: Fiber routes, each a list of (lat, lon)
+            fiber_points: (lat, lon) of fiber access points
+            other_points: (lat, lon) of cable, DSL or wireless access points
+            thresholds: Overrides for SERVICE_THRESHOLDS
+        """
+        self.thresholds = {**SERVICE_THRESHOLDS, **(thresholds or {})}
+        self.fiber_indexes = []
+        if fiber_lines:
+            self.fiber_indexes.append(GridIndex.from_lines(fiber_lines))
+        if fiber_points:
+            points = np.asarray(fiber_points, dtype=np.float64)
+            self.fiber_indexes.append(GridIndex.from_points(points[:, 0], points[:, 1]))
+        if not self.fiber_indexes:
+            raise ValueError("Coverage needs fiber lines or fiber access points")
+        self.other_index = None
+        if other_points:
+            points = np.asarray(other_points, dtype=np.float64)
+            self.other_index = GridIndex.from_points(points[:, 0], points[:, 1])
+
+    def fiber_distance(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """Meters to the nearest fiber geometry, inf beyond the underserved threshold"""
+        # Grid distances are approximate at the state's edges; search slightly past the threshold
+        reach = self.thresholds['underserved_m'] * 1.05
+        distance = np.full(len(latitudes), np.inf)
+        for index in self.fiber_indexes:
+            items, _ = index.nearest_items(latitudes, longitudes, max_distance_m=reach)
+            distance = np.minimum(distance, index.local_distance_m(latitudes, longitudes, items))
+        return distance
+
+    def classify(self, latitudes, longitudes) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Status code per location (SERVED, UNDERSERVED, UNSERVED) and meters to fiber
+
+        Served: fiber within served_m. Underserved: fiber within
+        underserved_m, or a non-fiber access point within served_m.
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        distance = self.fiber_distance(latitudes, longitudes)
+        status = np.full(len(latitudes), UNSERVED, dtype=np.int8)
+        status[distance <= self.thresholds['underserved_m']] = UNDERSERVED
+        if self.other_index is not None:
+            items, _ = self.other_index.nearest_items(latitudes, longitudes,
+                                                      max_distance_m=self.thresholds['served_m'] * 1.05)
+            near_other = self.other_index.local_distance_m(latitudes, longitudes, items) <= self.thresholds['served_m']
+            status[near_other & (status == UNSERVED)] = UNDERSERVED
+        status[distance <= self.thresholds['served_m']] = SERVED
+        return status, distance
+
+
+def model_from_roads_map(path: str = "../infrastructure_roads_map.html", **kwargs) -> CoverageModel:
+    """Fiber routes and access points from the folium roads map"""
+    from ingest_infrastructure import parse_roads_map
+    features = parse_roads_map(path)
+    fiber_lines = [road['path'] for road in features['roads'] if 'fiber' in road['infrastructure_types']]
+    fiber_points = [(a['latitude'], a['longitude']) for a in features['access_points'] if a['technology'] == 'fiber']
+    other_points = [(a['latitude'], a['longitude']) for a in features['access_points'] if a['technology'] != 'fiber']
+    return CoverageModel(fiber_lines, fiber_points, other_points, **kwargs)
+
+
+def model_from_geojson(paths: List[str], **kwargs) -> CoverageModel:
+    """
+    Fiber and access points from GeoJSON files
+
+    Lines are fiber routes; points are access points, counted as fiber when
+    their technology (or type) property says so.
+    """
+    fiber_lines, fiber_points, other_points = [], [], []
+    for path in paths:
+        with open(path) as f:
+            collection = json.load(f)
+        for feature in collection.get('features', []):
+            geometry = feature.get('geometry') or {}
+            props = feature.get('properties') or {}
+            kind, coordinates = geometry.get('type'), geometry.get('coordinates')
+            if kind == 'LineString':
+                fiber_lines.append([(lat, lon) for lon, lat, *_ in coordinates])
+            elif kind == 'MultiLineString':
+                fiber_lines.extend([(lat, lon) for lon, lat, *_ in part] for part in coordinates)
+            elif kind in ('Point', 'MultiPoint'):
+                technology = str(props.get('technology') or props.get('type') or 'fiber').lower()
+                target = fiber_points if 'fiber' in technology else other_points
+                points = [coordinates] if kind == 'Point' else coordinates
+                target.extend((lat, lon) for lon, lat, *_ in points)
+    return CoverageModel(fiber_lines, fiber_points, other_points, **kwargs)
+
+
+# ===== Chunked, parallel classification =====
+
+_worker_model = None
+
+
+def _init_worker(model: CoverageModel):
+    global _worker_model
+    _worker_model = model
+
+
+def _classify_chunk(latitudes: np.ndarray, longitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    status, distance = _worker_model.classify(latitudes, longitudes)
+    return status, distance.astype(np.float32)
+
+
+def iter_location_chunks(path: str, region_column: str = 'county',
+                         chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Stream a locations CSV (id, latitude, longitude, region column) in chunks"""
+    columns = ['id', 'latitude', 'longitude'] + ([region_column] if region_column else [])
+    for chunk in pd.read_csv(path, usecols=lambda c: c in columns, chunksize=chunk_size,
+                             dtype={'id': str, region_column: str} if region_column else {'id': str}):
+        yield chunk
+
+
+def classify_locations(chunks: Iterator[pd.DataFrame], model: CoverageModel, region_column: str = 'county',
+                       workers: int = None, output_path: str = None) -> Dict:
+    """
+    Classify streamed location chunks and tally statuses per region
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    by chunk size rather than file size.
+
+    Returns:
+        {'totals': {status: n}, 'regions': {region: {status: n}}, 'locations': n, 'seconds': s}
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.time()
+    totals = np.zeros(3, dtype=np.int64)
+    regions: Dict[str, np.ndarray] = {}
+    header = True
+
+    def tally(frame: pd.DataFrame, status: np.ndarray, distance: np.ndarray):
+        nonlocal header
+        totals[:] += np.bincount(status, minlength=3)
+        if region_column and region_column in frame:
+            names = frame[region_column].fillna('').to_numpy()
+            for name, codes in pd.Series(status).groupby(names):
+                if name:
+                    counts = regions.setdefault(name, np.zeros(3, dtype=np.int64))
+                    counts += np.bincount(codes.to_numpy(), minlength=3)
+        if output_path:
+            out = pd.DataFrame({'id': frame['id'].to_numpy(),
+                                'status': np.asarray(STATUS_NAMES)[status],
+                                'fiber_distance_m': np.round(distance, 1)})
+            out.to_csv(output_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+
+    if workers == 1:
+        _init_worker(model)
+        for frame in chunks:
+            tally(frame, *_classify_chunk(frame['latitude'].to_numpy(), frame['longitude'].to_numpy()))
+    else:
+        # spawn: safe from the dashboard's threads; the model is shipped to each worker once
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(model,)) as pool:
+            pending = []
+            for frame in chunks:
+                pending.append((frame, pool.submit(_classify_chunk, frame['latitude'].to_numpy(),
+                                                   frame['longitude'].to_numpy())))
+                while len(pending) >= 2 * workers:
+                    done_frame, future = pending.pop(0)
+                    tally(done_frame, *future.result())
+            for done_frame, future in pending:
+                tally(done_frame, *future.result())
+
+    return {
+        'totals': dict(zip(STATUS_NAMES, totals.tolist())),
+        'regions': {name: dict(zip(STATUS_NAMES, counts.tolist())) for name, counts in regions.items()},
+        'locations': int(totals.sum()),
+        'seconds': round(time.time() - start, 2)
+    }
+
+
+def graph_location_chunks(driver, chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Household nodes and their region, streamed from the graph"""
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (h:Household) WHERE h.location IS NOT NULL
+            OPTIONAL MATCH (h)-[:LOCATED_IN]->(r:GeographicRegion)
+            RETURN h.id as id, h.location.latitude as latitude, h.location.longitude as longitude,
+                   r.name as county
+        """)
+        rows = []
+        for record in result:
+            rows.append(record.values())
+            if len(rows) >= chunk_size:
+                yield pd.DataFrame(rows, columns=['id', 'latitude', 'longitude', 'county'])
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows, columns=['id', 'latitude', 'longitude', 'county'])
+
+
+def write_region_coverage(driver, regions: Dict[str, Dict[str, int]]) -> int:
+    """
+    Replace sample coverage with measured percentages, then rescore availability
+
+    Regions marked fiber_coverage_source = 'computed' keep their value when
+    ingest_michigan_data.py reruns.
+    """
+    from ingest_michigan_data import AVAILABILITY_SCORE_QUERY
+    from analytics_views import refresh_analytics_views
+    from graph_metadata import bump_graph_version
+
+    rows = []
+    for name, counts in regions.items():
+        total = sum(counts.values())
+        if total:
+            rows.append({'name': name, 'total': total, **counts,
+                         'served_pct': round(100.0 * counts['served'] / total, 2),
+                         'underserved_pct': round(100.0 * counts['underserved'] / total, 2),
+                         'unserved_pct': round(100.0 * counts['unserved'] / total, 2)})
+    with driver.session() as session:
+        result = session.run("""
+            UNWIND $rows as row
+            MATCH (r:GeographicRegion {name: row.name})
+            SET r.fiber_coverage = row.served_pct,
+                r.underserved_pct = row.underserved_pct,
+                r.unserved_pct = row.unserved_pct,
+                r.served_locations = row.served,
+                r.underserved_locations = row.underserved,
+                r.unserved_locations = row.unserved,
+                r.coverage_locations = row.total,
+                r.fiber_coverage_source = 'computed',
+                r.coverage_updated_at = datetime()
+            RETURN count(r) as updated
+        """, {'rows': rows})
+        updated = result.single()['updated']
+        session.run(AVAILABILITY_SCORE_QUERY)
+        refresh_analytics_views(session)
+        bump_graph_version(session, source='coverage_engine')
+    return updated
+
+
+# Classify coverage from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classify locations as served, underserved or unserved")
+    parser.add_argument("--locations", help="Locations CSV with id, latitude, longitude and a region column "
+                                            "(default: Household nodes in Neo4j)")
+    parser.add_argument("--region-column", default="county", help="Column holding GeographicRegion names")
+    parser.add_argument("--infrastructure", nargs="+",
+                        help="Fiber / access point GeoJSON files (default: the roads map)")
+    parser.add_argument("--served-m", type=float, default=SERVICE_THRESHOLDS['served_m'])
+    parser.add_argument("--underserved-m", type=float, default=SERVICE_THRESHOLDS['underserved_m'])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", help="Write per-location status CSV")
+    parser.add_argument("--write", action="store_true", help="Write region coverage to Neo4j")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Fiber Coverage Classification")
+    print("=" * 60)
+    print()
+
+    try:
+        thresholds = {'served_m': args.served_m, 'underserved_m': args.underserved_m}
+        model = (model_from_geojson(args.infrastructure, thresholds=thresholds) if args.infrastructure
+                 else model_from_roads_map(thresholds=thresholds))
+
+        driver = None
+        if args.locations:
+            chunks = iter_location_chunks(args.locations, args.region_column, args.chunk_size)
+        else:
+            from neo4j_connection import get_driver
+            driver = get_driver()
+            chunks = graph_location_chunks(driver, args.chunk_size)
+            args.region_column = 'county'
+
+        summary = classify_locations(chunks, model, args.region_column, args.workers, args.output)
+        total = max(summary['locations'], 1)
+        print(f"✓ Classified {summary['locations']:,} locations in {summary['seconds']:.1f}s "
+              f"with {args.workers} workers ({summary['locations'] / max(summary['seconds'], 1e-9):,.0f}/s)")
+        for status in STATUS_NAMES:
+            print(f"  {status:12s} {summary['totals'][status]:>12,}  {summary['totals'][status] / total:7.1%}")
+
+        if args.write:
+            if driver is None:
+                from neo4j_connection import get_driver
+                driver = get_driver()
+            updated = write_region_coverage(driver, summary['regions'])
+            print(f"✓ Updated fiber coverage on {updated} regions")
+
+    except Exception as e:
+        print(f"❌ Coverage classification failed: {e}")
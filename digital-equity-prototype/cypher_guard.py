@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Safe Execution Gate for LLM-Generated Cypher
+Rejects write clauses and unbounded patterns, checks the EXPLAIN plan's
+estimated rows, injects a LIMIT and runs the query in a read-only
+transaction with a server-side timeout
+"""
+
+from context_assembly import inject_limit
+from contextlib import contextmanager
+from neo4j import READ_ACCESS, unit_of_work
+from typing import Dict, List
+import re
+import threading
+
+# Clauses and procedures that modify the database or its schema
+WRITE_PATTERN = re.compile(
+    r'\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV|'
+    r'IN\s+TRANSACTIONS|GRANT|REVOKE|DENY|ALTER|RENAME)\b'
+    r'|\bCALL\s+(dbms|db\.create|db\.index\.fulltext\.create|apoc\.(create|merge|refactor|periodic|trigger|load|export))',
+    re.IGNORECASE
+)
+
+# Variable-length relationships with no upper bound: [*], [:R*], [*2..]
+UNBOUNDED_PATH_PATTERN = re.compile(r'\[[^\]]*\*\s*(\d+\s*\.\.\s*|\.\.\s*)?\]')
+# Upper bound of [*..5], [*2..5] and [*5]
+BOUNDED_PATH_PATTERN = re.compile(r'\*\s*(?:\d*\s*\.\.\s*)?(\d+)\s*\]')
+
+_STRING_LITERAL = re.compile(r"'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|`[^`]*`")
+_COMMENT = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+class CypherRejected(ValueError):
+    """Raised when a generated query fails a safety check"""
+
+    def __init__(self, reason: str, cypher: str):
+        super().__init__(reason)
+        self.reason = reason
+        self.cypher = cypher
+
+
+class CypherUnavailable(RuntimeError):
+    """
+    Raised when an acceptable query could not run: no free slot, or the timeout
+
+    Not a CypherRejected: the query itself is fine, so callers should keep
+    it (and any cache entry) and retry later rather than regenerate it.
+    """
+
+    def __init__(self, reason: str, cypher: str):
+        super().__init__(reason)
+        self.reason = reason
+        self.cypher = cypher
+
+
+def _strip_literals(cypher: str) -> str:
+    """Remove comments and quoted text so keywords inside values don't match"""
+    return _STRING_LITERAL.sub("''", _COMMENT.sub(' ', cypher))
+
+
+def max_estimated_rows(plan: Dict) -> float:
+    """Largest EstimatedRows anywhere in an EXPLAIN plan tree"""
+    if not plan:
+        return 0.0
+    rows = float(plan.get('args', {}).get('EstimatedRows', 0) or 0)
+    for child in plan.get('children', []):
+        rows = max(rows, max_estimated_rows(child))
+    return rows
+
+
+def plan_operators(plan: Dict) -> List[str]:
+    if not plan:
+        return []
+    operators = [plan.get('operatorType', '')]
+    for child in plan.get('children', []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
+class CypherGuard:
+    """
+    Pre-execution gate and read-only executor for generated queries
+    """
+
+    def __init__(self, driver=None, max_estimated_rows: float = 100000, row_limit: int = 200,
+                 timeout_seconds: float = 10.0, max_path_length: int = 4,
+                 max_concurrent: int = 4, acquire_timeout: float = 5.0, database: str = None):
+        """
+        Args:
+            driver: neo4j driver used for EXPLAIN and execution (static checks only if None)
+            max_estimated_rows: Reject plans estimating more rows than this at any operator
+            row_limit: LIMIT injected into every query
+            timeout_seconds: Server-side transaction timeout
+            max_path_length: Longest allowed variable-length relationship
+            max_concurrent: Generated queries allowed to run at once
+            acquire_timeout: Seconds to wait for a free slot before rejecting
+            database: Database name; defaults to the shared driver's configured database
+        """
+        self.driver = driver
+        self.max_estimated_rows = max_estimated_rows
+        self.row_limit = row_limit
+        self.timeout_seconds = timeout_seconds
+        self.max_path_length = max_path_length
+        self.acquire_timeout = acquire_timeout
+        self.database = database or getattr(getattr(driver, 'config', None), 'database', None)
+        # Caps how much of the pool GraphRAG can hold so dashboards keep their connections
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self.stats = {'checked': 0, 'rejected': 0, 'busy': 0, 'timed_out': 0}
+
+    def check_static(self, cypher: str) -> str:
+        """
+        Text-level checks; returns the query with a LIMIT injected
+
+        Raises:
+            CypherRejected: on write clauses, multiple statements or unbounded paths
+        """
+        self.stats['checked'] += 1
+        bare = _strip_literals(cypher).strip().rstrip(';')
+
+        if ';' in bare:
+            self._reject("Multiple statements are not allowed", cypher)
+
+        write = WRITE_PATTERN.search(bare)
+        if write:
+            self._reject(f"'{write.group(0).strip()}' is not allowed in generated read-only queries", cypher)
+
+        if UNBOUNDED_PATH_PATTERN.search(bare):
+            self._reject(f"Variable-length relationships need an upper bound (at most *..{self.max_path_length})", cypher)
+        for match in BOUNDED_PATH_PATTERN.finditer(bare):
+            if int(match.group(1)) > self.max_path_length:
+                self._reject(f"Variable-length relationships longer than {self.max_path_length} hops are not allowed", cypher)
+
+        return inject_limit(cypher, self.row_limit)
+
+    def check_plan(self, cypher: str) -> Dict:
+        """
+        EXPLAIN the query (compiles without executing) and check its estimated rows
+        """
+        with self._session() as session:
+            summary = session.run(f"EXPLAIN {cypher}").consume()
+        plan = summary.plan or {}
+
+        estimated = max_estimated_rows(plan)
+        if estimated > self.max_estimated_rows:
+            operators = plan_operators(plan)
+            hint = " (cartesian product)" if 'CartesianProduct' in ' '.join(operators) else ""
+            self._reject(f"Query plan estimates {estimated:,.0f} rows{hint}; "
+                         f"limit is {self.max_estimated_rows:,.0f}", cypher)
+        return {'estimated_rows': estimated}
+
+    def _session(self):
+        """Read-only session; database=None is not passed, so the driver's default still applies"""
+        kwargs = {'default_access_mode': READ_ACCESS}
+        if self.database:
+            kwargs['database'] = self.database
+        return self.driver.session(**kwargs)
+
+    @contextmanager
+    def _slot(self, cypher: str):
+        """Hold one of the max_concurrent slots (EXPLAIN and execution both use the pool)"""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self.stats['busy'] += 1
+            raise CypherUnavailable("Too many generated queries running; try again shortly", cypher)
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def validate(self, cypher: str) -> str:
+        """Run every check; returns the query that is safe to execute"""
+        cypher = self.check_static(cypher)
+        if self.driver is not None:
+            with self._slot(cypher):
+                self.check_plan(cypher)
+        return cypher
+
+    def run(self, cypher: str, params: Dict = None) -> List[Dict]:
+        """Check statically, then check the plan and execute within one slot"""
+        return self.execute(self.check_static(cypher), params)
+
+    def execute(self, cypher: str, params: Dict = None, check_plan: bool = True) -> List[Dict]:
+        """
+        Execute a statically checked query in a read-only transaction with a timeout
+
+        The EXPLAIN plan check (unless check_plan is False) runs in the same
+        slot as the query.
+
+        Raises:
+            CypherRejected: the plan estimates too many rows
+            CypherUnavailable: no free slot within acquire_timeout, or the query timed out
+        """
+        with self._slot(cypher):
+            if check_plan:
+                self.check_plan(cypher)
+
+            @unit_of_work(timeout=self.timeout_seconds)
+            def read(tx):
+                return [record.data() for record in tx.run(cypher, params or {})]
+
+            with self._session() as session:
+                try:
+                    return session.execute_read(read)
+                except Exception as e:
+                    if 'TransactionTimedOut' in str(getattr(e, 'code', '')) or 'timed out' in str(e).lower():
+                        self.stats['timed_out'] += 1
+                        raise CypherUnavailable(f"Query exceeded the {self.timeout_seconds:g}s timeout", cypher)
+                    raise
+
+    def _reject(self, reason: str, cypher: str):
+        self.stats['rejected'] += 1
+        raise CypherRejected(reason, cypher)
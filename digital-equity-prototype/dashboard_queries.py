@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Dashboard Query Layer
+Cypher behind the Streamlit pages, kept separate from rendering so the
+same queries serve the dashboard, scripts and tests. Charts read the
+summary nodes written by analytics_views.py, so their cost follows the
+rows shown rather than the size of the graph
+"""
+
+from neo4j.exceptions import ClientError
+from typing import Dict, List
+import re
+
+# Counts and regional coverage from the materialized views in one round trip
+OVERVIEW_QUERY = """
+OPTIONAL MATCH (v:AnalyticsView {name: 'overview'})
+CALL {
+    MATCH (r:RegionSummary) WHERE r.rank < $limit
+    WITH r ORDER BY r.rank
+    RETURN collect({county: r.county, fiber: r.fiber, cable: r.cable, speed: r.speed}) as region_coverage
+}
+RETURN v IS NOT NULL as materialized,
+       coalesce(v.organizations, 0) as organizations,
+       coalesce(v.services, 0) as services,
+       coalesce(v.populations, 0) as populations,
+       coalesce(v.regions, 0) as regions,
+       region_coverage
+"""
+
+SERVICE_SUMMARY_QUERY = """
+MATCH (s:ServiceSummary) WHERE s.rank < $limit
+RETURN s.service as service, s.provider_count as provider_count, s.providers as providers
+ORDER BY s.rank
+"""
+
+POPULATION_SUMMARY_QUERY = """
+MATCH (p:PopulationSummary) WHERE p.rank < $limit
+RETURN p.population as population, p.org_count as org_count, p.organizations as organizations
+ORDER BY p.rank
+"""
+
+
+def fetch_overview(session, region_limit: int = 100) -> Dict:
+    """
+    Summary metrics and regional coverage in a single query
+
+    Returns:
+        Dictionary with organizations, services, populations, regions
+        counts, a region_coverage list and whether the views exist yet
+    """
+    return session.run(OVERVIEW_QUERY, {'limit': region_limit}).single().data()
+
+
+def fetch_service_summary(session, limit: int = 50) -> List[Dict]:
+    """Services ranked by provider count"""
+    return [record.data() for record in session.run(SERVICE_SUMMARY_QUERY, {'limit': limit})]
+
+
+def fetch_population_summary(session, limit: int = 50) -> List[Dict]:
+    """Populations ranked by number of serving organizations"""
+    return [record.data() for record in session.run(POPULATION_SUMMARY_QUERY, {'limit': limit})]
+
+
+# Ranked gaps materialized by service_gaps.py; filters walk the rank index in order
+SERVICE_GAPS_QUERY = """
+MATCH (g:ServiceGap)
+WHERE ($region IS NULL OR g.region = $region)
+  AND ($population IS NULL OR g.population = $population)
+  AND ($service IS NULL OR g.service = $service)
+WITH g ORDER BY g.rank LIMIT $limit
+RETURN g.region as region, g.population as population, g.service as service,
+       g.providers as providers, g.statewide_providers as statewide_providers,
+       g.affected_population as affected_population, g.gap_score as gap_score
+"""
+
+
+def fetch_service_gaps(session, limit: int = 50, region: str = None, population: str = None,
+                       service: str = None) -> List[Dict]:
+    """Region x population x service gaps, most people affected first"""
+    return [record.data() for record in session.run(SERVICE_GAPS_QUERY, {
+        'limit': limit, 'region': region, 'population': population, 'service': service})]
+
+
+# ===== Geographic Map =====
+
+# Region properties offered on the choropleth, with display labels
+REGION_METRICS = {
+    'fiber_coverage': 'Fiber coverage (%)',
+    'cable_coverage': 'Cable coverage (%)',
+    'dsl_coverage': 'DSL coverage (%)',
+    'median_speed_mbps': 'Median download speed (Mbps)',
+    'median_income': 'Median household income ($)',
+    'poverty_rate': 'Poverty rate',
+    'rural_percentage': 'Rural share of population',
+    'availability_score': 'Availability score',
+    'affordability_score': 'Affordability score',
+    'aspiration_score': 'Aspiration score',
+    'service_quality_score': 'Service quality score'
+}
+
+REGION_METRICS_QUERY = """
+MATCH (r:GeographicRegion) WHERE r.type = $level
+RETURN r {.name, .fips, """ + ", ".join(f".{key}" for key in REGION_METRICS) + """} as region
+"""
+
+
+def fetch_region_metrics(session, level: str = 'county') -> List[Dict]:
+    """Every map metric for the regions at one level (one row per region drawn)"""
+    return [record["region"] for record in session.run(REGION_METRICS_QUERY, {'level': level})]
+
+
+# ===== Knowledge Graph Explorer =====
+
+ORGANIZATION_SEARCH_INDEX = 'organization_search'
+
+EXPLORER_FILTERS_QUERY = """
+CALL { MATCH (r:GeographicRegion) RETURN collect(r.name) as regions }
+CALL { MATCH (s:Service) RETURN collect(s.name) as services }
+CALL { MATCH (p:Population) RETURN collect(p.name) as populations }
+CALL {
+    MATCH (o:Organization)
+    UNWIND labels(o) as label
+    WITH DISTINCT label WHERE label <> 'Organization'
+    RETURN collect(label) as labels
+}
+RETURN regions, services, populations, labels
+"""
+
+# Related names are collected per page row, never for the whole graph
+ORGANIZATION_DETAILS = """
+CALL { WITH o OPTIONAL MATCH (o)-[:PROVIDES_SERVICE]->(s:Service) RETURN collect(DISTINCT s.name) as services }
+CALL { WITH o OPTIONAL MATCH (o)-[:SERVES_POPULATION]->(p:Population) RETURN collect(DISTINCT p.name) as populations }
+CALL { WITH o OPTIONAL MATCH (o)-[:LOCATED_IN]->(r:GeographicRegion) RETURN collect(DISTINCT r.name) as regions }
+RETURN o.name as name, labels(o) as types, services, populations, regions
+"""
+
+
+def create_explorer_indexes(session):
+    """Full-text index behind the Explorer search box"""
+    session.run(f"""
+        CREATE FULLTEXT INDEX {ORGANIZATION_SEARCH_INDEX} IF NOT EXISTS
+        FOR (o:Organization) ON EACH [o.name, o.type]
+    """)
+
+
+def fetch_explorer_filters(session) -> Dict:
+    """Distinct regions, services, populations and organization labels for the filter widgets"""
+    record = session.run(EXPLORER_FILTERS_QUERY).single().data()
+    return {key: sorted(v for v in values if v) for key, values in record.items()}
+
+
+def _lucene_query(text: str) -> str:
+    """Escape user input and turn each word into a prefix term"""
+    terms = []
+    for word in text.split():
+        escaped = re.sub(r'([+\-&|!(){}\[\]^"~*?:\\/])', r'\\\1', word)
+        terms.append(f"{escaped}*")
+    return " AND ".join(terms)
+
+
+def fetch_organization_page(session, page_size: int = 25, after: str = None, region: str = None,
+                            service: str = None, population: str = None, label: str = None,
+                            search: str = None) -> Dict:
+    """
+    One page of organizations using a keyset cursor on the unique name
+
+    Only page_size + 1 rows are read (the extra row tells whether another
+    page exists), so cost stays flat however many organizations there are.
+
+    Args:
+        after: Name of the last organization on the previous page
+        region, service, population: Exact names to filter by
+        label: Organization sub-label such as 'Library'
+        search: Free text matched against the organization search index
+
+    Returns:
+        Dictionary with rows and next_cursor (None on the last page)
+    """
+    if label and not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', label):
+        raise ValueError(f"Invalid label: {label}")
+
+    conditions = []
+    if after is not None:
+        conditions.append("o.name > $after")
+    else:
+        conditions.append("o.name IS NOT NULL")
+    if label:
+        conditions.append(f"o:`{label}`")
+    if region:
+        conditions.append("EXISTS { (o)-[:LOCATED_IN]->(:GeographicRegion {name: $region}) }")
+    if service:
+        conditions.append("EXISTS { (o)-[:PROVIDES_SERVICE]->(:Service {name: $service}) }")
+    if population:
+        conditions.append("EXISTS { (o)-[:SERVES_POPULATION]->(:Population {name: $population}) }")
+
+    if search:
+        source = (f"CALL db.index.fulltext.queryNodes('{ORGANIZATION_SEARCH_INDEX}', $search) "
+                  f"YIELD node as o WHERE o:Organization AND ")
+    else:
+        source = "MATCH (o:Organization) WHERE "
+
+    query = (source + " AND ".join(conditions) +
+             "\nWITH o ORDER BY o.name LIMIT $fetch\n" + ORGANIZATION_DETAILS)
+    params = {'after': after, 'region': region, 'service': service, 'population': population,
+              'search': _lucene_query(search) if search else None, 'fetch': page_size + 1}
+
+    try:
+        rows = [record.data() for record in session.run(query, params)]
+    except ClientError:
+        if not search:
+            raise
+        # Search index not created yet (build_knowledge_graph.py); fall back to a scan
+        query = query.replace(source, "MATCH (o:Organization) WHERE toLower(o.name) CONTAINS toLower($text) AND ")
+        params['text'] = search
+        rows = [record.data() for record in session.run(query, params)]
+
+    next_cursor = rows[page_size - 1]['name'] if len(rows) > page_size else None
+    return {'rows': rows[:page_size], 'next_cursor': next_cursor}
@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""
+Organization Entity Resolution
+Finds organizations that different sources name differently ("Detroit Public
+Library" vs "Detroit Public Library - Main"). Candidates are blocked on rare
+name tokens within a county, scored with vectorized character-trigram
+similarity, clustered, and merged in the graph into canonical nodes through
+reversible ALIAS_OF edges
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+import re
+import time
+import unicodedata
+import uuid
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from spatial_index import haversine_m
+
+# Name variants folded before comparison
+ABBREVIATIONS = {
+    'lib': 'library', 'libr': 'library', 'pub': 'public', 'dist': 'district', 'twp': 'township',
+    'cnty': 'county', 'ctr': 'center', 'cntr': 'center', 'centre': 'center', 'assn': 'association',
+    'assoc': 'association', 'univ': 'university', 'dept': 'department', 'mt': 'mount',
+    'comm': 'community', 'svcs': 'services', 'svc': 'service', 'intl': 'international', 'natl': 'national'
+}
+# Legal suffixes and main-site qualifiers ("- Main", "(Main Branch)") do not distinguish organizations
+STOPWORDS = {'the', 'of', 'a', 'an', 'inc', 'incorporated', 'llc', 'ltd', 'corp', 'corporation',
+             'main', 'branch', 'headquarters', 'hq'}
+
+# Each record is blocked on its rarest tokens; oversized blocks are too generic to be useful
+BLOCK_TOKENS = 2
+MAX_BLOCK_SIZE = 400
+
+# Pair score needed to merge
+MATCH_THRESHOLD = 0.85
+# One name's tokens containing another's ("Detroit Library" in "Detroit Public Library Foundation")
+# is not a match on its own: it scores just below the threshold...
+CONTAINMENT_SCORE = 0.8
+# ...and only reaches CONTAINMENT_MATCH_SCORE for co-located records whose names differ by one token
+CONTAINMENT_MATCH_SCORE = 0.9
+CONTAINMENT_DISTANCE_M = 200.0
+# Located records farther apart than this are different sites, whatever their names
+MAX_MATCH_DISTANCE_M = 1500.0
+
+ALIAS_LABEL = 'OrganizationAlias'
+# Original alias relationships are kept, with their properties, as (alias)-[:MERGED_RELATIONSHIP]->(other)
+STASH_TYPE = 'MERGED_RELATIONSHIP'
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase ASCII tokens with abbreviations expanded and STOPWORDS dropped"""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode().lower()
+    text = re.sub(r'[^a-z0-9]+', ' ', text.replace('&', ' and '))
+    tokens = [ABBREVIATIONS.get(token, token) for token in text.split()]
+    return ' '.join(token for token in tokens if token not in STOPWORDS)
+
+
+def normalize_region(region) -> str:
+    """County names compare without case or the 'County' suffix; '' when unknown"""
+    if not isinstance(region, str):
+        return ''
+    region = re.sub(r'\s+county$', '', region.strip().lower())
+    return '' if region in ('', 'multiple', 'statewide', 'unknown') else region
+
+
+# ===== Blocking =====
+
+def candidate_pairs(normalized: List[str], regions: List[str]) -> np.ndarray:
+    """
+    (i, j) index pairs, i < j, that share a rare token and a county
+
+    Records without a county pair with every record sharing a rare token,
+    so a statewide source still meets the county-level ones.
+    """
+    tokens = [set(name.split()) for name in normalized]
+    frequency = Counter(token for record in tokens for token in record)
+    blocks = defaultdict(list)
+    for i, (record, region) in enumerate(zip(tokens, regions)):
+        for token in sorted(record, key=lambda t: (frequency[t], t))[:BLOCK_TOKENS]:
+            blocks[(region, token)].append(i)
+            if region:
+                blocks[('', token)].append(i)
+
+    located = np.array([bool(region) for region in regions])
+    parts = []
+    for (region, _), members in blocks.items():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        members = np.asarray(members)
+        if region:
+            left, right = np.triu_indices(len(members), k=1)
+            left, right = members[left], members[right]
+        else:
+            # Located records already met in their county blocks; pair only the unlocated ones here
+            unlocated = members[~located[members]]
+            if not len(unlocated):
+                continue
+            left, right = np.repeat(unlocated, len(members)), np.tile(members, len(unlocated))
+            keep = (left != right) & (located[right] | (left < right))
+            left, right = left[keep], right[keep]
+        parts.append(np.column_stack([np.minimum(left, right), np.maximum(left, right)]))
+    if not parts:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.unique(np.vstack(parts).astype(np.int64), axis=0)
+
+
+# ===== Similarity =====
+
+def trigram_matrix(normalized: List[str]) -> sparse.csr_matrix:
+    """
+    L2-normalized character trigram vectors, one row per name
+
+    Trigrams are weighted by the square root of their IDF: rare trigrams
+    still dominate, but a single typo no longer sinks the score.
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for i, name in enumerate(normalized):
+        padded = f"  {name} "
+        for k in range(len(padded) - 2):
+            rows.append(i)
+            cols.append(vocabulary.setdefault(padded[k:k + 3], len(vocabulary)))
+    counts = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(normalized), len(vocabulary)))
+    document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = np.log((1.0 + len(normalized)) / (1.0 + document_frequency)) + 1.0
+    weighted = counts @ sparse.diags(np.sqrt(idf))
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    return sparse.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ weighted
+
+
+def pair_scores(records: pd.DataFrame, pairs: np.ndarray) -> np.ndarray:
+    """
+    Similarity in [0, 1] for each candidate pair
+
+    Trigram cosine, zeroed when the names carry different numbers or the
+    records are located farther apart than MAX_MATCH_DISTANCE_M. When one
+    name's tokens (two or more) are contained in the other's, the pair
+    scores CONTAINMENT_SCORE (below the threshold) unless both records are
+    within CONTAINMENT_DISTANCE_M and the names differ by a single token:
+    "Detroit Library" is not "Detroit Public Library Foundation".
+    """
+    if not len(pairs):
+        return np.zeros(0)
+    normalized = records['normalized'].tolist()
+    vectors = trigram_matrix(normalized)
+    left, right = pairs[:, 0], pairs[:, 1]
+    scores = np.asarray(vectors[left].multiply(vectors[right]).sum(axis=1)).ravel()
+
+    distance = np.full(len(pairs), np.inf)
+    if {'latitude', 'longitude'} <= set(records.columns):
+        lat = records['latitude'].to_numpy(dtype=np.float64)
+        lon = records['longitude'].to_numpy(dtype=np.float64)
+        both = np.isfinite(lat[left]) & np.isfinite(lat[right])
+        distance[both] = haversine_m(lat[left[both]], lon[left[both]], lat[right[both]], lon[right[both]])
+
+    tokens = [frozenset(name.split()) for name in normalized]
+    for k in np.flatnonzero(scores >= 0.5):
+        a, b = tokens[left[k]], tokens[right[k]]
+        if any(token.isdigit() for token in a ^ b):
+            # "Library 2" is a sibling site, not a variant spelling
+            scores[k] = 0.0
+        elif a != b and min(len(a), len(b)) >= 2 and (a <= b or b <= a):
+            colocated = distance[k] <= CONTAINMENT_DISTANCE_M and len(a ^ b) == 1
+            scores[k] = max(scores[k], CONTAINMENT_MATCH_SCORE) if colocated else \
+                min(scores[k], CONTAINMENT_SCORE)
+
+    scores[np.isfinite(distance) & (distance > MAX_MATCH_DISTANCE_M)] = 0.0
+    return np.clip(scores, 0.0, 1.0)
+
+
+# ===== Clustering =====
+
+def resolve(records: pd.DataFrame, threshold: float = MATCH_THRESHOLD) -> Dict:
+    """
+    Cluster records that refer to the same organization
+
+    Args:
+        records: name and optional county, latitude, longitude, degree
+                 (relationship count) and canonical (already a merge target)
+        threshold: Pair score needed to link two records
+
+    Returns:
+        {'records': records plus normalized, cluster, canonical_row (row of
+         the cluster's canonical record, which every member matches
+         directly) and score (best link score),
+         'pairs': candidate pairs, 'matches': linked pairs, 'seconds': s}
+    """
+    start = time.perf_counter()
+    records = records.reset_index(drop=True).copy()
+    records['normalized'] = records['name'].map(normalize_name)
+    regions = (records['county'].map(normalize_region) if 'county' in records
+               else pd.Series('', index=records.index)).tolist()
+    pairs = candidate_pairs(records['normalized'].tolist(), regions)
+    scores = pair_scores(records, pairs)
+    matched = scores >= threshold
+    links = pairs[matched]
+
+    n = len(records)
+    graph = sparse.coo_matrix((np.ones(len(links)), (links[:, 0], links[:, 1])), shape=(n, n))
+    _, clusters = connected_components(graph, directed=False)
+    best = np.zeros(n)
+    np.maximum.at(best, links[:, 0], scores[matched])
+    np.maximum.at(best, links[:, 1], scores[matched])
+
+    # Canonical record: an existing merge target, else the best connected, else the spelling
+    # most records in the cluster normalize to (sources rarely repeat a typo), then the one
+    # whose words are most common across all records (a misspelled word is rare), written out
+    # in full (no abbreviations or legal suffixes), and only then the shortest
+    records['cluster'] = clusters.astype(np.int64)
+    records['score'] = np.round(best, 4)
+    spelled_out = records['name'].str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+    words = records['normalized'].str.split().explode()
+    word_support = words.map(np.log(words.value_counts())).groupby(level=0).mean().fillna(0.0)
+    order = records.assign(
+        _canonical=-(records['canonical'].fillna(False).astype(int) if 'canonical' in records else 0),
+        _degree=-(records['degree'].fillna(0) if 'degree' in records else 0),
+        _votes=-records.groupby(['cluster', 'normalized'])['name'].transform('size'),
+        _word_support=-word_support.round(6),
+        _abbreviated=(spelled_out != records['normalized']).astype(int),
+        _shouting=records['name'].str.isupper().astype(int),
+        _length=records['name'].str.len()
+    ).sort_values(['cluster', '_canonical', '_degree', '_votes', '_word_support', '_abbreviated', '_shouting', '_length', 'name'])
+    first = order.drop_duplicates('cluster')
+    records['canonical_row'] = records['cluster'].map(pd.Series(first.index, index=first['cluster']))
+
+    # Connected components chain matches (A~B, B~C); a record only joins its cluster's
+    # canonical if the two match directly, otherwise it stays its own organization
+    members = np.flatnonzero(records.index.to_numpy() != records['canonical_row'].to_numpy())
+    direct = np.column_stack([members, records['canonical_row'].to_numpy()[members]]).astype(np.int64)
+    unlinked = members[pair_scores(records, direct) < threshold] if len(direct) else members
+    records.loc[unlinked, 'canonical_row'] = unlinked
+    records.loc[unlinked, 'cluster'] = clusters.max() + 1 + np.arange(len(unlinked))
+    return {
+        'records': records,
+        'pairs': len(pairs),
+        'matches': int(matched.sum()),
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def merge_plan(records: pd.DataFrame) -> List[Dict]:
+    """One alias -> canonical row for every record that is not its cluster's canonical"""
+    aliases = records[records.index != records['canonical_row']]
+    return [{'alias': records.at[row, 'id'], 'canonical': records.at[canonical, 'id'],
+             'alias_name': records.at[row, 'name'], 'canonical_name': records.at[canonical, 'name'],
+             'score': float(records.at[row, 'score'])}
+            for row, canonical in zip(aliases.index, aliases['canonical_row'])]
+
+
+# ===== Inputs =====
+
+def read_records(paths: Iterable[str]) -> pd.DataFrame:
+    """Organization records from CSVs with name and optional id, county, latitude, longitude"""
+    frames = []
+    for path in paths:
+        frame = pd.read_csv(path, dtype={'id': str})
+        frame['source'] = path
+        if 'id' not in frame:
+            frame['id'] = [f"{path}:{i}" for i in range(len(frame))]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def synthetic_records(entities: int, sources: int = 3, seed: int = 11) -> pd.DataFrame:
+    """Noisy copies of the same organizations from several sources, with the true entity id"""
+    rng = np.random.default_rng(seed)
+    syllables = [['Ash', 'Bay', 'Cedar', 'Dear', 'Elk', 'Fern', 'Glen', 'Hart', 'Iron', 'Lake', 'Mill', 'Oak',
+                  'Pine', 'Rock', 'Stone', 'Wolf', 'Birch', 'Clear', 'Maple', 'North', 'Red', 'Silver'],
+                 ['', 'brook', 'wood', 'water', 'ridge', 'land', 'field', 'hill', 'spring', 'creek'],
+                 ['ton', 'ville', 'ford', 'burg', 'dale', 'port', 'view', 'haven', ' City', ' Falls']]
+    kinds = ['Public Library', 'District Library', 'Community Center', 'Digital Navigators', 'Senior Center',
+             'Workforce Center', 'Housing Commission', 'Adult Education Center', 'Family Services', 'Tech Hub',
+             'Literacy Council', 'Boys & Girls Club', 'Community Action Agency', 'Township Hall']
+    names = [f"{a}{b}{c} {kind}" for a in syllables[0] for b in syllables[1] for c in syllables[2] for kind in kinds]
+    picks = rng.choice(len(names), size=min(entities, len(names)), replace=False)
+    counties = [f"County {i:02d}" for i in range(83)]
+    suffixes = ['', ' - Main', ' Inc.', ', Inc', ' (Main Branch)']
+
+    def variant(name):
+        roll = rng.random()
+        if roll < 0.2:
+            name = name.replace('Public', 'Pub.').replace('Library', 'Lib').replace('Center', 'Ctr')
+        elif roll < 0.35 and len(name) > 8:
+            k = int(rng.integers(1, len(name) - 1))
+            name = name[:k] + name[k + 1:]
+        elif roll < 0.45:
+            name = 'The ' + name
+        name += suffixes[int(rng.integers(0, len(suffixes)))] if rng.random() < 0.3 else ''
+        return name.upper() if rng.random() < 0.05 else name
+
+    rows = []
+    for entity in range(entities):
+        name = names[picks[entity % len(picks)]]
+        if entity >= len(picks):
+            name += f" Branch {entity // len(picks) + 1}"
+        county = counties[int(rng.integers(0, len(counties)))]
+        lat, lon = rng.uniform(41.7, 46.5), rng.uniform(-90.0, -82.5)
+        for source in range(sources):
+            if source and rng.random() < 0.3:
+                continue
+            rows.append({'id': f"s{source}:{entity}", 'source': f"source_{source}", 'entity': entity,
+                         'name': variant(name) if source else name,
+                         'county': None if source == 2 else county,
+                         'latitude': lat + rng.normal(0, 0.001) if source != 1 else np.nan,
+                         'longitude': lon + rng.normal(0, 0.001) if source != 1 else np.nan})
+    return pd.DataFrame(rows)
+
+
+# ===== Graph merges =====
+
+def _validated(names: Iterable[str]) -> List[str]:
+    """Label / relationship type names interpolated into Cypher must be plain identifiers"""
+    names = sorted(set(names))
+    for name in names:
+        if not _IDENTIFIER.match(name):
+            raise ValueError(f"Refusing to interpolate identifier '{name}'")
+    return names
+
+
+def fetch_organizations(driver) -> pd.DataFrame:
+    """Organization nodes with their county, location, degree and whether they are merge targets"""
+    with driver.session() as session:
+        rows = session.run("""
+            MATCH (o:Organization)
+            OPTIONAL MATCH (o)-[:LOCATED_IN]->(r:GeographicRegion)
+            WITH o, collect(r.name)[0] as county
+            RETURN elementId(o) as id, o.name as name, county,
+                   o.location.latitude as latitude, o.location.longitude as longitude,
+                   COUNT { (o)--() } as degree,
+                   EXISTS { (o)<-[:ALIAS_OF]-() } as canonical
+        """).data()
+    return pd.DataFrame(rows, columns=['id', 'name', 'county', 'latitude', 'longitude', 'degree', 'canonical'])
+
+
+def canonical_names(session, names: List[str]) -> Dict[str, str]:
+    """Map names to their canonical organization's name, so re-ingested aliases do not reappear"""
+    rows = session.run(f"""
+        UNWIND $names as name
+        OPTIONAL MATCH (:{ALIAS_LABEL} {{name: name}})-[:ALIAS_OF]->(c:Organization)
+        RETURN name, coalesce(c.name, name) as canonical
+    """, {'names': list(names)})
+    return {row['name']: row['canonical'] for row in rows}
+
+
+def _relationship_types(session, query: str, params: Dict) -> List[Tuple[str, bool]]:
+    rows = session.run(query, params).data()
+    types = _validated(row['type'] for row in rows)
+    return [(row['type'], row['outgoing']) for row in rows if row['type'] in types]
+
+
+def _pattern(rel_type: str, outgoing: bool, source: str, target: str, variable: str) -> str:
+    arrow = f"-[{variable}:`{rel_type}`]->" if outgoing else f"<-[{variable}:`{rel_type}`]-"
+    return f"({source}){arrow}({target})"
+
+
+def _canonical_batches(rows: List[Dict], batch_size: int) -> Iterable[List[Dict]]:
+    """Batches of about batch_size rows that never split one canonical's aliases"""
+    by_canonical = defaultdict(list)
+    for row in rows:
+        by_canonical[row['canonical']].append(row)
+    batch = []
+    for group in by_canonical.values():
+        batch.extend(group)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def merge_organizations(driver, plan: List[Dict], run_id: str = None, batch_size: int = 1000) -> Dict:
+    """
+    Merge each alias node into its canonical node, reversibly and without APOC
+
+    Every alias relationship is first copied, with its properties, to a
+    (alias)-[:MERGED_RELATIONSHIP {merged_type, merged_outgoing}]->(other)
+    snapshot and then deleted. Relationships to other nodes move to the
+    canonical node; a move that creates a new relationship marks it
+    merge_created, and every moved relationship records the alias in
+    merged_from. Relationships between an alias and its canonical (or
+    another alias of the same canonical) are only snapshotted, not moved.
+    The alias keeps its properties, trades its labels for OrganizationAlias
+    (saving them in merged_labels) and points to the canonical through
+    ALIAS_OF {merge_id, run_id, score}.
+
+    Returns:
+        {'run_id': id, 'merged': aliases merged, 'relationships': relationships moved}
+    """
+    from graph_metadata import bump_graph_version
+
+    run_id = run_id or time.strftime('%Y%m%d%H%M%S-') + uuid.uuid4().hex[:6]
+    members = defaultdict(list)
+    for row in plan:
+        members[row['canonical']].append(row['alias'])
+    rows = [{**row, 'merge_id': f"{run_id}:{row['canonical']}", 'run_id': run_id,
+             'members': members[row['canonical']]} for row in plan]
+    moved = merged = 0
+    with driver.session() as session:
+        session.run(f"CREATE INDEX organization_alias_name IF NOT EXISTS FOR (a:{ALIAS_LABEL}) ON (a.name)")
+        for batch in _canonical_batches(rows, batch_size):
+            aliases = [row['alias'] for row in batch]
+            types = _relationship_types(session, f"""
+                MATCH (a)-[r]-() WHERE elementId(a) IN $aliases AND type(r) <> '{STASH_TYPE}'
+                RETURN DISTINCT type(r) as type, startNode(r) = a as outgoing
+            """, {'aliases': aliases})
+            for rel_type, outgoing in types:
+                moved += session.run(f"""
+                    UNWIND $rows as row
+                    MATCH (a) WHERE elementId(a) = row.alias
+                    MATCH (c) WHERE elementId(c) = row.canonical
+                    MATCH {_pattern(rel_type, outgoing, 'a', 'other', 'r')}
+                    WHERE other <> a
+                    CREATE (a)-[s:{STASH_TYPE}]->(other)
+                    SET s = properties(r), s.merged_type = $type, s.merged_outgoing = $outgoing
+                    WITH a, c, other, r, other <> c AND NOT elementId(other) IN row.members as moves, row
+                    FOREACH (_ IN CASE WHEN moves THEN [1] ELSE [] END |
+                        MERGE {_pattern(rel_type, outgoing, 'c', 'other', 'm')}
+                        ON CREATE SET m += properties(r), m.merged_from = [], m.merge_created = true
+                        SET m.merged_from = coalesce(m.merged_from, []) + coalesce(r.merged_from, []) + row.alias)
+                    DELETE r
+                    RETURN sum(CASE WHEN moves THEN 1 ELSE 0 END) as moved
+                """, {'rows': batch, 'type': rel_type, 'outgoing': outgoing}).single()['moved']
+
+            labels = _validated(row['label'] for row in session.run("""
+                MATCH (a) WHERE elementId(a) IN $aliases UNWIND labels(a) as label RETURN DISTINCT label
+            """, {'aliases': aliases}))
+            remove = ''.join(f":`{label}`" for label in labels) or ':Organization'
+            merged += session.run(f"""
+                UNWIND $rows as row
+                MATCH (a) WHERE elementId(a) = row.alias
+                MATCH (c) WHERE elementId(c) = row.canonical
+                SET a.merged_labels = labels(a), a.merge_id = row.merge_id
+                REMOVE a{remove}
+                SET a:{ALIAS_LABEL},
+                    c.aliases = coalesce(c.aliases, []) + a.name
+                CREATE (a)-[:ALIAS_OF {{merge_id: row.merge_id, run_id: row.run_id,
+                                        score: row.score, merged_at: datetime()}}]->(c)
+                RETURN count(a) as merged
+            """, {'rows': batch}).single()['merged']
+        bump_graph_version(session, source='entity_resolution')
+    return {'run_id': run_id, 'merged': merged, 'relationships': moved}
+
+
+def undo_merges(driver, run_id: str = None, merge_id: str = None) -> Dict:
+    """
+    Split the aliases of one run (or one merge) back out of their canonical nodes
+
+    Each alias gets its original relationships back from the
+    MERGED_RELATIONSHIP snapshots, with their original properties. The
+    alias is removed from merged_from on the canonical's relationships and
+    relationships the merge created are deleted once no alias needs them.
+    Later merges involving the same canonical must be undone first.
+    """
+    from graph_metadata import bump_graph_version
+
+    with driver.session() as session:
+        rows = session.run(f"""
+            MATCH (a:{ALIAS_LABEL})-[link:ALIAS_OF]->(c)
+            WHERE link.run_id = $run_id OR link.merge_id = $merge_id
+            RETURN elementId(a) as alias, elementId(c) as canonical, a.merged_labels as labels,
+                   c:{ALIAS_LABEL} as canonical_merged
+        """, {'run_id': run_id, 'merge_id': merge_id}).data()
+        if any(row['canonical_merged'] for row in rows):
+            raise ValueError("A canonical node from this merge was merged again later; undo that run first")
+        aliases = [row['alias'] for row in rows]
+        canonicals = sorted({row['canonical'] for row in rows})
+
+        restored = 0
+        snapshots = session.run(f"""
+            MATCH (a)-[s:{STASH_TYPE}]->() WHERE elementId(a) IN $aliases
+            RETURN DISTINCT s.merged_type as type, s.merged_outgoing as outgoing
+        """, {'aliases': aliases}).data()
+        types = _validated(row['type'] for row in snapshots)
+        for rel_type, outgoing in [(row['type'], row['outgoing']) for row in snapshots if row['type'] in types]:
+            restored += session.run(f"""
+                MATCH (a)-[s:{STASH_TYPE} {{merged_type: $type, merged_outgoing: $outgoing}}]->(other)
+                WHERE elementId(a) IN $aliases
+                CREATE {_pattern(rel_type, outgoing, 'a', 'other', 'r')}
+                SET r = properties(s)
+                REMOVE r.merged_type, r.merged_outgoing
+                DELETE s
+                RETURN count(r) as restored
+            """, {'aliases': aliases, 'type': rel_type, 'outgoing': outgoing}).single()['restored']
+
+        session.run("""
+            MATCH (c)-[m]-() WHERE elementId(c) IN $canonicals
+              AND any(alias IN coalesce(m.merged_from, []) WHERE alias IN $aliases)
+            SET m.merged_from = [x IN m.merged_from WHERE NOT x IN $aliases]
+            WITH DISTINCT m WHERE size(m.merged_from) = 0
+            FOREACH (_ IN CASE WHEN m.merge_created THEN [] ELSE [1] END | REMOVE m.merged_from)
+            WITH m WHERE m.merge_created
+            DELETE m
+        """, {'canonicals': canonicals, 'aliases': aliases})
+
+        # Restore each alias's original labels, grouped by label set
+        by_labels = defaultdict(list)
+        for row in rows:
+            by_labels[tuple(_validated(row['labels'] or ['Organization']))].append(row)
+        for labels, group in by_labels.items():
+            session.run(f"""
+                UNWIND $rows as row
+                MATCH (a)-[link:ALIAS_OF]->(c)
+                WHERE elementId(a) = row.alias AND elementId(c) = row.canonical
+                DELETE link
+                REMOVE a:{ALIAS_LABEL}, a.merged_labels, a.merge_id
+                SET a{''.join(f":`{label}`" for label in labels)},
+                    c.aliases = [name IN coalesce(c.aliases, []) WHERE name <> a.name]
+            """, {'rows': group})
+        bump_graph_version(session, source='entity_resolution')
+    return {'split': len(rows), 'relationships': restored}
+
+
+def resolve_graph_organizations(driver, threshold: float = MATCH_THRESHOLD, apply: bool = False) -> Dict:
+    """
+    Resolve every Organization node; merge the duplicates found only if apply
+
+    Without apply the plan is returned for review (merged is 0), so
+    ingestion never merges organizations nobody has looked at.
+    """
+    result = resolve(fetch_organizations(driver), threshold)
+    plan = merge_plan(result['records'])
+    merged = merge_organizations(driver, plan) if plan and apply else {'run_id': None, 'merged': 0,
+                                                                          'relationships': 0}
+    return {**merged, 'records': len(result['records']), 'pairs': result['pairs'], 'plan': plan}
+
+
+# Resolve organizations from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Deduplicate organizations across sources")
+    parser.add_argument("--records", nargs="+", help="Organization CSVs to resolve offline (default: the graph)")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD)
+    parser.add_argument("--output", help="Write the record -> canonical crosswalk CSV")
+    parser.add_argument("--write", action="store_true", help="Merge duplicate Organization nodes in Neo4j")
+    parser.add_argument("--undo", metavar="RUN_ID", help="Split the merges of a previous run back out")
+    parser.add_argument("--benchmark", type=int, metavar="ENTITIES",
+                        help="Resolve noisy synthetic records for this many organizations")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Organization Entity Resolution")
+    print("=" * 60)
+    print()
+
+    try:
+        driver = None
+        if args.undo:
+            from neo4j_connection import get_driver
+            driver = get_driver()
+            undone = undo_merges(driver, run_id=args.undo)
+            print(f"✓ Split {undone['split']} aliases and restored {undone['relationships']} relationships")
+        else:
+            if args.benchmark:
+                records = synthetic_records(args.benchmark)
+            elif args.records:
+                records = read_records(args.records)
+            else:
+                from neo4j_connection import get_driver
+                driver = get_driver()
+                records = fetch_organizations(driver)
+
+            result = resolve(records, args.threshold)
+            resolved = result['records']
+            n = len(resolved)
+            clusters = resolved['cluster'].nunique()
+            print(f"✓ {n:,} records -> {clusters:,} organizations in {result['seconds']:.2f}s")
+            print(f"  {result['pairs']:,} candidate pairs ({result['pairs'] / max(n * (n - 1) / 2, 1):.4%} "
+                  f"of all pairs), {result['matches']:,} matched")
+
+            if 'entity' in resolved:
+                truth = resolved.groupby('entity')['cluster'].nunique()
+                purity = resolved.groupby('cluster')['entity'].nunique()
+                print(f"  Entities split across clusters: {(truth > 1).mean():.2%}; "
+                      f"clusters mixing entities: {(purity > 1).mean():.2%}")
+
+            plan = merge_plan(resolved)
+            for row in plan[:10]:
+                print(f"  {row['alias_name']!r} -> {row['canonical_name']!r} ({row['score']:.2f})")
+
+            if args.output:
+                resolved.assign(canonical_name=resolved['name'].to_numpy()[resolved['canonical_row']]) \
+                    .drop(columns=['canonical_row']).to_csv(args.output, index=False)
+                print(f"✓ Wrote {args.output}")
+
+            if args.write and driver is not None:
+                merged = merge_organizations(driver, plan)
+                print(f"✓ Merged {merged['merged']} aliases, moved {merged['relationships']} relationships "
+                      f"(undo with --undo {merged['run_id']})")
+
+    except Exception as e:
+        print(f"❌ Entity resolution failed: {e}")
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Last-Mile Fiber Route Cost Engine
+Builds a weighted road graph from local road files, runs one multi-source
+Dijkstra from every existing fiber vertex over a CSR adjacency matrix, and
+estimates each household's distance and construction cost to reach fiber
+along roads. Results are written back to Household and GeographicRegion nodes
+"""
+
+from typing import Dict, Iterator, List, Sequence, Tuple
+import json
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from spatial_index import GridIndex, haversine_m
+
+# Construction cost assumptions (USD); along-road build is a blended aerial/underground rate
+COST_MODEL = {
+    'per_meter_along_road': 40.0,
+    'drop_per_meter': 8.0,
+    'drop_fixed': 650.0
+}
+
+# Relative build cost by road class (OSM highway tag or TIGER MTFCC); unlisted classes cost 1.0
+ROAD_CLASS_COST = {
+    'motorway': 2.5, 'trunk': 1.8, 'primary': 1.4, 'secondary': 1.2,
+    'tertiary': 1.0, 'residential': 0.9, 'unclassified': 1.0, 'service': 1.1, 'track': 1.3,
+    'S1100': 2.5, 'S1200': 1.4, 'S1400': 0.9, 'S1500': 1.3, 'S1640': 1.1
+}
+
+# Vertices closer than this to fiber geometry are treated as lit
+FIBER_SNAP_M = 30.0
+
+# Coordinate rounding that merges shared endpoints (1e-6 degrees is ~0.1 m)
+SNAP_DECIMALS = 6
+
+
+def iter_road_lines(path: str) -> Iterator[Tuple[List, str]]:
+    """
+    (vertices as [lat, lon], road class) per line in a road file
+
+    Reads GeoJSON FeatureCollections or GeoJSON sequences (one feature per
+    line, streamed) with LineString or MultiLineString geometry in lon/lat
+    order, or the folium roads map via ingest_infrastructure.
+    """
+    if path.endswith('.html'):
+        from ingest_infrastructure import parse_roads_map
+        for road in parse_roads_map(path)['roads']:
+            yield road['path'], None
+        return
+
+    def lines_of(feature):
+        geometry = feature.get('geometry') or {}
+        props = feature.get('properties') or {}
+        road_class = props.get('highway') or props.get('MTFCC') or props.get('class')
+        parts = ([geometry['coordinates']] if geometry.get('type') == 'LineString' else
+                 geometry.get('coordinates', []) if geometry.get('type') == 'MultiLineString' else [])
+        for part in parts:
+            yield [[lat, lon] for lon, lat, *_ in part], road_class
+
+    with open(path) as f:
+        first = f.read(1)
+        f.seek(0)
+        if first in ('\x1e', '{') and not path.endswith(('.geojsonl', '.geojsons', '.jsonl')):
+            collection = json.load(f)
+            features = collection.get('features', [collection])
+        else:
+            features = (json.loads(line.strip('\x1e')) for line in f if line.strip())
+        for feature in features:
+            yield from lines_of(feature)
+
+
+class RoadNetwork:
+    """
+    Undirected road graph with vertices at line vertices and shared endpoints
+
+    Edges are stored once per direction in a CSR matrix weighted by build
+    cost; parallel edges keep their cheapest cost.
+    """
+
+    def __init__(self, lines: Sequence[Tuple[List, str]], cost_model: Dict = None,
+                 class_cost: Dict[str, float] = None, snap_decimals: int = SNAP_DECIMALS):
+        """
+        Args:
+            lines: (vertices as [lat, lon], road class or None) per road line
+            cost_model: Overrides for COST_MODEL
+            class_cost: Overrides for ROAD_CLASS_COST
+            snap_decimals: Coordinate rounding used to merge shared vertices
+        """
+        self.cost_model = {**COST_MODEL, **(cost_model or {})}
+        class_cost = {**ROAD_CLASS_COST, **(class_cost or {})}
+
+        coords, multipliers = [], []
+        for vertices, road_class in lines:
+            if len(vertices) < 2:
+                continue
+            coords.append(np.asarray(vertices, dtype=np.float64))
+            multipliers.append(class_cost.get(road_class, 1.0))
+        if not coords:
+            raise ValueError("No road lines to build a network from")
+        points = np.vstack(coords)
+        counts = np.array([len(c) for c in coords])
+
+        # Merge vertices that share rounded coordinates (intersections, split lines)
+        scale = 10 ** snap_decimals
+        lat_q = np.round(points[:, 0] * scale).astype(np.int64) + 90 * scale
+        lon_q = np.round(points[:, 1] * scale).astype(np.int64) + 180 * scale
+        keys, vertex_of = np.unique(lat_q * (361 * scale) + lon_q, return_inverse=True)
+        self.lat = (keys // (361 * scale) - 90 * scale) / scale
+        self.lon = (keys % (361 * scale) - 180 * scale) / scale
+
+        # Consecutive vertices within a line form edges
+        line_end = np.cumsum(counts) - 1
+        is_edge = np.ones(len(points) - 1, dtype=bool)
+        is_edge[line_end[:-1]] = False
+        u, v = vertex_of[:-1][is_edge], vertex_of[1:][is_edge]
+        multiplier = np.repeat(np.asarray(multipliers), counts - 1)
+        keep = u != v
+        u, v, multiplier = u[keep], v[keep], multiplier[keep]
+        length = haversine_m(self.lat[u], self.lon[u], self.lat[v], self.lon[v])
+        cost = np.maximum(length, 1e-3) * multiplier * self.cost_model['per_meter_along_road']
+
+        # One entry per undirected edge, cheapest first
+        a, b = np.minimum(u, v), np.maximum(u, v)
+        order = np.lexsort((cost, b, a))
+        a, b, cost, length = a[order], b[order], cost[order], length[order]
+        first = np.ones(len(a), dtype=bool)
+        first[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+        self.edge_u, self.edge_v = a[first], b[first]
+        self.edge_cost, self.edge_length = cost[first], length[first]
+
+        n = len(self.lat)
+        rows = np.concatenate([self.edge_u, self.edge_v])
+        cols = np.concatenate([self.edge_v, self.edge_u])
+        self.cost_graph = csr_matrix((np.concatenate([self.edge_cost] * 2), (rows, cols)), shape=(n, n))
+        self.length_graph = csr_matrix((np.concatenate([self.edge_length] * 2), (rows, cols)), shape=(n, n))
+        self._edge_index = None
+
+    @classmethod
+    def from_files(cls, paths: Sequence[str], **kwargs) -> 'RoadNetwork':
+        lines = [line for path in paths for line in iter_road_lines(path)]
+        return cls(lines, **kwargs)
+
+    @property
+    def vertices(self) -> int:
+        return len(self.lat)
+
+    @property
+    def edges(self) -> int:
+        return len(self.edge_u)
+
+    def edge_index(self) -> GridIndex:
+        """Spatial index over road edges (ids are edge positions)"""
+        if self._edge_index is None:
+            self._edge_index = GridIndex(self.lat[self.edge_u], self.lon[self.edge_u],
+                                         self.lat[self.edge_v], self.lon[self.edge_v])
+        return self._edge_index
+
+    def fiber_vertices(self, fiber_lines: Sequence[List], snap_m: float = FIBER_SNAP_M) -> np.ndarray:
+        """Road vertices within snap_m of any fiber line (fiber is assumed to follow roads)"""
+        fiber = GridIndex.from_lines(fiber_lines)
+        ids, _ = fiber.nearest(self.lat, self.lon, max_distance_m=snap_m)
+        return np.flatnonzero(ids != None)  # noqa: E711 (elementwise on an object array)
+
+    def distance_to_fiber(self, sources: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Cheapest build cost and its road length from every vertex to the nearest fiber vertex
+
+        One Dijkstra pass from all sources together (min_only), then the
+        road meters of each cheapest path are accumulated up the
+        predecessor tree by pointer doubling.
+        """
+        if len(sources) == 0:
+            raise ValueError("No fiber vertices on the road network")
+        cost, predecessors, source = dijkstra(self.cost_graph, directed=False, indices=sources,
+                                              min_only=True, return_predecessors=True)
+
+        n = self.vertices
+        parent = np.where(predecessors >= 0, predecessors, np.arange(n))
+        child = np.flatnonzero(predecessors >= 0)
+        step = np.zeros(n)
+        step[child] = np.asarray(self.length_graph[parent[child], child]).ravel()
+        meters = self._path_meters(step, parent)
+        meters[~np.isfinite(cost)] = np.inf
+        return {'cost': cost, 'meters': meters, 'source': source}
+
+    @staticmethod
+    def _path_meters(step: np.ndarray, parent: np.ndarray) -> np.ndarray:
+        """
+        Sum of step lengths from each vertex up to its tree root
+
+        Pointer doubling: after k rounds every vertex has accumulated 2^k
+        steps, so depth-d trees take log2(d) vectorized rounds. Roots are
+        their own parent with a zero step.
+        """
+        total, up = step.copy(), parent.copy()
+        while np.any(up[up] != up):
+            total, up = total + total[up], up[up]
+        return total
+
+    def household_costs(self, latitudes, longitudes, fiber: Dict[str, np.ndarray],
+                        max_drop_m: float = None) -> Dict[str, np.ndarray]:
+        """
+        Snap households to their nearest road edge and price the connection
+
+        A household reaches fiber through the cheaper end of its edge; the
+        drop from the household to the road is priced separately.
+
+        Returns:
+            Arrays of drop_m, road_m (along roads to fiber), distance_m and cost
+        """
+        index = self.edge_index()
+        edge, drop = index.nearest(latitudes, longitudes, max_distance_m=max_drop_m)
+        snapped = edge != None  # noqa: E711
+        e = edge[snapped].astype(np.int64)
+
+        # Position along the snapped edge (0 at u, 1 at v)
+        qx, qy = index.project(np.asarray(latitudes)[snapped], np.asarray(longitudes)[snapped])
+        dx, dy = index.bx[e] - index.ax[e], index.by[e] - index.ay[e]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.clip(((qx - index.ax[e]) * dx + (qy - index.ay[e]) * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+        t = np.nan_to_num(t)
+        u, v = self.edge_u[e], self.edge_v[e]
+        via_u_cost = fiber['cost'][u] + t * self.edge_cost[e]
+        via_v_cost = fiber['cost'][v] + (1 - t) * self.edge_cost[e]
+        via_u_m = fiber['meters'][u] + t * self.edge_length[e]
+        via_v_m = fiber['meters'][v] + (1 - t) * self.edge_length[e]
+        use_u = via_u_cost <= via_v_cost
+
+        n = len(snapped)
+        road_m, road_cost = np.full(n, np.inf), np.full(n, np.inf)
+        road_m[snapped] = np.where(use_u, via_u_m, via_v_m)
+        road_cost[snapped] = np.where(use_u, via_u_cost, via_v_cost)
+        drop_m = np.where(snapped, drop, np.inf)
+        cost = road_cost + self.cost_model['drop_fixed'] + drop_m * self.cost_model['drop_per_meter']
+        return {'drop_m': drop_m, 'road_m': road_m, 'distance_m': drop_m + road_m, 'cost': cost}
+
+
+def write_household_costs(driver, household_ids: Sequence[str], costs: Dict[str, np.ndarray],
+                          batch_size: int = 5000) -> int:
+    """Set fiber distance and cost on Household nodes, then roll them up to regions"""
+    rows = [{'id': str(hid), 'drop_m': round(float(d), 1), 'road_m': round(float(r), 1),
+             'cost': round(float(c), 2)}
+            for hid, d, r, c in zip(household_ids, costs['drop_m'], costs['road_m'], costs['cost'])
+            if np.isfinite(c)]
+    with driver.session() as session:
+        for start in range(0, len(rows), batch_size):
+            session.run("""
+                UNWIND $rows as row
+                MATCH (h:Household {id: row.id})
+                SET h.fiber_drop_m = row.drop_m,
+                    h.fiber_road_m = row.road_m,
+                    h.fiber_distance_m = row.drop_m + row.road_m,
+                    h.fiber_route_cost = row.cost
+            """, {'rows': rows[start:start + batch_size]})
+        session.run("""
+            MATCH (h:Household)-[:LOCATED_IN]->(r:GeographicRegion)
+            WHERE h.fiber_route_cost IS NOT NULL
+            WITH r, count(h) as households,
+                 percentileCont(h.fiber_route_cost, 0.5) as median_cost,
+                 sum(h.fiber_route_cost) as total_cost,
+                 percentileCont(h.fiber_distance_m, 0.5) as median_distance
+            SET r.fiber_cost_households = households,
+                r.median_fiber_route_cost = median_cost,
+                r.total_fiber_route_cost = total_cost,
+                r.median_fiber_distance_m = median_distance
+        """)
+    return len(rows)
+
+
+def fetch_households(driver) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Household ids and coordinates from the graph"""
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (h:Household) WHERE h.location IS NOT NULL
+            RETURN h.id as id, h.location.latitude as lat, h.location.longitude as lon
+        """)
+        rows = [(record['id'], record['lat'], record['lon']) for record in result]
+    ids = [row[0] for row in rows]
+    return ids, np.array([row[1] for row in rows], dtype=np.float64), np.array([row[2] for row in rows], dtype=np.float64)
+
+
+def lattice_lines(rows: int, cols: int, spacing_deg: float = 0.002, seed: int = 7) -> List[Tuple[List, str]]:
+    """Jittered street grid for benchmarking (rows * cols vertices, about 2 * rows * cols edges)"""
+    rng = np.random.default_rng(seed)
+    lat = 42.0 + np.arange(rows)[:, None] * spacing_deg + rng.normal(0, spacing_deg / 10, (rows, cols))
+    lon = -85.5 + np.arange(cols)[None, :] * spacing_deg + rng.normal(0, spacing_deg / 10, (rows, cols))
+    grid = np.stack([lat, lon], axis=-1)
+    return ([(grid[i].tolist(), 'residential') for i in range(rows)] +
+            [(grid[:, j].tolist(), 'tertiary') for j in range(cols)])
+
+
+# Estimate fiber route costs from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estimate household cost to reach fiber along roads")
+    parser.add_argument("--roads", nargs="+", default=["../infrastructure_roads_map.html"],
+                        help="Road files (GeoJSON, GeoJSON sequence or the folium roads map)")
+    parser.add_argument("--fiber", help="Fiber GeoJSON (default: FiberOpticCable geometry from the roads map)")
+    parser.add_argument("--households", help="Households CSV (default: Household nodes in Neo4j)")
+    parser.add_argument("--write", action="store_true", help="Write results to Household and region nodes")
+    parser.add_argument("--benchmark-grid", type=int, metavar="N",
+                        help="Benchmark on an N x N synthetic street grid instead of --roads")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Fiber Route Cost Engine")
+    print("=" * 60)
+    print()
+
+    try:
+        start = time.perf_counter()
+        if args.benchmark_grid:
+            lines = lattice_lines(args.benchmark_grid, args.benchmark_grid)
+            network = RoadNetwork(lines)
+            rng = np.random.default_rng(1)
+            fiber_lines = [lines[i][0] for i in rng.choice(len(lines), size=max(1, len(lines) // 50), replace=False)]
+        else:
+            network = RoadNetwork.from_files(args.roads)
+            if args.fiber:
+                fiber_lines = [vertices for vertices, _ in iter_road_lines(args.fiber)]
+            else:
+                from ingest_infrastructure import parse_roads_map
+                fiber_lines = [road['path'] for road in parse_roads_map(args.roads[0])['roads']
+                               if 'fiber' in road['infrastructure_types']]
+        print(f"✓ Road graph: {network.vertices:,} vertices, {network.edges:,} edges "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        start = time.perf_counter()
+        sources = network.fiber_vertices(fiber_lines)
+        fiber = network.distance_to_fiber(sources)
+        reachable = np.isfinite(fiber['cost'])
+        print(f"✓ Multi-source Dijkstra from {len(sources):,} fiber vertices "
+              f"({time.perf_counter() - start:.1f}s); {reachable.mean():.1%} of vertices connected")
+
+        driver = None
+        if args.households:
+            from ingest_infrastructure import read_households
+            households = read_households(args.households)
+            ids = [h['id'] for h in households]
+            lat = np.array([h['latitude'] for h in households])
+            lon = np.array([h['longitude'] for h in households])
+        elif args.benchmark_grid:
+            rng = np.random.default_rng(2)
+            ids = [f"h{i}" for i in range(network.vertices)]
+            lat = rng.uniform(network.lat.min(), network.lat.max(), len(ids))
+            lon = rng.uniform(network.lon.min(), network.lon.max(), len(ids))
+        else:
+            from neo4j_connection import get_driver
+            driver = get_driver()
+            ids, lat, lon = fetch_households(driver)
+
+        if ids:
+            start = time.perf_counter()
+            costs = network.household_costs(lat, lon, fiber)
+            priced = np.isfinite(costs['cost'])
+            print(f"✓ Priced {priced.sum():,} of {len(ids):,} households ({time.perf_counter() - start:.1f}s)")
+            if priced.any():
+                print(f"  Median distance to fiber: {np.median(costs['distance_m'][priced]):,.0f} m")
+                print(f"  Median connection cost:   ${np.median(costs['cost'][priced]):,.0f}")
+            if args.write:
+                if driver is None:
+                    from neo4j_connection import get_driver
+                    driver = get_driver()
+                written = write_household_costs(driver, ids, costs)
+                from graph_metadata import bump_graph_version
+                with driver.session() as session:
+                    bump_graph_version(session, source='fiber_routing')
+                print(f"✓ Wrote fiber route costs to {written:,} households")
+        else:
+            print("No households to price (ingest households or pass --households)")
+
+    except Exception as e:
+        print(f"❌ Fiber routing failed: {e}")
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Pre-Simplified Geometry Cache for the Geographic Dashboard
+Downloads Michigan county (or tract) boundaries once, simplifies them with
+Douglas-Peucker at several zoom tolerances and writes compact GeoJSON under
+data/geo, so the choropleth never touches full-resolution shapes
+"""
+
+from typing import Dict, List
+import hashlib
+import json
+import math
+import os
+import urllib.request
+
+import numpy as np
+
+MICHIGAN_STATE_FIPS = '26'
+
+# Public county boundaries (Census cartographic boundary file as GeoJSON, id = county FIPS)
+COUNTY_SOURCE_URL = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
+
+# Simplification tolerance in degrees per zoom level (~1 km, ~300 m, ~80 m)
+ZOOM_TOLERANCES = {
+    'state': 0.01,
+    'region': 0.003,
+    'detail': 0.0008
+}
+
+DEFAULT_CACHE_DIR = "data/geo"
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplify a polyline, keeping vertices farther than tolerance from the chord
+
+    Iterative (no recursion limit on long coastlines) with vectorized
+    distances per segment. Closed rings work because a zero-length chord
+    falls back to distance from its endpoint.
+    """
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        dx, dy = b - a
+        length = math.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(inner[:, 0] - a[0], inner[:, 1] - a[1])
+        else:
+            distances = np.abs(dx * (inner[:, 1] - a[1]) - dy * (inner[:, 0] - a[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return points[keep]
+
+
+def _decimals_for(tolerance: float) -> int:
+    """Coordinate precision an order of magnitude finer than the tolerance"""
+    return max(3, math.ceil(-math.log10(tolerance)) + 1)
+
+
+def simplify_polygon(rings: List, tolerance: float, decimals: int) -> List:
+    """Simplify one polygon; holes that collapse are dropped, the shell never is"""
+    simplified = []
+    for i, ring in enumerate(rings):
+        points = np.asarray(ring, dtype=np.float64)
+        reduced = douglas_peucker(points, tolerance)
+        if len(reduced) < 4:
+            if i > 0:
+                continue
+            reduced = points
+        simplified.append(np.round(reduced, decimals).tolist())
+    return simplified
+
+
+def simplify_geometry(geometry: Dict, tolerance: float) -> Dict:
+    """Simplify a Polygon or MultiPolygon geometry"""
+    decimals = _decimals_for(tolerance)
+    if geometry['type'] == 'Polygon':
+        return {'type': 'Polygon', 'coordinates': simplify_polygon(geometry['coordinates'], tolerance, decimals)}
+    if geometry['type'] == 'MultiPolygon':
+        return {'type': 'MultiPolygon',
+                'coordinates': [simplify_polygon(polygon, tolerance, decimals)
+                                for polygon in geometry['coordinates']]}
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def count_vertices(geometry: Dict) -> int:
+    polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+    return sum(len(ring) for polygon in polygons for ring in polygon)
+
+
+def _load_source(source: str) -> bytes:
+    if source.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(source, timeout=60) as response:
+            return response.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _feature_keys(feature: Dict, level: str) -> Dict:
+    """
+    Join keys for a feature: fips plus the name used by GeographicRegion
+
+    Accepts both the plotly/Census 20m layout (STATE, COUNTY, NAME, LSAD)
+    and TIGER cartographic files (STATEFP, GEOID, NAMELSAD).
+    """
+    props = feature.get('properties', {})
+    fips = str(props.get('GEOID') or feature.get('id') or
+               f"{props.get('STATE', '')}{props.get('COUNTY', '')}")
+    if level == 'county':
+        name = props.get('NAMELSAD') or f"{props.get('NAME', '')} {props.get('LSAD') or 'County'}"
+    else:
+        name = props.get('NAMELSAD') or props.get('NAME') or fips
+    return {'fips': fips, 'name': name.strip()}
+
+
+def cache_path(level: str, zoom: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    return os.path.join(cache_dir, f"{level}_{zoom}.geojson")
+
+
+def build_geometry_cache(source: str = COUNTY_SOURCE_URL, level: str = 'county',
+                         state_fips: str = MICHIGAN_STATE_FIPS, cache_dir: str = DEFAULT_CACHE_DIR,
+                         tolerances: Dict[str, float] = None) -> Dict:
+    """
+    Simplify source boundaries for one state at every zoom tolerance
+
+    Args:
+        source: GeoJSON URL or path (county or tract FeatureCollection)
+        level: 'county' or 'tract'; names the output files
+        state_fips: Two-digit state FIPS used to filter features
+        cache_dir: Output directory
+        tolerances: Zoom name -> tolerance in degrees
+
+    Returns:
+        Manifest with feature and vertex counts and file sizes per zoom
+    """
+    tolerances = tolerances or ZOOM_TOLERANCES
+    raw = _load_source(source)
+    collection = json.loads(raw)
+
+    features = []
+    for feature in collection['features']:
+        props = feature.get('properties', {})
+        state = str(props.get('STATEFP') or props.get('STATE') or str(feature.get('id', ''))[:2])
+        if state == state_fips and feature.get('geometry'):
+            features.append((_feature_keys(feature, level), feature['geometry']))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = {
+        'source': source,
+        'source_sha1': hashlib.sha1(raw).hexdigest(),
+        'level': level,
+        'features': len(features),
+        'original_vertices': sum(count_vertices(geometry) for _, geometry in features),
+        'zooms': {}
+    }
+
+    for zoom, tolerance in tolerances.items():
+        out = []
+        vertices = 0
+        for keys, geometry in features:
+            simplified = simplify_geometry(geometry, tolerance)
+            vertices += count_vertices(simplified)
+            out.append({'type': 'Feature', 'id': keys['fips'], 'properties': keys, 'geometry': simplified})
+
+        path = cache_path(level, zoom, cache_dir)
+        with open(path + ".tmp", 'w') as f:
+            json.dump({'type': 'FeatureCollection', 'features': out}, f, separators=(',', ':'))
+        os.replace(path + ".tmp", path)
+        manifest['zooms'][zoom] = {'tolerance': tolerance, 'vertices': vertices,
+                                   'bytes': os.path.getsize(path)}
+
+    with open(os.path.join(cache_dir, f"{level}_manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_geometries(level: str = 'county', zoom: str = 'state', cache_dir: str = DEFAULT_CACHE_DIR) -> Dict:
+    """
+    Load a cached FeatureCollection
+
+    Raises:
+        FileNotFoundError: if build_geometry_cache has not been run for this level
+    """
+    with open(cache_path(level, zoom, cache_dir)) as f:
+        return json.load(f)
+
+
+def available_levels(cache_dir: str = DEFAULT_CACHE_DIR) -> List[str]:
+    """Levels with a cached state-zoom file"""
+    return [level for level in ('county', 'tract') if os.path.exists(cache_path(level, 'state', cache_dir))]
+
+
+# Build the cache from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build simplified boundary files for the map page")
+    parser.add_argument("--source", default=COUNTY_SOURCE_URL, help="GeoJSON URL or path")
+    parser.add_argument("--level", default="county", choices=["county", "tract"])
+    parser.add_argument("--state-fips", default=MICHIGAN_STATE_FIPS)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Building Geometry Cache")
+    print("=" * 60)
+    print()
+
+    try:
+        manifest = build_geometry_cache(args.source, args.level, args.state_fips, args.cache_dir)
+        print(f"✓ {manifest['features']} {args.level} features, "
+              f"{manifest['original_vertices']:,} source vertices")
+        for zoom, stats in manifest['zooms'].items():
+            print(f"  {zoom:8s} tolerance {stats['tolerance']:<7} "
+                  f"{stats['vertices']:>8,} vertices  {stats['bytes'] / 1024:8.1f} KB")
+    except Exception as e:
+        print(f"❌ Geometry cache build failed: {e}")
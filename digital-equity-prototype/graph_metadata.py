@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Graph Version Stamp for the Digital Equity Knowledge Graph
+Ingestion bumps a stamp on a single GraphMeta node after every write pass;
+the dashboard keys its caches on that stamp instead of a blind TTL
+"""
+
+from typing import Optional
+
+GRAPH_META_ID = 'singleton'
+
+
+def bump_graph_version(session, source: str = None) -> str:
+    """
+    Mark the graph as changed; call once at the end of an ingestion run
+
+    A random stamp (not a counter) keeps caches correct even after the
+    graph is wiped and rebuilt from scratch.
+    """
+    record = session.run("""
+        MERGE (m:GraphMeta {id: $id})
+        SET m.version = randomUUID(),
+            m.updated_at = datetime(),
+            m.updated_by = $source
+        RETURN m.version as version
+    """, {'id': GRAPH_META_ID, 'source': source}).single()
+    return record["version"]
+
+
+def get_graph_version(session) -> Optional[str]:
+    """Current stamp, or None if nothing has been ingested yet"""
+    record = session.run("""
+        OPTIONAL MATCH (m:GraphMeta {id: $id})
+        RETURN m.version as version
+    """, {'id': GRAPH_META_ID}).single()
+    return record["version"] if record else None
@@ -4,19 +4,29 @@ GraphRAG Engine for Digital Equity Intelligence System
 Uses LangChain to enable natural language queries over the knowledge graph
 """
 
-from langchain.chains import GraphCypherQAChain
-from langchain.chat_models import ChatOpenAI
-from langchain.graphs import Neo4jGraph
+from context_assembly import ContextAssembler
+from cypher_guard import CypherGuard, CypherRejected
+from llm_providers import LLMProvider, get_provider
+from neo4j_connection import ConnectionConfig, PooledGraph, get_driver
+from vector_index import HybridRetriever, VectorIndex, manifest_signature
+from collections import OrderedDict
+from neo4j.exceptions import CypherSyntaxError
 from typing import Dict, List
 import os
+import threading
+import time
 
 class GraphRAGEngine:
     """
     Natural language query interface for the Digital Equity Knowledge Graph
-    Uses GraphRAG (Graph-augmented Retrieval) with LangChain
+    Uses GraphRAG (Graph-augmented Retrieval) with a pluggable LLM provider
     """
     
-    def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str, openai_api_key: str = None):
+    def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str, openai_api_key: str = None,
+                 token_budget: int = 1500, row_limit: int = 200, vector_index_dir: str = None,
+                 llm_provider: LLMProvider = None, graph=None, cypher_cache_size: int = 256,
+                 max_estimated_rows: float = 100000, query_timeout: float = 10.0, max_regenerations: int = 1,
+                 connection_config: ConnectionConfig = None):
         """
         Initialize the GraphRAG engine
         
@@ -25,53 +35,197 @@ class GraphRAGEngine:
             neo4j_user: Neo4j username
             neo4j_password: Neo4j password
             openai_api_key: Optional OpenAI API key (will use env var if not provided)
+            token_budget: Maximum estimated tokens of query results passed to the LLM
+            row_limit: LIMIT pushed into every generated Cypher query
+            vector_index_dir: Optional local vector index for hybrid vector + graph retrieval
+            llm_provider: LLM provider; defaults to OpenAI with a key, else the offline stub
+            graph: Optional object with query(cypher, params) and get_schema, replacing the pooled graph;
+                its driver attribute, if any, runs generated queries through the guard
+            cypher_cache_size: Number of generated Cypher queries cached by question
+            max_estimated_rows: Reject generated queries whose plan estimates more rows
+            query_timeout: Server-side timeout in seconds for generated queries
+            max_regenerations: Times a rejected query is regenerated before giving up
+            connection_config: Pool settings; overrides the URI and credentials arguments
         """
-        # Initialize Neo4j graph
-        self.graph = Neo4jGraph(
-            url=neo4j_uri,
-            username=neo4j_user,
-            password=neo4j_password
-        )
+        # Reuse the process-wide connection pool unless a graph is injected
+        self.driver = None
+        if graph is None:
+            config = connection_config or ConnectionConfig(neo4j_uri, neo4j_user, neo4j_password)
+            self.driver = get_driver(config)
+            graph = PooledGraph(self.driver)
+        self.graph = graph
         
-        # Initialize LLM (use GPT-3.5 for cost-effectiveness)
-        if openai_api_key:
-            os.environ["OPENAI_API_KEY"] = openai_api_key
+        # LLM provider (GPT-3.5 for cost-effectiveness, or a local stub offline)
+        self.llm_provider = llm_provider or get_provider(api_key=openai_api_key)
         
-        self.llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo")
+        # Bounds what the generated Cypher can feed back into the prompt
+        self.context_assembler = ContextAssembler(token_budget=token_budget, row_limit=row_limit)
         
-        # Create GraphCypherQAChain
-        self.chain = GraphCypherQAChain.from_llm(
-            llm=self.llm,
-            graph=self.graph,
-            verbose=True,
-            return_intermediate_steps=True
+        # Generated Cypher runs read-only, bounded and with a timeout; an injected
+        # graph's driver (e.g. PooledGraph's) is used so benchmarks take the same path
+        self.guard = CypherGuard(
+            self.driver or getattr(graph, 'driver', None),
+            max_estimated_rows=max_estimated_rows,
+            row_limit=row_limit,
+            timeout_seconds=query_timeout
         )
+        self.max_regenerations = max_regenerations
+        
+        # Hybrid retrieval covers fuzzy questions Text-to-Cypher misses
+        self.vector_index_dir = vector_index_dir
+        self.retriever = None
+        self._index_state = None
+        self.refresh_index()
+        
+        # Question -> Cypher cache; generation does not depend on graph contents
+        self._cypher_cache = OrderedDict()
+        self._cypher_cache_size = cypher_cache_size
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'misses': 0}
+    
+    @staticmethod
+    def _cache_key(question: str) -> str:
+        return " ".join(question.lower().split())
+    
+    def generate_cypher(self, question: str) -> str:
+        """Translate a question into Cypher, reusing cached translations"""
+        key = self._cache_key(question)
+        with self._cache_lock:
+            if key in self._cypher_cache:
+                self._cypher_cache.move_to_end(key)
+                self.cache_stats['hits'] += 1
+                return self._cypher_cache[key]
+            self.cache_stats['misses'] += 1
+        
+        cypher = self.llm_provider.generate_cypher(question, self.graph.get_schema)
+        
+        with self._cache_lock:
+            self._cypher_cache[key] = cypher
+            if len(self._cypher_cache) > self._cypher_cache_size:
+                self._cypher_cache.popitem(last=False)
+        return cypher
+    
+    def _remember_cypher(self, question: str, cypher: str = None):
+        """Replace (or with None, drop) the cached Cypher for a question"""
+        key = self._cache_key(question)
+        with self._cache_lock:
+            if cypher is None:
+                self._cypher_cache.pop(key, None)
+            else:
+                self._cypher_cache[key] = cypher
+    
+    def run_cypher(self, question: str, cypher: str):
+        """
+        Execute generated Cypher through the safety gate
+        
+        A rejected or uncompilable query is regenerated with the rejection
+        reason appended to the question, up to max_regenerations times. A
+        query that could not run for capacity or time (CypherUnavailable)
+        is not regenerated and stays cached; the error goes to the caller.
+        
+        Returns:
+            (rows, executed cypher, number of regenerations)
+        """
+        for attempt in range(self.max_regenerations + 1):
+            try:
+                cypher = self.guard.check_static(cypher)
+                if self.guard.driver is not None:
+                    # EXPLAIN check and execution share one guard slot
+                    return self.guard.execute(cypher), cypher, attempt
+                return self.graph.query(cypher), cypher, attempt
+            except (CypherRejected, CypherSyntaxError) as e:
+                self._remember_cypher(question, None)
+                if attempt == self.max_regenerations:
+                    raise
+                reason = getattr(e, 'reason', None) or str(e)
+                cypher = self.llm_provider.generate_cypher(
+                    f"{question}\n\nA previous query was rejected: {reason}. "
+                    f"Write a single bounded, read-only query.",
+                    self.graph.get_schema
+                )
+                self._remember_cypher(question, cypher)
+    
+    def refresh_index(self, graph_version=None):
+        """
+        Reopen the vector index after it was rebuilt on disk
+
+        The index is reloaded when its manifest changed or a new graph
+        version is given. A fresh retriever is swapped in whole, so queries
+        already running keep the index they started with.
+        """
+        if not self.vector_index_dir or not os.path.isdir(self.vector_index_dir):
+            return
+        if graph_version is None and self._index_state is not None:
+            graph_version = self._index_state[1]
+        state = (manifest_signature(self.vector_index_dir), graph_version)
+        if self.retriever is not None and state == self._index_state:
+            return
+        self.retriever = HybridRetriever(self.graph, VectorIndex(self.vector_index_dir))
+        self._index_state = state
+    
+    def answer(self, question: str, context: List[Dict]) -> str:
+        """Synthesize an answer from the assembled context"""
+        return self.llm_provider.answer(question, context)
     
     def query(self, question: str) -> Dict:
         """
         Query the knowledge graph using natural language
         
+        Runs Cypher generation, a guarded read-only graph query (plus hybrid
+        vector + graph retrieval when an index is available), token-budgeted
+        context assembly and answer synthesis as separate timed stages.
+        
         Args:
             question: Natural language question
             
         Returns:
-            Dictionary with answer, cypher query, and context
+            Dictionary with answer, cypher query, context, context stats and stage timings
         """
+        timings = {}
+        cypher = None
         try:
-            result = self.chain(question)
+            start = time.perf_counter()
+            cypher = self.generate_cypher(question)
+            timings['cypher_generation'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            rows, regenerations = [], 0
+            if cypher:
+                rows, cypher, regenerations = self.run_cypher(question, cypher)
+            self.refresh_index()
+            retriever = self.retriever
+            if retriever:
+                rows = rows + retriever.retrieve(question)
+            timings['graph_query'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            assembled = self.context_assembler.assemble(question, rows)
+            timings['context_assembly'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            answer = self.answer(question, assembled['context'])
+            timings['answer_synthesis'] = time.perf_counter() - start
             
             return {
                 'question': question,
-                'answer': result['result'],
-                'cypher_query': result['intermediate_steps'][0]['query'] if result.get('intermediate_steps') else None,
-                'context': result['intermediate_steps'][0]['context'] if result.get('intermediate_steps') else None
+                'answer': answer,
+                'cypher_query': cypher,
+                'context': assembled['context'],
+                'context_stats': {k: v for k, v in assembled.items() if k != 'context'},
+                'timings': timings,
+                'regenerations': regenerations,
+                'error': None
             }
         except Exception as e:
             return {
                 'question': question,
                 'answer': f"Error: {str(e)}",
-                'cypher_query': None,
-                'context': None
+                'cypher_query': cypher,
+                'context': None,
+                'context_stats': None,
+                'timings': timings,
+                'regenerations': None,
+                'error': str(e)
             }
     
     def get_sample_questions(self) -> List[str]:
@@ -135,11 +289,17 @@ class GraphRAGEngine:
         - Counties in Michigan
         - Urban/Rural classifications
         
+        **Research:**
+        - Research Documents split into Research Chunks (full-text indexed)
+        - Authors and Publications
+        
         **Relationships:**
         - Organizations PROVIDE_SERVICE to Services
         - Organizations SERVE_POPULATION to Populations
         - Organizations LOCATED_IN Geographic Regions
         - Infrastructure ENABLES Services
+        - Research Chunks MENTION Organizations, Services and Populations
+        - Research Documents SUPPORT_NAVIGATOR Programs
         """
 
 # Example usage
@@ -151,12 +311,11 @@ if __name__ == "__main__":
     print("=" * 60)
     print()
     
-    # Check for OpenAI API key
+    # Without an OpenAI key the offline rule-based provider is used
     if not os.getenv("OPENAI_API_KEY"):
-        print("⚠️  Warning: OPENAI_API_KEY not set")
+        print("⚠️  OPENAI_API_KEY not set - using the offline rule-based provider")
         print("   Set it in .streamlit/secrets.toml or as environment variable")
         print()
-        sys.exit(1)
     
     try:
         engine = GraphRAGEngine(
@@ -198,6 +357,12 @@ if __name__ == "__main__":
                 print("Generated Cypher:")
                 print(result['cypher_query'])
                 print()
+            
+            stats = result['context_stats']
+            if stats and stats['rows_dropped']:
+                print(f"Context: {stats['rows_included']} of {stats['rows_returned']} rows "
+                      f"({stats['tokens_used']}/{stats['token_budget']} tokens)")
+                print()
     
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Infrastructure Geometry Ingestion
+Loads road segments, fiber routes and served locations from the roads map
+(infrastructure_roads_map.html) and households from CSV into Neo4j as
+Road, FiberOpticCable, AccessPoint and Household nodes with point geometry,
+creates point indexes, links each household to its nearest access point
+and persists in-process spatial indexes under data/spatial
+"""
+
+from typing import Dict, List
+import csv
+import hashlib
+import html
+import re
+
+import numpy as np
+
+from neo4j_connection import ConnectionConfig, get_driver
+from graph_metadata import bump_graph_version
+from spatial_index import DEFAULT_INDEX_DIR, GridIndex, haversine_m, index_path
+
+DEFAULT_MAP_SOURCE = "../infrastructure_roads_map.html"
+
+# Households farther than this from any access point stay unlinked
+MAX_SERVICE_DISTANCE_M = 5000
+
+# Labels and geometry properties covered by Neo4j point indexes
+POINT_INDEXES = {
+    'AccessPoint': 'location',
+    'Household': 'location',
+    'Road': 'midpoint',
+    'FiberOpticCable': 'midpoint'
+}
+
+_FEATURE_SPLIT = re.compile(r"(?=var (?:circle_marker|poly_line)_\w+ = L\.(?:circleMarker|polyline)\()")
+_COORDS = re.compile(r"L\.(circleMarker|polyline)\(\s*(\[.*?\]),\s*\{", re.S)
+_POPUP = re.compile(r'<div id="html_\w+"[^>]*>(.*?)</div>`\)', re.S)
+
+
+def _stable_id(prefix: str, coordinates) -> str:
+    """Ids derived from geometry, so re-ingesting the same map is idempotent"""
+    digest = hashlib.sha1(np.round(np.asarray(coordinates, dtype=np.float64), 6).tobytes()).hexdigest()
+    return f"{prefix}-{digest[:12]}"
+
+
+def _parse_coordinates(literal: str):
+    """Leaflet coordinate literal ([lat, lon] or [[lat, lon], ...]) as nested lists of floats"""
+    values = [float(v) for v in re.findall(r"-?\d+(?:\.\d+)?(?:[eE]-?\d+)?", literal)]
+    if literal.strip()[1:].lstrip().startswith('['):
+        return [values[i:i + 2] for i in range(0, len(values), 2)]
+    return values[:2]
+
+
+def _text(fragment: str) -> str:
+    return html.unescape(re.sub(r"<[^>]+>", " ", fragment)).strip()
+
+
+def parse_roads_map(path: str = DEFAULT_MAP_SOURCE) -> Dict[str, List[Dict]]:
+    """
+    Extract geometry and popup attributes from the folium roads map
+
+    Returns:
+        {'roads': [{id, path, infrastructure_types, location_count, providers}],
+         'access_points': [{id, latitude, longitude, provider, technology, location_count}]}
+    """
+    with open(path, encoding='utf-8') as f:
+        document = f.read()
+
+    roads, access_points = {}, {}
+    for feature in _FEATURE_SPLIT.split(document)[1:]:
+        match = _COORDS.search(feature)
+        if not match:
+            continue
+        kind, coordinates = match.group(1), _parse_coordinates(match.group(2))
+        popup = _POPUP.search(feature)
+        popup_html = popup.group(1) if popup else ""
+
+        if kind == 'circleMarker':
+            provider = re.search(r"Provider:\s*(.*?)<br>", popup_html)
+            technology = re.search(r"Type:\s*([\w\s-]+)", popup_html)
+            point_id = _stable_id('ap', coordinates)
+            # Several served locations often share one coordinate; they are one access point
+            point = access_points.setdefault(point_id, {
+                'id': point_id,
+                'latitude': coordinates[0],
+                'longitude': coordinates[1],
+                'provider': _text(provider.group(1)) if provider else 'Unknown',
+                'technology': technology.group(1).strip().lower() if technology else 'unknown',
+                'location_count': 0
+            })
+            point['location_count'] += 1
+        elif len(coordinates) >= 2:
+            # The map draws most segments twice, once per direction; keep one canonical orientation
+            if coordinates[-1] < coordinates[0]:
+                coordinates = coordinates[::-1]
+            road_id = _stable_id('road', coordinates)
+            if road_id in roads:
+                continue
+            types = re.search(r"Infrastructure Types:</b>\s*(.*?)</p>", popup_html)
+            locations = re.search(r"Total Locations:</b>\s*(\d+)", popup_html)
+            providers = re.findall(r"<li>(.*?):\s*(\d+) locations", popup_html)
+            roads[road_id] = {
+                'id': road_id,
+                'path': coordinates,
+                'infrastructure_types': [t.strip().lower() for t in types.group(1).split(',')] if types else [],
+                'location_count': int(locations.group(1)) if locations else 0,
+                'providers': sorted({_text(name) for name, _ in providers})
+            }
+    return {'roads': list(roads.values()), 'access_points': list(access_points.values())}
+
+
+def read_households(path: str) -> List[Dict]:
+    """Households CSV with id, latitude, longitude and optional county columns"""
+    with open(path, newline='') as f:
+        return [{'id': str(row['id']), 'latitude': float(row['latitude']), 'longitude': float(row['longitude']),
+                 'county': row.get('county') or None}
+                for row in csv.DictReader(f)]
+
+
+def line_length_m(path: List) -> float:
+    vertices = np.asarray(path, dtype=np.float64)
+    return float(haversine_m(vertices[:-1, 0], vertices[:-1, 1], vertices[1:, 0], vertices[1:, 1]).sum())
+
+
+class InfrastructureIngester:
+    def __init__(self, neo4j_uri=None, neo4j_user=None, neo4j_password=None, batch_size: int = 1000,
+                 index_dir: str = DEFAULT_INDEX_DIR, connection_config: ConnectionConfig = None):
+        """
+        Args:
+            neo4j_uri, neo4j_user, neo4j_password: Connection; NEO4J_* environment variables if None
+            batch_size: Rows per UNWIND write
+            index_dir: Where the in-process spatial indexes are saved
+            connection_config: Pool settings; overrides the URI and credentials arguments
+        """
+        config = connection_config or ConnectionConfig(neo4j_uri, neo4j_user, neo4j_password)
+        self.driver = get_driver(config)
+        self.batch_size = batch_size
+        self.index_dir = index_dir
+
+    def create_indexes(self):
+        """Uniqueness constraints plus point indexes on the geometry properties"""
+        with self.driver.session() as session:
+            for label in POINT_INDEXES:
+                session.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE")
+            for label, prop in POINT_INDEXES.items():
+                name = f"{label.lower()}_{prop}"
+                try:
+                    session.run(f"CREATE POINT INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})")
+                except Exception:
+                    # Neo4j 4.x has no POINT INDEX; its default index also serves point lookups
+                    session.run(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})")
+        print("  ✓ Spatial indexes ready")
+
+    def _write_batches(self, query: str, rows: List[Dict]):
+        with self.driver.session() as session:
+            for start in range(0, len(rows), self.batch_size):
+                session.run(query, {'rows': rows[start:start + self.batch_size]})
+
+    def ingest_roads(self, roads: List[Dict]):
+        """Road segments, plus a FiberOpticCable along each road that carries fiber"""
+        print("Ingesting road and fiber geometry...")
+        rows = []
+        for road in roads:
+            middle = road['path'][len(road['path']) // 2]
+            rows.append({**road, 'midpoint': middle, 'length_m': round(line_length_m(road['path']), 1),
+                         'fiber_id': road['id'].replace('road-', 'fiber-', 1),
+                         'has_fiber': 'fiber' in road['infrastructure_types']})
+        self._write_batches("""
+            UNWIND $rows as row
+            MERGE (r:Road:Infrastructure {id: row.id})
+            SET r.path = [p IN row.path | point({latitude: p[0], longitude: p[1]})],
+                r.midpoint = point({latitude: row.midpoint[0], longitude: row.midpoint[1]}),
+                r.length_m = row.length_m,
+                r.infrastructure_types = row.infrastructure_types,
+                r.location_count = row.location_count,
+                r.providers = row.providers
+            WITH r, row WHERE row.has_fiber
+            MERGE (f:FiberOpticCable:Infrastructure {id: row.fiber_id})
+            SET f.path = r.path,
+                f.midpoint = r.midpoint,
+                f.length_m = row.length_m,
+                f.providers = row.providers
+            MERGE (r)-[:CONNECTED_TO]->(f)
+        """, rows)
+        fiber = sum(row['has_fiber'] for row in rows)
+        print(f"  ✓ Ingested {len(rows)} road segments ({fiber} with fiber)")
+
+    def ingest_access_points(self, access_points: List[Dict]):
+        print("Ingesting access points...")
+        self._write_batches("""
+            UNWIND $rows as row
+            MERGE (a:AccessPoint:Infrastructure {id: row.id})
+            SET a.location = point({latitude: row.latitude, longitude: row.longitude}),
+                a.provider = row.provider,
+                a.technology = row.technology,
+                a.location_count = row.location_count
+        """, access_points)
+        print(f"  ✓ Ingested {len(access_points)} access points")
+
+    def ingest_households(self, households: List[Dict]):
+        print("Ingesting households...")
+        self._write_batches("""
+            UNWIND $rows as row
+            MERGE (h:Household {id: row.id})
+            SET h.location = point({latitude: row.latitude, longitude: row.longitude})
+            WITH h, row WHERE row.county IS NOT NULL
+            MATCH (r:GeographicRegion {name: row.county})
+            MERGE (h)-[:LOCATED_IN]->(r)
+        """, households)
+        print(f"  ✓ Ingested {len(households)} households")
+
+    def link_nearest_access_points(self, households: List[Dict], access_index: GridIndex,
+                                   max_distance_m: float = MAX_SERVICE_DISTANCE_M):
+        """
+        (AccessPoint)-[:CONNECTED_TO {distance_m}]->(Household) for each household's nearest access point
+
+        Computed in one vectorized index pass, then written in batches.
+        """
+        print("Linking households to nearest access points...")
+        ids, distances = access_index.nearest([h['latitude'] for h in households],
+                                              [h['longitude'] for h in households], max_distance_m)
+        rows = [{'household': h['id'], 'access_point': str(ap), 'distance_m': round(float(d), 1)}
+                for h, ap, d in zip(households, ids, distances) if ap is not None]
+        self._write_batches("""
+            UNWIND $rows as row
+            MATCH (h:Household {id: row.household})
+            OPTIONAL MATCH (:AccessPoint)-[old:CONNECTED_TO]->(h)
+            DELETE old
+            WITH DISTINCT h, row
+            MATCH (a:AccessPoint {id: row.access_point})
+            MERGE (a)-[c:CONNECTED_TO]->(h)
+            SET c.distance_m = row.distance_m
+        """, rows)
+        print(f"  ✓ Linked {len(rows)} of {len(households)} households within {max_distance_m:,.0f} m")
+
+    def build_spatial_indexes(self, roads: List[Dict], access_points: List[Dict],
+                              households: List[Dict] = None) -> Dict[str, GridIndex]:
+        """Build and persist in-process indexes for the dashboard, API and analytics"""
+        indexes = {
+            'Road': GridIndex.from_lines([r['path'] for r in roads], ids=[r['id'] for r in roads]),
+            'AccessPoint': GridIndex.from_points([a['latitude'] for a in access_points],
+                                                 [a['longitude'] for a in access_points],
+                                                 ids=[a['id'] for a in access_points])
+        }
+        fiber = [r for r in roads if 'fiber' in r['infrastructure_types']]
+        if fiber:
+            indexes['FiberOpticCable'] = GridIndex.from_lines(
+                [r['path'] for r in fiber], ids=[r['id'].replace('road-', 'fiber-', 1) for r in fiber])
+        if households:
+            indexes['Household'] = GridIndex.from_points([h['latitude'] for h in households],
+                                                         [h['longitude'] for h in households],
+                                                         ids=[h['id'] for h in households])
+        for label, index in indexes.items():
+            index.save(index_path(label, self.index_dir))
+        print(f"  ✓ Saved spatial indexes for {', '.join(indexes)} to {self.index_dir}")
+        return indexes
+
+    def mark_graph_updated(self):
+        with self.driver.session() as session:
+            bump_graph_version(session, source='ingest_infrastructure')
+
+    def close(self):
+        self.driver.close()
+
+
+# Main ingestion script
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest infrastructure geometry into Neo4j")
+    parser.add_argument("--map", default=DEFAULT_MAP_SOURCE, help="Folium roads map HTML")
+    parser.add_argument("--households", help="CSV with id, latitude, longitude[, county]")
+    parser.add_argument("--max-distance", type=float, default=MAX_SERVICE_DISTANCE_M,
+                        help="Meters beyond which a household is not linked to an access point")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Infrastructure Geometry Ingestion")
+    print("=" * 60)
+    print()
+
+    # Same NEO4J_* settings (and shared pool) as the dashboard and API
+    ingester = InfrastructureIngester(connection_config=ConnectionConfig())
+
+    try:
+        features = parse_roads_map(args.map)
+        households = read_households(args.households) if args.households else []
+        print(f"✓ Parsed {len(features['roads'])} road segments and "
+              f"{len(features['access_points'])} access points from {args.map}")
+        print()
+
+        indexes = ingester.build_spatial_indexes(features['roads'], features['access_points'], households)
+        ingester.create_indexes()
+        ingester.ingest_roads(features['roads'])
+        ingester.ingest_access_points(features['access_points'])
+        if households:
+            ingester.ingest_households(households)
+            ingester.link_nearest_access_points(households, indexes['AccessPoint'], args.max_distance)
+        ingester.mark_graph_updated()
+
+        print()
+        print("✓ Infrastructure geometry ingested")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        print("\nMake sure Neo4j is running and the roads map exists (--map)")
+    finally:
+        ingester.close()
@@ -6,12 +6,68 @@ Ingests FCC broadband data, library data, digital navigator programs, and census
 
 import pandas as pd
 import requests
-from neo4j import GraphDatabase
+from neo4j_connection import ConnectionConfig, get_driver
+from analytics_views import refresh_analytics_views
+from graph_metadata import bump_graph_version
+from vector_index import sync_vector_index
+from entity_resolution import canonical_names, resolve_graph_organizations
 import json
 
+# Availability follows fiber coverage; shared with coverage_engine.py, which recomputes coverage
+AVAILABILITY_SCORE_QUERY = """
+MATCH (r:GeographicRegion)
+SET r.availability_score = 
+    CASE 
+        WHEN r.fiber_coverage >= 70 THEN 1.0
+        WHEN r.fiber_coverage >= 40 THEN 0.7
+        ELSE 0.3
+    END
+"""
+
+def calculate_factor_scores(session):
+    """Set the Bayesian factor scores on every region from its ingested attributes"""
+    # Calculate Availability score
+    session.run(AVAILABILITY_SCORE_QUERY)
+    
+    # Calculate Affordability score
+    session.run("""
+        MATCH (r:GeographicRegion)
+        SET r.affordability_score = 
+            CASE 
+                WHEN r.median_income >= 55000 THEN 1.0
+                WHEN r.median_income >= 45000 THEN 0.7
+                ELSE 0.3
+            END
+    """)
+    
+    # Calculate Aspiration score (based on education proxy)
+    session.run("""
+        MATCH (r:GeographicRegion)
+        SET r.aspiration_score = 
+            CASE 
+                WHEN r.rural_percentage < 0.3 THEN 0.8
+                WHEN r.rural_percentage < 0.6 THEN 0.6
+                ELSE 0.4
+            END
+    """)
+    
+    # Calculate Service Quality score (accessibility_engine.py scores replace the count)
+    session.run("""
+        MATCH (r:GeographicRegion)<-[:LOCATED_IN]-(o:Organization)
+        WITH r, count(o) as org_count
+        SET r.service_quality_score = 
+            CASE 
+                WHEN r.service_quality_source = 'accessibility' THEN r.service_quality_score
+                WHEN org_count >= 3 THEN 1.0
+                WHEN org_count >= 1 THEN 0.6
+                ELSE 0.2
+            END
+    """)
+
+
 class MichiganDataIngester:
     def __init__(self, neo4j_uri, neo4j_user, neo4j_password):
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        self.driver = get_driver(ConnectionConfig(neo4j_uri, neo4j_user, neo4j_password))
     
     def ingest_fcc_broadband_data(self, fcc_data_path=None):
         """Ingest FCC broadband availability data"""
@@ -32,7 +88,10 @@ class MichiganDataIngester:
                 session.run("""
                     MERGE (r:GeographicRegion {name: $county})
                     SET r.population = $population,
-                        r.fiber_coverage = $fiber,
+                        r.fiber_coverage = CASE
+                            WHEN r.fiber_coverage_source = 'computed' THEN r.fiber_coverage
+                            ELSE $fiber
+                        END,
                         r.cable_coverage = $cable,
                         r.dsl_coverage = $dsl,
                         r.median_speed_mbps = $speed,
@@ -57,30 +116,37 @@ class MichiganDataIngester:
             {
                 'name': 'Upper Peninsula District Library',
                 'county': 'Marquette County',
+                'location': (46.5436, -87.3954),
                 'services': ['Digital Navigation', 'WiFi Access', 'Device Lending', 'Digital Literacy Training'],
                 'populations': ['Seniors', 'Rural Residents', 'Low-Income Families']
             },
             {
                 'name': 'Detroit Public Library',
                 'county': 'Wayne County',
+                'location': (42.3584, -83.0665),
                 'services': ['WiFi Access', 'Computer Access', 'Digital Literacy Training', 'Job Search Assistance'],
                 'populations': ['Low-Income Families', 'Job Seekers', 'Students']
             },
             {
                 'name': 'Grand Rapids Public Library',
                 'county': 'Kent County',
+                'location': (42.9625, -85.6680),
                 'services': ['WiFi Access', 'Device Lending', 'Digital Literacy Training', 'Tech Help Desk'],
                 'populations': ['Seniors', 'Students', 'Low-Income Families']
             }
         ]
         
         with self.driver.session() as session:
+            # Names merged away by entity_resolution.py load into their canonical organization
+            canonical = canonical_names(session, [lib['name'] for lib in libraries])
             for lib in libraries:
+                lib = {**lib, 'name': canonical[lib['name']]}
                 # Create library
                 session.run("""
                     MERGE (l:Library:Organization {name: $name})
-                    SET l.type = 'Library'
-                """, {'name': lib['name']})
+                    SET l.type = 'Library',
+                        l.location = point({latitude: $latitude, longitude: $longitude})
+                """, {'name': lib['name'], 'latitude': lib['location'][0], 'longitude': lib['location'][1]})
                 
                 # Link to region
                 session.run("""
@@ -118,7 +184,8 @@ class MichiganDataIngester:
                 'type': 'Workforce Development',
                 'county': 'Multiple',
                 'services': ['Job Search Assistance', 'Digital Skills Training', 'Device Access'],
-                'populations': ['Job Seekers', 'Low-Income Families']
+                'populations': ['Job Seekers', 'Low-Income Families'],
+                'partners': ['Detroit Public Library', 'Grand Rapids Public Library']
             },
             {
                 'name': 'AARP Digital Skills Program',
@@ -126,12 +193,16 @@ class MichiganDataIngester:
                 'type': 'Senior Services',
                 'county': 'Multiple',
                 'services': ['Digital Literacy Training', 'Online Safety', 'Tech Support'],
-                'populations': ['Seniors']
+                'populations': ['Seniors'],
+                'partners': ['Upper Peninsula District Library', 'Detroit Public Library', 'Michigan Works!']
             }
         ]
         
         with self.driver.session() as session:
+            canonical = canonical_names(session, [name for prog in programs
+                                                  for name in [prog['organization']] + prog['partners']])
             for prog in programs:
+                prog = {**prog, 'organization': canonical[prog['organization']]}
                 # Create organization
                 session.run("""
                     MERGE (o:DigitalEquityNonprofit:Organization {name: $org_name})
@@ -159,6 +230,15 @@ class MichiganDataIngester:
                         MERGE (p:Population {name: $pop})
                         MERGE (o)-[:SERVES_POPULATION]->(p)
                     """, {'org_name': prog['organization'], 'pop': pop})
+            
+            # Partnerships (collaborates_with in the ontology); partners are created as they are ingested
+            for prog in programs:
+                for partner in prog['partners']:
+                    session.run("""
+                        MATCH (o:Organization {name: $org_name})
+                        MATCH (p:Organization {name: $partner})
+                        MERGE (o)-[:COLLABORATES_WITH]->(p)
+                    """, {'org_name': canonical[prog['organization']], 'partner': canonical[partner]})
         
         print(f"  ✓ Ingested {len(programs)} digital navigator programs")
     
@@ -172,7 +252,10 @@ class MichiganDataIngester:
             'median_income': [45000, 52000, 58000, 42000],
             'poverty_rate': [0.18, 0.22, 0.15, 0.19],
             'senior_population_pct': [0.20, 0.15, 0.13, 0.22],
-            'rural_percentage': [0.75, 0.10, 0.25, 0.85]
+            'rural_percentage': [0.75, 0.10, 0.25, 0.85],
+            # Population-weighted centroids, the demand points for accessibility_engine.py
+            'centroid_lat': [46.52, 42.31, 42.98, 46.42],
+            'centroid_lon': [-87.50, -83.19, -85.63, -84.45]
         })
         
         with self.driver.session() as session:
@@ -182,74 +265,65 @@ class MichiganDataIngester:
                     SET r.median_income = $income,
                         r.poverty_rate = $poverty,
                         r.senior_population_pct = $seniors,
-                        r.rural_percentage = $rural
+                        r.rural_percentage = $rural,
+                        r.centroid = point({latitude: $lat, longitude: $lon})
                 """, {
                     'county': row['county'],
                     'income': row['median_income'],
                     'poverty': row['poverty_rate'],
                     'seniors': row['senior_population_pct'],
-                    'rural': row['rural_percentage']
+                    'rural': row['rural_percentage'],
+                    'lat': row['centroid_lat'],
+                    'lon': row['centroid_lon']
                 })
         
         print(f"  ✓ Ingested census data for {len(census_data)} counties")
     
+    def resolve_organizations(self, apply: bool = False):
+        """Find organizations that different sources name differently; merge them only if apply"""
+        print("Resolving duplicate organizations...")
+        result = resolve_graph_organizations(self.driver, apply=apply)
+        if apply:
+            print(f"  ✓ {result['records']} organizations, {result['merged']} merged as aliases"
+                  + (f" (undo: python entity_resolution.py --undo {result['run_id']})" if result['merged'] else ""))
+        else:
+            print(f"  ✓ {result['records']} organizations, {len(result['plan'])} likely duplicates "
+                  f"(review with python entity_resolution.py, merge with --write)")
+    
     def calculate_bayesian_factors(self):
         """Calculate Bayesian factor scores for each region"""
         print("Calculating Bayesian factor scores...")
         
         with self.driver.session() as session:
-            # Calculate Availability score
-            session.run("""
-                MATCH (r:GeographicRegion)
-                SET r.availability_score = 
-                    CASE 
-                        WHEN r.fiber_coverage >= 70 THEN 1.0
-                        WHEN r.fiber_coverage >= 40 THEN 0.7
-                        ELSE 0.3
-                    END
-            """)
-            
-            # Calculate Affordability score
-            session.run("""
-                MATCH (r:GeographicRegion)
-                SET r.affordability_score = 
-                    CASE 
-                        WHEN r.median_income >= 55000 THEN 1.0
-                        WHEN r.median_income >= 45000 THEN 0.7
-                        ELSE 0.3
-                    END
-            """)
-            
-            # Calculate Aspiration score (based on education proxy)
-            session.run("""
-                MATCH (r:GeographicRegion)
-                SET r.aspiration_score = 
-                    CASE 
-                        WHEN r.rural_percentage < 0.3 THEN 0.8
-                        WHEN r.rural_percentage < 0.6 THEN 0.6
-                        ELSE 0.4
-                    END
-            """)
-            
-            # Calculate Service Quality score
-            session.run("""
-                MATCH (r:GeographicRegion)<-[:LOCATED_IN]-(o:Organization)
-                WITH r, count(o) as org_count
-                SET r.service_quality_score = 
-                    CASE 
-                        WHEN org_count >= 3 THEN 1.0
-                        WHEN org_count >= 1 THEN 0.6
-                        ELSE 0.2
-                    END
-            """)
+            calculate_factor_scores(session)
         
         print("  ✓ Calculated Bayesian factor scores for all regions")
     
+    def materialize_analytics_views(self):
+        """Precompute the dashboard aggregates into summary nodes"""
+        print("Materializing analytics views...")
+        with self.driver.session() as session:
+            counts = refresh_analytics_views(session)
+        print(f"  ✓ {counts['ServiceSummary']} services, {counts['PopulationSummary']} populations, "
+              f"{counts['RegionSummary']} regions")
+    
+    def mark_graph_updated(self):
+        """Bump the graph version so dashboard caches refresh"""
+        with self.driver.session() as session:
+            bump_graph_version(session, source='ingest_michigan_data')
+    
     def close(self):
         self.driver.close()
 
 # Main ingestion script
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Ingest Michigan digital equity data into Neo4j")
+    parser.add_argument("--merge-duplicates", action="store_true",
+                        help="Merge the duplicate organizations entity resolution finds (reversible)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Michigan Digital Equity Data Ingestion")
     print("=" * 60)
@@ -268,8 +342,15 @@ if __name__ == "__main__":
         ingester.ingest_fcc_broadband_data()
         ingester.ingest_library_data()
         ingester.ingest_digital_navigator_programs()
+        ingester.resolve_organizations(apply=args.merge_duplicates)
         ingester.ingest_census_data()
         ingester.calculate_bayesian_factors()
+        ingester.materialize_analytics_views()
+        ingester.mark_graph_updated()
+        
+        print("Refreshing hybrid retrieval index...")
+        stats = sync_vector_index(ingester.driver)
+        print(f"  ✓ Indexed {stats['nodes']} nodes ({stats['embedded']} re-embedded)")
         
         print()
         print("=" * 60)
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Research Document Ingestion for the Digital Equity Knowledge Graph
+Streams markdown and text files into section-aware chunks, links each chunk
+to the organizations, services and populations it names, and maintains a
+full-text index over chunk text for GraphRAG retrieval
+"""
+
+from graph_metadata import bump_graph_version
+from neo4j_connection import ConnectionConfig, get_driver
+from vector_index import sync_vector_index
+from typing import Dict, Iterator, List
+import hashlib
+import os
+import re
+
+DOCUMENT_EXTENSIONS = ('.md', '.markdown', '.txt')
+SKIP_DIRS = {'.git', 'venv', '.venv', 'node_modules', '__pycache__', 'data', 'neo4j-data'}
+
+# Entity labels matched in chunk text
+MENTION_LABELS = ['Organization', 'Service', 'Population']
+
+FULLTEXT_INDEX = 'research_chunk_text'
+
+# Document keys are stored relative to the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_FENCE = re.compile(r'^\s*(```|~~~)')
+
+
+def iter_document_paths(paths: List[str]) -> Iterator[str]:
+    """Yield markdown/text files under the given files or directories"""
+    for path in paths:
+        if os.path.isfile(path):
+            if path.lower().endswith(DOCUMENT_EXTENSIONS):
+                yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith('.'))
+            for name in sorted(files):
+                if name.lower().endswith(DOCUMENT_EXTENSIONS) and not name.startswith('requirements'):
+                    yield os.path.join(root, name)
+
+
+def _parse_front_matter(lines: List[str]) -> Dict:
+    """Parse the simple 'key: value' YAML front matter used by the blog posts"""
+    meta = {}
+    for line in lines:
+        if ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        value = value.strip().strip('"\'')
+        if value.startswith('[') and value.endswith(']'):
+            value = [v.strip().strip('"\'') for v in value[1:-1].split(',') if v.strip()]
+        meta[key.strip().lower()] = value
+    return meta
+
+
+def stream_chunks(path: str, max_chars: int = 1500) -> Iterator[Dict]:
+    """
+    Split one document into section-aware chunks without loading it whole
+
+    Chunks never span a heading; long sections are split at paragraph
+    boundaries once they exceed max_chars. Headings inside code fences
+    are treated as text. The first item yielded is the document metadata.
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        first = f.readline()
+        meta_lines = []
+        if first.strip() == '---':
+            for line in f:
+                if line.strip() == '---':
+                    break
+                meta_lines.append(line)
+            pending = []
+        else:
+            pending = [first]
+        meta = _parse_front_matter(meta_lines)
+        yield {'meta': meta}
+
+        headings: List[str] = []
+        paragraph: List[str] = []
+        buffer: List[str] = []
+        size = 0
+        seq = 0
+        in_fence = False
+
+        def flush():
+            nonlocal buffer, size, seq
+            text = "\n\n".join(buffer).strip()
+            buffer, size = [], 0
+            if not text:
+                return None
+            seq += 1
+            return {'seq': seq, 'heading': " > ".join(headings), 'text': text}
+
+        def lines():
+            yield from pending
+            yield from f
+
+        for raw in lines():
+            line = raw.rstrip('\n')
+            if _FENCE.match(line):
+                in_fence = not in_fence
+            heading = None if in_fence else _HEADING.match(line)
+
+            if heading or not line.strip():
+                if paragraph:
+                    block = "\n".join(paragraph)
+                    if size + len(block) > max_chars and buffer:
+                        chunk = flush()
+                        if chunk:
+                            yield chunk
+                    buffer.append(block)
+                    size += len(block)
+                    paragraph = []
+                if heading:
+                    chunk = flush()
+                    if chunk:
+                        yield chunk
+                    level = len(heading.group(1))
+                    headings = headings[:level - 1] + [heading.group(2).strip('*_ ')]
+                continue
+            paragraph.append(line)
+
+        if paragraph:
+            buffer.append("\n".join(paragraph))
+        chunk = flush()
+        if chunk:
+            yield chunk
+
+
+class EntityMatcher:
+    """
+    Batched dictionary matcher for graph entity names
+
+    Loads every Organization/Service/Population name once and compiles a
+    single case-insensitive alternation (longest names first), so each
+    chunk is scanned in one pass regardless of how many entities exist.
+    """
+
+    def __init__(self, entities: List[Dict]):
+        """
+        Args:
+            entities: Dicts with 'label' and 'name'
+        """
+        self.lookup = {}
+        for entity in entities:
+            if entity['name']:
+                self.lookup.setdefault(entity['name'].lower(), set()).add((entity['label'], entity['name']))
+
+        names = sorted(self.lookup, key=len, reverse=True)
+        self.pattern = None
+        if names:
+            self.pattern = re.compile(
+                r'(?<!\w)(' + '|'.join(re.escape(n) for n in names) + r')(?!\w)',
+                re.IGNORECASE
+            )
+
+    def match(self, text: str) -> List[Dict]:
+        if self.pattern is None:
+            return []
+        found = {}
+        for m in self.pattern.finditer(text):
+            for label, name in self.lookup[m.group(1).lower()]:
+                found[(label, name)] = found.get((label, name), 0) + 1
+        return [{'label': label, 'name': name, 'count': count}
+                for (label, name), count in found.items()]
+
+    def match_batch(self, chunks: List[Dict]) -> List[Dict]:
+        """Mentions for a batch of chunks as flat rows ready for UNWIND"""
+        rows = []
+        for chunk in chunks:
+            for mention in self.match(chunk['text']):
+                rows.append({'chunk_id': chunk['id'], **mention})
+        return rows
+
+
+class ResearchDocumentIngester:
+    def __init__(self, neo4j_uri, neo4j_user, neo4j_password, batch_size: int = 500):
+        self.driver = get_driver(ConnectionConfig(neo4j_uri, neo4j_user, neo4j_password))
+        self.batch_size = batch_size
+        self.matcher = None
+
+    def create_indexes(self):
+        """Create constraints and the full-text index over chunk text"""
+        with self.driver.session() as session:
+            session.run("""
+                CREATE CONSTRAINT IF NOT EXISTS FOR (d:ResearchDocument)
+                REQUIRE d.file IS UNIQUE
+            """)
+            session.run("""
+                CREATE CONSTRAINT IF NOT EXISTS FOR (c:ResearchChunk)
+                REQUIRE c.id IS UNIQUE
+            """)
+            session.run("""
+                CREATE CONSTRAINT IF NOT EXISTS FOR (a:Author)
+                REQUIRE a.name IS UNIQUE
+            """)
+            session.run(f"""
+                CREATE FULLTEXT INDEX {FULLTEXT_INDEX} IF NOT EXISTS
+                FOR (c:ResearchChunk) ON EACH [c.text, c.heading]
+            """)
+        print("  ✓ Research indexes ready")
+
+    def load_entity_matcher(self):
+        """Load entity names once for batched matching"""
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (n)
+                WHERE any(label IN labels(n) WHERE label IN $labels) AND n.name IS NOT NULL
+                UNWIND [label IN labels(n) WHERE label IN $labels] as label
+                RETURN DISTINCT label, n.name as name
+            """, {'labels': MENTION_LABELS})
+            entities = [dict(record) for record in result]
+        self.matcher = EntityMatcher(entities)
+        print(f"  ✓ Loaded {len(entities)} entity names for matching")
+
+    def _document_hash(self, path: str) -> str:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _write_document(self, session, doc: Dict):
+        session.run("""
+            MERGE (d:ResearchDocument {file: $file})
+            SET d.title = $title,
+                d.authors = $authors,
+                d.year = $year,
+                d.published_date = $date,
+                d.type = $type,
+                d.content_hash = $content_hash
+            WITH d
+            OPTIONAL MATCH (d)-[:HAS_CHUNK]->(old:ResearchChunk)
+            DETACH DELETE old
+        """, doc)
+        session.run("""
+            MATCH (d:ResearchDocument {file: $file})
+            UNWIND $authors as author_name
+            MERGE (a:Author {name: author_name})
+            MERGE (a)-[:AUTHORED]->(d)
+        """, doc)
+        if doc['publication']:
+            session.run("""
+                MATCH (d:ResearchDocument {file: $file})
+                MERGE (p:Publication {name: $publication})
+                MERGE (d)-[:PUBLISHED_IN]->(p)
+            """, doc)
+
+    def _write_chunks(self, session, chunks: List[Dict]):
+        session.run("""
+            UNWIND $chunks as chunk
+            MATCH (d:ResearchDocument {file: chunk.file})
+            MERGE (c:ResearchChunk {id: chunk.id})
+            SET c.seq = chunk.seq,
+                c.heading = chunk.heading,
+                c.text = chunk.text
+            MERGE (d)-[:HAS_CHUNK]->(c)
+        """, {'chunks': chunks})
+
+        mentions = self.matcher.match_batch(chunks)
+        for label in MENTION_LABELS:
+            rows = [m for m in mentions if m['label'] == label]
+            if not rows:
+                continue
+            # Labels cannot be parameters; one UNWIND per label keeps the index lookup
+            session.run(f"""
+                UNWIND $rows as row
+                MATCH (c:ResearchChunk {{id: row.chunk_id}})
+                MATCH (e:{label} {{name: row.name}})
+                MERGE (c)-[m:MENTIONS]->(e)
+                SET m.count = row.count
+            """, {'rows': rows})
+
+    def remove_documents(self, session, files: List[str]) -> int:
+        """Delete documents (with their chunks) whose source files are gone"""
+        if not files:
+            return 0
+        session.run("""
+            UNWIND $files as file
+            MATCH (d:ResearchDocument {file: file})
+            OPTIONAL MATCH (d)-[:HAS_CHUNK]->(c:ResearchChunk)
+            DETACH DELETE c, d
+        """, {'files': files})
+        # Authors and publications left without any document
+        session.run("""
+            MATCH (a:Author) WHERE NOT (a)-[:AUTHORED]->() DETACH DELETE a
+        """)
+        session.run("""
+            MATCH (p:Publication) WHERE NOT ()-[:PUBLISHED_IN]->(p) DETACH DELETE p
+        """)
+        return len(files)
+
+    def link_navigator_support(self):
+        """Link documents that discuss digital navigators to navigator programs"""
+        with self.driver.session() as session:
+            session.run("""
+                MATCH (d:ResearchDocument)-[:HAS_CHUNK]->(c:ResearchChunk)
+                WHERE toLower(c.text) CONTAINS 'navigator'
+                WITH DISTINCT d
+                MATCH (p:Program)
+                WHERE toLower(p.name) CONTAINS 'navigator'
+                MERGE (d)-[:SUPPORTS_NAVIGATOR]->(p)
+            """)
+
+    def ingest_paths(self, paths: List[str], max_chars: int = 1500) -> Dict:
+        """
+        Stream documents into the graph, skipping files whose content is unchanged
+
+        Documents previously ingested from under the given paths whose files
+        no longer exist are deleted along with their chunks.
+        """
+        print("Ingesting research documents...")
+        if self.matcher is None:
+            self.load_entity_matcher()
+
+        stats = {'documents': 0, 'skipped': 0, 'chunks': 0, 'removed': 0}
+        scopes = [os.path.relpath(os.path.abspath(path), REPO_ROOT) for path in paths]
+        seen = set()
+        with self.driver.session() as session:
+            existing = {r['file']: r['content_hash'] for r in session.run(
+                "MATCH (d:ResearchDocument) RETURN d.file as file, d.content_hash as content_hash"
+            )}
+
+            batch: List[Dict] = []
+            for path in iter_document_paths(paths):
+                file_key = os.path.relpath(os.path.abspath(path), REPO_ROOT)
+                seen.add(file_key)
+                content_hash = self._document_hash(path)
+                if existing.get(file_key) == content_hash:
+                    stats['skipped'] += 1
+                    continue
+
+                chunks = stream_chunks(path, max_chars=max_chars)
+                meta = next(chunks)['meta']
+                authors = meta.get('author') or meta.get('authors') or []
+                if isinstance(authors, str):
+                    authors = [a.strip() for a in re.split(r';| and ', authors) if a.strip()]
+                date = str(meta.get('date', '')) or None
+                title = meta.get('title') or os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+
+                # Flush pending chunks first so they never reference a rewritten document
+                if batch:
+                    self._write_chunks(session, batch)
+                    batch = []
+                self._write_document(session, {
+                    'file': file_key,
+                    'title': title,
+                    'authors': authors,
+                    'year': int(date[:4]) if date and date[:4].isdigit() else None,
+                    'date': date,
+                    'type': meta.get('layout', 'note'),
+                    'publication': meta.get('publication') or meta.get('venue'),
+                    'content_hash': content_hash
+                })
+                stats['documents'] += 1
+
+                for chunk in chunks:
+                    chunk.update({'file': file_key, 'id': f"{file_key}#{chunk['seq']}"})
+                    batch.append(chunk)
+                    stats['chunks'] += 1
+                    if len(batch) >= self.batch_size:
+                        self._write_chunks(session, batch)
+                        batch = []
+
+            if batch:
+                self._write_chunks(session, batch)
+
+            removed = [
+                file_key for file_key in existing
+                if file_key not in seen and any(
+                    scope == os.curdir or file_key == scope or file_key.startswith(scope + os.sep)
+                    for scope in scopes
+                )
+            ]
+            stats['removed'] = self.remove_documents(session, removed)
+
+        self.link_navigator_support()
+        if stats['documents'] or stats['removed']:
+            with self.driver.session() as session:
+                bump_graph_version(session, source='ingest_research_documents')
+        print(f"  ✓ Ingested {stats['documents']} documents ({stats['chunks']} chunks), "
+              f"{stats['skipped']} unchanged, {stats['removed']} removed")
+        return stats
+
+    def search(self, text: str, limit: int = 10) -> List[Dict]:
+        """Full-text search over research chunks"""
+        with self.driver.session() as session:
+            result = session.run(f"""
+                CALL db.index.fulltext.queryNodes('{FULLTEXT_INDEX}', $text)
+                YIELD node, score
+                MATCH (d:ResearchDocument)-[:HAS_CHUNK]->(node)
+                RETURN d.title as document, node.heading as section,
+                       left(node.text, 300) as excerpt, score
+                LIMIT $limit
+            """, {'text': text, 'limit': limit})
+            return [dict(record) for record in result]
+
+    def close(self):
+        self.driver.close()
+
+# Main ingestion script
+if __name__ == "__main__":
+    import sys
+
+    print("=" * 60)
+    print("Research Document Ingestion")
+    print("=" * 60)
+    print()
+
+    # Default: every markdown/text file in the repository
+    paths = sys.argv[1:] or [REPO_ROOT]
+
+    ingester = ResearchDocumentIngester(
+        neo4j_uri="bolt://localhost:7687",
+        neo4j_user="neo4j",
+        neo4j_password="password"
+    )
+
+    try:
+        ingester.create_indexes()
+        ingester.ingest_paths(paths)
+
+        # Runs after the Michigan ingestion's sync, so chunks need their own refresh
+        print("Refreshing hybrid retrieval index...")
+        stats = sync_vector_index(ingester.driver)
+        print(f"  ✓ Indexed {stats['nodes']} nodes ({stats['embedded']} re-embedded)")
+
+        print()
+        print("=" * 60)
+        print("✓ Research documents ingested successfully!")
+        print("=" * 60)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        print("\nMake sure Neo4j is running and Michigan data is ingested first:")
+        print("  python ingest_michigan_data.py")
+    finally:
+        ingester.close()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Background Job Runner for Long Dashboard Computations
+Intervention sweeps, sensitivity analyses, regional scoring and GraphRAG
+queries run on a local worker pool instead of inside the Streamlit script.
+Jobs live in a SQLite table with progress, deduplication of identical
+submissions and persisted results, so reruns and other users never wait
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+DEFAULT_JOB_DB = "data/jobs.sqlite"
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+
+# Each runner stamps the unfinished jobs it owns this often...
+HEARTBEAT_INTERVAL = 10.0
+# ...and another runner only recovers a job once its owner has been silent this long
+# (or, on the same host, as soon as the owner's process has exited)
+STALE_AFTER = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key, status);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at);
+"""
+
+
+class JobStore:
+    """
+    SQLite job table shared by the dashboard and worker processes
+
+    WAL mode lets workers write progress while the UI reads it. Each call
+    opens a short-lived connection, so the store is safe to use from any
+    thread or process.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Job tables created before owners and heartbeats were tracked
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, kind: str, params: Dict, dedup_key: str, owner: str = None) -> Tuple[str, bool]:
+        """
+        Insert a job unless an identical one is queued, running or done
+
+        Returns:
+            (job id, True if a new job was created)
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedup_key = ? AND status IN (?, ?, ?) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedup_key, QUEUED, RUNNING, SUCCEEDED)
+            ).fetchone()
+            if row:
+                conn.execute("COMMIT")
+                return row['id'], False
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, dedup_key, status, created_at, owner, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params, default=str), dedup_key, QUEUED, now, owner, now)
+            )
+            conn.execute("COMMIT")
+            return job_id, True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def update(self, job_id: str, **fields):
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def unfinished(self) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                                (QUEUED, RUNNING)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def heartbeat(self, owner: str):
+        """Mark every unfinished job of this owner as still alive"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                         (time.time(), owner, QUEUED, RUNNING))
+
+    def claim(self, job: Dict, owner: str) -> bool:
+        """Take over an orphaned job; False if another runner claimed it (or its owner woke up) first"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET owner = ?, heartbeat_at = ? WHERE id = ? AND status IN (?, ?) "
+                "AND owner IS ? AND heartbeat_at IS ?",
+                (owner, time.time(), job['id'], QUEUED, RUNNING, job['owner'], job['heartbeat_at']))
+            return cursor.rowcount == 1
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        return job
+
+
+# ===== Job types run in worker processes =====
+
+def intervention_sweep(params: Dict, progress: Callable) -> Dict:
+    """P(Digital Inclusion) for every intervention scenario"""
+    from bayesian_model import DigitalDivideBayesianModel
+    model = DigitalDivideBayesianModel()
+    return model.predict_intervention_impact(params.get('intervention_type', 'all'), progress=progress)
+
+
+def sensitivity_analysis(params: Dict, progress: Callable) -> List[Dict]:
+    """Swing in P(target = High) per network variable"""
+    from bayesian_model import DigitalDivideBayesianModel
+    model = DigitalDivideBayesianModel()
+    return model.sensitivity_analysis(params.get('target', 'DigitalInclusion'), progress=progress)
+
+
+def regional_scoring(params: Dict, progress: Callable) -> Dict:
+    """
+    Posterior P(Digital Inclusion = High) for a batch of regions
+
+    params['regions'] holds region metric rows; without it every region at
+    params['level'] (default county) is read from the graph, so submit a
+    'graph_version' too or a re-ingest will reuse the old scores.
+    """
+    from bayesian_model import DigitalDivideBayesianModel
+    regions = params.get('regions')
+    if regions is None:
+        from dashboard_queries import fetch_region_metrics
+        from neo4j_connection import get_driver
+        progress(0.05, "Reading region metrics")
+        with get_driver().session() as session:
+            regions = fetch_region_metrics(session, params.get('level', 'county'))
+    if not regions:
+        raise ValueError(f"No {params.get('level', 'county')} regions to score")
+    model = DigitalDivideBayesianModel()
+    progress(0.1, f"Scoring {len(regions)} regions")
+    return model.posterior_by_region(regions)
+
+
+# Job kinds that run in a separate process (CPU-bound, picklable by name)
+JOB_TYPES: Dict[str, Callable] = {
+    'intervention_sweep': intervention_sweep,
+    'sensitivity_analysis': sensitivity_analysis,
+    'regional_scoring': regional_scoring
+}
+
+
+def _run(store: JobStore, job_id: str, handler: Callable, params: Dict):
+    """Execute one job, recording progress, result or error"""
+    store.update(job_id, status=RUNNING, started_at=time.time(), progress=0.0)
+
+    def progress(fraction: float, message: str = None):
+        store.update(job_id, progress=round(min(max(fraction, 0.0), 1.0), 3), message=message)
+
+    try:
+        result = handler(params, progress)
+        if isinstance(result, dict) and result.get('error'):
+            # Failures reported in the result (GraphRAGEngine.query) must not be reused as successes
+            store.update(job_id, status=FAILED, finished_at=time.time(), error=str(result['error']),
+                         result=json.dumps(result, default=str))
+            return
+        store.update(job_id, status=SUCCEEDED, progress=1.0, finished_at=time.time(),
+                     result=json.dumps(result, default=str))
+    except Exception as e:
+        store.update(job_id, status=FAILED, finished_at=time.time(),
+                     error=f"{type(e).__name__}: {e}", message=traceback.format_exc(limit=5))
+
+
+def _run_in_worker(db_path: str, job_id: str, kind: str, params: Dict):
+    """Process pool entry point"""
+    _run(JobStore(db_path), job_id, JOB_TYPES[kind], params)
+
+
+def _owner_alive(owner: Optional[str], heartbeat_at: Optional[float]) -> bool:
+    """A job's owner is alive while it heartbeats and, on this host, while its process exists"""
+    if owner is None or heartbeat_at is None or time.time() - heartbeat_at > STALE_AFTER:
+        return False
+    host, pid = owner.split(':')[:2]
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, ValueError):
+        pass
+    return True
+
+
+def dedup_key(kind: str, params: Dict) -> str:
+    """Identical kind + parameters map to the same job"""
+    canonical = json.dumps({'kind': kind, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class JobRunner:
+    """
+    Submits jobs to a local worker pool and reports their status
+
+    CPU-bound job kinds in JOB_TYPES run in worker processes so they never
+    hold the dashboard's GIL; handlers registered with register() (for
+    example GraphRAG, which reuses the live engine) run on a thread pool.
+
+    Several runners (Streamlit workers, the API) can share one job table:
+    each owns the jobs it dispatched and heartbeats them, and only jobs
+    whose owner has stopped heartbeating or exited are recovered.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_JOB_DB, max_processes: int = 2, max_threads: int = 4):
+        """
+        Args:
+            db_path: SQLite file holding the job table
+            max_processes: Worker processes for CPU-bound jobs
+            max_threads: Threads for in-process (I/O-bound) jobs
+        """
+        self.store = JobStore(db_path)
+        self.max_processes = max_processes
+        self._processes = None
+        self._threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="job")
+        self._handlers: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopped = threading.Event()
+        self._resume_unfinished()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def register(self, kind: str, handler: Callable):
+        """Run jobs of this kind in-process; handler(params, progress) -> JSON-serializable result"""
+        self._handlers[kind] = handler
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                # spawn: forking a multi-threaded server process is unsafe
+                self._processes = ProcessPoolExecutor(max_workers=self.max_processes,
+                                                      mp_context=multiprocessing.get_context('spawn'))
+            return self._processes
+
+    def _dispatch(self, job_id: str, kind: str, params: Dict):
+        if kind in self._handlers:
+            self._threads.submit(_run, self.store, job_id, self._handlers[kind], params)
+        elif kind in JOB_TYPES:
+            future = self._process_pool().submit(_run_in_worker, self.store.path, job_id, kind, params)
+            future.add_done_callback(lambda f: self._on_worker_exit(job_id, f))
+        else:
+            self.store.update(job_id, status=FAILED, error=f"Unknown job kind: {kind}", finished_at=time.time())
+
+    def _on_worker_exit(self, job_id: str, future):
+        """A worker that died mid-job never records failure itself"""
+        error = future.exception()
+        if error is not None:
+            self.store.update(job_id, status=FAILED, finished_at=time.time(),
+                              error=f"Worker process failed: {type(error).__name__}: {error}")
+            with self._lock:
+                # A broken pool rejects all further work; start a fresh one on next submit
+                self._processes = None
+
+    def _heartbeat_loop(self):
+        while not self._stopped.wait(HEARTBEAT_INTERVAL):
+            try:
+                self.store.heartbeat(self.owner)
+                self._resume_unfinished()
+            except Exception:
+                pass
+
+    def _resume_unfinished(self):
+        """
+        Recover jobs whose runner died: requeue process kinds, fail in-process
+        kinds (they can't resume until re-registered). Jobs of live runners,
+        including other processes sharing the table, are left alone.
+        """
+        for job in self.store.unfinished():
+            if job['owner'] == self.owner or _owner_alive(job['owner'], job['heartbeat_at']):
+                continue
+            if not self.store.claim(job, self.owner):
+                continue
+            if job['kind'] in JOB_TYPES:
+                self.store.update(job['id'], status=QUEUED, progress=0.0, message="Resumed after its runner stopped")
+                self._dispatch(job['id'], job['kind'], job['params'])
+            else:
+                self.store.update(job['id'], status=FAILED, error="Interrupted: its runner stopped",
+                                  finished_at=time.time())
+
+    def submit(self, kind: str, params: Dict = None, dedup: bool = True) -> str:
+        """
+        Queue a job, or return the id of an identical queued, running or finished one
+
+        Include anything the result depends on (such as the graph version)
+        in params so stale results are not reused.
+        """
+        params = params or {}
+        key = dedup_key(kind, params) if dedup else uuid.uuid4().hex
+        job_id, created = self.store.create(kind, params, key, self.owner)
+        if created:
+            self._dispatch(job_id, kind, params)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        return self.store.recent(limit)
+
+    def wait(self, job_id: str, timeout: float = None, poll_interval: float = 0.2) -> Dict:
+        """Block until the job finishes (scripts and the CLI; the dashboard polls instead)"""
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            job = self.status(job_id)
+            if job['status'] in (SUCCEEDED, FAILED):
+                return job
+            if deadline and time.time() > deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def shutdown(self, wait: bool = True):
+        self._stopped.set()
+        self._threads.shutdown(wait=wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+
+
+# Run a job from the command line
+if __name__ == "__main__":
+    import sys
+
+    print("=" * 60)
+    print("Background Job Runner")
+    print("=" * 60)
+    print()
+
+    kind = sys.argv[1] if len(sys.argv) > 1 else 'intervention_sweep'
+    # Optional JSON params, e.g. job_runner.py regional_scoring '{"level": "tract"}'
+    params = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
+    if kind == 'regional_scoring' and 'regions' not in params:
+        # Regions come from the graph: key the job on its version so a re-ingest is rescored
+        try:
+            from graph_metadata import get_graph_version
+            from neo4j_connection import get_driver
+            with get_driver().session() as session:
+                params['graph_version'] = get_graph_version(session)
+        except Exception as e:
+            print(f"❌ regional_scoring reads regions from Neo4j, which is unavailable: {e}")
+            sys.exit(1)
+
+    runner = JobRunner()
+    try:
+        job_id = runner.submit(kind, params)
+        print(f"Submitted {kind} as {job_id}")
+        job = runner.wait(job_id)
+        if job['status'] == SUCCEEDED:
+            print(f"✓ Finished in {job['finished_at'] - job['started_at']:.2f}s" if job['started_at'] else "✓ Finished")
+            print(json.dumps(job['result'], indent=2))
+        else:
+            print(f"❌ {job['error']}")
+    finally:
+        runner.shutdown()
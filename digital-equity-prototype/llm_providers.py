@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+LLM Providers for the GraphRAG Engine
+Pluggable Cypher generation and answer synthesis: OpenAI through LangChain,
+a deterministic rule-based stub, and record/replay of real responses so the
+engine can run and be benchmarked with no network access
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import json
+import os
+import re
+import threading
+
+
+class LLMProvider(ABC):
+    """
+    Interface for the two LLM calls GraphRAG makes
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def generate_cypher(self, question: str, schema: str) -> str:
+        """Translate a natural language question into Cypher"""
+
+    @abstractmethod
+    def answer(self, question: str, context: List[Dict]) -> str:
+        """Synthesize an answer from the retrieved context"""
+
+
+class OpenAIProvider(LLMProvider):
+    """
+    OpenAI chat model with LangChain's GraphCypherQAChain prompts
+    """
+
+    name = 'openai'
+
+    def __init__(self, api_key: str = None, model: str = "gpt-3.5-turbo"):
+        from langchain.chains import LLMChain
+        from langchain.chains.graph_qa.cypher import extract_cypher
+        from langchain.chains.graph_qa.prompts import CYPHER_GENERATION_PROMPT, CYPHER_QA_PROMPT
+        from langchain.chat_models import ChatOpenAI
+
+        if api_key:
+            os.environ["OPENAI_API_KEY"] = api_key
+
+        self.llm = ChatOpenAI(temperature=0, model=model)
+        self._extract_cypher = extract_cypher
+        self.cypher_chain = LLMChain(llm=self.llm, prompt=CYPHER_GENERATION_PROMPT)
+        self.qa_chain = LLMChain(llm=self.llm, prompt=CYPHER_QA_PROMPT)
+
+    def generate_cypher(self, question: str, schema: str) -> str:
+        generated = self.cypher_chain.run({"question": question, "schema": schema})
+        return self._extract_cypher(generated)
+
+    def answer(self, question: str, context: List[Dict]) -> str:
+        return self.qa_chain.run({"question": question, "context": context})
+
+
+class RuleBasedCypherProvider(LLMProvider):
+    """
+    Deterministic offline stub
+
+    Maps keywords in the question onto the graph vocabulary and fills
+    Cypher templates, then answers by listing what came back. Good enough
+    to exercise every stage of the pipeline with stable output.
+    """
+
+    name = 'rule-based'
+
+    POPULATIONS = {
+        'senior': 'Seniors', 'older': 'Seniors', 'low-income': 'Low-Income Families',
+        'low income': 'Low-Income Families', 'student': 'Students', 'job seeker': 'Job Seekers',
+        'rural': 'Rural Residents'
+    }
+    SERVICES = {
+        'device lending': 'Device Lending', 'wifi': 'WiFi Access', 'wi-fi': 'WiFi Access',
+        'literacy': 'Digital Literacy Training', 'tech support': 'Tech Support',
+        'job search': 'Job Search Assistance', 'navigation': 'Digital Navigation'
+    }
+
+    def generate_cypher(self, question: str, schema: str = "") -> str:
+        q = question.lower()
+        county = re.search(r"([A-Z][a-z]+) County", question)
+
+        if 'broadband' in q or 'coverage' in q:
+            order = 'ASC' if any(w in q for w in ('lowest', 'least', 'worst')) else 'DESC'
+            return (f"MATCH (r:GeographicRegion) RETURN r.name as county, r.fiber_coverage as fiber, "
+                    f"r.median_speed_mbps as speed ORDER BY r.fiber_coverage {order} LIMIT 5")
+
+        if 'infrastructure' in q or 'investment' in q:
+            return ("MATCH (r:GeographicRegion) RETURN r.name as county, r.availability_score as availability "
+                    "ORDER BY r.availability_score ASC LIMIT 5")
+
+        if 'underserved' in q:
+            return ("MATCH (p:Population) OPTIONAL MATCH (p)<-[:SERVES_POPULATION]-(o:Organization) "
+                    "RETURN p.name as population, count(o) as organizations ORDER BY organizations ASC")
+
+        if 'rural' in q and 'urban' in q:
+            return ("MATCH (r:GeographicRegion) OPTIONAL MATCH (r)<-[:LOCATED_IN]-(o:Organization) "
+                    "RETURN CASE WHEN r.rural_percentage >= 0.5 THEN 'rural' ELSE 'urban' END as setting, "
+                    "count(DISTINCT r) as counties, count(o) as organizations")
+
+        match = ["MATCH (o:Library)" if 'librar' in q else "MATCH (o:Organization)"]
+        for keyword, population in self.POPULATIONS.items():
+            if keyword in q:
+                match.append(f"MATCH (o)-[:SERVES_POPULATION]->(:Population {{name: '{population}'}})")
+                break
+        for keyword, service in self.SERVICES.items():
+            if keyword in q:
+                match.append(f"MATCH (o)-[:PROVIDES_SERVICE]->(:Service {{name: '{service}'}})")
+                break
+        if county:
+            match.append(f"MATCH (o)-[:LOCATED_IN]->(:GeographicRegion {{name: '{county.group(0)}'}})")
+
+        if re.search(r"\b(what|which)\b.*\bservices\b", q):
+            match.append("MATCH (o)-[:PROVIDES_SERVICE]->(s:Service)")
+            return "\n".join(match) + "\nRETURN s.name as service, collect(DISTINCT o.name) as providers"
+
+        return "\n".join(match) + "\nRETURN DISTINCT o.name as organization"
+
+    def answer(self, question: str, context: List[Dict]) -> str:
+        rows = [row for row in context if 'summary' not in row]
+        if not rows:
+            return "I don't know the answer."
+        values = []
+        for row in rows[:10]:
+            values.append(", ".join(str(v) for v in row.values() if v is not None))
+        more = f" (and {len(rows) - 10} more)" if len(rows) > 10 else ""
+        return f"Found {len(rows)} results: " + "; ".join(values) + more
+
+
+class RecordedProvider(LLMProvider):
+    """
+    Replays responses captured from a real provider
+
+    Recordings are JSON lines of {question, cypher, answer}. Questions not
+    in the recording fall through to the fallback provider. With record=True
+    every fallback response is appended to the file.
+    """
+
+    name = 'recorded'
+
+    def __init__(self, path: str, fallback: Optional[LLMProvider] = None, record: bool = False):
+        self.path = path
+        self.fallback = fallback or RuleBasedCypherProvider()
+        self.record = record
+        self._lock = threading.Lock()
+        self.responses: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.responses.setdefault(self._key(entry['question']), {}).update(entry)
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return " ".join(question.lower().split())
+
+    def _save(self, question: str, field: str, value: str):
+        if not self.record:
+            return
+        with self._lock:
+            entry = self.responses.setdefault(self._key(question), {'question': question})
+            entry[field] = value
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps({'question': question, field: value}) + "\n")
+
+    def generate_cypher(self, question: str, schema: str) -> str:
+        entry = self.responses.get(self._key(question), {})
+        if 'cypher' in entry:
+            return entry['cypher']
+        cypher = self.fallback.generate_cypher(question, schema)
+        self._save(question, 'cypher', cypher)
+        return cypher
+
+    def answer(self, question: str, context: List[Dict]) -> str:
+        entry = self.responses.get(self._key(question), {})
+        if 'answer' in entry:
+            return entry['answer']
+        answer = self.fallback.answer(question, context)
+        self._save(question, 'answer', answer)
+        return answer
+
+
+def get_provider(name: str = None, api_key: str = None, recording_path: str = "data/llm_recordings.jsonl"):
+    """
+    Build a provider by name: 'openai', 'rule-based', 'recorded' or 'record'
+
+    Defaults to OpenAI when an API key is available, otherwise the offline stub.
+    """
+    name = name or os.getenv("GRAPHRAG_LLM_PROVIDER") or ('openai' if api_key or os.getenv("OPENAI_API_KEY") else 'rule-based')
+    if name == 'openai':
+        return OpenAIProvider(api_key)
+    if name == 'rule-based':
+        return RuleBasedCypherProvider()
+    if name == 'recorded':
+        return RecordedProvider(recording_path)
+    if name == 'record':
+        return RecordedProvider(recording_path, fallback=OpenAIProvider(api_key), record=True)
+    raise ValueError(f"Unknown LLM provider: {name}")
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Multi-User Load Test for the Dashboard Query Paths
+Replays realistic analyst sessions (Overview, Explorer tabs, map, Bayesian
+queries, Intervention Planner, GraphRAG) through the shared query layer with
+many concurrent virtual users, against a live Neo4j or an in-memory replay
+backend, and reports throughput, latency percentiles and pool saturation per
+page - one run per concurrency level gives a scaling curve
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from api_server import QueryAPI
+from benchmark_graphrag import DEFAULT_SUITE, percentiles
+
+DEFAULT_RECORDING = "data/load_test_recording.json"
+
+
+# ===== In-memory backend =====
+
+class _Record(dict):
+    """Row with the parts of neo4j.Record the query layer uses"""
+
+    def data(self) -> Dict:
+        return dict(self)
+
+
+class _Summary:
+    plan = None
+
+    class counters:
+        nodes_created = 0
+
+
+class _Result:
+    def __init__(self, rows: List[Dict], summary=None):
+        self._rows = [_Record(row) for row in rows]
+        self._summary = summary
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def single(self):
+        return self._rows[0] if self._rows else None
+
+    def data(self) -> List[Dict]:
+        return [row.data() for row in self._rows]
+
+    def consume(self):
+        return self._summary or _Summary()
+
+
+def _query_key(query: str, params: Dict) -> str:
+    normalized = " ".join(query.split())
+    canonical = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha1(f"{normalized}\n{canonical}".encode('utf-8')).hexdigest()
+
+
+def sample_fixtures(organizations: int = 500, counties: int = 83, seed: int = 7) -> List:
+    """
+    Synthetic responses for the dashboard queries, used when a query is not in the recording
+
+    Returns:
+        List of (pattern, rows_fn(params)) checked in order
+    """
+    rng = random.Random(seed)
+    services = ['WiFi Access', 'Device Lending', 'Digital Literacy Training', 'Tech Support',
+                'Job Search Assistance', 'Digital Navigation']
+    populations = ['Seniors', 'Low-Income Families', 'Students', 'Job Seekers', 'Rural Residents']
+    regions = [{'name': f"County {i:02d} County", 'fips': f"26{2 * i + 1:03d}",
+                'fiber_coverage': round(rng.uniform(10, 95), 1), 'cable_coverage': round(rng.uniform(30, 98), 1),
+                'dsl_coverage': round(rng.uniform(50, 99), 1), 'median_speed_mbps': round(rng.uniform(20, 300)),
+                'median_income': rng.randrange(35000, 90000, 500), 'poverty_rate': round(rng.uniform(0.05, 0.3), 3),
+                'rural_percentage': round(rng.random(), 2), 'availability_score': rng.choice([0.3, 0.7, 1.0]),
+                'affordability_score': rng.choice([0.3, 0.7, 1.0]), 'aspiration_score': rng.choice([0.4, 0.6, 0.8]),
+                'service_quality_score': rng.choice([0.2, 0.6, 1.0])}
+               for i in range(counties)]
+    orgs = sorted(({'name': f"Organization {i:05d}", 'types': ['Organization', rng.choice(['Library', 'Nonprofit'])],
+                    'services': rng.sample(services, 2), 'populations': rng.sample(populations, 2),
+                    'regions': [rng.choice(regions)['name']]} for i in range(organizations)),
+                  key=lambda org: org['name'])
+
+    def organization_page(params):
+        after = params.get('after')
+        rows = [org for org in orgs if after is None or org['name'] > after]
+        return rows[:params.get('fetch', 26)]
+
+    return [
+        ('GraphMeta', lambda p: [{'version': 'load-test'}]),
+        ('AnalyticsView', lambda p: [{
+            'materialized': True, 'organizations': organizations, 'services': len(services),
+            'populations': len(populations), 'regions': counties,
+            'region_coverage': [{'county': r['name'], 'fiber': r['fiber_coverage'], 'cable': r['cable_coverage'],
+                                 'speed': r['median_speed_mbps']} for r in regions[:p.get('limit', 100)]]}]),
+        ('ServiceSummary', lambda p: [{'service': s, 'provider_count': organizations // (i + 2),
+                                       'providers': [o['name'] for o in orgs[:25]]}
+                                      for i, s in enumerate(services)]),
+        ('PopulationSummary', lambda p: [{'population': s, 'org_count': organizations // (i + 2),
+                                          'organizations': [o['name'] for o in orgs[:25]]}
+                                         for i, s in enumerate(populations)]),
+        ('RETURN regions, services, populations, labels', lambda p: [{
+            'regions': [r['name'] for r in regions], 'services': services,
+            'populations': populations, 'labels': ['Library', 'Nonprofit']}]),
+        ('ORDER BY o.name LIMIT $fetch', organization_page),
+        ('r {.name', lambda p: [{'region': r} for r in regions]),
+        ('db.schema', lambda p: []),
+        ('', lambda p: [{'organization': o['name']} for o in orgs[:20]])
+    ]
+
+
+class ReplayDriver:
+    """
+    In-memory stand-in for the shared driver
+
+    Answers queries from a recording (see RecordingDriver), falling back to
+    synthetic fixtures, after a simulated round-trip latency. A bounded
+    pool of "connections" models the real driver's pool so saturation and
+    acquisition waits show up under load.
+    """
+
+    def __init__(self, recording_path: str = None, latency_ms: float = 2.0,
+                 max_connection_pool_size: int = 50, fixtures: List = None):
+        """
+        Args:
+            recording_path: JSON file written by RecordingDriver (optional)
+            latency_ms: Simulated server time per query
+            max_connection_pool_size: Simulated pool size
+            fixtures: (pattern, rows_fn) rules for queries not in the recording
+        """
+        self.responses = {}
+        if recording_path and os.path.exists(recording_path):
+            with open(recording_path) as f:
+                self.responses = json.load(f)
+        self.latency = latency_ms / 1000.0
+        self.max_connection_pool_size = max_connection_pool_size
+        self.fixtures = fixtures if fixtures is not None else sample_fixtures()
+        self._pool = threading.BoundedSemaphore(max_connection_pool_size)
+        self._lock = threading.Lock()
+        self._stats = {'sessions_opened': 0, 'sessions_in_use': 0, 'peak_sessions_in_use': 0,
+                       'connections_in_use': 0, 'replayed': 0, 'synthesized': 0}
+        self.acquire_waits: List[float] = []
+
+    def session(self, **kwargs):
+        return _ReplaySession(self)
+
+    def _respond(self, query: str, params: Dict) -> _Result:
+        entry = self.responses.get(_query_key(query, params))
+        if entry is not None:
+            rows = entry['rows']
+            self._count('replayed')
+        else:
+            rows = next(fn(params or {}) for pattern, fn in self.fixtures if pattern in query)
+            self._count('synthesized')
+        if self.latency:
+            time.sleep(self.latency)
+        return _Result(rows)
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self._stats[key] += delta
+
+    def _checkout(self):
+        start = time.perf_counter()
+        self._pool.acquire()
+        wait = time.perf_counter() - start
+        with self._lock:
+            self.acquire_waits.append(wait)
+            self._stats['sessions_opened'] += 1
+            self._stats['sessions_in_use'] += 1
+            self._stats['connections_in_use'] += 1
+            self._stats['peak_sessions_in_use'] = max(self._stats['peak_sessions_in_use'],
+                                                      self._stats['sessions_in_use'])
+
+    def _checkin(self):
+        with self._lock:
+            self._stats['sessions_in_use'] -= 1
+            self._stats['connections_in_use'] -= 1
+        self._pool.release()
+
+    def pool_metrics(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._stats)
+        metrics['max_connection_pool_size'] = self.max_connection_pool_size
+        metrics['pool_utilization'] = round(metrics['connections_in_use'] / self.max_connection_pool_size, 3)
+        return metrics
+
+    def close(self):
+        pass
+
+
+class _ReplaySession:
+    """Holds a pooled connection from first query to close, like a real session"""
+
+    def __init__(self, driver: ReplayDriver):
+        self._driver = driver
+        self._connected = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, query: str, params: Dict = None, **kwargs):
+        if not self._connected:
+            self._driver._checkout()
+            self._connected = True
+        return self._driver._respond(query, params or kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    execute_write = execute_read
+
+    def close(self):
+        if self._connected:
+            self._connected = False
+            self._driver._checkin()
+
+
+class RecordingDriver:
+    """
+    Wraps a live shared driver and captures every query's rows for replay
+    """
+
+    def __init__(self, driver, path: str = DEFAULT_RECORDING):
+        self.driver = driver
+        self.path = path
+        self.responses: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def session(self, **kwargs):
+        return _RecordingSession(self, self.driver.session(**kwargs))
+
+    def _record(self, query: str, params: Dict, rows: List[Dict]):
+        with self._lock:
+            self.responses[_query_key(query, params)] = {'query': " ".join(query.split()), 'rows': rows}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.responses, f, default=str)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class _RecordingRunner:
+    """Records the rows of every run() on a live session or transaction"""
+
+    def __init__(self, owner: RecordingDriver, target):
+        self._owner = owner
+        self._target = target
+
+    def run(self, query: str, params: Dict = None, **kwargs):
+        result = self._target.run(query, params or kwargs)
+        rows = [record.data() for record in result]
+        self._owner._record(query, params or kwargs, json.loads(json.dumps(rows, default=str)))
+        # Keep the live summary so the guard's EXPLAIN check still sees the plan
+        return _Result(rows, result.consume())
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class _RecordingSession(_RecordingRunner):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._target.close()
+
+    def execute_read(self, work, *args, **kwargs):
+        """Record queries run in managed transactions (GraphRAG's guarded execution)"""
+        # wraps keeps the @unit_of_work timeout the live session reads from work
+        @functools.wraps(work)
+        def recorded(tx, *a, **kw):
+            return work(_RecordingRunner(self._owner, tx), *a, **kw)
+        return self._target.execute_read(recorded, *args, **kwargs)
+
+
+# ===== User sessions =====
+
+def _get(api: QueryAPI, target: str) -> Dict:
+    status, _, body = api.handle('GET', target)
+    if status >= 400:
+        raise RuntimeError(f"{target} returned {status}")
+    return json.loads(body) if body else None
+
+
+def overview(api, rng):
+    _get(api, "/v1/overview")
+
+
+def explorer_organizations(api, rng):
+    filters = _get(api, "/v1/filters")
+    query = "/v1/organizations?page_size=25"
+    if rng.random() < 0.4 and filters['services']:
+        query += f"&service={rng.choice(filters['services']).replace(' ', '+')}"
+    page = _get(api, query)
+    # Analysts page forward a few times
+    for _ in range(rng.randint(0, 3)):
+        if not page['next_cursor']:
+            break
+        page = _get(api, f"{query}&after={page['next_cursor'].replace(' ', '+')}")
+
+
+def explorer_services(api, rng):
+    _get(api, "/v1/services")
+
+
+def explorer_populations(api, rng):
+    _get(api, "/v1/populations")
+
+
+def geographic_map(api, rng):
+    _get(api, "/v1/regions?level=county")
+    if rng.random() < 0.5:
+        _get(api, "/v1/bayesian/regions")
+
+
+def bayesian_analysis(api, rng):
+    evidence = "&".join(f"{variable}={rng.choice(['Low', 'High'])}"
+                        for variable in rng.sample(['Infrastructure', 'Availability', 'Affordability', 'Aspiration'],
+                                                   rng.randint(0, 2)))
+    _get(api, f"/v1/bayesian/query?target=DigitalInclusion&{evidence}")
+
+
+def intervention_planner(api, rng):
+    _get(api, "/v1/interventions")
+
+
+def graphrag(api, rng):
+    question = rng.choice(DEFAULT_SUITE)['question']
+    status, _, body = api.handle('POST', "/v1/graphrag", json.dumps({'question': question}).encode('utf-8'))
+    if status >= 400:
+        raise RuntimeError(f"GraphRAG returned {status}")
+
+
+PAGES: Dict[str, Callable] = {
+    'Overview': overview,
+    'Explorer: Organizations': explorer_organizations,
+    'Explorer: Services': explorer_services,
+    'Explorer: Populations': explorer_populations,
+    'Geographic Map': geographic_map,
+    'Bayesian Analysis': bayesian_analysis,
+    'Intervention Planner': intervention_planner,
+    'GraphRAG': graphrag
+}
+
+# Page visit weights for a typical analyst session
+PAGE_WEIGHTS = {
+    'Overview': 5, 'Explorer: Organizations': 4, 'Explorer: Services': 2, 'Explorer: Populations': 2,
+    'Geographic Map': 3, 'Bayesian Analysis': 2, 'Intervention Planner': 1, 'GraphRAG': 1
+}
+
+
+def user_session(rng: random.Random, steps: int = 8) -> List[str]:
+    """A session always starts on the Overview, then wanders by page weight"""
+    pages, weights = zip(*PAGE_WEIGHTS.items())
+    return ['Overview'] + rng.choices(pages, weights=weights, k=steps - 1)
+
+
+# ===== Runner =====
+
+def run_load_test(api: QueryAPI, driver, concurrency: int = 8, sessions_per_user: int = 5,
+                  steps: int = 8, think_time: float = 0.0, seed: int = 42) -> Dict:
+    """
+    Run concurrent virtual users through recorded-style sessions
+
+    Returns:
+        Report with throughput and, per page, latency percentiles, errors
+        and pool utilization sampled when each page view started
+    """
+    samples: Dict[str, List] = {page: [] for page in PAGES}
+    errors: Dict[str, List[str]] = {page: [] for page in PAGES}
+    lock = threading.Lock()
+
+    def virtual_user(user: int):
+        rng = random.Random(seed * 1000 + user)
+        for _ in range(sessions_per_user):
+            for page in user_session(rng, steps):
+                utilization = driver.pool_metrics()['pool_utilization']
+                start = time.perf_counter()
+                try:
+                    PAGES[page](api, rng)
+                    error = None
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                elapsed = time.perf_counter() - start
+                with lock:
+                    samples[page].append((elapsed, utilization))
+                    if error:
+                        errors[page].append(error)
+                if think_time:
+                    time.sleep(rng.expovariate(1.0 / think_time))
+
+    wait_offset = len(getattr(driver, 'acquire_waits', []))
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(virtual_user, range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    pages = {}
+    all_latencies = []
+    for page, page_samples in samples.items():
+        if not page_samples:
+            continue
+        latencies = [latency for latency, _ in page_samples]
+        utilization = [u for _, u in page_samples]
+        all_latencies.extend(latencies)
+        pages[page] = {
+            'views': len(page_samples),
+            'errors': len(errors[page]),
+            'throughput_per_s': round(len(page_samples) / wall, 2),
+            'latency': percentiles(latencies),
+            'pool_utilization_mean': round(sum(utilization) / len(utilization), 3),
+            'pool_utilization_max': round(max(utilization), 3),
+            'pool_saturated_share': round(sum(1 for u in utilization if u >= 1.0) / len(utilization), 3),
+            'sample_errors': errors[page][:3]
+        }
+
+    pool = driver.pool_metrics()
+    report = {
+        'concurrency': concurrency,
+        'views': len(all_latencies),
+        'wall_seconds': round(wall, 3),
+        'throughput_per_s': round(len(all_latencies) / wall, 2) if wall else None,
+        'latency': percentiles(all_latencies),
+        'peak_sessions_in_use': pool.get('peak_sessions_in_use'),
+        'max_connection_pool_size': pool.get('max_connection_pool_size'),
+        'response_cache': dict(api.cache.stats),
+        'pages': pages
+    }
+    waits = getattr(driver, 'acquire_waits', None)
+    if waits is not None:
+        report['pool_acquire_wait'] = percentiles(waits[wait_offset:])
+    return report
+
+
+def print_report(report: Dict):
+    print(f"Concurrency {report['concurrency']}: {report['views']} page views in {report['wall_seconds']}s "
+          f"({report['throughput_per_s']} views/s), peak sessions "
+          f"{report['peak_sessions_in_use']}/{report['max_connection_pool_size']}")
+    if 'pool_acquire_wait' in report and report['pool_acquire_wait']['count']:
+        print(f"  pool acquire wait p95 {report['pool_acquire_wait']['p95_ms']} ms")
+    print(f"  {'page':26s} {'views':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'pool max':>9s} {'saturated':>10s}")
+    for page, stats in report['pages'].items():
+        latency = stats['latency']
+        print(f"  {page:26s} {stats['views']:6d} {latency['p50_ms']:9.2f} {latency['p95_ms']:9.2f} "
+              f"{latency['p99_ms']:9.2f} {stats['pool_utilization_max']:9.0%} {stats['pool_saturated_share']:10.0%}"
+              + (f"  ❌ {stats['errors']} errors" if stats['errors'] else ""))
+
+
+# Run the load test from the command line
+if __name__ == "__main__":
+    import argparse
+    from bayesian_model import DigitalDivideBayesianModel
+    from graphrag_engine import GraphRAGEngine
+    from llm_providers import get_provider
+    from neo4j_connection import ConnectionConfig, PooledGraph, get_driver
+
+    parser = argparse.ArgumentParser(description="Multi-user load test for the dashboard query paths")
+    parser.add_argument("--backend", default="memory", choices=["memory", "neo4j", "record"],
+                        help="memory: replay/synthetic in-process backend; neo4j: live database; "
+                             "record: live database, saving responses for later memory runs")
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        help="Comma-separated virtual user counts; one run per level")
+    parser.add_argument("--sessions", type=int, default=5, help="Sessions per virtual user")
+    parser.add_argument("--steps", type=int, default=8, help="Page views per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between page views")
+    parser.add_argument("--pool-size", type=int, default=50, help="Connection pool size")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Simulated query latency (memory backend)")
+    parser.add_argument("--recording", default=DEFAULT_RECORDING)
+    parser.add_argument("--no-cache", action="store_true", help="Disable response caching (worst case)")
+    parser.add_argument("--provider", default="rule-based", help="GraphRAG LLM provider")
+    parser.add_argument("--output", help="Write the reports as JSON")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Dashboard Load Test")
+    print("=" * 60)
+    print()
+
+    if args.backend == "memory":
+        driver = ReplayDriver(args.recording, args.latency_ms, args.pool_size)
+        engine = GraphRAGEngine(None, None, None, graph=PooledGraph(driver), llm_provider=get_provider(args.provider))
+    else:
+        config = ConnectionConfig(max_connection_pool_size=args.pool_size)
+        driver = get_driver(config)
+        if args.backend == "record":
+            driver = RecordingDriver(driver, args.recording)
+        engine = GraphRAGEngine(config.uri, config.user, config.password, connection_config=config,
+                                graph=PooledGraph(driver) if args.backend == "record" else None,
+                                llm_provider=get_provider(args.provider))
+
+    model = DigitalDivideBayesianModel()
+    print()
+    reports = []
+    try:
+        for level in [int(n) for n in re.split(r"[,\s]+", args.concurrency.strip()) if n]:
+            api = QueryAPI(driver, model, engine, cache_size=0 if args.no_cache else 1024)
+            report = run_load_test(api, driver, concurrency=level, sessions_per_user=args.sessions,
+                                   steps=args.steps, think_time=args.think_time)
+            reports.append(report)
+            print_report(report)
+            print()
+
+        print("Scaling curve:")
+        print(f"  {'users':>6s} {'views/s':>10s} {'p95 ms':>9s} {'p99 ms':>9s} {'peak sessions':>14s}")
+        for report in reports:
+            print(f"  {report['concurrency']:6d} {report['throughput_per_s']:10.1f} "
+                  f"{report['latency']['p95_ms']:9.2f} {report['latency']['p99_ms']:9.2f} "
+                  f"{report['peak_sessions_in_use']:>14}")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(reports, f, indent=2)
+    finally:
+        if args.backend == "record":
+            driver.save()
+            print(f"\n✓ Recorded {len(driver.responses)} responses to {args.recording}")
+        driver.close()
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Streaming Tiled Infrastructure Map
+Streams road, fiber and access point features from the graph or local files
+and writes a static map: per-zoom GeoJSON tiles with Douglas-Peucker
+simplified lines and grid-clustered markers, popup attributes in shards that
+load on click, and a small Leaflet page that fetches only visible tiles.
+Replaces the single-file Folium map, whose size grows with every asset
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from geometry_cache import douglas_peucker
+
+TILE_SIZE = 256
+
+# Each file holds a 4x4 block of tiles, keeping the file count and request count low at street zooms
+CHUNK_TILES = 4
+CHUNK_PX = TILE_SIZE * CHUNK_TILES
+
+# Statewide overview through street level
+DEFAULT_MIN_ZOOM = 6
+DEFAULT_MAX_ZOOM = 15
+
+# Markers closer than this many pixels merge into one cluster below the max zoom
+CLUSTER_RADIUS_PX = 40
+
+# Lines are simplified to this fraction of a pixel at each zoom
+SIMPLIFY_PX = 0.5
+
+# Popup attributes are split across this many files, fetched on first click
+ATTRIBUTE_SHARDS = 256
+
+DEFAULT_TILE_DIR = "data/tiles"
+
+# Colors match the legend of the original roads map
+INFRASTRUCTURE_COLORS = {
+    'fiber': '#0000FF',
+    'cable': '#00FF00',
+    'dsl': '#FFFF00',
+    'wireless': '#800080',
+    'satellite': '#FFA500',
+    'mixed': '#FF0000',
+    'none': '#808080'
+}
+
+
+def to_pixels(lat, lon, zoom: int):
+    """Web Mercator global pixel coordinates at a zoom (vectorized)"""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878)
+    scale = TILE_SIZE * (2 ** zoom)
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * scale
+    phi = np.radians(lat)
+    y = (1.0 - np.log(np.tan(phi) + 1.0 / np.cos(phi)) / math.pi) / 2.0 * scale
+    return x, y
+
+
+def from_pixels(x, y, zoom: int):
+    """Inverse of to_pixels: (lat, lon)"""
+    scale = TILE_SIZE * (2 ** zoom)
+    lon = np.asarray(x, dtype=np.float64) / scale * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(math.pi * (1.0 - 2.0 * np.asarray(y, dtype=np.float64) / scale))))
+    return lat, lon
+
+
+def category_of(types: List[str]) -> str:
+    types = [t for t in (types or []) if t]
+    if not types:
+        return 'none'
+    if len(set(types)) > 1:
+        return 'mixed'
+    return types[0] if types[0] in INFRASTRUCTURE_COLORS else 'mixed'
+
+
+def attribute_shard(feature_id: str) -> int:
+    return int(hashlib.sha1(feature_id.encode('utf-8')).hexdigest()[:4], 16) % ATTRIBUTE_SHARDS
+
+
+# ===== Feature sources =====
+# Each yields {'id', 'layer', 'category', 'attributes'} plus 'path' (lines) or 'lat'/'lon' (points)
+
+def features_from_roads_map(path: str = "../infrastructure_roads_map.html") -> Iterator[Dict]:
+    """Roads and access points parsed from the existing Folium map"""
+    from ingest_infrastructure import parse_roads_map
+    features = parse_roads_map(path)
+    for road in features['roads']:
+        yield {'id': road['id'], 'layer': 'roads', 'path': road['path'],
+               'category': category_of(road['infrastructure_types']),
+               'attributes': {'Infrastructure Types': ', '.join(road['infrastructure_types']) or 'none',
+                              'Total Locations': road['location_count'],
+                              'Service Providers': ', '.join(road['providers']) or 'Unknown'}}
+    for point in features['access_points']:
+        yield {'id': point['id'], 'layer': 'access_points', 'lat': point['latitude'], 'lon': point['longitude'],
+               'category': category_of([point['technology']]),
+               'attributes': {'Provider': point['provider'], 'Type': point['technology'],
+                              'Locations': point['location_count']}}
+
+
+def features_from_graph(driver) -> Iterator[Dict]:
+    """Road and AccessPoint nodes, streamed record by record"""
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (r:Road) WHERE r.path IS NOT NULL
+            RETURN r.id as id, [p IN r.path | [p.latitude, p.longitude]] as path,
+                   coalesce(r.infrastructure_types, []) as types,
+                   coalesce(r.location_count, 0) as locations, coalesce(r.providers, []) as providers
+        """)
+        for record in result:
+            yield {'id': record['id'], 'layer': 'roads', 'path': record['path'],
+                   'category': category_of(record['types']),
+                   'attributes': {'Infrastructure Types': ', '.join(record['types']) or 'none',
+                                  'Total Locations': record['locations'],
+                                  'Service Providers': ', '.join(record['providers']) or 'Unknown'}}
+    with driver.session() as session:
+        result = session.run("""
+            MATCH (a:AccessPoint) WHERE a.location IS NOT NULL
+            RETURN a.id as id, a.location.latitude as lat, a.location.longitude as lon,
+                   coalesce(a.technology, 'unknown') as technology, coalesce(a.provider, 'Unknown') as provider,
+                   coalesce(a.location_count, 1) as locations
+        """)
+        for record in result:
+            yield {'id': record['id'], 'layer': 'access_points', 'lat': record['lat'], 'lon': record['lon'],
+                   'category': category_of([record['technology']]),
+                   'attributes': {'Provider': record['provider'], 'Type': record['technology'],
+                                  'Locations': record['locations']}}
+
+
+# GeoJSON geometry types the map can draw; polygons and collections are skipped
+LINE_GEOMETRIES = ('LineString', 'MultiLineString')
+POINT_GEOMETRIES = ('Point', 'MultiPoint')
+
+
+def features_from_geojson(paths: Iterable[str]) -> Iterator[Dict]:
+    """
+    LineString features become roads, Point features access points; properties become popups
+
+    Multi-part geometries yield one feature per part. Other geometry types
+    (Polygon, MultiPolygon, GeometryCollection) are skipped and counted.
+    """
+    for path in paths:
+        with open(path) as f:
+            collection = json.load(f)
+        skipped = defaultdict(int)
+        for i, feature in enumerate(collection.get('features', [])):
+            geometry = feature.get('geometry') or {}
+            geometry_type = geometry.get('type')
+            if geometry_type not in LINE_GEOMETRIES + POINT_GEOMETRIES or not geometry.get('coordinates'):
+                skipped[geometry_type or 'empty'] += 1
+                continue
+            props = feature.get('properties') or {}
+            feature_id = str(feature.get('id') or props.get('id') or f"{os.path.basename(path)}-{i}")
+            technology = props.get('technology') or props.get('type')
+            parts = ([geometry['coordinates']] if geometry_type in ('LineString', 'Point') else
+                     geometry['coordinates'])
+            for j, part in enumerate(parts):
+                part_id = feature_id if len(parts) == 1 else f"{feature_id}-{j}"
+                if geometry_type in LINE_GEOMETRIES:
+                    yield {'id': part_id, 'layer': 'roads', 'path': [[lat, lon] for lon, lat, *_ in part],
+                           'category': category_of([technology] if technology else props.get('infrastructure_types')),
+                           'attributes': props}
+                else:
+                    yield {'id': part_id, 'layer': 'access_points', 'lat': part[1], 'lon': part[0],
+                           'category': category_of([technology]), 'attributes': props}
+        if skipped:
+            print(f"  ⚠️  {os.path.basename(path)}: skipped unsupported geometries "
+                  f"({', '.join(f'{n:,} {kind}' for kind, n in sorted(skipped.items()))})")
+
+
+class TileBuilder:
+    """
+    Streams features into per-zoom tiles
+
+    Lines are simplified once per zoom and registered in every tile their
+    pixel bounds touch (the page deduplicates by id). Points are binned
+    into cluster cells per zoom and only emitted individually at the
+    maximum zoom or when alone in their cell.
+
+    Tile features are spooled to one file per zoom as they arrive; write()
+    assembles and writes the tiles one zoom at a time, so only a single
+    zoom level is ever held in memory.
+    """
+
+    def __init__(self, min_zoom: int = DEFAULT_MIN_ZOOM, max_zoom: int = DEFAULT_MAX_ZOOM,
+                 cluster_radius_px: float = CLUSTER_RADIUS_PX, spool_dir: str = None):
+        """
+        Args:
+            spool_dir: Scratch directory for the per-zoom spools; a temporary directory by default
+        """
+        self.zooms = list(range(min_zoom, max_zoom + 1))
+        self.cluster_radius_px = cluster_radius_px
+        self.spool_dir = spool_dir or tempfile.mkdtemp(prefix='map_tiles_')
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.spools = {zoom: open(os.path.join(self.spool_dir, f"{zoom}.jsonl"), 'w') for zoom in self.zooms}
+        self.clusters: Dict[tuple, Dict] = {}
+        self.attributes: Dict[int, Dict[str, Dict]] = defaultdict(dict)
+        self.counts = defaultdict(int)
+        self.bounds = [90.0, 180.0, -90.0, -180.0]
+
+    def _extend_bounds(self, lats, lons):
+        self.bounds = [min(self.bounds[0], float(np.min(lats))), min(self.bounds[1], float(np.min(lons))),
+                       max(self.bounds[2], float(np.max(lats))), max(self.bounds[3], float(np.max(lons)))]
+
+    def add(self, feature: Dict):
+        shard = attribute_shard(feature['id'])
+        self.attributes[shard][feature['id']] = feature.get('attributes', {})
+        self.counts[feature['layer']] += 1
+        if 'path' in feature:
+            self._add_line(feature, shard)
+        else:
+            self._add_point(feature, shard)
+
+    def _add_line(self, feature: Dict, shard: int):
+        path = np.asarray(feature['path'], dtype=np.float64)
+        if len(path) < 2:
+            return
+        self._extend_bounds(path[:, 0], path[:, 1])
+        # Pixels scale by 2 per zoom: project once, then simplify progressively from street level out
+        top = self.zooms[-1]
+        x, y = to_pixels(path[:, 0], path[:, 1], top)
+        pixels = np.column_stack([x, y])
+        for zoom in reversed(self.zooms):
+            pixels_z = pixels / 2 ** (top - zoom)
+            span = pixels_z.max(axis=0) - pixels_z.min(axis=0)
+            # Sub-pixel lines are invisible at this zoom and every zoom below it
+            if span.max() < 1.0:
+                break
+            # Vertices sharing a tolerance-sized cell with their predecessor add nothing at this zoom;
+            # dropping them first (vectorized) leaves far less work for Douglas-Peucker
+            cells = np.floor(pixels_z / SIMPLIFY_PX)
+            distinct = np.ones(len(cells), dtype=bool)
+            distinct[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+            distinct[-1] = True
+            simplified = douglas_peucker(pixels_z[distinct], SIMPLIFY_PX)
+            pixels = simplified * 2 ** (top - zoom)
+            lat, lon = from_pixels(simplified[:, 0], simplified[:, 1], zoom)
+            # A tenth of a pixel of precision is enough at every zoom
+            decimals = max(4, min(7, math.ceil(math.log10(TILE_SIZE * 2 ** zoom / 36.0))))
+            coordinates = np.round(np.column_stack([lon, lat]), decimals).tolist()
+            out = {'type': 'Feature', 'id': feature['id'],
+                   'geometry': {'type': 'LineString', 'coordinates': coordinates},
+                   'properties': {'l': feature['layer'], 'c': feature['category'], 's': shard}}
+            tx0, ty0 = (pixels_z.min(axis=0) // CHUNK_PX).astype(int)
+            tx1, ty1 = (pixels_z.max(axis=0) // CHUNK_PX).astype(int)
+            self._spool(zoom, [[tx, ty] for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)], out)
+
+    def _spool(self, zoom: int, tiles: List[List[int]], feature: Dict):
+        """Append a tile feature and the tiles it belongs to to the zoom's spool"""
+        self.spools[zoom].write(json.dumps([tiles, feature], separators=(',', ':')))
+        self.spools[zoom].write('\n')
+
+    def _add_point(self, feature: Dict, shard: int):
+        lat, lon = float(feature['lat']), float(feature['lon'])
+        self._extend_bounds([lat], [lon])
+        top = self.zooms[-1]
+        top_x, top_y = to_pixels(lat, lon, top)
+        for zoom in self.zooms:
+            x, y = top_x / 2 ** (top - zoom), top_y / 2 ** (top - zoom)
+            if zoom == top:
+                self._spool(zoom, [[int(x // CHUNK_PX), int(y // CHUNK_PX)]],
+                            self._point_feature(feature['id'], lat, lon, feature['layer'], feature['category'], shard))
+                continue
+            cell = (zoom, feature['layer'], int(x // self.cluster_radius_px), int(y // self.cluster_radius_px))
+            cluster = self.clusters.get(cell)
+            if cluster is None:
+                self.clusters[cell] = {'n': 1, 'lat': lat, 'lon': lon, 'categories': {feature['category']},
+                                       'first': (feature['id'], shard, feature['category'])}
+            else:
+                cluster['n'] += 1
+                cluster['lat'] += lat
+                cluster['lon'] += lon
+                cluster['categories'].add(feature['category'])
+
+    @staticmethod
+    def _point_feature(feature_id, lat, lon, layer, category, shard, count=None) -> Dict:
+        props = {'l': layer, 'c': category}
+        if count:
+            props['n'] = count
+        else:
+            props['s'] = shard
+        return {'type': 'Feature', 'id': feature_id,
+                'geometry': {'type': 'Point', 'coordinates': [round(lon, 6), round(lat, 6)]},
+                'properties': props}
+
+    def _cluster_features(self, zoom: int, tiles: Dict[tuple, List[Dict]]):
+        """Add one zoom's clusters to its tiles and release them"""
+        cells = [cell for cell in self.clusters if cell[0] == zoom]
+        for cell in cells:
+            _, layer, cx, cy = cell
+            cluster = self.clusters.pop(cell)
+            n = cluster['n']
+            lat, lon = cluster['lat'] / n, cluster['lon'] / n
+            if n == 1:
+                feature_id, shard, category = cluster['first']
+                feature = self._point_feature(feature_id, lat, lon, layer, category, shard)
+            else:
+                category = next(iter(cluster['categories'])) if len(cluster['categories']) == 1 else 'mixed'
+                feature = self._point_feature(f"cluster-{zoom}-{layer}-{cx}-{cy}", lat, lon, layer, category,
+                                              None, count=n)
+            x, y = to_pixels(lat, lon, zoom)
+            tiles[(int(x // CHUNK_PX), int(y // CHUNK_PX))].append(feature)
+
+    def _zoom_tiles(self, zoom: int) -> Dict[tuple, List[Dict]]:
+        """All tiles of one zoom, read back from its spool plus its clusters"""
+        tiles = defaultdict(list)
+        with open(os.path.join(self.spool_dir, f"{zoom}.jsonl")) as f:
+            for line in f:
+                keys, feature = json.loads(line)
+                for tx, ty in keys:
+                    tiles[(tx, ty)].append(feature)
+        self._cluster_features(zoom, tiles)
+        return tiles
+
+    def write(self, out_dir: str = DEFAULT_TILE_DIR) -> Dict:
+        """
+        Write tile chunks, attribute shards, manifest and viewer page
+
+        Builds into a sibling directory and swaps it in, so a server can keep
+        serving the previous map until the new one is complete.
+
+        Returns:
+            The manifest
+        """
+        for spool in self.spools.values():
+            spool.close()
+        building = out_dir.rstrip('/') + '.building'
+        shutil.rmtree(building, ignore_errors=True)
+        tile_count, total_bytes, largest = 0, 0, 0
+        try:
+            for zoom in self.zooms:
+                tiles = self._zoom_tiles(zoom)
+                for (tx, ty), features in tiles.items():
+                    tile_dir = os.path.join(building, 'tiles', str(zoom), str(tx))
+                    os.makedirs(tile_dir, exist_ok=True)
+                    path = os.path.join(tile_dir, f"{ty}.geojson")
+                    with open(path, 'w') as f:
+                        # dumps uses the C encoder; dump to a file would not
+                        f.write(json.dumps({'type': 'FeatureCollection', 'features': features},
+                                           separators=(',', ':')))
+                    size = os.path.getsize(path)
+                    total_bytes += size
+                    largest = max(largest, size)
+                tile_count += len(tiles)
+                del tiles
+        finally:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+        os.makedirs(os.path.join(building, 'attributes'), exist_ok=True)
+        for shard, attributes in self.attributes.items():
+            with open(os.path.join(building, 'attributes', f"{shard}.json"), 'w') as f:
+                f.write(json.dumps(attributes, separators=(',', ':'), default=str))
+
+        manifest = {
+            'bounds': [[self.bounds[0], self.bounds[1]], [self.bounds[2], self.bounds[3]]],
+            'min_zoom': self.zooms[0],
+            'max_zoom': self.zooms[-1],
+            'tile_size': CHUNK_PX,
+            'colors': INFRASTRUCTURE_COLORS,
+            'features': dict(self.counts),
+            'tiles': tile_count,
+            'tile_bytes': total_bytes,
+            'largest_tile_bytes': largest
+        }
+        with open(os.path.join(building, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        with open(os.path.join(building, 'index.html'), 'w') as f:
+            f.write(VIEWER_HTML)
+
+        previous = out_dir.rstrip('/') + '.previous'
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(out_dir):
+            os.replace(out_dir, previous)
+        os.replace(building, out_dir)
+        shutil.rmtree(previous, ignore_errors=True)
+        return manifest
+
+
+def build_tiles(features: Iterable[Dict], out_dir: str = DEFAULT_TILE_DIR, min_zoom: int = DEFAULT_MIN_ZOOM,
+                max_zoom: int = DEFAULT_MAX_ZOOM) -> Dict:
+    builder = TileBuilder(min_zoom, max_zoom)
+    for feature in features:
+        builder.add(feature)
+    return builder.write(out_dir)
+
+
+# Leaflet viewer: loads the tiles in view, dedupes lines shared by tiles, fetches popups on click
+VIEWER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8"/>
+<meta name="viewport" content="width=device-width, initial-scale=1.0"/>
+<title>Michigan Broadband Infrastructure</title>
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>
+<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+<style>
+html, body, #map {width: 100%; height: 100%; margin: 0; padding: 0;}
+.legend {background: white; padding: 10px; border: 2px solid grey; border-radius: 5px; font-family: Arial; line-height: 20px;}
+.legend i {display: inline-block; width: 15px; height: 15px; margin-right: 5px; vertical-align: middle;}
+</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+(async function () {
+  const manifest = await fetch('manifest.json').then(r => r.json());
+  const map = L.map('map', {preferCanvas: true});
+  L.tileLayer('https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png', {
+    maxZoom: 20,
+    attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>'
+  }).addTo(map);
+  map.fitBounds(manifest.bounds);
+
+  const tileCache = new Map();
+  const shardCache = new Map();
+  const layer = L.layerGroup().addTo(map);
+  const color = c => manifest.colors[c] || manifest.colors.mixed;
+
+  function tileZoom() {
+    return Math.max(manifest.min_zoom, Math.min(manifest.max_zoom, Math.round(map.getZoom())));
+  }
+
+  async function loadTile(key) {
+    if (!tileCache.has(key)) {
+      tileCache.set(key, fetch('tiles/' + key + '.geojson')
+        .then(r => r.ok ? r.json() : {features: []})
+        .catch(() => ({features: []})));
+    }
+    return tileCache.get(key);
+  }
+
+  async function attributes(feature) {
+    const shard = feature.properties.s;
+    if (!shardCache.has(shard)) {
+      shardCache.set(shard, fetch('attributes/' + shard + '.json').then(r => r.json()));
+    }
+    return (await shardCache.get(shard))[feature.id] || {};
+  }
+
+  function escape(value) {
+    const div = document.createElement('div');
+    div.textContent = String(value);
+    return div.innerHTML;
+  }
+
+  async function openPopup(feature, latlng) {
+    const attrs = await attributes(feature);
+    const rows = Object.entries(attrs).map(([k, v]) => '<p><b>' + escape(k) + ':</b> ' + escape(v) + '</p>');
+    L.popup({maxWidth: 400}).setLatLng(latlng).setContent('<div style="max-width: 300px;">' + rows.join('') + '</div>').openOn(map);
+  }
+
+  let generation = 0;
+  async function refresh() {
+    const current = ++generation;
+    const z = tileZoom();
+    const bounds = map.getBounds();
+    const nw = map.project(bounds.getNorthWest(), z).divideBy(manifest.tile_size).floor();
+    const se = map.project(bounds.getSouthEast(), z).divideBy(manifest.tile_size).floor();
+    const keys = [];
+    for (let x = nw.x; x <= se.x; x++) {
+      for (let y = nw.y; y <= se.y; y++) keys.push(z + '/' + x + '/' + y);
+    }
+    const tiles = await Promise.all(keys.map(loadTile));
+    if (current !== generation) return;
+
+    const seen = new Set();
+    const features = [];
+    for (const tile of tiles) {
+      for (const f of tile.features) {
+        if (!seen.has(f.id)) { seen.add(f.id); features.push(f); }
+      }
+    }
+    layer.clearLayers();
+    L.geoJSON({type: 'FeatureCollection', features: features}, {
+      style: f => ({color: color(f.properties.c), weight: 4, opacity: 0.8}),
+      pointToLayer: (f, latlng) => {
+        const n = f.properties.n;
+        const marker = L.circleMarker(latlng, {
+          radius: n ? Math.min(24, 5 + 3 * Math.log2(n)) : 3,
+          color: color(f.properties.c), fillColor: color(f.properties.c), fillOpacity: n ? 0.5 : 0.2, weight: n ? 1 : 3
+        });
+        if (n) marker.bindTooltip(n + ' locations');
+        return marker;
+      },
+      onEachFeature: (f, l) => l.on('click', e => {
+        if (f.properties.n) {
+          map.setView(e.latlng, Math.min(map.getZoom() + 2, manifest.max_zoom));
+        } else {
+          openPopup(f, e.latlng);
+        }
+      })
+    }).addTo(layer);
+  }
+  map.on('moveend', refresh);
+  refresh();
+
+  const legend = L.control({position: 'bottomleft'});
+  legend.onAdd = () => {
+    const div = L.DomUtil.create('div', 'legend');
+    const names = {fiber: 'Fiber', cable: 'Cable', dsl: 'DSL', wireless: 'Wireless', satellite: 'Satellite',
+                   mixed: 'Mixed Types', none: 'No Infrastructure'};
+    div.innerHTML = '<p style="text-align: center; margin: 0"><b>Road Infrastructure Types</b></p>' +
+      Object.entries(names).map(([k, v]) => '<i style="background:' + manifest.colors[k] + '"></i>' + v).join('<br>');
+    return div;
+  };
+  legend.addTo(map);
+})();
+</script>
+</body>
+</html>
+"""
+
+
+# Build the tiled map from the command line
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the tiled infrastructure map")
+    parser.add_argument("--source", choices=["map", "graph", "geojson"], default="map",
+                        help="Roads map HTML (default), Neo4j graph, or GeoJSON files")
+    parser.add_argument("--map", default="../infrastructure_roads_map.html")
+    parser.add_argument("--geojson", nargs="*", default=[])
+    parser.add_argument("--out", default=DEFAULT_TILE_DIR)
+    parser.add_argument("--min-zoom", type=int, default=DEFAULT_MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=DEFAULT_MAX_ZOOM)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Building Tiled Infrastructure Map")
+    print("=" * 60)
+    print()
+
+    try:
+        start = time.perf_counter()
+        if args.source == "graph":
+            from neo4j_connection import get_driver
+            features = features_from_graph(get_driver())
+        elif args.source == "geojson":
+            features = features_from_geojson(args.geojson)
+        else:
+            features = features_from_roads_map(args.map)
+
+        manifest = build_tiles(features, args.out, args.min_zoom, args.max_zoom)
+        print(f"✓ {sum(manifest['features'].values()):,} features "
+              f"({', '.join(f'{n:,} {layer}' for layer, n in manifest['features'].items())})")
+        print(f"✓ {manifest['tiles']:,} tiles, zoom {manifest['min_zoom']}-{manifest['max_zoom']}, "
+              f"{manifest['tile_bytes'] / 1024:,.0f} KB total, largest {manifest['largest_tile_bytes'] / 1024:,.1f} KB")
+        print(f"✓ Built in {time.perf_counter() - start:.1f}s")
+        print()
+        print(f"View: python -m http.server 8700 --directory {args.out}  then open http://localhost:8700")
+    except Exception as e:
+        print(f"❌ Tiled map build failed: {e}")
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Shared Neo4j Connection Management
+One pooled driver per database/user, reused by the dashboard, GraphRAG,
+ingestion and verification scripts, with pool configuration in one place
+and pool metrics exposed. Sessions are instrumented: every query is timed
+per call site and slow ones land in the slow-query log (query_metrics.py)
+"""
+
+from neo4j import GraphDatabase
+from query_metrics import DEFAULT_SLOW_QUERY_LOG, InstrumentedTransaction, QueryRecorder
+from typing import Dict, List
+import atexit
+import hashlib
+import os
+import threading
+
+
+class ConnectionConfig:
+    """
+    Neo4j connection and pool settings
+
+    Values come from arguments, then NEO4J_* environment variables, then
+    defaults suited to a single dashboard host.
+    """
+
+    def __init__(self, uri: str = None, user: str = None, password: str = None, database: str = None,
+                 max_connection_pool_size: int = None, connection_acquisition_timeout: float = None,
+                 max_connection_lifetime: float = None, connection_timeout: float = None,
+                 keep_alive: bool = True, liveness_check_timeout: float = None,
+                 instrument_queries: bool = None, slow_query_ms: float = None,
+                 profile_sample_rate: float = None, slow_query_log: str = None):
+        """
+        Args:
+            uri: Bolt URI
+            user: Username
+            password: Password
+            database: Database name (server default if None)
+            max_connection_pool_size: Connections kept per server
+            connection_acquisition_timeout: Seconds to wait for a free pooled connection
+            max_connection_lifetime: Seconds before a connection is retired and replaced
+            connection_timeout: Seconds allowed to open a new connection (TCP + TLS + handshake)
+            keep_alive: TCP keep-alive on pooled connections
+            liveness_check_timeout: Idle seconds after which a connection is pinged before reuse (neo4j>=5.15)
+            instrument_queries: Time every query per call site (NEO4J_INSTRUMENT_QUERIES=0 disables)
+            slow_query_ms: Queries at or above this many milliseconds go to the slow-query log (0 or "off" disables it)
+            profile_sample_rate: Share of slow queries whose PROFILE/EXPLAIN plan is captured
+            slow_query_log: JSON-lines slow-query log file
+        """
+        env = os.environ.get
+        self.uri = uri or env("NEO4J_URI", "bolt://localhost:7687")
+        self.user = user or env("NEO4J_USERNAME", "neo4j")
+        self.password = password or env("NEO4J_PASSWORD", "password")
+        self.database = database or env("NEO4J_DATABASE") or None
+        self.max_connection_pool_size = int(max_connection_pool_size or env("NEO4J_MAX_POOL_SIZE", 50))
+        self.connection_acquisition_timeout = float(connection_acquisition_timeout or env("NEO4J_ACQUISITION_TIMEOUT", 30))
+        self.max_connection_lifetime = float(max_connection_lifetime or env("NEO4J_MAX_CONNECTION_LIFETIME", 3600))
+        self.connection_timeout = float(connection_timeout or env("NEO4J_CONNECTION_TIMEOUT", 15))
+        self.keep_alive = keep_alive
+        self.liveness_check_timeout = liveness_check_timeout
+        if instrument_queries is None:
+            instrument_queries = env("NEO4J_INSTRUMENT_QUERIES", "1").lower() not in ("0", "false", "no")
+        self.instrument_queries = instrument_queries
+        slow_query_ms = slow_query_ms if slow_query_ms is not None else env("NEO4J_SLOW_QUERY_MS", 250)
+        self.slow_query_ms = None if str(slow_query_ms).strip().lower() in ('', 'off', 'none') \
+            or float(slow_query_ms) <= 0 else float(slow_query_ms)
+        self.profile_sample_rate = float(profile_sample_rate if profile_sample_rate is not None
+                                         else env("NEO4J_PROFILE_SAMPLE_RATE", 0.2))
+        self.slow_query_log = slow_query_log or env("NEO4J_SLOW_QUERY_LOG", DEFAULT_SLOW_QUERY_LOG)
+
+    @classmethod
+    def from_secrets(cls, secrets) -> 'ConnectionConfig':
+        """Build from the [neo4j] section of Streamlit secrets"""
+        section = dict(secrets.get("neo4j", {}))
+        return cls(
+            uri=section.get("uri"),
+            user=section.get("username"),
+            password=section.get("password"),
+            database=section.get("database"),
+            max_connection_pool_size=section.get("max_connection_pool_size"),
+            connection_acquisition_timeout=section.get("connection_acquisition_timeout"),
+            max_connection_lifetime=section.get("max_connection_lifetime"),
+            connection_timeout=section.get("connection_timeout"),
+            keep_alive=section.get("keep_alive", True),
+            liveness_check_timeout=section.get("liveness_check_timeout"),
+            instrument_queries=section.get("instrument_queries"),
+            slow_query_ms=section.get("slow_query_ms"),
+            profile_sample_rate=section.get("profile_sample_rate"),
+            slow_query_log=section.get("slow_query_log")
+        )
+
+    def key(self) -> tuple:
+        """
+        Pool identity: configs that differ in credentials, pool or
+        instrumentation settings get separate drivers instead of silently
+        sharing the first one created (the password enters only as a digest)
+        """
+        settings = self.driver_kwargs()
+        settings['auth'] = (self.user, hashlib.sha256(self.password.encode('utf-8')).hexdigest())
+        return (self.uri, self.database, tuple(sorted(settings.items())), self.instrument_queries,
+                self.slow_query_ms, self.profile_sample_rate, self.slow_query_log)
+
+    def driver_kwargs(self) -> Dict:
+        kwargs = {
+            'auth': (self.user, self.password),
+            'max_connection_pool_size': self.max_connection_pool_size,
+            'connection_acquisition_timeout': self.connection_acquisition_timeout,
+            'max_connection_lifetime': self.max_connection_lifetime,
+            'connection_timeout': self.connection_timeout,
+            'keep_alive': self.keep_alive
+        }
+        if self.liveness_check_timeout is not None:
+            kwargs['liveness_check_timeout'] = self.liveness_check_timeout
+        return kwargs
+
+
+class _TrackedSession:
+    """
+    Session wrapper that reports checkout/return to the shared driver
+
+    run(), execute_read(), execute_write() and begin_transaction() go
+    through the driver's QueryRecorder when instrumentation is on.
+    """
+
+    def __init__(self, owner: 'SharedDriver', session, database: str = None):
+        self._owner = owner
+        self._session = session
+        self._database = database
+        self._pending = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, query, parameters: Dict = None, **kwargs):
+        recorder = self._owner.recorder
+        if recorder is None:
+            return self._session.run(query, parameters, **kwargs)
+        return recorder.run(self._session, self._pending, self._database, None, query, parameters, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._session.execute_read(self._work(work), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._session.execute_write(self._work(work), *args, **kwargs)
+
+    def _work(self, work):
+        recorder = self._owner.recorder
+        return work if recorder is None else recorder.transaction_work(work, self._database)
+
+    def begin_transaction(self, *args, **kwargs):
+        tx = self._session.begin_transaction(*args, **kwargs)
+        recorder = self._owner.recorder
+        return tx if recorder is None else InstrumentedTransaction(tx, recorder, self._database,
+                                                                   kwargs.get('timeout'))
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            for result in self._pending:
+                result._finish()
+            self._pending.clear()
+            self._session.close()
+            self._owner._session_closed()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class SharedDriver:
+    """
+    Reference-counted wrapper around one neo4j Driver
+
+    Behaves like the driver (session(), execute_query(), ...); close()
+    only closes the real driver once every component has released it.
+    """
+
+    def __init__(self, config: ConnectionConfig):
+        self.config = config
+        self.driver = GraphDatabase.driver(config.uri, **config.driver_kwargs())
+        self.recorder = QueryRecorder(self.driver, config.slow_query_ms, config.profile_sample_rate,
+                                      config.slow_query_log) if config.instrument_queries else None
+        self._refs = 0
+        self._lock = threading.Lock()
+        self._stats = {'sessions_opened': 0, 'sessions_in_use': 0, 'peak_sessions_in_use': 0}
+
+    def session(self, **kwargs):
+        """Open a session (database defaults to the configured one)"""
+        if self.config.database and 'database' not in kwargs:
+            kwargs['database'] = self.config.database
+        with self._lock:
+            self._stats['sessions_opened'] += 1
+            self._stats['sessions_in_use'] += 1
+            self._stats['peak_sessions_in_use'] = max(self._stats['peak_sessions_in_use'],
+                                                      self._stats['sessions_in_use'])
+        return _TrackedSession(self, self.driver.session(**kwargs), kwargs.get('database'))
+
+    def _session_closed(self):
+        with self._lock:
+            self._stats['sessions_in_use'] -= 1
+
+    def pool_metrics(self) -> Dict:
+        """
+        Pool utilization: sessions checked out plus live connection counts
+
+        Connection counts read the private driver pool (neo4j 5.x keeps a
+        dict of connection deques in driver._pool.connections) and are
+        reported as None if the driver version does not expose it.
+        """
+        with self._lock:
+            metrics = dict(self._stats)
+        metrics['max_connection_pool_size'] = self.config.max_connection_pool_size
+
+        connections = self._pool_connections()
+        metrics['connections_open'] = None if connections is None else len(connections)
+        metrics['connections_in_use'] = None if connections is None else \
+            sum(1 for c in connections if getattr(c, 'in_use', False))
+
+        in_use = metrics['connections_in_use']
+        if in_use is None:
+            in_use = metrics['sessions_in_use']
+        metrics['pool_utilization'] = round(in_use / self.config.max_connection_pool_size, 3)
+        return metrics
+
+    def _pool_connections(self):
+        """Connections in the driver's private pool, or None if it is not laid out as expected"""
+        pool = getattr(self.driver, '_pool', None)
+        by_address = getattr(pool, 'connections', None)
+        if not isinstance(by_address, dict):
+            return None
+        try:
+            # Copies first: the pool adds and removes connections from other threads
+            return [c for connections in list(by_address.values()) for c in list(connections)]
+        except (RuntimeError, TypeError):
+            return None
+
+    def _acquire(self):
+        with self._lock:
+            self._refs += 1
+        return self
+
+    def close(self):
+        """Release this reference; the last release closes the pool"""
+        with self._lock:
+            self._refs -= 1
+            last = self._refs <= 0
+        if last:
+            _forget(self)
+            if self.recorder is not None:
+                self.recorder.close()
+            self.driver.close()
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+_drivers: Dict[tuple, SharedDriver] = {}
+_drivers_lock = threading.Lock()
+
+
+def get_driver(config: ConnectionConfig = None) -> SharedDriver:
+    """
+    Shared driver for a connection config; created on first use
+
+    Every caller with the same URI, database, credentials and pool
+    settings gets the same pool; a different password or pool size gets
+    its own.
+    Call close() on the result when done (scripts) or keep it for the
+    life of the process (dashboard, API).
+    """
+    config = config or ConnectionConfig()
+    with _drivers_lock:
+        shared = _drivers.get(config.key())
+        if shared is None:
+            shared = SharedDriver(config)
+            _drivers[config.key()] = shared
+        return shared._acquire()
+
+
+def _forget(shared: SharedDriver):
+    with _drivers_lock:
+        if _drivers.get(shared.config.key()) is shared:
+            del _drivers[shared.config.key()]
+
+
+def all_pool_metrics() -> Dict[str, Dict]:
+    """Pool metrics for every shared driver in this process"""
+    with _drivers_lock:
+        drivers = list(_drivers.values())
+    metrics = {}
+    for shared in drivers:
+        # Several pools can share a URI now that settings are part of the key
+        label = shared.config.uri
+        if label in metrics:
+            label = f"{shared.config.uri} ({shared.config.user}@{shared.config.database or 'default'} #{len(metrics)})"
+        metrics[label] = shared.pool_metrics()
+    return metrics
+
+
+@atexit.register
+def _close_all():
+    with _drivers_lock:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+    for shared in drivers:
+        try:
+            if shared.recorder is not None:
+                shared.recorder.close()
+            shared.driver.close()
+        except Exception:
+            pass
+
+
+class PooledGraph:
+    """
+    Graph interface for GraphRAG on top of the shared driver
+
+    Provides query(cypher, params) and get_schema like LangChain's
+    Neo4jGraph, but reuses the shared pool and reads the schema with
+    built-in db.schema procedures (no APOC needed).
+    """
+
+    NODE_PROPERTIES_QUERY = """
+    CALL db.schema.nodeTypeProperties()
+    YIELD nodeLabels, propertyName, propertyTypes
+    WHERE propertyName IS NOT NULL AND size(nodeLabels) = 1
+    RETURN nodeLabels[0] as label, collect({property: propertyName, type: propertyTypes[0]}) as properties
+    """
+
+    REL_PROPERTIES_QUERY = """
+    CALL db.schema.relTypeProperties()
+    YIELD relType, propertyName, propertyTypes
+    WHERE propertyName IS NOT NULL
+    RETURN replace(replace(relType, ':`', ''), '`', '') as type,
+           collect({property: propertyName, type: propertyTypes[0]}) as properties
+    """
+
+    REL_PATTERNS_QUERY = """
+    CALL db.schema.visualization() YIELD relationships
+    UNWIND relationships as r
+    RETURN DISTINCT labels(startNode(r))[0] as start, type(r) as type, labels(endNode(r))[0] as end
+    """
+
+    def __init__(self, driver, database: str = None):
+        self._driver = driver
+        self.database = database
+        self.schema = ""
+        self._schema_loaded = False
+
+    @property
+    def driver(self):
+        """Shared driver, so an injected PooledGraph still gets the guarded execution path"""
+        return self._driver
+
+    def query(self, query: str, params: Dict = None) -> List[Dict]:
+        kwargs = {'database': self.database} if self.database else {}
+        with self._driver.session(**kwargs) as session:
+            return [record.data() for record in session.run(query, params or {})]
+
+    def refresh_schema(self):
+        """Describe labels, properties and relationship patterns for Cypher generation"""
+        nodes = self.query(self.NODE_PROPERTIES_QUERY)
+        rels = self.query(self.REL_PROPERTIES_QUERY)
+        patterns = self.query(self.REL_PATTERNS_QUERY)
+        self.schema = "\n".join([
+            "Node properties are the following:",
+            str({n['label']: n['properties'] for n in nodes}),
+            "Relationship properties are the following:",
+            str({r['type']: r['properties'] for r in rels}),
+            "The relationships are the following:",
+            str([f"(:{p['start']})-[:{p['type']}]->(:{p['end']})" for p in patterns])
+        ])
+        self._schema_loaded = True
+
+    @property
+    def get_schema(self) -> str:
+        if not self._schema_loaded:
+            self.refresh_schema()
+        return self.schema
+
+
+# Show pool settings and metrics from the command line
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Neo4j Connection Pool")
+    print("=" * 60)
+    print()
+
+    config = ConnectionConfig()
+    driver = get_driver(config)
+    try:
+        with driver.session() as session:
+            session.run("RETURN 1").consume()
+        print(f"✓ Connected to {config.uri}")
+        for key, value in driver.pool_metrics().items():
+            print(f"  {key:28s} {value}")
+        if driver.recorder is None:
+            print("  Query instrumentation off")
+        elif config.slow_query_ms is None:
+            print("✓ Queries instrumented; slow-query log off")
+        else:
+            print(f"✓ Queries instrumented; slow-query log {config.slow_query_log} "
+                  f"(>= {config.slow_query_ms:g} ms, plans for {config.profile_sample_rate:.0%})")
+    except Exception as e:
+        print(f"❌ Connection failed: {e}")
+    finally:
+        driver.close()
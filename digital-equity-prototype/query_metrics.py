@@ -0,0 +1,734 @@
+#!/usr/bin/env python3
+"""
+Cypher Query Instrumentation and Slow-Query Log
+Every query issued through the shared driver is attributed to the line of
+code that ran it and recorded in latency histograms with row counts and
+the server's summary counters. Queries above a threshold go to a local
+slow-query log; a sample of them is re-run with PROFILE (EXPLAIN for
+writes) off the request path so the log carries the plan. Metrics are
+exposed as Prometheus text
+"""
+
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from typing import Callable, Dict, List, Optional
+import functools
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import warnings
+
+import neo4j
+from neo4j import READ_ACCESS
+from neo4j.exceptions import ResultNotSingleError
+
+# Histogram bucket upper bounds in seconds (+Inf is implied)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# SummaryCounters fields accumulated per call site
+UPDATE_COUNTERS = ('nodes_created', 'nodes_deleted', 'relationships_created', 'relationships_deleted',
+                   'properties_set', 'labels_added', 'labels_removed', 'indexes_added',
+                   'indexes_removed', 'constraints_added', 'constraints_removed')
+
+DEFAULT_SLOW_QUERY_LOG = "data/slow_queries.jsonl"
+SLOW_LOG_MAX_BYTES = 5 * 1024 * 1024  # rotated to <log>.1 beyond this
+PROFILE_COOLDOWN = 60.0               # seconds between plan captures for one call site
+PROFILE_QUEUE_SIZE = 64               # pending slow-log entries; extras are dropped, not blocked on
+PROFILE_TIMEOUT = 10.0                # transaction timeout (seconds) for plan capture re-runs
+QUERY_TEXT_LIMIT = 500                # characters of Cypher kept per site and log entry
+PARAM_TEXT_LIMIT = 80                 # characters kept per logged parameter value
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Frames in these files are plumbing, not call sites
+_INTERNAL_FILES = {os.path.abspath(__file__),
+                   os.path.join(os.path.dirname(os.path.abspath(__file__)), 'neo4j_connection.py')}
+_NEO4J_DIR = os.path.dirname(os.path.abspath(neo4j.__file__))
+
+
+def call_site() -> str:
+    """file.py:function:line of the innermost frame outside the driver plumbing"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename not in _INTERNAL_FILES and not filename.startswith(_NEO4J_DIR):
+            return f"{os.path.basename(filename)}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def query_text(query) -> str:
+    """Whitespace-normalized Cypher for a str or neo4j.Query"""
+    text = getattr(query, 'text', query)
+    return " ".join(str(text).split())[:QUERY_TEXT_LIMIT]
+
+
+def summarize_params(parameters: Optional[Dict]) -> Dict:
+    """Loggable parameters: lists reduced to their length, long values truncated"""
+    summary = {}
+    for name, value in (parameters or {}).items():
+        if isinstance(value, (list, tuple)):
+            summary[name] = f"<list of {len(value)}>"
+        elif isinstance(value, dict):
+            summary[name] = f"<map of {len(value)}>"
+        else:
+            text = repr(value)
+            summary[name] = text if len(text) <= PARAM_TEXT_LIMIT else text[:PARAM_TEXT_LIMIT] + "..."
+    return summary
+
+
+def render_plan(plan: Dict, depth: int = 0) -> List[str]:
+    """Indented operator tree for a PROFILE/EXPLAIN plan dict"""
+    args = plan.get('args') or {}
+    line = "  " * depth + "+" + plan.get('operatorType', '?')
+    details = args.get('Details')
+    if details:
+        line += f" {str(details)[:120]}"
+    stats = []
+    if 'rows' in plan:
+        stats.append(f"rows={plan['rows']}")
+    if 'dbHits' in plan:
+        stats.append(f"dbHits={plan['dbHits']}")
+    if args.get('EstimatedRows') is not None:
+        stats.append(f"est={float(args['EstimatedRows']):.0f}")
+    if stats:
+        line += f"  [{', '.join(stats)}]"
+    lines = [line]
+    for child in plan.get('children') or []:
+        lines.extend(render_plan(child, depth + 1))
+    return lines
+
+
+def total_db_hits(plan: Dict) -> int:
+    return plan.get('dbHits', 0) + sum(total_db_hits(child) for child in plan.get('children') or [])
+
+
+# ===== Metrics registry =====
+
+class _SiteStats:
+    """Histogram and counters for one call site"""
+
+    __slots__ = ('query', 'buckets', 'count', 'seconds', 'max_seconds', 'server_ms', 'rows',
+                 'errors', 'slow', 'updates', 'query_types')
+
+    def __init__(self, query: str, bucket_count: int):
+        self.query = query
+        self.buckets = [0] * (bucket_count + 1)  # last slot is the +Inf overflow
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.server_ms = 0
+        self.rows = 0
+        self.errors = 0
+        self.slow = 0
+        self.updates = dict.fromkeys(UPDATE_COUNTERS, 0)
+        self.query_types = {}
+
+
+class QueryMetrics:
+    """
+    Process-wide per-call-site query metrics
+
+    Shared by every driver in the process; a call site is the code
+    location that issued the query, so the same line reports one series
+    however many sessions it runs in.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._sites: Dict[str, _SiteStats] = {}
+        self._lock = threading.Lock()
+        self.profiles = {'captured': 0, 'failed': 0, 'dropped': 0}
+
+    def observe(self, site: str, query: str, seconds: float, rows: int, summary=None,
+                error: bool = False, slow: bool = False):
+        """Record one finished query"""
+        slot = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self._lock:
+            stats = self._sites.get(site)
+            if stats is None:
+                stats = self._sites[site] = _SiteStats(query, len(self.buckets))
+            stats.buckets[slot] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows
+            stats.errors += int(error)
+            stats.slow += int(slow)
+            if summary is not None:
+                stats.server_ms += (summary.result_available_after or 0) + (summary.result_consumed_after or 0)
+                if summary.query_type:
+                    stats.query_types[summary.query_type] = stats.query_types.get(summary.query_type, 0) + 1
+                counters = summary.counters
+                for name in UPDATE_COUNTERS:
+                    stats.updates[name] += getattr(counters, name, 0) or 0
+
+    def count_profile(self, outcome: str):
+        with self._lock:
+            self.profiles[outcome] += 1
+
+    def reset(self):
+        with self._lock:
+            self._sites.clear()
+            self.profiles = dict.fromkeys(self.profiles, 0)
+
+    def _quantile(self, stats: _SiteStats, q: float) -> float:
+        """histogram_quantile-style estimate, capped at the observed maximum"""
+        rank = q * stats.count
+        cumulative, lower = 0, 0.0
+        for bound, n in zip(self.buckets + (stats.max_seconds,), stats.buckets):
+            if n and cumulative + n >= rank:
+                return min(lower + (bound - lower) * (rank - cumulative) / n, stats.max_seconds)
+            cumulative += n
+            lower = bound
+        return stats.max_seconds
+
+    def snapshot(self) -> List[Dict]:
+        """Per-site summary rows, slowest total time first"""
+        with self._lock:
+            rows = [{
+                'site': site,
+                'query': stats.query,
+                'count': stats.count,
+                'total_ms': round(stats.seconds * 1000, 1),
+                'mean_ms': round(stats.seconds * 1000 / stats.count, 2),
+                'p50_ms': round(self._quantile(stats, 0.5) * 1000, 2),
+                'p95_ms': round(self._quantile(stats, 0.95) * 1000, 2),
+                'max_ms': round(stats.max_seconds * 1000, 2),
+                'server_ms': stats.server_ms,
+                'rows': stats.rows,
+                'errors': stats.errors,
+                'slow': stats.slow,
+                'updates': {name: value for name, value in stats.updates.items() if value},
+                'query_types': dict(stats.query_types)
+            } for site, stats in self._sites.items() if stats.count]
+        return sorted(rows, key=lambda row: -row['total_ms'])
+
+    def top(self, n: int = 10, by: str = 'total_ms') -> List[Dict]:
+        """The n call sites with the highest value of a snapshot column"""
+        return sorted(self.snapshot(), key=lambda row: -row[by])[:n]
+
+    def render_prometheus(self, pool_metrics: Dict[str, Dict] = None) -> str:
+        """Prometheus text exposition of the histograms, counters and pool gauges"""
+        with self._lock:
+            sites = [(site, stats.buckets[:], stats.count, stats.seconds, stats.server_ms, stats.rows,
+                      stats.errors, stats.slow, dict(stats.updates))
+                     for site, stats in sorted(self._sites.items())]
+            profiles = dict(self.profiles)
+
+        lines = ["# HELP neo4j_query_duration_seconds Cypher latency from run() to the last record, per call site",
+                 "# TYPE neo4j_query_duration_seconds histogram"]
+        for site, buckets, count, seconds, *_ in sites:
+            label = f'site="{_escape(site)}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets, buckets):
+                cumulative += n
+                lines.append(f'neo4j_query_duration_seconds_bucket{{{label},le="{bound:g}"}} {cumulative}')
+            lines.append(f'neo4j_query_duration_seconds_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f'neo4j_query_duration_seconds_sum{{{label}}} {seconds:.6f}')
+            lines.append(f'neo4j_query_duration_seconds_count{{{label}}} {count}')
+
+        counters = [
+            ('neo4j_query_server_seconds_total', "Server-reported time to first and last record", 4, 0.001),
+            ('neo4j_query_rows_total', "Records returned to the client", 5, 1),
+            ('neo4j_query_errors_total', "Queries that raised", 6, 1),
+            ('neo4j_slow_queries_total', "Queries above the slow-query threshold", 7, 1),
+        ]
+        for name, help_text, index, scale in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for site_row in sites:
+                value = site_row[index] * scale
+                lines.append(f'{name}{{site="{_escape(site_row[0])}"}} {value:g}')
+
+        lines += ["# HELP neo4j_query_updates_total Result summary update counters",
+                  "# TYPE neo4j_query_updates_total counter"]
+        for site, *_, updates in sites:
+            for counter, value in updates.items():
+                if value:
+                    lines.append(f'neo4j_query_updates_total{{site="{_escape(site)}",counter="{counter}"}} {value}')
+
+        lines += ["# HELP neo4j_slow_query_profiles_total Slow-query plan captures by outcome",
+                  "# TYPE neo4j_slow_query_profiles_total counter"]
+        for outcome, value in profiles.items():
+            lines.append(f'neo4j_slow_query_profiles_total{{outcome="{outcome}"}} {value}')
+
+        gauges = ('sessions_in_use', 'peak_sessions_in_use', 'connections_open', 'connections_in_use',
+                  'max_connection_pool_size', 'pool_utilization')
+        for name in gauges:
+            lines += [f"# TYPE neo4j_pool_{name} gauge"]
+            for uri, metrics in sorted((pool_metrics or {}).items()):
+                if metrics.get(name) is not None:
+                    lines.append(f'neo4j_pool_{name}{{uri="{_escape(uri)}"}} {metrics[name]:g}')
+        lines += ["# TYPE neo4j_pool_sessions_opened_total counter"]
+        for uri, metrics in sorted((pool_metrics or {}).items()):
+            lines.append(f'neo4j_pool_sessions_opened_total{{uri="{_escape(uri)}"}} {metrics["sessions_opened"]}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+QUERY_METRICS = QueryMetrics()
+
+
+# ===== Slow-query log =====
+
+class SlowQueryLog:
+    """
+    JSON-lines log of queries above the threshold, with sampled plans
+
+    Entries are written by a daemon worker so the query path only pays
+    for a queue put. A sampled entry, at most once per site per
+    PROFILE_COOLDOWN, re-runs the query with a PROFILE_TIMEOUT transaction
+    timeout: PROFILE for read-only queries (summary query_type 'r') in a
+    read session, EXPLAIN for anything that writes so nothing is executed
+    twice. Queries that ran under their own timeout (cypher_guard's
+    generated queries, Query(timeout=...)) are deliberately bounded by
+    their caller, so they only get EXPLAIN too.
+    """
+
+    def __init__(self, driver, path: str = DEFAULT_SLOW_QUERY_LOG, sample_rate: float = 0.2,
+                 cooldown: float = PROFILE_COOLDOWN, registry: QueryMetrics = QUERY_METRICS):
+        """
+        Args:
+            driver: Raw neo4j Driver used for plan captures (never instrumented)
+            path: JSON-lines log file
+            sample_rate: Share of slow queries whose plan is captured
+            cooldown: Minimum seconds between plan captures for one call site
+            registry: Metrics registry that counts capture outcomes
+        """
+        self.driver = driver
+        self.path = path
+        self.sample_rate = sample_rate
+        self.cooldown = cooldown
+        self.registry = registry
+        self._last_profiled: Dict[str, float] = {}
+        self._queue = queue.Queue(maxsize=PROFILE_QUEUE_SIZE)
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, site: str, query, parameters: Optional[Dict], database: Optional[str],
+               seconds: float, rows: int, summary=None, error: bool = False, timeout: float = None):
+        now = time.monotonic()
+        profile = False
+        if not error and summary is not None and random.random() < self.sample_rate:
+            with self._lock:
+                if now - self._last_profiled.get(site, -self.cooldown) >= self.cooldown:
+                    self._last_profiled[site] = now
+                    profile = True
+        entry = {
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'site': site,
+            'duration_ms': round(seconds * 1000, 2),
+            'server_ms': ((summary.result_available_after or 0) + (summary.result_consumed_after or 0)
+                          if summary is not None else None),
+            'rows': rows,
+            'error': error,
+            'query_type': summary.query_type if summary is not None else None,
+            'updates': ({name: getattr(summary.counters, name) for name in UPDATE_COUNTERS
+                         if getattr(summary.counters, name, 0)} if summary is not None else {}),
+            'database': database,
+            'timeout': timeout,
+            'query': query_text(query),
+            'params': summarize_params(parameters)
+        }
+        self._start()
+        try:
+            self._queue.put_nowait((entry, getattr(query, 'text', query), parameters if profile else None, profile))
+        except queue.Full:
+            self.registry.count_profile('dropped')
+
+    def _start(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            entry, text, parameters, profile = item
+            if profile:
+                self._capture_plan(entry, text, parameters)
+            try:
+                self._write(entry)
+            except OSError:
+                pass
+
+    def _capture_plan(self, entry: Dict, text: str, parameters: Optional[Dict]):
+        mode = 'PROFILE' if entry['query_type'] == 'r' and entry['timeout'] is None else 'EXPLAIN'
+        entry['plan_mode'] = mode
+        stripped = text.lstrip()
+        if stripped[:7].upper() == 'PROFILE' and mode == 'EXPLAIN':
+            stripped = stripped[7:].lstrip()
+        if not stripped[:7].upper().startswith(('EXPLAIN', 'PROFILE')):
+            stripped = f"{mode} {stripped}"
+        kwargs = {'database': entry['database']} if entry['database'] else {}
+        try:
+            with self.driver.session(default_access_mode=READ_ACCESS, **kwargs) as session:
+                summary = session.run(neo4j.Query(stripped, timeout=PROFILE_TIMEOUT), parameters or {}).consume()
+            plan = summary.profile or summary.plan or {}
+            entry['plan'] = render_plan(plan)
+            if summary.profile:
+                entry['db_hits'] = total_db_hits(summary.profile)
+            self.registry.count_profile('captured')
+        except Exception as e:
+            entry['plan_error'] = f"{type(e).__name__}: {e}"
+            self.registry.count_profile('failed')
+
+    def _write(self, entry: Dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) > SLOW_LOG_MAX_BYTES:
+            os.replace(self.path, self.path + ".1")
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending entries (plan captures included) and stop the worker"""
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join(timeout)
+
+
+def read_slow_log(path: str = DEFAULT_SLOW_QUERY_LOG, limit: int = None) -> List[Dict]:
+    """Slow-query log entries, oldest first (the last `limit` if given)"""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return entries[-limit:] if limit else entries
+
+
+def summarize_slow_log(entries: List[Dict]) -> List[Dict]:
+    """Slow-log entries grouped by call site, worst total time first"""
+    groups: Dict[str, Dict] = {}
+    for entry in entries:
+        group = groups.setdefault(entry['site'], {'site': entry['site'], 'query': entry['query'],
+                                                  'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                                  'plans': 0})
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        group['plans'] += int('plan' in entry)
+    return sorted(groups.values(), key=lambda g: -g['total_ms'])
+
+
+# ===== Instrumented results and transactions =====
+
+class InstrumentedResult:
+    """
+    Result wrapper that counts records and times the query to completion
+
+    A query finishes when its records are exhausted, when a consuming
+    method (single, data, value, values, consume) is called, or when the
+    owning session/transaction runs the next query or closes. A result
+    still open at the next run() is buffered, as the driver itself does,
+    so later iteration still sees every record.
+    """
+
+    def __init__(self, result, recorder: 'QueryRecorder', site: str, query, parameters,
+                 database: Optional[str], started: float, timeout: float = None):
+        self._result = result
+        self._records = iter(result)
+        self._recorder = recorder
+        self._site = site
+        self._query = query
+        self._parameters = parameters
+        self._database = database
+        self._started = started
+        self._timeout = timeout
+        self._rows = 0
+        self._buffer = None
+        self._summary = None
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._buffer is not None:
+            if self._buffer:
+                return self._buffer.popleft()
+            raise StopIteration
+        try:
+            record = next(self._records)
+        except StopIteration:
+            self._finish()
+            raise
+        except Exception:
+            self._finish(error=True)
+            raise
+        self._rows += 1
+        return record
+
+    def _finish(self, error: bool = False):
+        if self._done:
+            return
+        self._done = True
+        seconds = time.perf_counter() - self._started
+        if not error:
+            try:
+                self._summary = self._result.consume()
+            except Exception:
+                error = True
+        self._recorder.record(self._site, self._query, self._parameters, self._database, seconds,
+                              self._rows, self._summary, error, self._timeout)
+        self._parameters = None
+
+    def _settle(self):
+        """Buffer any unread records and finish (the next query is about to run)"""
+        if self._done:
+            return
+        try:
+            remaining = list(self._records)
+        except Exception:
+            self._finish(error=True)
+            return
+        self._rows += len(remaining)
+        self._buffer = deque(remaining)
+        self._finish()
+
+    def keys(self):
+        return self._result.keys()
+
+    def consume(self):
+        self._finish()
+        self._buffer = deque()
+        return self._summary
+
+    def single(self, strict: bool = False):
+        records = list(islice(self, 2))
+        self.consume()
+        if len(records) != 1:
+            message = "No records found" if not records else "More than one record found"
+            if strict:
+                raise ResultNotSingleError(self, message)
+            if records:
+                warnings.warn(message)
+        return records[0] if records else None
+
+    def fetch(self, n: int):
+        return list(islice(self, n))
+
+    def peek(self):
+        self._settle()
+        return self._buffer[0] if self._buffer else None
+
+    def data(self, *keys):
+        return [record.data(*keys) for record in self]
+
+    def value(self, key=0, default=None):
+        return [record.value(key, default) for record in self]
+
+    def values(self, *keys):
+        return [record.values(*keys) for record in self]
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+
+class InstrumentedTransaction:
+    """Transaction wrapper whose run() is timed; open results finish at commit/rollback/close"""
+
+    def __init__(self, tx, recorder: 'QueryRecorder', database: Optional[str], timeout: float = None):
+        self._tx = tx
+        self._recorder = recorder
+        self._database = database
+        self._timeout = timeout
+        self._pending: List[InstrumentedResult] = []
+
+    def run(self, query, parameters: Dict = None, **kwargs):
+        return self._recorder.run(self._tx, self._pending, self._database, self._timeout, query,
+                                  parameters, **kwargs)
+
+    def _finish_results(self):
+        for result in self._pending:
+            result._finish()
+        self._pending.clear()
+
+    def commit(self):
+        self._finish_results()
+        return self._tx.commit()
+
+    def rollback(self):
+        self._finish_results()
+        return self._tx.rollback()
+
+    def close(self):
+        self._finish_results()
+        return self._tx.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._finish_results()
+        return self._tx.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+
+class QueryRecorder:
+    """
+    Times queries for one shared driver and feeds the metrics registry
+
+    Args:
+        driver: Raw neo4j Driver (used for slow-query plan captures)
+        slow_query_ms: Threshold for the slow-query log (None disables it)
+        sample_rate: Share of slow queries whose plan is captured
+        log_path: Slow-query log file
+        registry: Metrics registry (process-wide by default)
+    """
+
+    def __init__(self, driver, slow_query_ms: Optional[float] = 250.0, sample_rate: float = 0.2,
+                 log_path: str = DEFAULT_SLOW_QUERY_LOG, registry: QueryMetrics = QUERY_METRICS):
+        self.registry = registry
+        self.slow_query_ms = slow_query_ms
+        self.slow_log = SlowQueryLog(driver, log_path, sample_rate, registry=registry) \
+            if slow_query_ms is not None else None
+
+    def run(self, target, pending: List[InstrumentedResult], database: Optional[str],
+            timeout: Optional[float], query, parameters: Dict = None, **kwargs) -> InstrumentedResult:
+        """
+        run() on a session or transaction, settling its previous results first
+
+        timeout is the transaction timeout the caller imposed, if any
+        (Query(timeout=...), @unit_of_work or begin_transaction).
+        """
+        timeout = getattr(query, 'timeout', None) or timeout
+        site = call_site()
+        for previous in pending:
+            previous._settle()
+        pending.clear()
+        started = time.perf_counter()
+        try:
+            result = target.run(query, parameters, **kwargs)
+        except Exception:
+            self.record(site, query, parameters, database, time.perf_counter() - started, 0, None, True, timeout)
+            raise
+        wrapped = InstrumentedResult(result, self, site, query, parameters, database, started, timeout)
+        pending.append(wrapped)
+        return wrapped
+
+    def transaction_work(self, work: Callable, database: Optional[str]) -> Callable:
+        """Wrap an execute_read/execute_write work function so its tx.run calls are timed"""
+        # @unit_of_work(timeout=...) stores the timeout on the work function
+        timeout = getattr(work, 'timeout', None)
+
+        # wraps copies timeout/metadata too: the session reads them from the function it is handed
+        @functools.wraps(work)
+        def instrumented(tx, *args, **kwargs):
+            itx = InstrumentedTransaction(tx, self, database, timeout)
+            try:
+                return work(itx, *args, **kwargs)
+            finally:
+                itx._finish_results()
+        return instrumented
+
+    def record(self, site: str, query, parameters, database, seconds: float, rows: int,
+               summary=None, error: bool = False, timeout: float = None):
+        slow = self.slow_query_ms is not None and seconds * 1000 >= self.slow_query_ms
+        self.registry.observe(site, query_text(query), seconds, rows, summary, error, slow)
+        if slow:
+            self.slow_log.submit(site, query, parameters, database, seconds, rows, summary, error, timeout)
+
+    def close(self):
+        if self.slow_log is not None:
+            self.slow_log.close()
+
+
+# ===== Exposition =====
+
+def metrics_text() -> str:
+    """Prometheus text for this process: query metrics plus every shared pool"""
+    from neo4j_connection import all_pool_metrics
+    return QUERY_METRICS.render_prometheus(all_pool_metrics())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0].rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        data = metrics_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a daemon thread (once per process)
+
+    For processes without their own HTTP API, such as the Streamlit
+    dashboard, so Prometheus can scrape them.
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics-server",
+                             daemon=True).start()
+        return _metrics_server
+
+
+# Inspect the slow-query log from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize the Cypher slow-query log")
+    parser.add_argument("--log", default=os.environ.get("NEO4J_SLOW_QUERY_LOG", DEFAULT_SLOW_QUERY_LOG))
+    parser.add_argument("--top", type=int, default=10, help="Call sites to list")
+    parser.add_argument("--tail", type=int, default=0, help="Also print the last N entries with plans")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Cypher Slow-Query Log")
+    print("=" * 60)
+    print()
+
+    try:
+        entries = read_slow_log(args.log)
+        if not entries:
+            print(f"No slow queries logged in {args.log}")
+        else:
+            print(f"✓ {len(entries)} slow queries in {args.log} ({entries[0]['ts']} .. {entries[-1]['ts']})")
+            print()
+            print(f"{'call site':48s} {'count':>6s} {'total ms':>10s} {'max ms':>9s} {'plans':>6s}")
+            for group in summarize_slow_log(entries)[:args.top]:
+                print(f"{group['site'][:48]:48s} {group['count']:6d} {group['total_ms']:10.0f} "
+                      f"{group['max_ms']:9.0f} {group['plans']:6d}")
+                print(f"  {group['query'][:100]}")
+            for entry in entries[-args.tail:] if args.tail else []:
+                print()
+                print(f"{entry['ts']}  {entry['site']}  {entry['duration_ms']:.0f} ms  rows={entry['rows']}")
+                print(f"  {entry['query'][:200]}")
+                if entry.get('params'):
+                    print(f"  params: {entry['params']}")
+                for line in entry.get('plan', []):
+                    print(f"    {line}")
+                if entry.get('plan_error'):
+                    print(f"  plan capture failed: {entry['plan_error']}")
+    except Exception as e:
+        print(f"❌ Reading slow-query log failed: {e}")
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Service Gap Cube for Digital Equity Planning
+Answers "which populations in which counties lack which services" by counting
+providers for every region x population x service triple with sparse
+incidence products, weighting each gap by the people affected, and
+materializing the ranked gaps as ServiceGap rows for the dashboard
+"""
+
+from typing import Dict, List, Tuple
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Region property giving each population's share of residents (Census / ACS estimates)
+POPULATION_SHARES = {
+    'Seniors': 'senior_population_pct',
+    'Low-Income Families': 'poverty_rate',
+    'Rural Residents': 'rural_percentage',
+    'Job Seekers': 'unemployment_rate',
+    'Students': 'student_population_pct'
+}
+# Share assumed when a region has no estimate for a population
+DEFAULT_POPULATION_SHARE = 0.1
+
+# Fewer local providers than this counts as a gap
+MIN_PROVIDERS = 1
+
+# Ranked gaps kept for the dashboard; the cube itself is never stored
+MAX_GAP_ROWS = 5000
+WRITE_BATCH = 1000
+
+EDGES_QUERY = """
+MATCH (o:Organization)-[:{rel}]->(t:{label})
+RETURN elementId(o) as org, t.name as target
+"""
+
+
+class GapCube:
+    """
+    Provider counts for every region x population x service triple
+
+    With incidence matrices R (orgs x regions), P (orgs x populations) and
+    S (orgs x services), the cube is
+
+        C = R^T (P * S)
+
+    where P * S is the row-wise Kronecker product (orgs x populations*services):
+    an organization provides each of its services to each population it serves.
+    Organizations without populations count for every population. Those
+    without a region are statewide; they are tallied separately, so
+    statewide or virtual coverage does not hide a missing local provider.
+    """
+
+    def __init__(self, organizations: List[str], regions: List[str], populations: List[str], services: List[str],
+                 org_regions: pd.DataFrame, org_populations: pd.DataFrame, org_services: pd.DataFrame):
+        """
+        Args:
+            organizations, regions, populations, services: Axis labels
+            org_regions, org_populations, org_services: Edge lists with org and target columns
+        """
+        self.organizations = list(organizations)
+        self.regions = list(regions)
+        self.populations = list(populations)
+        self.services = list(services)
+        org_index = pd.Index(self.organizations)
+        self.R = self._incidence(org_index, pd.Index(self.regions), org_regions, fill_missing=False)
+        self.statewide = np.asarray(self.R.sum(axis=1)).ravel() == 0
+        self.P = self._incidence(org_index, pd.Index(self.populations), org_populations, fill_missing=True)
+        self.S = self._incidence(org_index, pd.Index(self.services), org_services, fill_missing=False)
+
+    @staticmethod
+    def _incidence(org_index: pd.Index, target_index: pd.Index, edges: pd.DataFrame,
+                   fill_missing: bool) -> sparse.csr_matrix:
+        """0/1 orgs x targets; orgs with no edge get a full row when fill_missing"""
+        rows = org_index.get_indexer(edges['org'])
+        cols = target_index.get_indexer(edges['target'])
+        keep = (rows >= 0) & (cols >= 0)
+        rows, cols = rows[keep], cols[keep]
+        if fill_missing and len(target_index):
+            missing = np.setdiff1d(np.arange(len(org_index)), rows)
+            rows = np.concatenate([rows, np.repeat(missing, len(target_index))])
+            cols = np.concatenate([cols, np.tile(np.arange(len(target_index)), len(missing))])
+        matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(org_index), len(target_index)))
+        matrix.data[:] = 1.0
+        return matrix
+
+    def provider_counts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Dense (regions, populations, services) local and (populations, services) statewide provider counts"""
+        P, S = self.P.tocsr(), self.S.tocsr()
+        # Row-wise Kronecker: every (population, service) pair of each org
+        p_rows = np.repeat(np.arange(P.shape[0]), np.diff(P.indptr))
+        s_rows = np.repeat(np.arange(S.shape[0]), np.diff(S.indptr))
+        p_edges = pd.DataFrame({'org': p_rows, 'p': P.indices})
+        s_edges = pd.DataFrame({'org': s_rows, 's': S.indices})
+        pairs = p_edges.merge(s_edges, on='org')
+        n_services = len(self.services)
+        PS = sparse.csr_matrix((np.ones(len(pairs)), (pairs['org'], pairs['p'] * n_services + pairs['s'])),
+                               shape=(len(self.organizations), len(self.populations) * n_services))
+        cube = (self.R.T @ PS).toarray()
+        statewide = PS.T @ self.statewide.astype(np.float64)
+        return (cube.reshape(len(self.regions), len(self.populations), n_services),
+                statewide.reshape(len(self.populations), n_services))
+
+    def gaps(self, affected: np.ndarray, min_providers: int = MIN_PROVIDERS) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Ranked gaps, weighted by the people affected
+
+        Only (population, service) pairs offered somewhere in the state are
+        considered, so the cube reflects needs the graph knows about rather
+        than every combination. A gap is fewer than min_providers local
+        providers; gap_score is affected / (1 + local + statewide providers).
+
+        Args:
+            affected: (regions, populations) residents in each population
+
+        Returns:
+            (gaps DataFrame sorted by gap_score, summary counts)
+        """
+        counts, statewide = self.provider_counts()
+        offered = (counts.sum(axis=0) + statewide) > 0
+        is_gap = (counts < min_providers) & offered[None, :, :] & (affected[:, :, None] > 0)
+        r, p, s = np.nonzero(is_gap)
+        providers = counts[r, p, s]
+        statewide_providers = statewide[p, s]
+        people = affected[r, p]
+        frame = pd.DataFrame({
+            'region': np.asarray(self.regions, dtype=object)[r],
+            'population': np.asarray(self.populations, dtype=object)[p],
+            'service': np.asarray(self.services, dtype=object)[s],
+            'providers': providers.astype(np.int64),
+            'statewide_providers': statewide_providers.astype(np.int64),
+            'affected_population': np.round(people).astype(np.int64),
+            'gap_score': people / (1.0 + providers + statewide_providers)
+        }).sort_values(['gap_score', 'region', 'population', 'service'],
+                       ascending=[False, True, True, True], ignore_index=True)
+        summary = {
+            'triples': int(counts.size),
+            'offered_triples': int(offered.sum() * len(self.regions)),
+            'gaps': int(len(frame)),
+            'affected_population': int(frame.drop_duplicates(['region', 'population'])['affected_population'].sum())
+        }
+        return frame, summary
+
+
+def affected_population(regions: pd.DataFrame, populations: List[str],
+                        demand: pd.DataFrame = None) -> np.ndarray:
+    """
+    (regions, populations) resident counts
+
+    Uses explicit counts (region, population, count rows, e.g. from ACS tables)
+    where given, else region population x the POPULATION_SHARES property,
+    else DEFAULT_POPULATION_SHARE.
+    """
+    total = pd.to_numeric(regions['population'], errors='coerce').fillna(0.0).to_numpy()
+    affected = np.empty((len(regions), len(populations)))
+    for j, name in enumerate(populations):
+        column = POPULATION_SHARES.get(name)
+        share = (pd.to_numeric(regions[column], errors='coerce') if column in regions
+                 else pd.Series(np.nan, index=regions.index))
+        affected[:, j] = total * share.fillna(DEFAULT_POPULATION_SHARE).to_numpy()
+    if demand is not None and len(demand):
+        r = pd.Index(regions['name']).get_indexer(demand['region'])
+        p = pd.Index(populations).get_indexer(demand['population'])
+        keep = (r >= 0) & (p >= 0)
+        affected[r[keep], p[keep]] = pd.to_numeric(demand['count']).to_numpy()[keep]
+    return affected
+
+
+# ===== Graph I/O =====
+
+def fetch_cube_inputs(session, level: str = 'county') -> Dict:
+    """Axis labels, incidence edges and region demographics from the graph"""
+    share_columns = sorted(set(POPULATION_SHARES.values()))
+    regions = pd.DataFrame(session.run(
+        "MATCH (r:GeographicRegion) WHERE r.type = $level "
+        "RETURN r.name as name, r.population as population, "
+        + ", ".join(f"r.{column} as {column}" for column in share_columns) + " ORDER BY name",
+        {'level': level}).data(), columns=['name', 'population'] + share_columns)
+    organizations = [row['id'] for row in session.run("MATCH (o:Organization) RETURN elementId(o) as id")]
+    populations = [row['name'] for row in session.run("MATCH (p:Population) RETURN p.name as name ORDER BY name")]
+    services = [row['name'] for row in session.run("MATCH (s:Service) RETURN s.name as name ORDER BY name")]
+
+    def edges(rel, label):
+        return pd.DataFrame(session.run(EDGES_QUERY.format(rel=rel, label=label)).data(), columns=['org', 'target'])
+
+    org_regions = edges('LOCATED_IN', 'GeographicRegion')
+    return {
+        'regions': regions,
+        'organizations': organizations,
+        'populations': populations,
+        'services': services,
+        'org_regions': org_regions[org_regions['target'].isin(regions['name'])],
+        'org_populations': edges('SERVES_POPULATION', 'Population'),
+        'org_services': edges('PROVIDES_SERVICE', 'Service')
+    }
+
+
+def build_gap_cube(inputs: Dict) -> GapCube:
+    return GapCube(inputs['organizations'], inputs['regions']['name'].tolist(), inputs['populations'],
+                   inputs['services'], inputs['org_regions'], inputs['org_populations'], inputs['org_services'])
+
+
+def _write_gaps(tx, rows: List[Dict], summary: Dict) -> int:
+    tx.run("MATCH (g:ServiceGap) DELETE g")
+    for i in range(0, len(rows), WRITE_BATCH):
+        tx.run("""
+            UNWIND $rows as row
+            CREATE (:ServiceGap {rank: row.rank, region: row.region, population: row.population,
+                                 service: row.service, providers: row.providers,
+                                 statewide_providers: row.statewide_providers,
+                                 affected_population: row.affected_population, gap_score: row.gap_score})
+        """, {'rows': rows[i:i + WRITE_BATCH]})
+    tx.run("""
+        MERGE (v:AnalyticsView {name: 'service_gaps'})
+        SET v += $summary, v.refreshed_at = datetime()
+    """, {'summary': summary})
+    return len(rows)
+
+
+def create_gap_index(session):
+    """Range index on rank so dashboard reads walk the ranking in order"""
+    session.run("CREATE INDEX servicegap_rank IF NOT EXISTS FOR (g:ServiceGap) ON (g.rank)").consume()
+
+
+def prepare_service_gaps(session, level: str = 'county', demand: pd.DataFrame = None,
+                         max_rows: int = MAX_GAP_ROWS) -> Dict:
+    """
+    Read the graph and rank the gaps without writing anything
+
+    Returns:
+        'rows' and 'summary' for write_service_gaps, plus 'compute_seconds'
+    """
+    start = time.perf_counter()
+    inputs = fetch_cube_inputs(session, level)
+    cube = build_gap_cube(inputs)
+    gaps, summary = cube.gaps(affected_population(inputs['regions'], inputs['populations'], demand))
+    top = gaps.head(max_rows)
+    rows = [{'rank': rank, **row, 'gap_score': round(row['gap_score'], 2)}
+            for rank, row in enumerate(top.to_dict('records'))]
+    return {'rows': rows, 'summary': {**summary, 'level': level},
+            'compute_seconds': round(time.perf_counter() - start, 3)}
+
+
+def write_service_gaps(tx, prepared: Dict) -> int:
+    """Replace the ServiceGap rows inside the caller's write transaction"""
+    return _write_gaps(tx, prepared['rows'], prepared['summary'])
+
+
+def refresh_service_gaps(session, level: str = 'county', demand: pd.DataFrame = None,
+                         max_rows: int = MAX_GAP_ROWS) -> Dict:
+    """
+    Recompute the gap cube and replace the materialized ServiceGap rows
+
+    The read and the cube run outside the write transaction; only the
+    ranked rows are written, in one transaction, so the dashboard never
+    sees a partial ranking.
+
+    Returns:
+        Summary counts plus the seconds spent computing and writing
+    """
+    start = time.perf_counter()
+    prepared = prepare_service_gaps(session, level, demand, max_rows)
+    create_gap_index(session)
+    written = session.execute_write(write_service_gaps, prepared)
+    return {**prepared['summary'], 'written': written, 'compute_seconds': prepared['compute_seconds'],
+            'seconds': round(time.perf_counter() - start, 3)}
+
+
+def synthetic_inputs(organizations: int, regions: int = 83, populations: int = 8,
+                     services: int = 30, seed: int = 5) -> Dict:
+    """Statewide-scale random graph extract for benchmarking"""
+    rng = np.random.default_rng(seed)
+    orgs = [f"org{i}" for i in range(organizations)]
+    region_names = [f"County {i:02d} County" for i in range(regions)]
+    population_names = (list(POPULATION_SHARES) + [f"Population {i}" for i in range(populations)])[:populations]
+    service_names = [f"Service {i:02d}" for i in range(services)]
+
+    def edges(targets, low, high, weights, skip=0.0):
+        # Providers concentrate in populous counties and on a few common services
+        counts = rng.integers(low, high + 1, organizations)
+        counts[rng.random(organizations) < skip] = 0
+        weights = np.asarray(weights, dtype=np.float64) / np.sum(weights)
+        return pd.DataFrame({'org': np.repeat(orgs, counts),
+                             'target': [targets[k] for n in counts
+                                        for k in rng.choice(len(targets), n, replace=False, p=weights)]})
+
+    region_population = np.round(2000 * rng.pareto(1.0, regions) + 2000).astype(np.int64)
+    region_frame = pd.DataFrame({'name': region_names, 'population': region_population})
+    for column in set(POPULATION_SHARES.values()):
+        region_frame[column] = rng.uniform(0.05, 0.4, regions)
+    zipf = 1.0 / np.arange(1, services + 1) ** 1.5
+    return {'regions': region_frame, 'organizations': orgs, 'populations': population_names,
+            'services': service_names,
+            'org_regions': edges(region_names, 1, 1, region_population, skip=0.02),
+            'org_populations': edges(population_names, 1, 3, np.ones(len(population_names)), skip=0.1),
+            'org_services': edges(service_names, 1, 4, zipf)}
+
+
+# Rebuild the gap cube from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rank region x population x service gaps")
+    parser.add_argument("--level", default="county", help="GeographicRegion type to analyze")
+    parser.add_argument("--demand", help="CSV of region, population, count overriding estimated counts")
+    parser.add_argument("--top", type=int, default=15, help="Gaps to print")
+    parser.add_argument("--benchmark", type=int, metavar="ORGS", help="Run on a synthetic graph extract instead")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Service Gap Analysis")
+    print("=" * 60)
+    print()
+
+    try:
+        demand = pd.read_csv(args.demand) if args.demand else None
+        if args.benchmark:
+            start = time.perf_counter()
+            inputs = synthetic_inputs(args.benchmark)
+            print(f"✓ Generated {args.benchmark:,} organizations ({time.perf_counter() - start:.1f}s)")
+            start = time.perf_counter()
+            cube = build_gap_cube(inputs)
+            gaps, summary = cube.gaps(affected_population(inputs['regions'], inputs['populations'], demand))
+            summary['compute_seconds'] = round(time.perf_counter() - start, 3)
+        else:
+            from graph_metadata import bump_graph_version
+            from neo4j_connection import get_driver
+            driver = get_driver()
+            with driver.session() as session:
+                summary = refresh_service_gaps(session, args.level, demand)
+                bump_graph_version(session, source='service_gaps')
+                gaps = pd.DataFrame(session.run(
+                    "MATCH (g:ServiceGap) WHERE g.rank < $top RETURN g {.*} as gap ORDER BY g.rank",
+                    {'top': args.top}).value())
+            print(f"✓ Materialized {summary['written']:,} ServiceGap rows")
+
+        print(f"✓ {summary['triples']:,} region x population x service triples, "
+              f"{summary['gaps']:,} gaps in {summary['compute_seconds']:.2f}s")
+        if len(gaps):
+            print()
+            print(gaps.head(args.top)[['region', 'population', 'service', 'providers', 'statewide_providers',
+                                       'affected_population']].to_string(index=False))
+    except Exception as e:
+        print(f"❌ Gap analysis failed: {e}")
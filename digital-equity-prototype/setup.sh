@@ -91,6 +91,37 @@ python ingest_michigan_data.py
 echo "✓ Data ingestion complete"
 echo ""
 
+# Step 6b: Cache simplified map boundaries
+echo "Step 6b: Building map geometry cache..."
+python geometry_cache.py
+echo ""
+
+# Step 6c: Ingest infrastructure geometry
+echo "Step 6c: Ingesting road, fiber and access point geometry..."
+python ingest_infrastructure.py
+echo ""
+
+# Step 6d: Build the tiled infrastructure map
+echo "Step 6d: Building tiled infrastructure map..."
+python map_tiles.py
+echo ""
+
+# Step 6e: Score service accessibility
+echo "Step 6e: Scoring service accessibility..."
+python accessibility_engine.py --write
+echo ""
+
+# Step 6f: Analyze the collaboration network
+echo "Step 6f: Computing collaboration network metrics..."
+python collaboration_network.py --write
+echo ""
+
+# Step 7: Ingest research documents
+echo "Step 7: Ingesting research documents..."
+python ingest_research_documents.py
+echo "✓ Research documents ingested"
+echo ""
+
 # Success message
 echo "=========================================="
 echo "✓ Setup Complete!"
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Import Profiler
+Measures what the dashboard and each CLI script pay in imports before doing
+any work, using CPython's -X importtime in a fresh interpreter per target,
+and fails when a target exceeds its startup budget (used as a CI gate)
+"""
+
+from typing import Dict, List
+import ast
+import os
+import re
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Entry points whose cold start is tracked
+DEFAULT_TARGETS = ['app', 'verify', 'api_server', 'job_runner', 'load_test',
+                   'benchmark_graphrag', 'ingest_michigan_data', 'ingest_research_documents']
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def module_level_imports(path: str) -> List[str]:
+    """
+    Import statements a script runs unconditionally at startup
+
+    Imports inside functions, classes, if-blocks (pages) and try-blocks are
+    lazy by construction and are left out.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    statements = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            statements.extend(f"import {alias.name}" for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            statements.append(f"import {node.module}")
+    return statements
+
+
+def _importtime(code: str, cwd: str) -> List:
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                               cwd=cwd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed")
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us) / 1000.0, int(cumulative_us) / 1000.0, len(indent) == 1))
+    return rows
+
+
+_interpreter_modules = None
+
+
+def profile_imports(statements: List[str], cwd: str = HERE) -> Dict:
+    """
+    Run the imports in a fresh interpreter with -X importtime
+
+    Modules the bare interpreter loads anyway (encodings, site) are excluded.
+
+    Returns:
+        total_ms, per top-level module cumulative ms and the slowest modules by self time
+    """
+    global _interpreter_modules
+    if _interpreter_modules is None:
+        _interpreter_modules = {row[0] for row in _importtime("pass", cwd)}
+
+    top_level, self_times = {}, {}
+    for module, self_ms, cumulative_ms, direct in _importtime("\n".join(statements) or "pass", cwd):
+        if module in _interpreter_modules:
+            continue
+        self_times[module] = self_ms
+        if direct:  # imported by the target itself, not by a dependency
+            top_level[module] = cumulative_ms
+
+    slowest = sorted(self_times.items(), key=lambda item: -item[1])[:10]
+    return {
+        'total_ms': round(sum(top_level.values()), 1),
+        'modules': {module: round(ms, 1) for module, ms in sorted(top_level.items(), key=lambda item: -item[1])},
+        'slowest_self_ms': [(module, round(ms, 1)) for module, ms in slowest]
+    }
+
+
+def profile_target(target: str) -> Dict:
+    """Cold-start imports for a script in this directory (by module name)"""
+    return profile_imports(module_level_imports(os.path.join(HERE, f"{target}.py")))
+
+
+def parse_budgets(values: List[str]) -> Dict[str, float]:
+    """Budgets given as target=milliseconds"""
+    budgets = {}
+    for value in values or []:
+        target, _, ms = value.partition('=')
+        budgets[target.strip()] = float(ms)
+    return budgets
+
+
+# Profile cold start from the command line
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Measure import-time cold start per entry point")
+    parser.add_argument("targets", nargs="*", help=f"Scripts to profile (default: {' '.join(DEFAULT_TARGETS)})")
+    parser.add_argument("--budget", action="append", metavar="TARGET=MS",
+                        help="Fail if TARGET's import time exceeds MS (repeatable)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per target; the median is reported")
+    parser.add_argument("--top", type=int, default=5, help="Modules listed per target")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget)
+    targets = args.targets or sorted(set(DEFAULT_TARGETS) | set(budgets))
+
+    print("=" * 60)
+    print("Cold-Start Import Profile")
+    print("=" * 60)
+    print()
+
+    results, failed = {}, False
+    for target in targets:
+        try:
+            # Median of several runs: the fastest run understates what a cold start usually costs
+            runs = sorted((profile_target(target) for _ in range(max(1, args.runs))),
+                          key=lambda r: r['total_ms'])
+            result = runs[(len(runs) - 1) // 2]
+            result['runs_ms'] = [run['total_ms'] for run in runs]
+        except Exception as e:
+            print(f"❌ {target}: {e}")
+            failed = True
+            continue
+        results[target] = result
+
+        budget = budgets.get(target)
+        over = budget is not None and result['total_ms'] > budget
+        failed = failed or over
+        status = "❌" if over else "✓"
+        limit = f" (budget {budget:.0f} ms)" if budget is not None else ""
+        print(f"{status} {target:28s} {result['total_ms']:8.1f} ms{limit}")
+        for module, ms in list(result['modules'].items())[:args.top]:
+            print(f"    {module:30s} {ms:8.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Seeded Synthetic Statewide Data for Michigan
+Generates the 83 counties, census tracts, organizations with their services,
+populations, programs and collaborations, and millions of households at a
+configurable scale, so ingestion, scoring, dashboard queries and retrieval
+can be exercised at realistic size. Writes CSVs in the formats the other
+tools read, or loads everything into Neo4j with batched UNWIND writes
+"""
+
+from typing import Dict, Iterator, List, Tuple
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+STATE_FIPS = '26'
+
+# County FIPS codes are the odd numbers 001-165 in alphabetical order
+MICHIGAN_COUNTIES = [
+    'Alcona', 'Alger', 'Allegan', 'Alpena', 'Antrim', 'Arenac', 'Baraga', 'Barry', 'Bay', 'Benzie',
+    'Berrien', 'Branch', 'Calhoun', 'Cass', 'Charlevoix', 'Cheboygan', 'Chippewa', 'Clare', 'Clinton',
+    'Crawford', 'Delta', 'Dickinson', 'Eaton', 'Emmet', 'Genesee', 'Gladwin', 'Gogebic', 'Grand Traverse',
+    'Gratiot', 'Hillsdale', 'Houghton', 'Huron', 'Ingham', 'Ionia', 'Iosco', 'Iron', 'Isabella', 'Jackson',
+    'Kalamazoo', 'Kalkaska', 'Kent', 'Keweenaw', 'Lake', 'Lapeer', 'Leelanau', 'Lenawee', 'Livingston',
+    'Luce', 'Mackinac', 'Macomb', 'Manistee', 'Marquette', 'Mason', 'Mecosta', 'Menominee', 'Midland',
+    'Missaukee', 'Monroe', 'Montcalm', 'Montmorency', 'Muskegon', 'Newaygo', 'Oakland', 'Oceana', 'Ogemaw',
+    'Ontonagon', 'Osceola', 'Oscoda', 'Otsego', 'Ottawa', 'Presque Isle', 'Roscommon', 'Saginaw',
+    'St. Clair', 'St. Joseph', 'Sanilac', 'Schoolcraft', 'Shiawassee', 'Tuscola', 'Van Buren', 'Washtenaw',
+    'Wayne', 'Wexford'
+]
+UPPER_PENINSULA = {'Alger', 'Baraga', 'Chippewa', 'Delta', 'Dickinson', 'Gogebic', 'Houghton', 'Iron',
+                   'Keweenaw', 'Luce', 'Mackinac', 'Marquette', 'Menominee', 'Ontonagon', 'Schoolcraft'}
+
+# Bounding boxes (south, north, west, east) that county centers are drawn from
+PENINSULA_BOUNDS = {'lower': (41.8, 45.7, -86.4, -82.6), 'upper': (45.7, 47.3, -90.3, -84.0)}
+
+# Tracts, organizations, programs and households per preset; counties are always the 83
+SCALES = {
+    'tiny': {'tracts': 300, 'organizations': 2000, 'programs': 800, 'households': 50000},
+    'small': {'tracts': 2800, 'organizations': 8000, 'programs': 3000, 'households': 400000},
+    'statewide': {'tracts': 2800, 'organizations': 40000, 'programs': 15000, 'households': 4000000}
+}
+
+# (label, name suffix, share of organizations)
+ORGANIZATION_KINDS = [
+    ('Library', 'District Library', 0.15),
+    ('DigitalEquityNonprofit', 'Digital Equity Center', 0.25),
+    ('ComplementaryOrganization', 'Community Services', 0.45),
+    ('CoalitionOrganization', 'Digital Inclusion Coalition', 0.05),
+    ('DigitalEquityNonprofit', 'Digital Navigators', 0.10)
+]
+# Organizations with no county serve the whole state
+STATEWIDE_SHARE = 0.02
+
+# Service catalogue of the sample data, most commonly offered first
+SERVICE_TYPES = ['WiFi Access', 'Digital Literacy Training', 'Computer Access', 'Device Lending',
+                 'Tech Support', 'Digital Navigation', 'Job Search Assistance', 'Digital Skills Training',
+                 'Online Safety', 'Tech Help Desk', 'Device Access', 'Telehealth Access']
+POPULATIONS = ['Seniors', 'Low-Income Families', 'Rural Residents', 'Job Seekers', 'Students']
+PROGRAM_KINDS = ['Digital Navigator Program', 'Device Distribution', 'Digital Skills Workshop',
+                 'Affordable Connectivity Enrollment', 'Telehealth Support', 'Hotspot Lending']
+
+# Share of an organization's partnerships inside its own county
+LOCAL_COLLABORATION_SHARE = 0.75
+
+WRITE_BATCH = 5000
+
+
+def _top_k(rng, weights: np.ndarray, k: np.ndarray) -> List[np.ndarray]:
+    """For each row, k[i] distinct indices drawn by weight (Gumbel top-k, no Python loop per draw)"""
+    keys = np.log(weights)[None, :] + rng.gumbel(size=(len(k), len(weights)))
+    order = np.argsort(-keys, axis=1)
+    return [order[i, :k[i]] for i in range(len(k))]
+
+
+def generate_statewide(tracts: int = 2800, organizations: int = 40000, programs: int = 15000,
+                       households: int = 4000000, counties: int = len(MICHIGAN_COUNTIES),
+                       seed: int = 42) -> Dict[str, pd.DataFrame]:
+    """
+    A synthetic state: the same seed and sizes always give the same data
+
+    Tracts hold roughly equal numbers of households, so populous counties get
+    more tracts. Rural counties have lower incomes, older residents and less
+    fiber; households subscribe to broadband less often where incomes and
+    coverage are low. Organizations cluster where people live.
+
+    Returns:
+        DataFrames: counties, tracts, organizations, org_services, org_populations,
+        programs, collaborations and households (households reference tracts by
+        row number to keep millions of rows compact)
+    """
+    if not 1 <= counties <= len(MICHIGAN_COUNTIES):
+        raise ValueError(f"counties must be between 1 and {len(MICHIGAN_COUNTIES)}")
+    if tracts < counties:
+        raise ValueError("Need at least one tract per county")
+    rng = np.random.default_rng(seed)
+
+    # ===== Counties and tracts =====
+    county_names = MICHIGAN_COUNTIES[:counties]
+    fips = [f"{STATE_FIPS}{2 * i + 1:03d}" for i in range(counties)]
+    bounds = np.array([PENINSULA_BOUNDS['upper' if name in UPPER_PENINSULA else 'lower'] for name in county_names])
+    center = np.column_stack([rng.uniform(bounds[:, 0], bounds[:, 1]), rng.uniform(bounds[:, 2], bounds[:, 3])])
+    weight = rng.lognormal(0.0, 1.2, counties)
+    tract_counts = 1 + rng.multinomial(tracts - counties, weight / weight.sum())
+    # Counties with few tracts are the rural ones
+    urbanity = pd.Series(tract_counts).rank(pct=True).to_numpy()
+
+    county_of = np.repeat(np.arange(counties), tract_counts)
+    ordinal = np.concatenate([np.arange(n) for n in tract_counts])
+    tract_codes = [f"{(j + 1) * 100:06d}" for j in ordinal]
+    rural = np.clip(1.0 - urbanity[county_of] + rng.normal(0.0, 0.15, tracts), 0.0, 1.0)
+    spread = 0.05 + 0.1 * rural
+    lat = center[county_of, 0] + rng.normal(0.0, 1.0, tracts) * spread
+    lon = center[county_of, 1] + rng.normal(0.0, 1.0, tracts) * spread * 1.4
+
+    income = np.round(rng.lognormal(np.log(40000 + 30000 * (1.0 - rural)), 0.3), -2)
+    poverty = np.clip(0.34 - income / 350000 + rng.normal(0.0, 0.04, tracts), 0.02, 0.6)
+    fiber = np.clip(100 * (0.9 * (1.0 - rural) ** 1.5 + rng.normal(0.0, 0.1, tracts)), 0.0, 100.0)
+    cable = np.clip(fiber + rng.uniform(5, 40, tracts), 0.0, 100.0)
+    dsl = np.clip(cable + rng.uniform(0, 30, tracts), 0.0, 100.0)
+    tract_frame = pd.DataFrame({
+        'name': [f"Census Tract {int(code) / 100:g}, {county_names[c]} County"
+                 for code, c in zip(tract_codes, county_of)],
+        'fips': [f"{fips[c]}{code}" for code, c in zip(tract_codes, county_of)],
+        'type': 'tract',
+        'county': [f"{county_names[c]} County" for c in county_of],
+        'county_fips': [fips[c] for c in county_of],
+        'latitude': lat.round(5),
+        'longitude': lon.round(5),
+        'median_income': income,
+        'poverty_rate': poverty.round(3),
+        'senior_population_pct': np.clip(0.14 + 0.1 * rural + rng.normal(0.0, 0.04, tracts), 0.03, 0.45).round(3),
+        'unemployment_rate': np.clip(0.03 + 0.25 * poverty + rng.normal(0.0, 0.015, tracts), 0.01, 0.25).round(3),
+        'student_population_pct': np.clip(rng.normal(0.17, 0.05, tracts), 0.02, 0.6).round(3),
+        'rural_percentage': rural.round(2),
+        'fiber_coverage': fiber.round(1),
+        'cable_coverage': cable.round(1),
+        'dsl_coverage': dsl.round(1),
+        'median_speed_mbps': np.round(25 + 2.5 * fiber + rng.uniform(0, 50, tracts))
+    })
+
+    # ===== Households =====
+    tract_weight = rng.lognormal(0.0, 0.25, tracts)
+    household_counts = rng.multinomial(households, tract_weight / tract_weight.sum())
+    tract_of = np.repeat(np.arange(tracts, dtype=np.int32), household_counts)
+    scatter = (0.01 + 0.04 * rural)[tract_of]
+    size = np.minimum(1 + rng.poisson(1.5, households), 8).astype(np.int8)
+    household_income = (income[tract_of] * rng.lognormal(-0.18, 0.6, households)).round(-2).astype(np.int32)
+    adoption = 1.0 / (1.0 + np.exp(-(0.5 + 1.5 * np.log(household_income / 40000.0)
+                                     + 0.02 * (fiber[tract_of] - 40.0))))
+    household_frame = pd.DataFrame({
+        'tract': tract_of,
+        'latitude': lat[tract_of] + rng.normal(0.0, 1.0, households) * scatter,
+        'longitude': lon[tract_of] + rng.normal(0.0, 1.0, households) * scatter * 1.4,
+        'size': size,
+        'income': household_income,
+        'subscribed': rng.random(households) < adoption
+    })
+
+    tract_frame['households'] = household_counts
+    tract_frame['population'] = np.bincount(tract_of, weights=size, minlength=tracts).astype(np.int64)
+    county_frame = _county_rollup(tract_frame, county_names, fips)
+
+    # ===== Organizations =====
+    labels, suffixes, shares = zip(*ORGANIZATION_KINDS)
+    kind = rng.choice(len(ORGANIZATION_KINDS), organizations, p=np.array(shares) / sum(shares))
+    # Placed near a household drawn at random, so organizations follow population (damped for big tracts)
+    home = tract_of[rng.integers(0, households, organizations)] if households else rng.integers(0, tracts, organizations)
+    statewide = rng.random(organizations) < STATEWIDE_SHARE
+    org_county = np.where(statewide, -1, county_of[home])
+    base = [f"Michigan {suffixes[k]}" if c < 0 else f"{county_names[c]} {suffixes[k]}"
+            for k, c in zip(kind, org_county)]
+    seen: Dict[str, int] = {}
+    names = []
+    for name in base:
+        seen[name] = seen.get(name, 0) + 1
+        names.append(f"{name} {seen[name]}")
+    capacity = rng.lognormal(1.5, 0.7, organizations).round(1)
+    org_frame = pd.DataFrame({
+        'name': names,
+        'label': [labels[k] for k in kind],
+        'type': [suffixes[k] for k in kind],
+        'county': [None if c < 0 else f"{county_names[c]} County" for c in org_county],
+        'latitude': np.where(statewide, np.nan, lat[home] + rng.normal(0.0, 0.02, organizations)).round(5),
+        'longitude': np.where(statewide, np.nan, lon[home] + rng.normal(0.0, 0.03, organizations)).round(5),
+        'capacity': capacity
+    })
+
+    # Zipf-like popularity: WiFi everywhere, telehealth rare
+    service_weight = 1.0 / np.arange(1, len(SERVICE_TYPES) + 1) ** 0.8
+    offered = _top_k(rng, service_weight, 1 + rng.binomial(5, 0.4, organizations))
+    org_services = pd.DataFrame({
+        'organization': np.repeat(org_frame['name'].to_numpy(), [len(s) for s in offered]),
+        'service': np.array(SERVICE_TYPES)[np.concatenate(offered)]
+    })
+    # Organizations with no listed population serve everyone
+    served = _top_k(rng, np.ones(len(POPULATIONS)), rng.binomial(3, 0.5, organizations))
+    org_populations = pd.DataFrame({
+        'organization': np.repeat(org_frame['name'].to_numpy(), [len(p) for p in served]),
+        'population': np.array(POPULATIONS)[np.concatenate(served)] if served else []
+    })
+
+    # ===== Programs =====
+    operator = rng.choice(organizations, programs, p=capacity / capacity.sum())
+    program_kind = rng.integers(0, len(PROGRAM_KINDS), programs)
+    seen = {}
+    program_names = []
+    for org, k in zip(operator, program_kind):
+        name = f"{names[org]} {PROGRAM_KINDS[k]}"
+        seen[name] = seen.get(name, 0) + 1
+        program_names.append(name if seen[name] == 1 else f"{name} {seen[name]}")
+    program_frame = pd.DataFrame({
+        'name': program_names,
+        'organization': [names[org] for org in operator],
+        'type': [PROGRAM_KINDS[k] for k in program_kind],
+        'enrollment': rng.poisson(120, programs),
+        'description': [f"{PROGRAM_KINDS[k]} run by {names[org]} for "
+                        f"{', '.join(np.array(POPULATIONS)[served[org]]) or 'all residents'} in "
+                        f"{org_frame['county'].iat[org] or 'Michigan'}"
+                        for org, k in zip(operator, program_kind)]
+    })
+
+    org_frame['programs'] = np.bincount(operator, minlength=organizations)
+    collaboration_frame = _collaborations(rng, org_county, capacity)
+    collaboration_frame['source'] = org_frame['name'].to_numpy()[collaboration_frame['source']]
+    collaboration_frame['target'] = org_frame['name'].to_numpy()[collaboration_frame['target']]
+
+    return {
+        'counties': county_frame,
+        'tracts': tract_frame,
+        'organizations': org_frame,
+        'org_services': org_services,
+        'org_populations': org_populations,
+        'programs': program_frame,
+        'collaborations': collaboration_frame,
+        'households': household_frame
+    }
+
+
+def _county_rollup(tracts: pd.DataFrame, names: List[str], fips: List[str]) -> pd.DataFrame:
+    """County rows: summed counts and population-weighted tract attributes"""
+    weighted = ['median_income', 'poverty_rate', 'senior_population_pct', 'unemployment_rate',
+                'student_population_pct', 'rural_percentage', 'fiber_coverage', 'cable_coverage',
+                'dsl_coverage', 'median_speed_mbps', 'latitude', 'longitude']
+    codes = pd.Index(fips).get_indexer(tracts['county_fips'])
+    population = tracts['population'].to_numpy(dtype=np.float64)
+    totals = np.bincount(codes, weights=population, minlength=len(fips))
+    frame = pd.DataFrame({'name': [f"{name} County" for name in names], 'fips': fips, 'type': 'county',
+                          'population': totals.astype(np.int64),
+                          'households': np.bincount(codes, weights=tracts['households'], minlength=len(fips))
+                          .astype(np.int64)})
+    for column in weighted:
+        sums = np.bincount(codes, weights=population * tracts[column].to_numpy(), minlength=len(fips))
+        frame[column] = np.divide(sums, totals, out=np.zeros(len(fips)), where=totals > 0)
+    rounding = {'median_income': -2, 'latitude': 5, 'longitude': 5, 'median_speed_mbps': 0}
+    return frame.round({column: rounding.get(column, 3) for column in weighted})
+
+
+def _collaborations(rng, org_county: np.ndarray, capacity: np.ndarray) -> pd.DataFrame:
+    """Partnerships: mostly within the county, the rest with large organizations anywhere"""
+    n = len(org_county)
+    partners = 1 + rng.poisson(0.6, n)
+    source = np.repeat(np.arange(n), partners)
+    local = rng.random(len(source)) < LOCAL_COLLABORATION_SHARE
+
+    # A random organization of the same county: position within the county's sorted block
+    order = np.argsort(org_county, kind='stable')
+    starts = np.searchsorted(org_county[order], org_county)
+    sizes = np.bincount(org_county + 1)[org_county + 1]
+    pick = starts[source] + (rng.random(len(source)) * sizes[source]).astype(np.int64)
+    target = np.where(local, order[pick], rng.choice(n, len(source), p=capacity / capacity.sum()))
+
+    keep = source != target
+    pairs = np.unique(np.sort(np.column_stack([source[keep], target[keep]]), axis=1), axis=0)
+    return pd.DataFrame({'source': pairs[:, 0], 'target': pairs[:, 1],
+                         'weight': rng.integers(1, 6, len(pairs))})
+
+
+def accessibility_inputs(data: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Tract demand areas and one provider row per service, as accessibility_engine.py reads them"""
+    areas = data['tracts'].rename(columns={'fips': 'geoid'})[
+        ['geoid', 'latitude', 'longitude', 'population', 'county', 'county_fips']]
+    located = data['organizations'].dropna(subset=['latitude'])
+    providers = data['org_services'].merge(located[['name', 'latitude', 'longitude', 'capacity']],
+                                           left_on='organization', right_on='name')
+    return areas, providers.rename(columns={'organization': 'id'})[
+        ['id', 'latitude', 'longitude', 'service', 'capacity']]
+
+
+def gap_inputs(data: Dict[str, pd.DataFrame]) -> Dict:
+    """County-level extract in the shape service_gaps.fetch_cube_inputs returns"""
+    organizations = data['organizations']
+    located = organizations.dropna(subset=['county'])
+    return {
+        'regions': data['counties'],
+        'organizations': organizations['name'].tolist(),
+        'populations': POPULATIONS,
+        'services': SERVICE_TYPES,
+        'org_regions': pd.DataFrame({'org': located['name'], 'target': located['county']}),
+        'org_populations': data['org_populations'].rename(columns={'organization': 'org', 'population': 'target'}),
+        'org_services': data['org_services'].rename(columns={'organization': 'org', 'service': 'target'})
+    }
+
+
+def household_chunks(data: Dict[str, pd.DataFrame], chunk_size: int = 500000) -> Iterator[pd.DataFrame]:
+    """Households with ids, tract and county names, a chunk at a time"""
+    households, tracts = data['households'], data['tracts']
+    for start in range(0, len(households), chunk_size):
+        chunk = households.iloc[start:start + chunk_size]
+        tract = chunk['tract'].to_numpy()
+        yield pd.DataFrame({
+            'id': [f"hh-{i:08d}" for i in range(start, start + len(chunk))],
+            'latitude': chunk['latitude'].round(6).to_numpy(),
+            'longitude': chunk['longitude'].round(6).to_numpy(),
+            'county': tracts['county'].to_numpy()[tract],
+            'tract': tracts['name'].to_numpy()[tract],
+            'size': chunk['size'].to_numpy(),
+            'income': chunk['income'].to_numpy(),
+            'subscribed': chunk['subscribed'].to_numpy()
+        })
+
+
+def write_csvs(data: Dict[str, pd.DataFrame], output_dir: str) -> Dict[str, str]:
+    """
+    One CSV per table, in the formats the other tools accept
+
+    tracts.csv feeds accessibility_engine.py --areas, providers.csv its
+    --providers, organizations.csv entity_resolution.py --records and
+    households.csv ingest_infrastructure.py / coverage_engine.py.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+
+    def save(name, frame):
+        paths[name] = os.path.join(output_dir, f"{name}.csv")
+        frame.to_csv(paths[name], index=False)
+
+    for name in ['counties', 'organizations', 'org_services', 'org_populations', 'programs', 'collaborations']:
+        save(name, data[name])
+    save('tracts', data['tracts'].rename(columns={'fips': 'geoid'}))
+    _, providers = accessibility_inputs(data)
+    save('providers', providers.groupby(['id', 'latitude', 'longitude', 'capacity'], as_index=False)
+         .agg(services=('service', ';'.join)))
+
+    paths['households'] = os.path.join(output_dir, "households.csv")
+    for i, chunk in enumerate(household_chunks(data)):
+        chunk.to_csv(paths['households'], mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return paths
+
+
+# ===== Graph loading =====
+
+REGION_PROPERTIES = ['fips', 'type', 'population', 'households', 'median_income', 'poverty_rate',
+                     'senior_population_pct', 'unemployment_rate', 'student_population_pct',
+                     'rural_percentage', 'fiber_coverage', 'cable_coverage', 'dsl_coverage', 'median_speed_mbps']
+
+# Graph names of loaded regions, organizations, programs and households start
+# with this, so a load never MERGEs onto (or clears) real Michigan nodes such
+# as "Wayne County"
+GRAPH_PREFIX = "Synthetic "
+
+LOAD_CONSTRAINTS = {'GeographicRegion': 'name', 'Organization': 'name', 'Service': 'name',
+                    'Population': 'name', 'Program': 'name', 'Household': 'id'}
+
+
+def _write_batches(session, query: str, rows: Iterator[Dict], batch_size: int) -> int:
+    written, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            session.run(query, {'rows': batch}).consume()
+            written += len(batch)
+            batch = []
+    if batch:
+        session.run(query, {'rows': batch}).consume()
+        written += len(batch)
+    return written
+
+
+def _records(frame: pd.DataFrame) -> Iterator[Dict]:
+    """Rows as dicts with NaN as None, which Cypher treats as missing"""
+    for row in frame.astype(object).where(frame.notna(), None).to_dict('records'):
+        yield row
+
+
+def _grouped(frame: pd.DataFrame, key: str, column: str) -> Iterator[Dict]:
+    for name, values in frame.groupby(key, sort=False)[column]:
+        yield {'name': GRAPH_PREFIX + name, 'values': values.tolist()}
+
+
+def _prefixed(rows: Iterator[Dict], *keys: str) -> Iterator[Dict]:
+    """Rows with their name/reference columns moved into the synthetic namespace"""
+    for row in rows:
+        for key in keys:
+            if row[key] is not None:
+                row[key] = GRAPH_PREFIX + row[key]
+        yield row
+
+
+def clear_synthetic(driver) -> int:
+    """Delete everything a previous load created (nodes are tagged synthetic = true)"""
+    with driver.session() as session:
+        return session.run("""
+            MATCH (n) WHERE n.synthetic = true
+            CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+        """).consume().counters.nodes_deleted
+
+
+def load_statewide(driver, data: Dict[str, pd.DataFrame], batch_size: int = WRITE_BATCH,
+                   households: bool = True) -> Dict[str, Dict]:
+    """
+    Load the synthetic state into Neo4j with batched UNWIND writes
+
+    Names and household ids carry GRAPH_PREFIX, so synthetic nodes never
+    share a key with ingested ones. Nodes are tagged synthetic = true only
+    when the load creates them, and properties are only set on tagged
+    nodes, so a load can be repeated or removed with clear_synthetic()
+    without touching real data. Shared Service and Population nodes are
+    MERGEd but never tagged. Tracts are
+    PART_OF their county; households are LOCATED_IN their tract. Callers
+    score, refresh the views and bump the graph version afterwards.
+
+    Returns:
+        Per table, the rows written and seconds taken
+    """
+    timings = {}
+    with driver.session() as session:
+        for label, key in LOAD_CONSTRAINTS.items():
+            session.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.{key} IS UNIQUE").consume()
+        session.run("CREATE INDEX geographicregion_fips IF NOT EXISTS FOR (r:GeographicRegion) ON (r.fips)").consume()
+
+        def timed(name, query, rows):
+            start = time.perf_counter()
+            written = _write_batches(session, query, rows, batch_size)
+            timings[name] = {'rows': written, 'seconds': round(time.perf_counter() - start, 3)}
+
+        region_columns = ['name', 'latitude', 'longitude'] + REGION_PROPERTIES
+        timed('counties', """
+            UNWIND $rows as row
+            MERGE (r:GeographicRegion {name: row.name})
+            ON CREATE SET r.synthetic = true
+            WITH r, row WHERE r.synthetic = true
+            SET r += row.properties,
+                r.centroid = point({latitude: row.latitude, longitude: row.longitude})
+        """, ({**row, 'properties': {k: row[k] for k in REGION_PROPERTIES}}
+              for row in _prefixed(_records(data['counties'][region_columns]), 'name')))
+        timed('tracts', """
+            UNWIND $rows as row
+            MERGE (r:GeographicRegion {name: row.name})
+            ON CREATE SET r.synthetic = true
+            WITH r, row WHERE r.synthetic = true
+            SET r += row.properties,
+                r.centroid = point({latitude: row.latitude, longitude: row.longitude})
+            WITH r, row
+            MATCH (c:GeographicRegion {name: row.county})
+            MERGE (r)-[:PART_OF]->(c)
+        """, ({**row, 'properties': {k: row[k] for k in REGION_PROPERTIES}}
+              for row in _prefixed(_records(data['tracts'][region_columns + ['county']]), 'name', 'county')))
+        timed('services', """
+            UNWIND $rows as row
+            MERGE (:Service {name: row.name})
+        """, ({'name': name} for name in SERVICE_TYPES))
+        timed('populations', """
+            UNWIND $rows as row
+            MERGE (:Population {name: row.name})
+        """, ({'name': name} for name in POPULATIONS))
+
+        organizations = data['organizations']
+        start = time.perf_counter()
+        written = 0
+        # Labels cannot be parameters; they come from the fixed ORGANIZATION_KINDS
+        for label, group in organizations.groupby('label'):
+            written += _write_batches(session, f"""
+                UNWIND $rows as row
+                MERGE (o:{label}:Organization {{name: row.name}})
+                ON CREATE SET o.synthetic = true
+                WITH o, row WHERE o.synthetic = true
+                SET o.type = row.type,
+                    o.capacity = row.capacity,
+                    o.location = CASE WHEN row.latitude IS NULL THEN null
+                                      ELSE point({{latitude: row.latitude, longitude: row.longitude}}) END
+                WITH o, row WHERE row.county IS NOT NULL
+                MATCH (r:GeographicRegion {{name: row.county}})
+                MERGE (o)-[:LOCATED_IN]->(r)
+            """, _prefixed(_records(group[['name', 'type', 'capacity', 'latitude', 'longitude', 'county']]),
+                           'name', 'county'), batch_size)
+        timings['organizations'] = {'rows': written, 'seconds': round(time.perf_counter() - start, 3)}
+
+        timed('org_services', """
+            UNWIND $rows as row
+            MATCH (o:Organization {name: row.name})
+            UNWIND row.values as service
+            MATCH (s:Service {name: service})
+            MERGE (o)-[:PROVIDES_SERVICE]->(s)
+        """, _grouped(data['org_services'], 'organization', 'service'))
+        timed('org_populations', """
+            UNWIND $rows as row
+            MATCH (o:Organization {name: row.name})
+            UNWIND row.values as population
+            MATCH (p:Population {name: population})
+            MERGE (o)-[:SERVES_POPULATION]->(p)
+        """, _grouped(data['org_populations'], 'organization', 'population'))
+        timed('programs', """
+            UNWIND $rows as row
+            MATCH (o:Organization {name: row.organization})
+            MERGE (pr:Program {name: row.name})
+            ON CREATE SET pr.synthetic = true
+            WITH o, pr, row WHERE pr.synthetic = true
+            SET pr.type = row.type,
+                pr.description = row.description,
+                pr.enrollment = row.enrollment
+            MERGE (o)-[:OPERATES]->(pr)
+        """, _prefixed(_records(data['programs']), 'name', 'organization'))
+        timed('collaborations', """
+            UNWIND $rows as row
+            MATCH (a:Organization {name: row.source})
+            MATCH (b:Organization {name: row.target})
+            MERGE (a)-[c:COLLABORATES_WITH]->(b)
+            SET c.weight = row.weight
+        """, _prefixed(_records(data['collaborations']), 'source', 'target'))
+
+        if households:
+            timed('households', """
+                UNWIND $rows as row
+                MERGE (h:Household {id: row.id})
+                ON CREATE SET h.synthetic = true
+                WITH h, row WHERE h.synthetic = true
+                SET h.location = point({latitude: row.latitude, longitude: row.longitude}),
+                    h.size = row.size,
+                    h.income = row.income,
+                    h.broadband_subscribed = row.subscribed
+                WITH h, row
+                MATCH (t:GeographicRegion {name: row.tract})
+                MERGE (h)-[:LOCATED_IN]->(t)
+            """, (row for chunk in household_chunks(data, batch_size * 20)
+                  for row in _prefixed(_records(chunk.drop(columns=['county'])), 'id', 'tract')))
+    return timings
+
+
+def table_sizes(data: Dict[str, pd.DataFrame]) -> Dict[str, int]:
+    return {name: len(frame) for name, frame in data.items()}
+
+
+# Generate (and optionally load) a synthetic state from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic statewide digital equity data")
+    parser.add_argument("--scale", default="small", choices=sorted(SCALES), help="Size preset")
+    parser.add_argument("--seed", type=int, default=42)
+    for table in ['tracts', 'organizations', 'programs', 'households']:
+        parser.add_argument(f"--{table}", type=int, help=f"Override the preset's number of {table}")
+    parser.add_argument("--output-dir", help="Write one CSV per table here")
+    parser.add_argument("--load", action="store_true", help="Load into Neo4j, replacing earlier synthetic data")
+    parser.add_argument("--no-households", action="store_true", help="Skip households when loading")
+    parser.add_argument("--clear", action="store_true", help="Only delete previously loaded synthetic data")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Synthetic Statewide Data")
+    print("=" * 60)
+    print()
+
+    try:
+        if args.clear:
+            from neo4j_connection import get_driver
+            print(f"✓ Deleted {clear_synthetic(get_driver()):,} synthetic nodes")
+        else:
+            sizes = {**SCALES[args.scale], **{k: v for k, v in vars(args).items() if k in SCALES[args.scale] and v}}
+            start = time.perf_counter()
+            data = generate_statewide(seed=args.seed, **sizes)
+            print(f"✓ Generated '{args.scale}' state (seed {args.seed}) in {time.perf_counter() - start:.1f}s")
+            for name, rows in table_sizes(data).items():
+                print(f"  {name:16s} {rows:>12,}")
+
+            if args.output_dir:
+                paths = write_csvs(data, args.output_dir)
+                print(f"✓ Wrote {len(paths)} CSVs to {args.output_dir}")
+
+            if args.load:
+                from neo4j_connection import get_driver
+                from ingest_michigan_data import calculate_factor_scores
+                from analytics_views import refresh_analytics_views
+                from graph_metadata import bump_graph_version
+                driver = get_driver()
+                removed = clear_synthetic(driver)
+                if removed:
+                    print(f"✓ Removed {removed:,} nodes of the previous synthetic load")
+                timings = load_statewide(driver, data, households=not args.no_households)
+                for name, stats in timings.items():
+                    print(f"  {name:16s} {stats['rows']:>12,} rows  {stats['seconds']:8.1f}s")
+                with driver.session() as session:
+                    calculate_factor_scores(session)
+                    refresh_analytics_views(session)
+                    bump_graph_version(session, source='synthetic_statewide')
+                print("✓ Loaded into Neo4j, scored and materialized the dashboard views")
+
+    except Exception as e:
+        print(f"❌ Synthetic data failed: {e}")
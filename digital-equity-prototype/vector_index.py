@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Local Hybrid Retrieval Index for the Digital Equity Knowledge Graph
+Embeds node text (names, descriptions, research passages) into a
+memory-mapped on-disk index and combines top-k vector hits with k-hop
+graph expansion, so fuzzy questions work without Text-to-Cypher
+"""
+
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+from neo4j_connection import PooledGraph
+
+# Labels whose nodes are embedded, with the properties that make up their text
+INDEXED_LABELS = ['Organization', 'Service', 'Population', 'Program',
+                  'GeographicRegion', 'ResearchDocument', 'ResearchChunk']
+TEXT_PROPERTIES = ['name', 'description', 'type', 'heading', 'text']
+
+# Everyday phrasings mapped onto the vocabulary used in the graph
+DOMAIN_SYNONYMS = {
+    'older': 'seniors', 'elderly': 'seniors', 'elder': 'seniors', 'aging': 'seniors',
+    'online': 'internet digital', 'web': 'internet', 'broadband': 'internet',
+    'computer': 'device', 'laptop': 'device', 'tablet': 'device', 'chromebook': 'device',
+    'poor': 'low-income', 'poverty': 'low-income', 'kids': 'students', 'youth': 'students',
+    'jobs': 'job', 'work': 'job', 'employment': 'job', 'countryside': 'rural',
+    'teach': 'training literacy', 'learn': 'training literacy', 'class': 'training',
+    'help': 'support assistance navigation', 'helps': 'support assistance navigation'
+}
+
+NODE_TEXT_QUERY = """
+MATCH (n)
+WHERE any(label IN labels(n) WHERE label IN $labels)
+RETURN elementId(n) as id,
+       labels(n) as labels,
+       [key IN $properties WHERE n[key] IS NOT NULL | toString(n[key])] as parts
+"""
+
+
+def _tokens(text: str) -> List[str]:
+    """Lowercased word tokens with domain synonyms appended"""
+    words = re.findall(r"[a-z0-9][a-z0-9\-]*", text.lower())
+    expanded = list(words)
+    for word in words:
+        if word in DOMAIN_SYNONYMS:
+            expanded.extend(DOMAIN_SYNONYMS[word].split())
+    return expanded
+
+
+class HashingEmbedder:
+    """
+    Offline embedder using signed feature hashing
+
+    Hashes word unigrams, bigrams and character trigrams into a fixed
+    number of dimensions. Stateless, so vectors never go stale and the
+    index can be updated one node at a time.
+    """
+
+    name = 'hashing'
+
+    def __init__(self, dim: int = 512, char_ngrams: bool = True):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def fingerprint(self) -> str:
+        """Identifies the vector space; a change forces a full rebuild"""
+        return f"{self.name}:{self.dim}:{int(self.char_ngrams)}"
+
+    def _features(self, text: str) -> Iterable[Tuple[str, float]]:
+        tokens = _tokens(text)
+        for token in tokens:
+            yield token, 1.0
+        for first, second in zip(tokens, tokens[1:]):
+            yield f"{first} {second}", 0.5
+        if self.char_ngrams:
+            for token in tokens:
+                padded = f"#{token}#"
+                for i in range(len(padded) - 2):
+                    yield padded[i:i + 3], 0.25
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as L2-normalized float32 rows"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                vectors[row, h % self.dim] += sign * weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class TfidfHashingEmbedder(HashingEmbedder):
+    """
+    Hashing embedder with IDF weights learned from the indexed corpus
+
+    Sharper ranking than plain hashing, but refitting changes the
+    fingerprint and therefore triggers a full index rebuild.
+    """
+
+    name = 'tfidf-hashing'
+
+    def __init__(self, dim: int = 512, char_ngrams: bool = True):
+        super().__init__(dim, char_ngrams)
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def fit(self, texts: List[str]):
+        """Learn per-dimension IDF weights from a corpus"""
+        doc_freq = np.zeros(self.dim, dtype=np.float32)
+        for text in texts:
+            buckets = {zlib.crc32(f.encode('utf-8')) % self.dim for f, _ in self._features(text)}
+            doc_freq[list(buckets)] += 1
+        self.idf = (np.log((1 + len(texts)) / (1 + doc_freq)) + 1).astype(np.float32)
+        return self
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha1(self.idf.tobytes()).hexdigest()[:12]
+        return f"{super().fingerprint()}:{digest}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = super().embed(texts) * self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def manifest_signature(index_dir: str) -> Tuple:
+    """(mtime, size) of an index's manifest, None when there is no index yet; changes on every save"""
+    try:
+        stat = os.stat(os.path.join(index_dir, "manifest.json"))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class VectorIndex:
+    """
+    Memory-mapped brute-force vector index with incremental updates
+
+    Vectors live in a float32 file opened with np.memmap; a small JSON
+    manifest holds node ids, content hashes and free rows. Only nodes
+    whose text changed are re-embedded.
+    """
+
+    def __init__(self, index_dir: str = "data/vector_index", embedder=None):
+        """
+        Args:
+            index_dir: Directory holding vectors.f32 and manifest.json
+            embedder: Object with dim, fingerprint() and embed(texts); defaults to HashingEmbedder
+        """
+        self.index_dir = index_dir
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self.vectors_path = os.path.join(index_dir, "vectors.f32")
+        self.manifest_path = os.path.join(index_dir, "manifest.json")
+
+        self.ids: List[str] = []          # row -> node id ('' for free rows)
+        self.hashes: Dict[str, str] = {}  # node id -> content hash
+        self.labels: Dict[str, List[str]] = {}
+        self.texts: Dict[str, str] = {}
+        self.rows: Dict[str, int] = {}
+        self.free_rows: List[int] = []
+        self.capacity = 0
+        self._vectors = None
+
+        os.makedirs(index_dir, exist_ok=True)
+        self.signature = manifest_signature(index_dir)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('fingerprint') != self.embedder.fingerprint() or manifest.get('dim') != self.dim:
+            # Different vector space; start over
+            return
+        self.ids = manifest['ids']
+        self.hashes = manifest['hashes']
+        self.labels = manifest.get('labels', {})
+        self.texts = manifest.get('texts', {})
+        self.free_rows = manifest['free_rows']
+        self.capacity = manifest['capacity']
+        self.rows = {node_id: row for row, node_id in enumerate(self.ids) if node_id}
+        if self.capacity:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                      shape=(self.capacity, self.dim))
+
+    def _save(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+        manifest = {
+            'fingerprint': self.embedder.fingerprint(),
+            'dim': self.dim,
+            'capacity': self.capacity,
+            'ids': self.ids,
+            'hashes': self.hashes,
+            'labels': self.labels,
+            'texts': self.texts,
+            'free_rows': self.free_rows
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+        self.signature = manifest_signature(self.index_dir)
+
+    def _grow(self, needed_rows: int):
+        """Extend the memory-mapped file, doubling capacity"""
+        new_capacity = max(64, self.capacity)
+        while new_capacity < needed_rows:
+            new_capacity *= 2
+        if new_capacity == self.capacity:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(new_capacity, self.dim))
+        self.capacity = new_capacity
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def upsert(self, items: List[Dict], batch_size: int = 1024) -> int:
+        """
+        Add or update nodes; unchanged nodes are skipped
+
+        Args:
+            items: Dicts with 'id', 'text' and optional 'labels'
+
+        Returns:
+            Number of nodes (re-)embedded
+        """
+        changed = [item for item in items
+                   if self.hashes.get(item['id']) != self.content_hash(item['text'])]
+
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            new_ids = [item['id'] for item in batch if item['id'] not in self.rows]
+            reusable = min(len(new_ids), len(self.free_rows))
+            self._grow(len(self.ids) + len(new_ids) - reusable)
+
+            vectors = self.embedder.embed([item['text'] for item in batch])
+            for item, vector in zip(batch, vectors):
+                node_id = item['id']
+                row = self.rows.get(node_id)
+                if row is None:
+                    if self.free_rows:
+                        row = self.free_rows.pop()
+                        self.ids[row] = node_id
+                    else:
+                        row = len(self.ids)
+                        self.ids.append(node_id)
+                    self.rows[node_id] = row
+                self._vectors[row] = vector
+                self.hashes[node_id] = self.content_hash(item['text'])
+                self.labels[node_id] = item.get('labels', [])
+                self.texts[node_id] = item['text'][:200]
+
+        if changed:
+            self._save()
+        return len(changed)
+
+    def remove(self, node_ids: Iterable[str]) -> int:
+        """Drop nodes from the index; their rows are reused by later upserts"""
+        removed = 0
+        for node_id in node_ids:
+            row = self.rows.pop(node_id, None)
+            if row is None:
+                continue
+            self._vectors[row] = 0.0
+            self.ids[row] = ''
+            self.free_rows.append(row)
+            for store in (self.hashes, self.labels, self.texts):
+                store.pop(node_id, None)
+            removed += 1
+        if removed:
+            self._save()
+        return removed
+
+    def search(self, query: str, k: int = 10, chunk_rows: int = 65536) -> List[Dict]:
+        """
+        Brute-force cosine top-k over the memory-mapped vectors
+
+        Scans in chunks so memory stays bounded for large indexes.
+        """
+        if not self.rows:
+            return []
+        q = self.embedder.embed([query])[0]
+        used = len(self.ids)
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+
+        for start in range(0, used, chunk_rows):
+            stop = min(start + chunk_rows, used)
+            scores = np.asarray(self._vectors[start:stop] @ q)
+            take = min(k, len(scores))
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_rows = np.concatenate([best_rows, top + start])
+
+        order = np.argsort(-best_scores)
+        hits = []
+        for i in order:
+            node_id = self.ids[best_rows[i]]
+            if not node_id or best_scores[i] <= 0:
+                continue
+            hits.append({'id': node_id, 'score': float(best_scores[i]),
+                         'labels': self.labels.get(node_id, []),
+                         'text': self.texts.get(node_id, '')})
+            if len(hits) == k:
+                break
+        return hits
+
+    def sync_from_graph(self, graph, labels: List[str] = None) -> Dict:
+        """
+        Incrementally rebuild from the graph after ingestion
+
+        Re-embeds only nodes whose text changed and drops nodes that no
+        longer exist.
+
+        Args:
+            graph: Object with query(cypher, params) -> List[Dict] (e.g. Neo4jGraph)
+        """
+        records = graph.query(NODE_TEXT_QUERY, {
+            'labels': labels or INDEXED_LABELS,
+            'properties': TEXT_PROPERTIES
+        })
+        items = []
+        for record in records:
+            text = ". ".join(record['parts'])
+            if text:
+                items.append({'id': record['id'], 'labels': record['labels'],
+                              'text': f"{' '.join(record['labels'])}: {text}"})
+
+        seen = {item['id'] for item in items}
+        embedded = self.upsert(items)
+        removed = self.remove([node_id for node_id in list(self.rows) if node_id not in seen])
+        return {'nodes': len(items), 'embedded': embedded, 'removed': removed}
+
+
+class HybridRetriever:
+    """
+    Vector search seeded k-hop graph expansion
+    """
+
+    # Ordered by seed score before the LIMIT, so the strongest hits keep their neighbors
+    EXPANSION_QUERY = """
+    MATCH (seed) WHERE elementId(seed) IN $ids
+    MATCH path = (seed)-[*1..{hops}]-(neighbor)
+    WITH seed, neighbor, [r IN relationships(path) | type(r)] as via
+    RETURN elementId(seed) as seed_id,
+           seed.name as seed,
+           via,
+           neighbor.name as neighbor,
+           labels(neighbor) as neighbor_labels
+    ORDER BY $scores[elementId(seed)] DESC, size(via)
+    LIMIT $limit
+    """
+
+    def __init__(self, graph, index: VectorIndex, hops: int = 1, expansion_limit: int = 100):
+        """
+        Args:
+            graph: Object with query(cypher, params) -> List[Dict] (e.g. Neo4jGraph)
+            index: VectorIndex over node text
+            hops: Relationship hops to expand from each hit (kept small; paths grow fast)
+            expansion_limit: Maximum neighbor rows returned
+        """
+        self.graph = graph
+        self.index = index
+        self.hops = max(1, min(int(hops), 3))
+        self.expansion_limit = expansion_limit
+
+    def retrieve(self, question: str, k: int = 5) -> List[Dict]:
+        """
+        Return context rows for a question: the top-k hits plus their neighborhoods
+        """
+        hits = self.index.search(question, k=k)
+        if not hits:
+            return []
+
+        scores = {hit['id']: hit['score'] for hit in hits}
+        rows = [{'source': 'vector', 'match': hit['text'], 'labels': hit['labels'],
+                 'score': round(hit['score'], 3)} for hit in hits]
+
+        expansion = self.graph.query(
+            self.EXPANSION_QUERY.replace('{hops}', str(self.hops)),
+            {'ids': list(scores), 'scores': scores, 'limit': self.expansion_limit}
+        )
+        for record in expansion:
+            rows.append({'source': 'graph', 'seed': record['seed'],
+                         'relationship': '/'.join(record['via']),
+                         'neighbor': record['neighbor'],
+                         'labels': record['neighbor_labels']})
+        return rows
+
+
+def sync_vector_index(driver, index_dir: str = "data/vector_index") -> Dict:
+    """Refresh the local index from Neo4j; called at the end of ingestion"""
+    index = VectorIndex(index_dir)
+    return index.sync_from_graph(PooledGraph(driver))
+
+
+# Build or refresh the index from the command line
+if __name__ == "__main__":
+    import sys
+    from neo4j_connection import get_driver
+
+    print("=" * 60)
+    print("Hybrid Retrieval Index")
+    print("=" * 60)
+    print()
+
+    driver = get_driver()
+    try:
+        index = VectorIndex()
+        stats = index.sync_from_graph(PooledGraph(driver))
+        print(f"✓ Indexed {stats['nodes']} nodes "
+              f"({stats['embedded']} embedded, {stats['removed']} removed)")
+        print()
+
+        question = " ".join(sys.argv[1:]) or "who helps older folks get online"
+        print(f"Question: {question}")
+        for row in HybridRetriever(PooledGraph(driver), index).retrieve(question):
+            print(f"  {row}")
+    finally:
+        driver.close()
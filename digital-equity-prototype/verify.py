@@ -3,10 +3,17 @@
 Verification script to check all components are working correctly
 """
 
+import importlib
+import importlib.util
 import sys
 
-def check_imports():
-    """Check all required packages are installed"""
+def check_imports(deep=False):
+    """
+    Check all required packages are installed
+
+    Args:
+        deep: Also import each one (catches installed-but-broken packages; slower)
+    """
     print("Checking Python packages...")
     required_packages = [
         'streamlit',
@@ -15,6 +22,7 @@ def check_imports():
         'pgmpy',
         'pandas',
         'numpy',
+        'scipy',
         'networkx',
         'plotly',
         'langchain',
@@ -24,14 +32,20 @@ def check_imports():
     missing = []
     for package in required_packages:
         try:
-            __import__(package)
+            if importlib.util.find_spec(package) is None:
+                raise ImportError(package)
+            if deep:
+                importlib.import_module(package)
             print(f"  ✓ {package}")
         except ImportError:
             print(f"  ❌ {package} - MISSING")
             missing.append(package)
+        except Exception as e:
+            print(f"  ❌ {package} - FAILED TO IMPORT: {e}")
+            missing.append(package)
     
     if missing:
-        print(f"\n❌ Missing packages: {', '.join(missing)}")
+        print(f"\n❌ Missing or broken packages: {', '.join(missing)}")
         print("Run: pip install -r requirements.txt")
         return False
     
@@ -42,12 +56,11 @@ def check_neo4j():
     """Check Neo4j connection"""
     print("Checking Neo4j connection...")
     try:
-        from neo4j import GraphDatabase
-        driver = GraphDatabase.driver("bolt://localhost:7687", auth=("neo4j", "password"))
+        from neo4j_connection import get_driver
+        driver = get_driver()
         with driver.session() as session:
             result = session.run("RETURN 1")
             result.single()
-        driver.close()
         print("✓ Neo4j is accessible\n")
         return True
     except Exception as e:
@@ -62,15 +75,14 @@ def check_knowledge_graph():
     """Check if knowledge graph has data"""
     print("Checking knowledge graph data...")
     try:
-        from neo4j import GraphDatabase
-        driver = GraphDatabase.driver("bolt://localhost:7687", auth=("neo4j", "password"))
+        # Same pool as check_neo4j; closed when the script exits
+        from neo4j_connection import get_driver
+        driver = get_driver()
         with driver.session() as session:
             org_count = session.run("MATCH (o:Organization) RETURN count(o) as count").single()["count"]
             service_count = session.run("MATCH (s:Service) RETURN count(s) as count").single()["count"]
             region_count = session.run("MATCH (r:GeographicRegion) RETURN count(r) as count").single()["count"]
         
-        driver.close()
-        
         print(f"  Organizations: {org_count}")
         print(f"  Services: {service_count}")
         print(f"  Regions: {region_count}")
@@ -86,6 +98,37 @@ def check_knowledge_graph():
         print(f"❌ Error checking knowledge graph: {e}\n")
         return False
 
+def check_query_timeout():
+    """Check generated queries still hit the guard's server-side timeout with instrumentation on"""
+    print("Checking generated-query timeout...")
+    try:
+        from cypher_guard import CypherGuard, CypherUnavailable
+        from neo4j import unit_of_work
+        from neo4j_connection import get_driver
+        driver = get_driver()
+
+        # The instrumented session must hand the driver a work function that keeps its timeout
+        if driver.recorder is not None:
+            @unit_of_work(timeout=1.0)
+            def work(tx):
+                return None
+            if getattr(driver.recorder.transaction_work(work, None), 'timeout', None) != 1.0:
+                print("❌ Instrumentation drops the transaction timeout\n")
+                return False
+
+        guard = CypherGuard(driver, timeout_seconds=1.0)
+        try:
+            guard.execute("UNWIND range(1, 2000000000) AS x WITH x WHERE x % 7 = 3 RETURN count(x) AS n",
+                          check_plan=False)
+        except CypherUnavailable:
+            print("✓ Generated queries time out server-side\n")
+            return True
+        print("❌ A slow generated query ran past the 1s timeout\n")
+        return False
+    except Exception as e:
+        print(f"❌ Timeout check failed: {e}\n")
+        return False
+
 def check_bayesian_model():
     """Check Bayesian model"""
     print("Checking Bayesian model...")
@@ -93,6 +136,7 @@ def check_bayesian_model():
         from bayesian_model import DigitalDivideBayesianModel
         model = DigitalDivideBayesianModel()
         result = model.query(["DigitalInclusion"], {})
+        assert abs(sum(result['marginals']['DigitalInclusion'].values()) - 1) < 1e-6
         print("✓ Bayesian model is working\n")
         return True
     except Exception as e:
@@ -118,21 +162,28 @@ def check_graphrag():
         return True  # Don't fail on optional feature
 
 def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Check all components are working")
+    parser.add_argument("--deep", action="store_true",
+                        help="Import every required package instead of only checking it is installed")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Digital Equity Intelligence System - Verification")
     print("=" * 60)
     print()
     
     checks = [
-        check_imports(),
+        check_imports(deep=args.deep),
         check_neo4j(),
         check_knowledge_graph(),
+        check_query_timeout(),
         check_bayesian_model(),
         check_graphrag()
     ]
     
     print("=" * 60)
-    if all(checks[:4]):  # First 4 are required
+    if all(checks[:5]):  # First 5 are required
         print("✓ All core components are working!")
         print("=" * 60)
         print()